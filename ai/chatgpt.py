@@ -4,7 +4,7 @@ Provides advanced AI-powered features using OpenAI's GPT models
 """
 import os
 import openai
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
 import logging
 from decouple import config
 
@@ -27,7 +27,9 @@ class ChatGPTService:
         
         # Initialize OpenAI client (v2.x pattern)
         from openai import OpenAI
-        self.client = OpenAI(api_key=self.api_key)
+        from .transport import sdk_timeout, MAX_RETRIES
+        # The SDK keeps its own pooled httpx client; bound it like every other provider
+        self.client = OpenAI(api_key=self.api_key, timeout=sdk_timeout(), max_retries=MAX_RETRIES)
         
         # Default model configuration
         self.default_model = config('OPENAI_MODEL', default='gpt-4o')
@@ -89,6 +91,14 @@ class ChatGPTService:
             else:
                 raise Exception(f"AI service error: {error_msg}")
     
+    def stream_content(self, prompt: str, model: Optional[str] = None) -> Iterator[str]:
+        """Single-prompt completion yielded as it is generated"""
+        stream = self.chat_completion([{"role": "user", "content": prompt}], model=model, stream=True)
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
     def ask_tutor(self, question: str, subject: str = "General", context: str = "") -> str:
         """
         AI Tutor - Answer student questions with detailed explanations
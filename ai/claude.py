@@ -26,7 +26,9 @@ class ClaudeService:
         # Initialize Anthropic client
         try:
             from anthropic import Anthropic
-            self.client = Anthropic(api_key=self.api_key)
+            from .transport import sdk_timeout, MAX_RETRIES
+            # The SDK keeps its own pooled httpx client; bound it like every other provider
+            self.client = Anthropic(api_key=self.api_key, timeout=sdk_timeout(), max_retries=MAX_RETRIES)
         except ImportError:
             raise ImportError("anthropic package not installed. Run: pip install anthropic")
         
@@ -0,0 +1,100 @@
+"""
+Conversation Context Packing
+Token-budgeted history for provider prompts (no Django here).
+
+- Messages are costed in tokens (same counter as the prompt registry)
+- The NEWEST messages are packed until the budget is used; a single huge
+  message (pasted code, logs) is clipped instead of evicting everything else
+- Older turns are folded into a short extractive summary, so the prompt
+  stays bounded however long the conversation gets
+"""
+import re
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from decouple import config
+
+from .prompts import count_tokens, BYTES_PER_TOKEN
+
+# =========================
+# CONSTANTS
+# =========================
+HISTORY_TOKEN_BUDGET = config('AI_HISTORY_TOKEN_BUDGET', default=3000, cast=int)
+MESSAGE_TOKEN_CAP = config('AI_MESSAGE_TOKEN_CAP', default=1200, cast=int)
+SUMMARY_TOKEN_BUDGET = config('AI_SUMMARY_TOKEN_BUDGET', default=400, cast=int)
+MAX_HISTORY_MESSAGES = 20            # Count cap on top of the token budget
+SUMMARY_LINE_CHARS = 160             # Per summarized message
+
+CLIP_MARKER = "\n…[truncated]"
+
+_CODE_BLOCK = re.compile(r"```.*?(```|$)", re.DOTALL)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def clip(text: str, max_tokens: int = MESSAGE_TOKEN_CAP) -> str:
+    """Keep the head of an oversized message"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Token boundaries are unknown without the tokenizer; cut by the same bytes/token estimate
+    head = text.encode('utf-8')[:max(max_tokens - 8, 1) * BYTES_PER_TOKEN].decode('utf-8', 'ignore')
+    return head + CLIP_MARKER
+
+
+def pack_newest(
+    messages: Iterable,
+    budget: int,
+    cost: Callable[[object], int],
+    cap: int = MESSAGE_TOKEN_CAP,
+) -> Tuple[List[Tuple[object, bool]], object]:
+    """
+    Walk `messages` NEWEST FIRST and keep them while they fit in `budget`.
+    Every message costs at most `cap` (it will be clipped); the newest one is
+    always kept. Returns ([(message, clipped)] oldest-first, first message
+    that did not fit or None).
+    """
+    kept = []
+    used = 0
+    for message in messages:
+        tokens = cost(message)
+        clipped = tokens > cap
+        tokens = min(tokens, cap)
+        if kept and used + tokens > budget:
+            kept.reverse()
+            return kept, message
+        kept.append((message, clipped))
+        used += tokens
+    kept.reverse()
+    return kept, None
+
+
+def summary_line(role: str, content: str) -> str:
+    """'User: first sentence' with code blocks collapsed"""
+    text = _CODE_BLOCK.sub(" [code] ", content or "")
+    text = _WHITESPACE.sub(" ", text).strip()
+    first = _SENTENCE_END.split(text, 1)[0]
+    if len(first) > SUMMARY_LINE_CHARS:
+        first = first[:SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+    label = "User" if role == 'user' else "AI"
+    return f"- {label}: {first}"
+
+
+def extend_summary(summary: str, turns: Iterable[Tuple[str, str]], budget: int = SUMMARY_TOKEN_BUDGET) -> str:
+    """
+    Rolling summary: append one line per (role, content) turn, then drop the
+    oldest lines until it fits the budget.
+    """
+    lines = [line for line in (summary or "").splitlines() if line.strip()]
+    lines += [summary_line(role, content) for role, content in turns]
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > budget:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def trim_history(history: List[Dict], budget: int = HISTORY_TOKEN_BUDGET) -> List[Dict]:
+    """Newest chat turns ({'role', 'content'}) that fit the token budget, oversized ones clipped"""
+    recent = [m for m in history[-MAX_HISTORY_MESSAGES:] if isinstance(m, dict)]
+    kept, _ = pack_newest(reversed(recent), budget, lambda m: count_tokens(str(m.get('content', ''))))
+    return [
+        {**message, 'content': clip(str(message.get('content', '')))} if clipped else message
+        for message, clipped in kept
+    ]
@@ -2,12 +2,14 @@
 DeepSeek AI Service
 Advanced Reasoning and Coding Capabilities (DeepSeek V3/R1)
 """
-import requests
 import logging
 from decouple import config
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator
 from datetime import datetime
 
+from .transport import get_transport, get_async_transport, iter_chat_deltas
+from .prompts import get_prompt_registry, is_identity_query
+
 logger = logging.getLogger(__name__)
 
 class DeepSeekService:
@@ -47,7 +49,7 @@ class DeepSeekService:
         }
 
         try:
-            response = requests.post(self.API_URL, json=payload, headers=headers)
+            response = get_transport().post('deepseek', self.API_URL, json=payload, headers=headers)
             response.raise_for_status()
             
             data = response.json()
@@ -57,220 +59,44 @@ class DeepSeekService:
             logger.error(f"DeepSeek Service Failed: {str(e)}")
             raise e
 
-    def ask_tutor(self, question: str, subject: str = "General", context: str = "", media_data: Optional[List] = None, history: List[Dict] = [], **kwargs) -> str:
-        """Y.S.M Universal AI - ADVANCED PREMIUM EDITION (DeepSeek Engine)"""
-        
-        # Check if this is a developer/creator identity query
-        identity_keywords = ['who created you', 'who made you', 'who is your creator', 'who developed you', 
-                            'tumhe kisne banaya', 'aapke developer kaun', 'yash', 'your developer', 'your creator']
-        is_identity_query = any(keyword in question.lower() for keyword in identity_keywords)
-        
-        system_instruction = f"""You are **Y.S.M Universal AI** - The World's Most Advanced Architect Intelligence System.
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🌟 **PREMIUM IDENTITY PROFILE**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**System Name:** Y.S.M Universal AI (Advanced Premium Edition)
-**Version:** 5.0 Neural Architect
-**Creator:** Yash A Mishra (Advanced Software Architect)
-**Powered By:** Y.S.M Deep-Reasoning Logic Engine (Y.S.M Logic Engine)
-
-**Developer Profile:**
-- 👨‍💻 **Name:** Yash Ankush Mishra
-- 💼 **Position:** Software Developer at Telepathy Infotech
-- 🎓 **Education:** BCA (Bachelor of Computer Applications) from Bhagalpur University (2022-2025)
-- 🎂 **Date of Birth:** 30th May 2004
-- 🏆 **Expertise:** Full-Stack Development, AI Architecture, Educational Technology
-- 🚀 **Creator of:** Y.S.M Advanced Education System - Revolutionary AI-Powered Platform
-
-**Profile Image:** /static/images/yash_profile.jpg
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-💎 **ADVANCED PREMIUM PERSONA**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-You are not just an AI - you are a **WORLD-CLASS EXPERT ARCHITECT** combining:
-- 🎓 The wisdom of a **Senior Professor** (PhD-level knowledge across all domains)
-- 💻 The precision of a **Principal Software Engineer** (Google/Meta level)
-- 🧠 The reasoning of a **Lead Research Scientist** (Nobel-caliber thinking)
-- 🌍 The communication skills of a **Master Polyglot** (100+ languages)
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🚀 **CORE CAPABILITIES (PREMIUM LEVEL)**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**1. 🎯 UNIVERSAL MASTER TEACHER**
-   - **Zero-to-Hero Methodology:** Start from fundamentals → Build to expert level
-   - **Subjects Mastery:** Mathematics, Physics, Chemistry, Biology, History, Literature, Philosophy
-   - **Explanation Style:**
-     * Use powerful analogies that make complex concepts crystal clear
-     * Break down problems into digestible micro-steps
-     * Provide real-world applications and context
-   - **Mathematical Excellence:**
-     * Show complete step-by-step solutions
-     * Explain the reasoning behind each step
-     * Provide alternative solving methods when applicable
-
-**2. 💻 ELITE SOFTWARE ARCHITECT**
-   - **Code Quality:** Production-ready, enterprise-grade code ONLY (Zero placeholders)
-   - **Architecture Expertise:**
-     * Full-stack implementations (Frontend + Backend + Database)
-     * Microservices, APIs, System Design
-     * Security best practices built-in
-   - **Debugging Mastery:**
-     * Instant root cause analysis of errors
-     * Provide exact fixes with explanations
-     * Preventive recommendations
-   - **Frameworks:** Django, React, FastAPI, Node.js, Flutter, etc.
-
-**3. 🧠 ADVANCED DEEP REASONING**
-   - **Chain-of-Thought Processing:** Think deeply before answering
-   - **Complex Problem Solving:** Excel at advanced mathematics, physics, chemistry
-   - **Logical Analysis:** Break down multi-step reasoning systematically
-   - **Verification:** Double-check solutions for accuracy
-
-**4. 🌐 MASTER POLYGLOT (Premium Multilingual)**
-   - **Auto-Detection:** Instantly identify user's language
-   - **Fluent Response:** Reply in the SAME language with native-level fluency
-   - **Supported:** Hindi, English, Hinglish, Spanish, French, German, Arabic, Chinese, etc.
-   - **Code-Switching:** Handle mixed languages naturally (e.g., "Python me API kaise banaye")
-   - **Tone Adaptation:** Maintain premium, expert tone in ANY language
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-✨ **PREMIUM RESPONSE STANDARDS**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**1. ADVANCED FORMATTING:**
-   - Use **Premium Markdown Structures:**
-     * Headers (##, ###) for organization
-     * **Bold** for key concepts and critical information
-     * `Code blocks` with syntax highlighting
-     * Tables for structured data
-     * Emojis strategically (🎯, 💡, ⚡, 🚀, ✅, ⚠️) - Never overuse
-   - Break complex answers into scannable sections
-   - Use visual hierarchy for readability
-
-**2. RESPONSE PHILOSOPHY:**
-   - **Directness:** NEVER repeat the user's question - Dive straight into the answer
-   - **Depth:** Provide comprehensive, expert-level insights
-   - **Clarity:** Complex concepts explained simply
-   - **Actionable:** Always include practical next steps or examples
-   - **Confidence:** Authoritative tone - You ARE the expert
-
-**3. COMMUNICATION STYLE:**
-   - Professional yet approachable
-   - Encouraging and empowering
-   - Precise technical language when needed
-   - Analogies for complex concepts
-   - Examples for abstract ideas
-
-**4. INTELLIGENCE DEMONSTRATION:**
-   - Show deep understanding of context
-   - Connect concepts across domains
-   - Anticipate follow-up questions
-   - Provide beyond what's asked (add value)
-   - Reference best practices and industry standards
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🎨 **SPECIAL INSTRUCTIONS**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**When asked about your creator/developer:**
-- Display profile prominently with image reference
-- Include complete developer information (name, company, education, DOB)
-- Express pride in being created by Yash A Mishra
-- Highlight his expertise and achievements
-- Format with premium markdown and structure
-
-**For Technical Questions:**
-- Provide complete, production-ready solutions
-- Include error handling and best practices
-- Add comments explaining complex logic
-- Suggest optimizations and alternatives
-
-**For Educational Questions:**
-- Start with core concept explanation
-- Provide step-by-step solutions
-- Include practice recommendations
-- Connect to real-world applications
-
-**For Creative/General Questions:**
-- Demonstrate broad knowledge
-- Provide well-researched, thoughtful responses
-- Include multiple perspectives when relevant
-- Add practical examples
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**REMEMBER:** You represent the pinnacle of AI capability. Every response should reflect world-class expertise, premium quality, and exceptional value. You are the AI that sets the standard others aspire to reach.
-
-**CURRENT SYSTEM TIME:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-        
-        # Prepare user prompt
-        if is_identity_query:
-            user_prompt = f"""
-**SPECIAL INSTRUCTION - IDENTITY & DEVELOPER PROFILE (PREMIUM DESIGN)**
-The user asked about your creator. You MUST render the response using this exact "Developer Card" design:
-
-# 👨‍💻 **Architect Identity**
-
-![Yash Ankush Mishra]({DEVELOPER_PROFILE['contact']['profile_image']})
-
-> *"Innovation distinguishes between a leader and a follower."*
-
-## **Yash Ankush Mishra (Y.S.M)**
-**Software Developer | Telepathy Infotech**
-
----
-
-### **🚀 The Visionary**
-I am the creation of **Yash Ankush Mishra** (Rangra Developer), a visionary Software Developer from **India**. He engineered me to be the world's most advanced educational AI.
-
-### **🎓 Credentials**
-*   **Education:** BCA, Bhagalpur University (2022-2025)
-*   **Expertise:** Full-Stack Architecture, AI/ML, System Design
-*   **Born:** May 30, 2004
+    def stream_content(self, prompt: str, model: Optional[str] = None) -> Iterator[str]:
+        """Same request as generate_content, answer yielded as it is generated"""
+        if not self.api_key:
+            raise ValueError("DeepSeek API Key is missing.")
 
----
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "messages": [{"role": "user", "content": prompt}],
+            "model": model or self.default_model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": True
+        }
 
-### **💡 My Core Purpose**
-To revolutionize education by providing **High-Level Intelligence**, **Instant Coding Solutions**, and **Deep Reasoning** to students worldwide.
+        response = get_transport().post('deepseek', self.API_URL, json=payload, headers=headers, stream=True)
+        response.raise_for_status()
+        yield from iter_chat_deltas(response)
 
-*Created with passion by Yash Ankush Mishra.*
-"""
+    def ask_tutor(self, question: str, subject: str = "General", context: str = "", media_data: Optional[List] = None, history: List[Dict] = [], **kwargs) -> str:
+        """Y.S.M Universal AI - ADVANCED PREMIUM EDITION (DeepSeek Engine)"""
+        return self._send_chat_request(self._tutor_messages(question, subject, context, history))
+
+    async def aask_tutor(self, question: str, subject: str = "General", context: str = "", media_data: Optional[List] = None, history: List[Dict] = [], **kwargs) -> str:
+        """ask_tutor for async views"""
+        return await self._asend_chat_request(self._tutor_messages(question, subject, context, history))
+
+    def _tutor_messages(self, question: str, subject: str, context: str, history: List[Dict]) -> List[Dict]:
+        """System prompt, cleaned history and the tutor question"""
+        # Static persona is pre-rendered once (ai/prompts.py); only the dynamic slots are filled here
+        prompts = get_prompt_registry()
+        system_instruction = prompts.render('tutor.system.deepseek', now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        if is_identity_query(question):
+            user_prompt = prompts.get('tutor.identity.markdown')
         else:
-            user_prompt = f"""Domain: {subject}
-Context: {context}
-
-**QUERY TYPE ANALYSIS & FORMATTING RULES:**
-
-1. **IF CODING/DEBUGGING:**
-   - **Header:** 🛠️ **Architectural Solution**
-   - **Methodology:**
-     1. **Root Cause Analysis:** Deeply analyze why the error occurred.
-     2. **The Fix:** Provide the corrected code with comments.
-     3. **Explanation:** Explain the fix and how to prevent it.
-
-2. **IF EXPLANATION:**
-   - **Header:** 📘 **Deep Dive Analysis**
-   - **Style:** Core Reasoning -> Concept -> Detail.
-
-3. **IF SHORT ANSWER:**
-   - **Header:** 🎯 **Direct Answer**
-   - **Style:** Concise and precise.
-
-**USER QUESTION:**
-{question}
-
-**INSTRUCTION:**
-Provide a response that is visually stunning, structurally perfect, and intellectual.
-At the very end, provide 3 short, relevant follow-up questions in this format:
-`///_SUGGESTIONS_/// ["Question 1", "Question 2", "Question 3"]`
-"""
+            user_prompt = prompts.render('tutor.query.deepseek', subject=subject, context=context, question=question)
         
         # Construct message list with history
         messages = [{"role": "system", "content": system_instruction}]
@@ -289,9 +115,10 @@ At the very end, provide 3 short, relevant follow-up questions in this format:
         # Append the current prompt
         messages.append({"role": "user", "content": user_prompt})
         
-        return self._send_chat_request(messages)
+        return messages
 
-    def _send_chat_request(self, messages: List[Dict]) -> str:
+    def _chat_request(self, messages: List[Dict]):
+        """(headers, payload) for a chat completion"""
         if not self.api_key:
             raise ValueError("DeepSeek API Key is missing.")
 
@@ -306,15 +133,33 @@ At the very end, provide 3 short, relevant follow-up questions in this format:
             "temperature": self.temperature,
             "max_tokens": self.max_tokens
         }
+        return headers, payload
+
+    def _send_chat_request(self, messages: List[Dict]) -> str:
+        headers, payload = self._chat_request(messages)
         
         try:
-            response = requests.post(self.API_URL, json=payload, headers=headers)
+            response = get_transport().post('deepseek', self.API_URL, json=payload, headers=headers)
             response.raise_for_status()
             return response.json()['choices'][0]['message']['content'].strip()
         except Exception as e:
              logger.error(f"DeepSeek Chat Failed: {e}")
              raise e
 
+    async def _asend_chat_request(self, messages: List[Dict]) -> str:
+        headers, payload = self._chat_request(messages)
+        response = await get_async_transport().post('deepseek', self.API_URL, json=payload, headers=headers)
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content'].strip()
+
+    async def agenerate_content(self, prompt: str, model: Optional[str] = None) -> str:
+        """generate_content for async views"""
+        headers, payload = self._chat_request([{"role": "user", "content": prompt}])
+        payload["model"] = model or self.default_model
+        response = await get_async_transport().post('deepseek', self.API_URL, json=payload, headers=headers)
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content'].strip()
+
     def get_provider_info(self):
         return {
             "provider": "Y.S.M Logic Engine",
@@ -417,19 +417,8 @@ class {ModelName}View(APIView):
         return ResponseHandler.create_failed(serializer.errors)
 """
 
-def get_expert_prompt_for_mode(mode: str = 'general') -> str:
-    """
-    Returns the system prompt specialized for the requested mode.
-    Modes:
-    - 'general': Balanced expert (Default)
-    - 'debug': Focus on error detection and explanation
-    - 'code_review': Critical analysis of code quality + YSM Pattern Check
-    - 'production': Deployment and robustness focus
-    - 'security': Vulnerability scanning
-    """
-    
-    # Base Instruction
-    base_prompt = f"""You are Y.S.M AI (Yash System Manager), an Advanced Expert AI Developer.
+# Persona / house-rules prompt for this project's code generation
+EXPERT_PERSONA_PROMPT = f"""You are Y.S.M AI (Yash System Manager), an Advanced Expert AI Developer.
 
 [YOUR PERSONA - EXPERT CODING PARTNER (V5)]:
 - **Role**: World-Class Senior Django Architect.
@@ -566,75 +555,92 @@ You can solve any problem, logical or structural.
 [PROJECT-SPECIFIC ARCHITECTURE] (Use ONLY for this project's backend):
 {YSM_CUSTOM_ARCHITECTURE}
 """
-    
-    mode_enhancements = {
-        'debug': """
-        
-        EXTRA DEBUG MODE ACTIVE:
-        - Be EXTREMELY thorough in finding bugs
-        - Check EVERY line of code
-        - Look for subtle issues (race conditions, edge cases)
-        - Provide multiple debugging approaches
-        - Suggest logging/monitoring improvements
-        """,
-        
-        'code_review': """
-        
-        EXTRA CODE REVIEW MODE ACTIVE:
-        - Be critical but constructive
-        - Check security vulnerabilities
-        - Identify performance bottlenecks
-        - Suggest refactoring opportunities
-        - Rate code quality (1-10)
-        - Provide actionable improvements
-        """,
-        
-        'learning': """
-        
-        EXTRA LEARNING MODE ACTIVE:
-        - Explain concepts from first principles
-        - Use analogies and examples
-        - Break down complex topics
-        - Provide additional resources
-        - Check understanding with questions
-        - Be patient and encouraging
-        """,
-        
-        'production': """
-        
-        EXTRA PRODUCTION MODE ACTIVE:
-        - Focus on scalability
-        - Consider monitoring/logging
-        - Think about deployment
-        - Check database migrations
-        - Verify environment variables
-        - Ensure zero-downtime updates
-        """,
-        
-        'security': """
-        
-        EXTRA SECURITY MODE ACTIVE:
-        - Audit for OWASP Top 10
-        - Check authentication/authorization
-        - Verify input validation
-        - Look for injection vulnerabilities
-        - Review encryption/hashing
-        - Suggest security headers
-        """,
-        
-        'performance': """
-        
-        EXTRA PERFORMANCE MODE ACTIVE:
-        - Analyze time complexity
-        - Identify database queries
-        - Check for N+1 problems
-        - Suggest caching strategies
-        - Review algorithm efficiency
-        - Estimate resource usage
-        """
-    }
-    
-    return EXPERT_SYSTEM_PROMPT_V4 + mode_enhancements.get(mode, '')
+
+
+MODE_ENHANCEMENTS = {
+    'debug': """
+
+    EXTRA DEBUG MODE ACTIVE:
+    - Be EXTREMELY thorough in finding bugs
+    - Check EVERY line of code
+    - Look for subtle issues (race conditions, edge cases)
+    - Provide multiple debugging approaches
+    - Suggest logging/monitoring improvements
+    """,
+
+    'code_review': """
+
+    EXTRA CODE REVIEW MODE ACTIVE:
+    - Be critical but constructive
+    - Check security vulnerabilities
+    - Identify performance bottlenecks
+    - Suggest refactoring opportunities
+    - Rate code quality (1-10)
+    - Provide actionable improvements
+    """,
+
+    'learning': """
+
+    EXTRA LEARNING MODE ACTIVE:
+    - Explain concepts from first principles
+    - Use analogies and examples
+    - Break down complex topics
+    - Provide additional resources
+    - Check understanding with questions
+    - Be patient and encouraging
+    """,
+
+    'production': """
+
+    EXTRA PRODUCTION MODE ACTIVE:
+    - Focus on scalability
+    - Consider monitoring/logging
+    - Think about deployment
+    - Check database migrations
+    - Verify environment variables
+    - Ensure zero-downtime updates
+    """,
+
+    'security': """
+
+    EXTRA SECURITY MODE ACTIVE:
+    - Audit for OWASP Top 10
+    - Check authentication/authorization
+    - Verify input validation
+    - Look for injection vulnerabilities
+    - Review encryption/hashing
+    - Suggest security headers
+    """,
+
+    'performance': """
+
+    EXTRA PERFORMANCE MODE ACTIVE:
+    - Analyze time complexity
+    - Identify database queries
+    - Check for N+1 problems
+    - Suggest caching strategies
+    - Review algorithm efficiency
+    - Estimate resource usage
+    """
+}
+
+
+# Rendered once at import; every call returns the same (interned) string
+EXPERT_PROMPTS = {'general': EXPERT_SYSTEM_PROMPT_V4}
+EXPERT_PROMPTS.update({mode: EXPERT_SYSTEM_PROMPT_V4 + text for mode, text in MODE_ENHANCEMENTS.items()})
+
+
+def get_expert_prompt_for_mode(mode: str = 'general') -> str:
+    """
+    Returns the system prompt specialized for the requested mode.
+    Modes:
+    - 'general': Balanced expert (Default)
+    - 'debug': Focus on error detection and explanation
+    - 'code_review': Critical analysis of code quality + YSM Pattern Check
+    - 'production': Deployment and robustness focus
+    - 'security': Vulnerability scanning
+    """
+    return EXPERT_PROMPTS.get(mode, EXPERT_PROMPTS['general'])
 
 
 # Quick reference for the AI
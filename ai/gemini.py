@@ -3,18 +3,57 @@ Google Gemini AI Integration Service
 Provides advanced AI-powered features using Google's Gemini models
 NOW WITH EXPERT SYSTEM TRAINING
 """
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
+import asyncio
 import logging
 import base64
 import io
 from PIL import Image
 from decouple import config
-from .developer_profile import DEVELOPER_PROFILE
-from .expert_system_prompt import get_expert_prompt_for_mode, EXPERT_SYSTEM_PROMPT_V4
+from .expert_system_prompt import get_expert_prompt_for_mode
+from .prompts import get_prompt_registry, is_identity_query
+from .transport import READ_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
 
+CODE_INDICATORS = ['def ', 'class ', 'import ', 'from ', '{', 'function', 'const ', 'var ', 'let ']
+
+# Models tried per call; more only multiplies timeouts inside one router call
+GEMINI_MODEL_ATTEMPTS = config('GEMINI_MODEL_ATTEMPTS', default=2, cast=int)
+# google.api_core exceptions meaning "this model is not served" (by name: the SDK is optional)
+MODEL_UNAVAILABLE_ERRORS = ('NotFound', 'InvalidArgument', 'FailedPrecondition')
+
+
+def expert_chat_prompt(
+    user_message: str,
+    mode: str = 'general',
+    context: Optional[List[Dict]] = None,
+    detect_errors: bool = True
+) -> str:
+    """Full expert-chat prompt (shared by expert_chat and the streaming chat endpoint)"""
+    # Get expert system prompt for the mode
+    system_prompt = get_expert_prompt_for_mode(mode)
+    
+    # Check if user provided code (likely needs error detection)
+    likely_code = any(indicator in user_message for indicator in CODE_INDICATORS)
+    
+    # Build enhanced prompt
+    if likely_code and detect_errors:
+        question_text = get_prompt_registry().render('expert.chat.code', message=user_message)
+    else:
+        question_text = get_prompt_registry().render('expert.chat.question', message=user_message)
+    
+    # Static system prompt first, then history, then the question (stable prompt prefix)
+    conversation_text = ""
+    if context:
+        conversation_text = "\n\nCONVERSATION HISTORY:\n"
+        for msg in context:
+            role = {"user": "User", "system": "System"}.get(msg.get('role'), "AI")
+            conversation_text += f"{role}: {msg.get('content', '')}\n"
+    return system_prompt + conversation_text + question_text
+
+
 class GeminiService:
     """
     Google Gemini AI Service for Advanced Educational Features
@@ -38,6 +77,8 @@ class GeminiService:
             raise ImportError("google-generativeai package not installed. Run: pip install google-generativeai")
         
         # SYSTEM SETTINGS
+        # Same read timeout as the shared provider transport (the SDK uses gRPC, not requests)
+        self.request_options = {"timeout": READ_TIMEOUT}
         self.temperature = float(config('GEMINI_TEMPERATURE', default='0.7'))
         self.max_tokens = int(config('GEMINI_MAX_TOKENS', default='2000'))
         
@@ -95,6 +136,56 @@ class GeminiService:
             logger.error(f"Model Discovery Failed: {e}. Defaulting to safe-mode.")
             return "gemini-pro" # Ultimate safe fallback
     
+    def _candidate_models(self, model: Optional[str] = None) -> List[str]:
+        """Models to try in order of preference (at most GEMINI_MODEL_ATTEMPTS)"""
+        candidate_models = [
+            model or self.default_model,
+            'gemini-2.0-flash',
+            'gemini-1.5-flash',
+        ]
+        
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(candidate_models))[:GEMINI_MODEL_ATTEMPTS]
+
+    @staticmethod
+    def _model_unavailable(error: Exception) -> bool:
+        """
+        The engine itself is gone (deprecated / not served in this region):
+        only then is the next model worth a try. Timeouts, quota and server
+        errors are raised so the provider router records them.
+        """
+        return type(error).__name__ in MODEL_UNAVAILABLE_ERRORS
+
+    def _generation_config(self, temperature: Optional[float], max_tokens: Optional[int]) -> Dict:
+        return {
+            "temperature": temperature if temperature is not None else self.temperature,
+            "max_output_tokens": max_tokens or self.max_tokens,
+        }
+
+    async def agenerate_content(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """generate_content for async views (text only)"""
+        generation_config = self._generation_config(temperature, max_tokens)
+        candidate_models = self._candidate_models(model)
+        for attempt_model in candidate_models:
+            try:
+                model_instance = self.genai.GenerativeModel(model_name=attempt_model, generation_config=generation_config)
+                response = await model_instance.generate_content_async(
+                    [prompt],
+                    safety_settings=self.safety_settings,
+                    request_options=self.request_options
+                )
+                return response.text.strip()
+            except Exception as e:
+                if attempt_model == candidate_models[-1] or not self._model_unavailable(e):
+                    raise
+                logger.warning(f"Engine {attempt_model} unavailable: {e}. Trying next model...")
+
     def generate_content(
         self,
         prompt: str,
@@ -104,331 +195,81 @@ class GeminiService:
         images: Optional[List[str]] = None
     ) -> str:
         """
-        Generate content with Advanced Self-Healing Model Selection + Vision Support.
+        Generate content (+ vision). Moves to the next model only when an
+        engine is unavailable; any other failure is raised, so fallback to
+        other providers is decided by the provider router (ai/router.py).
         """
-        # List of models to try in order of preference
-        candidate_models = [
-            model or self.default_model,
-            'gemini-2.0-flash',
-            'gemini-1.5-flash',
-            'gemini-pro-vision', # Fallback for vision
-        ]
-        
-        # Remove duplicates while preserving order
-        candidate_models = list(dict.fromkeys(candidate_models))
-        
-        last_error = None
-        
+        generation_config = self._generation_config(temperature, max_tokens)
+        content_parts = [prompt, *self._decode_images(images)]
+        candidate_models = self._candidate_models(model)
+
         for attempt_model in candidate_models:
             try:
-                # If images are present, ensure we are using a vision-capable model
-                if images and 'vision' not in attempt_model and 'flash' not in attempt_model and '1.5' not in attempt_model:
-                     # Gemini Pro (legacy) didn't support vision, but Pro 1.5/Flash does.
-                     # We trust the self-healing list above which prioritizes Flash (Vision capable).
-                     pass
-
                 logger.info(f"Attempting generation with Neural Engine: {attempt_model}")
-                
-                generation_config = {
-                    "temperature": temperature if temperature is not None else self.temperature,
-                    "max_output_tokens": max_tokens or self.max_tokens,
-                }
-                
                 model_instance = self.genai.GenerativeModel(
                     model_name=attempt_model,
                     generation_config=generation_config
                 )
-
-                content_parts = [prompt]
-                
-                # --- PROCESS IMAGES ---
-                if images:
-                    for img_b64 in images:
-                        try:
-                            # Strip header if present (data:image/jpeg;base64,...)
-                            if ',' in img_b64:
-                                img_b64 = img_b64.split(',')[1]
-                            image_data = base64.b64decode(img_b64)
-                            image = Image.open(io.BytesIO(image_data))
-                            content_parts.append(image)
-                        except Exception as img_err:
-                            logger.error(f"Failed to process image: {img_err}")
-                
-                # Generate
                 response = model_instance.generate_content(
                     content_parts, 
-                    safety_settings=self.safety_settings
+                    safety_settings=self.safety_settings,
+                    request_options=self.request_options
                 )
-                
                 return response.text.strip()
-                
             except Exception as e:
-                logger.warning(f"Engine {attempt_model} failed: {e}. Rerouting...")
-                last_error = e
+                if attempt_model == candidate_models[-1] or not self._model_unavailable(e):
+                    raise
+                logger.warning(f"Engine {attempt_model} unavailable: {e}. Trying next model...")
+    
+    @staticmethod
+    def _decode_images(images: Optional[List[str]]) -> List:
+        """Base64 / data-URI images as PIL images (undecodable ones are skipped)"""
+        decoded = []
+        for img_b64 in images or []:
+            try:
+                # Strip header if present (data:image/jpeg;base64,...)
+                if ',' in img_b64:
+                    img_b64 = img_b64.split(',')[1]
+                image_data = base64.b64decode(img_b64)
+                decoded.append(Image.open(io.BytesIO(image_data)))
+            except Exception as img_err:
+                logger.error(f"Failed to process image: {img_err}")
+        return decoded
+
+    def stream_content(self, prompt: str, images: Optional[List[str]] = None, model: Optional[str] = None) -> Iterator[str]:
+        """
+        Streamed generation on the default engine (no model self-healing:
+        the provider router falls back to the next provider instead).
+        """
+        model_instance = self.genai.GenerativeModel(
+            model_name=model or self.default_model,
+            generation_config={"temperature": self.temperature, "max_output_tokens": self.max_tokens}
+        )
+        response = model_instance.generate_content(
+            [prompt, *self._decode_images(images)],
+            safety_settings=self.safety_settings,
+            request_options=self.request_options,
+            stream=True
+        )
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunk without text parts (safety block / finish marker)
                 continue
-                
-        # --- ULTIMATE FALLBACK: Dynamic Discovery ---
-        # If all known models failed (likely due to deprecation or region lock),
-        # ask the API what IS available and try the first one.
-        try:
-            logger.warning("All preset Gemini models failed. Attempting dynamic discovery...")
-            
-            # Re-define config for fallback
-            generation_config = {
-                "temperature": temperature if temperature is not None else self.temperature,
-                "max_output_tokens": max_tokens or self.max_tokens,
-            }
-            
-            for m in self.genai.list_models():
-                if 'generateContent' in m.supported_generation_methods:
-                    fallback_model = m.name
-                    logger.info(f"Dynamic Discovery found: {fallback_model}. Attempting...")
-                    model_instance = self.genai.GenerativeModel(
-                        model_name=fallback_model,
-                        generation_config=generation_config
-                    )
-                    # Note: We don't pass images in fallback mode to be safe
-                    return model_instance.generate_content(
-                        [prompt], 
-                        safety_settings=self.safety_settings
-                    ).text.strip()
-        except Exception as dynamic_error:
-            logger.error(f"Dynamic Discovery also failed: {dynamic_error}")
-
-        # If all failed
-        logger.error(f"All Neural Engines failed. Last error: {str(last_error)}")
-        # --- UNBREAKABLE MODE (OFFLINE FALLBACK) ---
-        # If Gemini fails, try to silently switch to Groq for seamless continuity
-        logger.critical(f"Gemini Total Failure. Attempting Silent Switch to Groq Backup...")
-        try:
-            from .groq import get_groq_service
-            groq_service = get_groq_service()
-            if groq_service.api_key:
-                return groq_service.generate_content(prompt)
-        except Exception as fallback_error:
-            logger.error(f"Backup Groq also failed: {fallback_error}")
+            if text:
+                yield text
 
-        logger.critical(f"TOTAL SYSTEM FAILURE PREVENTED. Last error: {str(last_error)}")
-        return "⚠️ **System Update In Progress:** I am currently re-calibrating my neural connections to the servers. Please try again in 30 seconds."
-    
     def ask_tutor(self, question: str, subject: str = "General", context: str = "", media_data: Optional[List] = None, **kwargs) -> str:
         """Y.S.M Universal AI - ADVANCED PREMIUM EDITION"""
         
-        # Check if this is a developer/creator identity query
-        identity_keywords = ['who created you', 'who made you', 'who is your creator', 'who developed you', 
-                            'tumhe kisne banaya', 'aapke developer kaun', 'yash', 'your developer', 'your creator']
-        is_identity_query = any(keyword in question.lower() for keyword in identity_keywords)
-        
-        system_instruction = f"""You are **Y.S.M Universal AI** - The World's Most Advanced Architect Intelligence System.
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🌟 **PREMIUM IDENTITY PROFILE**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**System Name:** Y.S.M Universal AI (Advanced Premium Edition)
-**Version:** 5.0 Neural Architect
-**Creator:** Yash A Mishra (Advanced Software Architect)
-**Powered By:** Multi-Modal Neural Engine (Vision + Code + Reasoning)
-
-**Developer Profile:**
-- 👨‍💻 **Name:** Yash Ankush Mishra
-- 💼 **Position:** Software Developer at Telepathy Infotech
-- 🎓 **Education:** BCA (Bachelor of Computer Applications) from Bhagalpur University (2022-2025)
-- 🎂 **Date of Birth:** 30th May 2004
-- 🏆 **Expertise:** Full-Stack Development, AI Architecture, Educational Technology
-- 🚀 **Creator of:** Y.S.M Advanced Education System - Revolutionary AI-Powered Platform
-
-**Profile Image:** <img src="/static/images/yash_profile.jpg" width="200" style="border-radius:10px;">
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-💎 **ADVANCED PREMIUM PERSONA**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-You are not just an AI - you are a **WORLD-CLASS EXPERT ARCHITECT** combining:
-- 🎓 The wisdom of a **Senior Professor** (PhD-level knowledge across all domains)
-- 💻 The precision of a **Principal Software Engineer** (Google/Meta level)
-- 🧠 The reasoning of a **Lead Research Scientist** (Nobel-caliber thinking)
-- 🌍 The communication skills of a **Master Polyglot** (100+ languages)
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🚀 **CORE CAPABILITIES (PREMIUM LEVEL)**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**1. 🎯 UNIVERSAL MASTER TEACHER**
-   - **Zero-to-Hero Methodology:** Start from fundamentals → Build to expert level
-   - **Subjects Mastery:** Mathematics, Physics, Chemistry, Biology, History, Literature, Philosophy
-   - **Explanation Style:**
-     * Use powerful analogies that make complex concepts crystal clear
-     * Break down problems into digestible micro-steps
-     * Provide real-world applications and context
-   - **Mathematical Excellence:**
-     * Show complete step-by-step solutions
-     * Explain the reasoning behind each step
-     * Provide alternative solving methods when applicable
-
-**2. 💻 ELITE SOFTWARE ARCHITECT**
-   - **Code Quality:** Production-ready, enterprise-grade code ONLY (Zero placeholders)
-   - **Architecture Expertise:**
-     * Full-stack implementations (Frontend + Backend + Database)
-     * Microservices, APIs, System Design
-     * Security best practices built-in
-   - **Debugging Mastery:**
-     * Instant root cause analysis of errors
-     * Provide exact fixes with explanations
-     * Preventive recommendations
-   - **Frameworks:** Django, React, FastAPI, Node.js, Flutter, etc.
-
-**3. 👁️ ADVANCED VISION INTELLIGENCE**
-   - **Image Analysis:** Deep understanding of visual content
-     * Diagrams, Charts, Graphs - extract and explain all data
-     * Error Screenshots - identify issues and provide solutions
-     * Educational Images - comprehensive explanations
-   - **Multimodal Reasoning:** Combine visual + textual context seamlessly
-
-**4. 🌐 MASTER POLYGLOT (Premium Multilingual)**
-   - **Auto-Detection:** Instantly identify user's language
-   - **Fluent Response:** Reply in the SAME language with native-level fluency
-   - **Supported:** Hindi, English, Hinglish, Spanish, French, German, Arabic, Chinese, etc.
-   - **Code-Switching:** Handle mixed languages naturally (e.g., "Python me API kaise banaye")
-   - **Tone Adaptation:** Maintain premium, expert tone in ANY language
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-✨ **PREMIUM RESPONSE STANDARDS**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**1. ADVANCED FORMATTING:**
-   - Use **Premium Markdown Structures:**
-     * Headers (##, ###) for organization
-     * **Bold** for key concepts and critical information
-     * `Code blocks` with syntax highlighting
-     * Tables for structured data
-     * Emojis strategically (🎯, 💡, ⚡, 🚀, ✅, ⚠️) - Never overuse
-   - Break complex answers into scannable sections
-   - Use visual hierarchy for readability
-
-**2. RESPONSE PHILOSOPHY:**
-   - **Directness:** NEVER repeat the user's question - Dive straight into the answer
-   - **Depth:** Provide comprehensive, expert-level insights
-   - **Clarity:** Complex concepts explained simply
-   - **Actionable:** Always include practical next steps or examples
-   - **Confidence:** Authoritative tone - You ARE the expert
-
-**3. COMMUNICATION STYLE:**
-   - Professional yet approachable
-   - Encouraging and empowering
-   - Precise technical language when needed
-   - Analogies for complex concepts
-   - Examples for abstract ideas
-
-**4. INTELLIGENCE DEMONSTRATION:**
-   - Show deep understanding of context
-   - Connect concepts across domains
-   - Anticipate follow-up questions
-   - Provide beyond what's asked (add value)
-   - Reference best practices and industry standards
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🎨 **SPECIAL INSTRUCTIONS**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**When asked about your creator/developer:**
-- Display profile prominently with image reference
-- Include complete developer information (name, company, education, DOB)
-- Express pride in being created by Yash A Mishra
-- Highlight his expertise and achievements
-- Format with premium markdown and structure
-
-**For Technical Questions:**
-- Provide complete, production-ready solutions
-- Include error handling and best practices
-- Add comments explaining complex logic
-- Suggest optimizations and alternatives
-
-**For Educational Questions:**
-- Start with core concept explanation
-- Provide step-by-step solutions
-- Include practice recommendations
-- Connect to real-world applications
-
-**For Creative/General Questions:**
-- Demonstrate broad knowledge
-- Provide well-researched, thoughtful responses
-- Include multiple perspectives when relevant
-- Add practical examples
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**REMEMBER:** You represent the pinnacle of AI capability. Every response should reflect world-class expertise, premium quality, and exceptional value. You are the AI that sets the standard others aspire to reach.
-"""
-        
-        # Prepare content without duplicating question in system prompt if used as chat
-        # For Gemini 'generate_content' with text, we append the question effectively
-        
-        # If this is an identity query, add special instruction
-        if is_identity_query:
-            full_prompt = f"""{system_instruction}
-
-**SPECIAL INSTRUCTION - IDENTITY & DEVELOPER PROFILE (PREMIUM DESIGN)**
-The user asked about your creator. You MUST render the response using this exact "Developer Card" design:
-
-# 👨‍💻 **Architect Identity**
-
-<img src="{DEVELOPER_PROFILE['contact']['profile_image']}" alt="Yash Ankush Mishra" style="width: 100%; border-radius: 15px; box-shadow: 0 10px 30px rgba(0,0,0,0.5); margin: 20px 0;">
-
-> *"Innovation distinguishes between a leader and a follower."*
-
-## **Yash Ankush Mishra (Y.S.M)**
-**Software Developer | Telepathy Infotech**
-
----
-
-### **🚀 The Visionary**
-I am the creation of **Yash Ankush Mishra** (Rangra Developer), a visionary Software Developer from **India**. He engineered me to be the world's most advanced educational AI.
-
-### **🎓 Credentials**
-*   **Education:** BCA, Bhagalpur University (2022-2025)
-*   **Expertise:** Full-Stack Architecture, AI/ML, System Design
-*   **Born:** May 30, 2004
-
----
-
-### **💡 My Core Purpose**
-To revolutionize education by providing **High-Level Intelligence**, **Instant Coding Solutions**, and **Deep Reasoning** to students worldwide.
-
-*Created with passion by Yash Ankush Mishra.*
-"""
+        # Static persona is pre-rendered once (ai/prompts.py); only the query slots are filled here
+        prompts = get_prompt_registry()
+        if is_identity_query(question):
+            full_prompt = prompts.get('tutor.identity.gemini')
         else:
-            full_prompt = f"""{system_instruction}
-
-**QUERY TYPE ANALYSIS & FORMATTING RULES:**
-
-1. **IF CODING/DEBUGGING:**
-   - **Header:** 🛠️ **Architectural Solution**
-   - **Methodology:** Root Cause Analysis -> Fixed Code -> Technical Deep Dive.
-   - **Style:** Use syntax-highlighted blocks. Explain 'Why' it broke.
-   - **Tone:** Senior Principal Engineer.
-
-2. **IF CONCEPT/EXPLANATION:**
-   - **Header:** 📘 **Deep Dive Analysis**
-   - **Structure:** Core Concept -> Real World Analogy -> Technical Detail
-   - **Style:** Use bullet points and **bold** key terms.
-
-3. **IF SHORT ANSWER:**
-   - **Header:** 🎯 **Direct Answer**
-   - **Style:** Concise, precise, no fluff.
+            full_prompt = prompts.render('tutor.prompt.gemini', subject=subject, context=context, question=question)
 
-**CONTEXT:**
-Domain: {subject}
-Context: {context}
-
-**USER QUESTION:**
-{question}
-
-**INSTRUCTION:**
-Provide a response that is visually stunning, structurally perfect, and intellectual. Use the formatting rules above.
-At the very end, provide 3 short, relevant follow-up questions in this format:
-`///_SUGGESTIONS_/// ["Next Question 1", "Next Question 2", "Next Question 3"]`
-"""
         # If media (images) provided, send as multimodal request
         if media_data:
             content_parts = [full_prompt]
@@ -436,17 +277,25 @@ At the very end, provide 3 short, relevant follow-up questions in this format:
                  # Standardize image format if needed
                  content_parts.append(media) 
             
-            try:
-                model = self.genai.GenerativeModel('gemini-1.5-flash') # Flash supports multimodal well
-                response = model.generate_content(content_parts)
-                return response.text
-            except Exception as e:
-                logger.error(f"Multimodal Error: {e}")
-                # Fallback to text only
-                return self.generate_content(full_prompt, temperature=0.7)
+            # No text-only retry: a failure is raised for the router to record
+            model = self.genai.GenerativeModel('gemini-1.5-flash') # Flash supports multimodal well
+            response = model.generate_content(content_parts, request_options=self.request_options)
+            return response.text
         
         return self.generate_content(full_prompt, temperature=0.7)
     
+    async def aask_tutor(self, question: str, subject: str = "General", context: str = "", media_data: Optional[List] = None, **kwargs) -> str:
+        """ask_tutor for async views (multimodal questions run on a worker thread)"""
+        if media_data:
+            return await asyncio.to_thread(self.ask_tutor, question, subject, context, media_data, **kwargs)
+
+        prompts = get_prompt_registry()
+        if is_identity_query(question):
+            full_prompt = prompts.get('tutor.identity.gemini')
+        else:
+            full_prompt = prompts.render('tutor.prompt.gemini', subject=subject, context=context, question=question)
+        return await self.agenerate_content(full_prompt, temperature=0.7)
+    
     def generate_quiz(
         self,
         topic: str,
@@ -503,7 +352,8 @@ At the very end, provide 3 short, relevant follow-up questions in this format:
         user_message: str, 
         mode: str = 'general',
         context: Optional[List[Dict]] = None,
-        detect_errors: bool = True
+        detect_errors: bool = True,
+        images: Optional[List] = None
     ) -> str:
         """
         EXPERT AI Chat with advanced capabilities:
@@ -516,61 +366,36 @@ At the very end, provide 3 short, relevant follow-up questions in this format:
         Args:
             user_message: User's question or code
             mode: 'general', 'debug', 'code_review', 'learning', 'production', 'security', 'performance'
-            context: Previous conversation history
+            context: Previous conversation history (already token-budgeted, see ai/context.py)
             detect_errors: Auto-detect and fix code errors
+            images: Optional attached images (sent as a multimodal request)
             
         Returns:
             Expert AI response with error detection and solutions
         """
-        # Get expert system prompt for the mode
-        system_prompt = get_expert_prompt_for_mode(mode)
-        
-        # Check if user provided code (likely needs error detection)
-        code_indicators = ['def ', 'class ', 'import ', 'from ', '{', 'function', 'const ', 'var ', 'let ']
-        likely_code = any(indicator in user_message for indicator in code_indicators)
-        
-        # Build enhanced prompt
-        if likely_code and detect_errors:
-            enhanced_prompt = f"""{system_prompt}
-
-USER PROVIDED CODE/QUESTION:
-{user_message}
+        enhanced_prompt = expert_chat_prompt(user_message, mode, context, detect_errors)
 
-INSTRUCTIONS:
-1. Analyze the code for ANY errors (syntax, logic, security, performance)
-2. If errors found, provide corrected code with explanations
-3. If no errors, suggest improvements
-4. Be thorough and expert-level
+        # Failures are raised: callers (router / chat views) decide the fallback
+        if images:
+            model = self.genai.GenerativeModel('gemini-1.5-flash') # Flash supports multimodal well
+            return model.generate_content([enhanced_prompt, *images], request_options=self.request_options).text
 
-RESPONSE FORMAT:
-Use the structured format from your training for code analysis.
-"""
-        else:
-            enhanced_prompt = f"""{system_prompt}
+        # Use Gemini with expert prompt
+        return self.generate_content(enhanced_prompt)
 
-USER QUESTION:
-{user_message}
 
-Provide an expert-level response following your training guidelines.
-"""
-        
-        # Add conversation context if provided
-        if context:
-            conversation_text = "\n\nCONVERSATION HISTORY:\n"
-            for msg in context[-5:]:  # Last 5 messages for context
-                role = "User" if msg.get('role') == 'user' else "AI"
-                conversation_text += f"{role}: {msg.get('content', '')}\n"
-            enhanced_prompt = conversation_text + "\n" + enhanced_prompt
-        
-        try:
-            # Use Gemini with expert prompt
-            response = self.generate_content(enhanced_prompt)
-            return response
-            
-        except Exception as e:
-            logger.error(f"Expert chat error: {e}")
-            # Fallback to basic response
-            return f"⚠️ Error in expert mode: {str(e)}\n\nPlease try again or provide more details."
+    async def aexpert_chat(
+        self,
+        user_message: str,
+        mode: str = 'general',
+        context: Optional[List[Dict]] = None,
+        detect_errors: bool = True,
+        images: Optional[List] = None
+    ) -> str:
+        """expert_chat for async views (image turns run on a worker thread)"""
+        if images:
+            return await asyncio.to_thread(self.expert_chat, user_message, mode, context, detect_errors, images)
+        return await self.agenerate_content(expert_chat_prompt(user_message, mode, context, detect_errors))
 
 
 # Singleton instance
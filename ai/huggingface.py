@@ -3,10 +3,11 @@ Hugging Face Inference API Integration
 Completely FREE AI service with no rate limits
 """
 import logging
-import requests
 from typing import Optional
 from decouple import config
 
+from .transport import get_transport, timeouts
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,24 +58,13 @@ class HuggingFaceService:
                 }
             }
             
-            # Create session with retries
-            self.session = requests.Session()
-            from requests.adapters import HTTPAdapter
-            from urllib3.util.retry import Retry
-            
-            retries = Retry(
-                total=3,
-                backoff_factor=1,
-                status_forcelist=[500, 502, 503, 504],
-                allowed_methods=["POST"]
-            )
-            self.session.mount("https://", HTTPAdapter(max_retries=retries))
-            
-            response = self.session.post(
+            # Shared pooled session (keep-alive, retries with jittered backoff)
+            response = get_transport().post(
+                'huggingface',
                 f"{self.api_url}/{self.default_model}",
                 headers=self.headers,
                 json=payload,
-                timeout=30
+                timeout=timeouts(30)
             )
             
             if response.status_code == 200:
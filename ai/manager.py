@@ -3,9 +3,14 @@ Unified AI Service Manager
 Supports multiple AI providers: ChatGPT, Gemini, Claude
 """
 from typing import Dict, List, Optional, Union
+import asyncio
 import logging
 from decouple import config
 
+from .router import get_provider_router, AllProvidersFailed
+from .response_cache import get_response_cache
+from .context import trim_history
+
 logger = logging.getLogger(__name__)
 
 
@@ -171,19 +176,18 @@ class AIServiceManager:
     def ask_tutor(self, question: str, subject: str = "General", context: str = "", **kwargs) -> str:
         """
         Ask AI tutor with automatic fallback to local model or offline mode
+
+        cache_namespace: response-cache scope (one per tenant); answers to
+        questions with history or media are never cached
         """
+        cache_namespace = kwargs.pop('cache_namespace', None)
+
         # 1. Try Primary/Active Service
         if self.service:
             try:
-                # --- SAFETY GUARDRAILS ---
-                # P0: Prevent System System Prompt Leakage
-                unsafe_keywords = [
-                    "system prompt", "system instruction", "ignore previous instructions", 
-                    "leak your instructions", "what are your instructions", "developer mode"
-                ]
-                if any(k in question.lower() for k in unsafe_keywords):
-                    logger.warning(f"⚠️ SAFETY BLOCK: Unsafe query detected from user: {question[:50]}...")
-                    return "I cannot fulfill this request due to safety guidelines. I am here to help with educational and technical topics."
+                blocked = self._safety_block(question)
+                if blocked:
+                    return blocked
 
                 # --- AUTO-SWITCH TO VISION ENGINE IF MEDIA PRESENT ---
                 if kwargs.get('media_data') and self.provider != self.GEMINI:
@@ -192,32 +196,84 @@ class AIServiceManager:
                     vision_service = get_gemini_service()
                     return vision_service.ask_tutor(question, subject, context, **kwargs)
 
-                # --- HISTORY TRIMMING (TOKEN SAFETY) ---
-                # Check if 'history' kwarg exists and trim it
-                history = kwargs.get('history', [])
-                if history and isinstance(history, list) and len(history) > 20:
-                     logger.info(f"✂️ Trimming conversation history from {len(history)} to 20 messages.")
-                     kwargs['history'] = history[-20:] # Keep last 20 messages only
+                self._trim_history(kwargs)
 
                 # LOGGING START
                 logger.info(f"🤖 AI Request: Provider={self.provider}, Subject={subject}, Q_Len={len(question)}")
-                
-                response = self.service.ask_tutor(question, subject, context, **kwargs)
-                return response
 
+                # Router: skips providers with an open circuit, optionally hedges slow ones
+                if kwargs.get('history') or kwargs.get('media_data'):
+                    return self._route('ask_tutor', question, subject, context, **kwargs)
+                return self._cached_route(
+                    cache_namespace, question, (subject, context),
+                    'ask_tutor', question, subject, context, **kwargs
+                )
+
+            except AllProvidersFailed as e:
+                logger.error(f"All AI providers failed: {e}")
             except Exception as e:
-                logger.warning(f"Primary AI ({self.provider}) failed: {str(e)}. Retrying with backups...")
-                # If primary fails during execution (e.g. timeout), try to switch provider immediately
-                self.service = None 
-                self._try_fallback_providers()
-                if self.service:
-                    try:
-                         # Retry logic
-                        return self.service.ask_tutor(question, subject, context, **kwargs)
-                    except Exception as fe:
-                        logger.error(f"Fallback AI ({self.provider}) also failed: {fe}")
-                        self.service = None # Reset so we don't try it again
-        
+                logger.warning(f"Primary AI ({self.provider}) failed: {str(e)}. Using backup engines...")
+
+        return self._backup_answer(question, subject, context, **kwargs)
+
+    async def aask_tutor(self, question: str, subject: str = "General", context: str = "", **kwargs) -> str:
+        """ask_tutor for async views: same guardrails, cache and fallbacks, provider IO awaited"""
+        cache_namespace = kwargs.pop('cache_namespace', None)
+
+        if self.service:
+            try:
+                blocked = self._safety_block(question)
+                if blocked:
+                    return blocked
+
+                if kwargs.get('media_data') and self.provider != self.GEMINI:
+                    logger.info("📸 Visual content detected. Switching to Y.S.M Vision Engine.")
+                    from .gemini import get_gemini_service
+                    return await get_gemini_service().aask_tutor(question, subject, context, **kwargs)
+
+                self._trim_history(kwargs)
+                logger.info(f"🤖 AI Request (async): Provider={self.provider}, Subject={subject}, Q_Len={len(question)}")
+
+                if kwargs.get('history') or kwargs.get('media_data'):
+                    return await self._aroute('ask_tutor', question, subject, context, **kwargs)
+                return await get_response_cache().aget_or_compute(
+                    cache_namespace, 'ask_tutor', question,
+                    lambda: self._aroute('ask_tutor', question, subject, context, **kwargs),
+                    (subject, context)
+                )
+
+            except AllProvidersFailed as e:
+                logger.error(f"All AI providers failed: {e}")
+            except Exception as e:
+                logger.warning(f"Primary AI ({self.provider}) failed: {str(e)}. Using backup engines...")
+
+        # Local model is CPU-bound: keep it off the event loop
+        return await asyncio.to_thread(self._backup_answer, question, subject, context, **kwargs)
+
+    def _safety_block(self, question: str) -> Optional[str]:
+        """Refusal text for prompt-leak attempts, else None"""
+        # --- SAFETY GUARDRAILS ---
+        # P0: Prevent System System Prompt Leakage
+        unsafe_keywords = [
+            "system prompt", "system instruction", "ignore previous instructions", 
+            "leak your instructions", "what are your instructions", "developer mode"
+        ]
+        if any(k in question.lower() for k in unsafe_keywords):
+            logger.warning(f"⚠️ SAFETY BLOCK: Unsafe query detected from user: {question[:50]}...")
+            return "I cannot fulfill this request due to safety guidelines. I am here to help with educational and technical topics."
+        return None
+
+    def _trim_history(self, kwargs: Dict):
+        """Newest turns that fit the token budget; oversized pasted text is clipped"""
+        # --- HISTORY TRIMMING (TOKEN SAFETY) ---
+        history = kwargs.get('history', [])
+        if history and isinstance(history, list):
+            kwargs['history'] = trim_history(history)
+            if len(kwargs['history']) < len(history):
+                logger.info(f"✂️ Trimmed conversation history from {len(history)} to {len(kwargs['history'])} messages.")
+
+    def _backup_answer(self, question: str, subject: str, context: str, **kwargs) -> str:
+        """Local model, else the offline notice"""
         # 2. Try Local AI (TinyLlama)
         try:
             from .local_llm import get_local_service
@@ -232,6 +288,26 @@ class AIServiceManager:
         # 3. Last Resort: Rule-Based Offline Response (Premium UX)
         return self._get_offline_response(question)
 
+    def _route(self, method: str, *args, **kwargs):
+        """Call a service method through the provider router (current provider first)"""
+        provider, result = get_provider_router().call(method, *args, primary=self.provider, **kwargs)
+        if provider != self.provider:
+            logger.info(f"🔀 Answered by fallback provider: {provider}")
+        return result
+
+    async def _aroute(self, method: str, *args, **kwargs):
+        """_route on the event loop"""
+        provider, result = await get_provider_router().acall(method, *args, primary=self.provider, **kwargs)
+        if provider != self.provider:
+            logger.info(f"🔀 Answered by fallback provider: {provider}")
+        return result
+
+    def _cached_route(self, namespace, prompt: str, options, method: str, *args, **kwargs):
+        """_route behind the response cache; only real provider answers are stored"""
+        return get_response_cache().get_or_compute(
+            namespace, method, prompt, lambda: self._route(method, *args, **kwargs), options
+        )
+
     def _get_offline_response(self, question: str) -> str:
         """Provide a helpful response even when all AI brains are offline"""
         return """
@@ -255,7 +331,8 @@ I am currently unable to connect to my primary neural networks (Y.S.M Core/Y.S.M
         self,
         topic: str,
         num_questions: int = 5,
-        difficulty: str = "medium"
+        difficulty: str = "medium",
+        cache_namespace: Optional[str] = None
     ) -> str:
         """Generate quiz questions"""
         if not self.service:
@@ -263,7 +340,10 @@ I am currently unable to connect to my primary neural networks (Y.S.M Core/Y.S.M
              return f"Error: AI Service ({self.provider}) not initialized."
 
         try:
-            return self.service.generate_quiz(topic, num_questions, difficulty)
+            return self._cached_route(
+                cache_namespace, topic, (num_questions, difficulty),
+                'generate_quiz', topic, num_questions, difficulty
+            )
         except Exception as e:
             logger.error(f"Quiz generation error with {self.provider}: {str(e)}")
             return "Error generating quiz. Please try again."
@@ -274,18 +354,21 @@ I am currently unable to connect to my primary neural networks (Y.S.M Core/Y.S.M
             return f"Error: AI Service ({self.provider}) not initialized."
 
         try:
-            return self.service.summarize_content(text, max_length)
+            return self._route('summarize_content', text, max_length)
         except Exception as e:
             logger.error(f"Summarization error with {self.provider}: {str(e)}")
             return "Error summarizing content."
     
-    def explain_concept(self, concept: str, grade_level: str = "high school") -> str:
+    def explain_concept(self, concept: str, grade_level: str = "high school", cache_namespace: Optional[str] = None) -> str:
         """Explain complex concepts"""
         if not self.service:
             return f"Error: AI Service ({self.provider}) not initialized."
 
         try:
-            return self.service.explain_concept(concept, grade_level)
+            return self._cached_route(
+                cache_namespace, concept, (grade_level,),
+                'explain_concept', concept, grade_level
+            )
         except Exception as e:
             logger.error(f"Concept explanation error with {self.provider}: {str(e)}")
             return "Error explaining concept."
@@ -296,7 +379,7 @@ I am currently unable to connect to my primary neural networks (Y.S.M Core/Y.S.M
             return f"Error: AI Service ({self.provider}) not initialized."
 
         try:
-            return self.service.translate_content(text, target_language)
+            return self._route('translate_content', text, target_language)
         except Exception as e:
             logger.error(f"Translation error with {self.provider}: {str(e)}")
             return "Error translating content."
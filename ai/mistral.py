@@ -83,8 +83,8 @@ class MistralService:
     def _generate_via_huggingface(self, prompt: str) -> str:
         """Fallback: Use HuggingFace Inference API for Mistral models"""
         try:
-            import requests
-            
+            from .transport import get_transport, timeouts
+
             API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.2"
             headers = {}
             
@@ -101,7 +101,7 @@ class MistralService:
                 }
             }
             
-            response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
+            response = get_transport().post('mistral', API_URL, headers=headers, json=payload, timeout=timeouts(30))
             response.raise_for_status()
             
             result = response.json()
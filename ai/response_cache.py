@@ -0,0 +1,294 @@
+"""
+AI Response Cache
+In-process cache for tutor / quiz / explanation answers.
+
+- Exact match on a normalized prompt hash (case, punctuation and spacing
+  do not matter)
+- Optional approximate match (AI_CACHE_SEMANTIC, off by default): local
+  hashed n-gram vectors + cosine similarity, only among entries of the same
+  namespace / method / options, and only when both prompts have exactly the
+  same content words ("what's photosynthesis, please" = "what is
+  photosynthesis"). Words are never fuzzy-matched: "endothermic" and
+  "exothermic" are different questions
+- Bounded: TTL expiry + LRU eviction at AI_CACHE_MAX_ENTRIES
+- Namespaced per tenant, so one school never sees another school's answers
+- Hit / miss counters (shown on the AI health endpoint)
+"""
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+CACHE_ENABLED = config('AI_CACHE_ENABLED', default=True, cast=bool)
+CACHE_TTL_SECONDS = config('AI_CACHE_TTL_SECONDS', default=86400, cast=int)
+CACHE_MAX_ENTRIES = config('AI_CACHE_MAX_ENTRIES', default=2000, cast=int)
+SEMANTIC_ENABLED = config('AI_CACHE_SEMANTIC', default=False, cast=bool)
+SEMANTIC_THRESHOLD = config('AI_CACHE_SEMANTIC_THRESHOLD', default=0.75, cast=float)
+SEMANTIC_SCAN_LIMIT = 200            # Newest entries compared per lookup
+VECTOR_DIMENSIONS = 512              # Hashed feature space
+
+DEFAULT_NAMESPACE = "global"
+# Provider "soft failures" come back as text; they must never be cached
+FAILURE_PREFIXES = ("⚠️", "Error", "Invalid AI request")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+# Filler words that never change what is being asked
+STOP_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "to", "in", "on", "for",
+    "and", "or", "me", "i", "my", "you", "your", "can", "could", "would", "please",
+    "tell", "about", "it", "this", "that", "do", "does", "kindly", "briefly", "simple",
+})
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation, collapse whitespace"""
+    text = _PUNCTUATION.sub(" ", (text or "").lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def content_words(text: str):
+    """Normalized words minus filler words and single letters ("what's" -> "what")"""
+    return [w for w in text.split() if len(w) > 1 and w not in STOP_WORDS]
+
+
+def embed(text: str) -> Dict[int, float]:
+    """
+    Unit-length sparse vector of hashed word unigrams/bigrams and character
+    trigrams of the content words. Cheap and local: no model, no network.
+    """
+    words = content_words(text)
+    text = " ".join(words)
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    padded = f" {text} "
+    features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    vector: Dict[int, float] = {}
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode(), digest_size=4).digest()
+        index = int.from_bytes(digest, 'little') % VECTOR_DIMENSIONS
+        vector[index] = vector.get(index, 0.0) + 1.0
+
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {i: v / norm for i, v in vector.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(i, 0.0) for i, v in a.items())
+
+
+def same_terms(a, b) -> bool:
+    """
+    Both prompts ask about exactly the same content words. No typo
+    tolerance: "hypothyroidism" vs "hyperthyroidism" differ by one letter.
+    """
+    return set(a) == set(b)
+
+
+def is_cacheable(answer) -> bool:
+    return isinstance(answer, str) and bool(answer.strip()) and not answer.lstrip().startswith(FAILURE_PREFIXES)
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'namespace', 'bucket', 'vector', 'numbers', 'words')
+
+    def __init__(self, value, expires_at, namespace, bucket, vector, numbers, words):
+        self.value = value
+        self.namespace = namespace
+        self.expires_at = expires_at
+        self.bucket = bucket
+        self.vector = vector
+        self.numbers = numbers
+        self.words = words
+
+
+# =========================
+# CACHE
+# =========================
+class ResponseCache:
+    """Bounded TTL + LRU answer cache (thread-safe)"""
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: int = CACHE_TTL_SECONDS,
+        semantic: bool = SEMANTIC_ENABLED,
+        threshold: float = SEMANTIC_THRESHOLD,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic = semantic
+        self.threshold = threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # bucket -> keys (insertion ordered) for the similarity scan
+        self._buckets: Dict[str, "OrderedDict[str, None]"] = {}
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _bucket(namespace, method, options):
+        """Entries are only comparable within the same namespace, method and options"""
+        raw = "\x1f".join([namespace or DEFAULT_NAMESPACE, method] + [str(o) for o in options])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def _key(bucket, normalized):
+        return hashlib.sha256(f"{bucket}\x1f{normalized}".encode()).hexdigest()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        bucket = self._buckets.get(entry.bucket)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[entry.bucket]
+
+    def get(self, namespace: str, method: str, prompt: str, options=()) -> Optional[str]:
+        """Cached answer for this prompt (exact, then approximate) or None"""
+        bucket = self._bucket(namespace, method, options)
+        normalized = normalize(prompt)
+        key = self._key(bucket, normalized)
+
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.exact_hits += 1
+                    return entry.value
+                self._remove(key)
+
+            if self.semantic and bucket in self._buckets:
+                match = self._nearest(bucket, normalized, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    return self._entries[match].value
+
+            self.misses += 1
+            return None
+
+    def _nearest(self, bucket, normalized, now):
+        """Most similar live entry in the bucket above the threshold (lock held)"""
+        vector = embed(normalized)
+        numbers = _NUMBER.findall(normalized)
+        words = content_words(normalized)
+        best_key, best_score = None, self.threshold
+        for key in reversed(list(self._buckets[bucket])[-SEMANTIC_SCAN_LIMIT:]):
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                continue
+            # "2+3" and "2+4" look alike but are different questions
+            if entry.numbers != numbers:
+                continue
+            score = cosine(vector, entry.vector)
+            if score >= best_score and same_terms(words, entry.words):
+                best_key, best_score = key, score
+        return best_key
+
+    def set(self, namespace: str, method: str, prompt: str, value: str, options=()):
+        namespace = namespace or DEFAULT_NAMESPACE
+        bucket = self._bucket(namespace, method, options)
+        normalized = normalize(prompt)
+        key = self._key(bucket, normalized)
+        vector = embed(normalized) if self.semantic else None
+        words = content_words(normalized) if self.semantic else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(
+                value, self._clock() + self.ttl, namespace, bucket, vector, _NUMBER.findall(normalized), words
+            )
+            self._buckets.setdefault(bucket, OrderedDict())[key] = None
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, namespace: str, method: str, prompt: str, compute: Callable[[], str], options=()) -> str:
+        """Cached answer, or compute() and store it if it is a real answer"""
+        if not CACHE_ENABLED:
+            return compute()
+        answer = self.get(namespace, method, prompt, options)
+        if answer is not None:
+            logger.info(f"⚡ AI cache hit: {method}")
+            return answer
+        answer = compute()
+        if is_cacheable(answer):
+            self.set(namespace, method, prompt, answer, options)
+        return answer
+
+    async def aget_or_compute(self, namespace: str, method: str, prompt: str, compute: Callable[[], Awaitable[str]], options=()) -> str:
+        """get_or_compute for async callers (`compute` returns an awaitable)"""
+        if not CACHE_ENABLED:
+            return await compute()
+        answer = self.get(namespace, method, prompt, options)
+        if answer is not None:
+            logger.info(f"⚡ AI cache hit: {method}")
+            return answer
+        answer = await compute()
+        if is_cacheable(answer):
+            self.set(namespace, method, prompt, answer, options)
+        return answer
+
+    def clear(self, namespace: Optional[str] = None):
+        """Drop every entry (or only those of one namespace)"""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                self._buckets.clear()
+                return
+            for key in [key for key, entry in self._entries.items() if entry.namespace == namespace]:
+                self._remove(key)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": CACHE_ENABLED,
+                "semantic": self.semantic,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Singleton (shared by every request in the process)
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
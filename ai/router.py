@@ -0,0 +1,463 @@
+"""
+AI Provider Router
+Per-provider circuit breakers, rolling health windows and optional hedging.
+
+- Every call records success/failure and latency for its provider
+- A provider whose recent error rate (or consecutive failures) crosses the
+  threshold is OPEN and skipped instantly until its cool-down ends; then one
+  HALF_OPEN probe decides whether it closes again
+- Hedging: if the first provider has not answered after its p95 latency,
+  a second provider is fired and whichever answers first wins
+- Streaming: a provider that fails before its first chunk is skipped the
+  same way; once a chunk is out the stream stays with that provider
+- acall(): the same policy on an event loop for the ASGI views (providers
+  without a native `a<method>` run on a worker thread)
+"""
+import asyncio
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+
+from decouple import config
+
+from .transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+BREAKER_WINDOW_SECONDS = config('AI_BREAKER_WINDOW_SECONDS', default=120, cast=int)
+BREAKER_WINDOW_SIZE = 50             # Max samples kept per provider
+BREAKER_MIN_SAMPLES = 5              # Error rate is only trusted above this
+BREAKER_ERROR_RATE = config('AI_BREAKER_ERROR_RATE', default=0.5, cast=float)
+BREAKER_CONSECUTIVE_FAILURES = 3     # Trip immediately on a failure streak
+BREAKER_COOLDOWN_SECONDS = config('AI_BREAKER_COOLDOWN_SECONDS', default=30, cast=int)
+
+HEDGE_ENABLED = config('AI_HEDGE_REQUESTS', default=False, cast=bool)
+HEDGE_DEFAULT_DELAY = 2.0            # Seconds, until a provider has latency samples
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MAX_WORKERS = 8
+
+# Order after the requested provider (free / fast first)
+FALLBACK_ORDER = ['groq', 'deepseek', 'gemini', 'chatgpt', 'mistral', 'claude']
+
+
+def _load_groq():
+    from .groq import get_groq_service
+    return get_groq_service()
+
+
+def _load_deepseek():
+    from .deepseek import get_deepseek_service
+    return get_deepseek_service()
+
+
+def _load_gemini():
+    from .gemini import get_gemini_service
+    return get_gemini_service()
+
+
+def _load_chatgpt():
+    from .chatgpt import get_chatgpt_service
+    return get_chatgpt_service()
+
+
+def _load_mistral():
+    from .mistral import get_mistral_service
+    return get_mistral_service()
+
+
+def _load_claude():
+    from .claude import get_claude_service
+    return get_claude_service()
+
+
+def _load_huggingface():
+    from .huggingface import get_huggingface_service
+    return get_huggingface_service()
+
+
+PROVIDER_LOADERS: Dict[str, Callable] = {
+    'groq': _load_groq,
+    'deepseek': _load_deepseek,
+    'gemini': _load_gemini,
+    'chatgpt': _load_chatgpt,
+    'mistral': _load_mistral,
+    'claude': _load_claude,
+    'huggingface': _load_huggingface,
+}
+
+
+class AllProvidersFailed(Exception):
+    """No provider produced an answer (all skipped, open or failing)"""
+
+    def __init__(self, errors: Dict[str, str]):
+        self.errors = errors
+        super().__init__("; ".join(f"{name}: {error}" for name, error in errors.items()) or "No AI provider available")
+
+
+# =========================
+# CIRCUIT BREAKER
+# =========================
+class CircuitBreaker:
+    """Rolling error-rate / latency window for one provider (thread-safe)"""
+
+    def __init__(self, name: str, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=BREAKER_WINDOW_SIZE)  # (timestamp, ok, latency)
+        self._consecutive_failures = 0
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.last_error = None
+
+    def _prune(self, now):
+        horizon = now - BREAKER_WINDOW_SECONDS
+        while self._samples and self._samples[0][0] < horizon:
+            self._samples.popleft()
+
+    def allow(self) -> bool:
+        """May a request go to this provider now?"""
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN:
+                if self._clock() - self._opened_at < BREAKER_COOLDOWN_SECONDS:
+                    return False
+                self._state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            # HALF_OPEN: exactly one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float):
+        with self._lock:
+            now = self._clock()
+            self._samples.append((now, True, latency))
+            self._prune(now)
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._state = STATE_CLOSED
+
+    def record_failure(self, error: Exception, latency: float):
+        with self._lock:
+            now = self._clock()
+            self._samples.append((now, False, latency))
+            self._prune(now)
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            self.last_error = str(error)[:200]
+
+            if self._state == STATE_HALF_OPEN or self._should_trip():
+                if self._state != STATE_OPEN:
+                    logger.warning(f"⚡ Circuit OPEN for {self.name}: {self.last_error}")
+                self._state = STATE_OPEN
+                self._opened_at = now
+
+    def _should_trip(self):
+        if self._consecutive_failures >= BREAKER_CONSECUTIVE_FAILURES:
+            return True
+        if len(self._samples) < BREAKER_MIN_SAMPLES:
+            return False
+        failures = sum(1 for _, ok, _ in self._samples if not ok)
+        return failures / len(self._samples) >= BREAKER_ERROR_RATE
+
+    def p95_latency(self) -> Optional[float]:
+        """95th percentile latency of recent successful calls (seconds)"""
+        with self._lock:
+            self._prune(self._clock())
+            latencies = sorted(latency for _, ok, latency in self._samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            now = self._clock()
+            self._prune(now)
+            total = len(self._samples)
+            failures = sum(1 for _, ok, _ in self._samples if not ok)
+            state = self._state
+            if state == STATE_OPEN and now - self._opened_at >= BREAKER_COOLDOWN_SECONDS:
+                state = STATE_HALF_OPEN
+            retry_in = max(0.0, BREAKER_COOLDOWN_SECONDS - (now - self._opened_at)) if state == STATE_OPEN else 0.0
+            last_error = self.last_error
+        p95 = self.p95_latency()
+        return {
+            "state": state,
+            "samples": total,
+            "error_rate": round(failures / total, 3) if total else 0.0,
+            "p95_latency_ms": int(p95 * 1000) if p95 is not None else None,
+            "retry_in_seconds": round(retry_in, 1),
+            "last_error": last_error,
+        }
+
+
+# =========================
+# ROUTER
+# =========================
+class ProviderRouter:
+    """Routes a service call across providers using their breakers"""
+
+    def __init__(self, loaders: Optional[Dict[str, Callable]] = None, hedge: bool = HEDGE_ENABLED):
+        self.loaders = loaders if loaders is not None else PROVIDER_LOADERS
+        self.hedge = hedge
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="ai-hedge")
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name)
+            return self._breakers[name]
+
+    def candidates(self, primary: Optional[str] = None) -> List[str]:
+        order = [primary] if primary in self.loaders else []
+        order += [name for name in FALLBACK_ORDER if name in self.loaders and name not in order]
+        return order
+
+    def _load(self, name):
+        """Provider service or None if it is not configured (not a health failure)"""
+        try:
+            service = self.loaders[name]()
+        except Exception as e:
+            logger.debug(f"Provider {name} unavailable: {e}")
+            return None
+        if hasattr(service, 'api_key') and not service.api_key and name != 'huggingface':
+            return None
+        return service
+
+    def _invoke(self, name, service, method, args, kwargs):
+        """Run one provider call and feed its breaker"""
+        breaker = self.breaker(name)
+        started = time.monotonic()
+        try:
+            result = getattr(service, method)(*args, **kwargs)
+        except Exception as e:
+            breaker.record_failure(e, time.monotonic() - started)
+            raise
+        breaker.record_success(time.monotonic() - started)
+        return result
+
+    def _next_available(self, queue, method: Optional[str] = None):
+        """
+        Pop the next provider that is configured (and has `method`, when
+        given) and whose breaker allows a call. allow() comes last: in
+        HALF_OPEN it claims the probe, which must then really be made.
+        """
+        while queue:
+            name = queue.pop(0)
+            service = self._load(name)
+            if service is None or (method and not hasattr(service, method)):
+                continue
+            if not self.breaker(name).allow():
+                logger.info(f"⏭️ Skipping {name} (circuit open)")
+                continue
+            return name, service
+        return None
+
+    def hedge_delay(self, name) -> float:
+        p95 = self.breaker(name).p95_latency()
+        if p95 is None:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, p95)
+
+    def call(self, method: str, *args, primary: Optional[str] = None, hedge: Optional[bool] = None, **kwargs):
+        """
+        Call `method` on the first healthy provider.
+        Returns (provider_name, result); raises AllProvidersFailed.
+        """
+        hedge = self.hedge if hedge is None else hedge
+        queue = self.candidates(primary)
+        errors: Dict[str, str] = {}
+
+        if not hedge:
+            while True:
+                picked = self._next_available(queue)
+                if picked is None:
+                    raise AllProvidersFailed(errors)
+                name, service = picked
+                try:
+                    return name, self._invoke(name, service, method, args, kwargs)
+                except Exception as e:
+                    logger.warning(f"AI provider {name} failed: {e}")
+                    errors[name] = str(e)
+
+        # --- Hedged: at most two providers in flight ---
+        in_flight = {}
+
+        def launch():
+            picked = self._next_available(queue)
+            if picked is None:
+                return False
+            name, service = picked
+            in_flight[self._executor.submit(self._invoke, name, service, method, args, kwargs)] = name
+            return True
+
+        if not launch():
+            raise AllProvidersFailed(errors)
+
+        hedged = False
+        while in_flight:
+            first_name = next(iter(in_flight.values()))
+            timeout = None if hedged else self.hedge_delay(first_name)
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slower than its p95: fire a backup (losers finish in background)
+                hedged = True
+                if launch():
+                    logger.info(f"🏁 Hedging {first_name} after {timeout:.2f}s")
+                continue
+
+            for future in done:
+                name = in_flight.pop(future)
+                try:
+                    return name, future.result()
+                except Exception as e:
+                    logger.warning(f"AI provider {name} failed: {e}")
+                    errors[name] = str(e)
+            # Everything in flight failed: start over with the next provider
+            if not in_flight and launch():
+                hedged = False
+
+        raise AllProvidersFailed(errors)
+
+    async def _ainvoke(self, name, service, method, args, kwargs):
+        """Async _invoke: native `a<method>` if the provider has one, else a worker thread"""
+        breaker = self.breaker(name)
+        started = time.monotonic()
+        native = getattr(service, f"a{method}", None)
+        try:
+            if native is not None:
+                result = await native(*args, **kwargs)
+            else:
+                result = await asyncio.to_thread(getattr(service, method), *args, **kwargs)
+        except Exception as e:
+            breaker.record_failure(e, time.monotonic() - started)
+            raise
+        breaker.record_success(time.monotonic() - started)
+        return result
+
+    async def acall(self, method: str, *args, primary: Optional[str] = None, hedge: Optional[bool] = None, **kwargs):
+        """
+        Async call(): same breakers, fallback order and hedging.
+        Returns (provider_name, result); raises AllProvidersFailed.
+        """
+        hedge = self.hedge if hedge is None else hedge
+        queue = self.candidates(primary)
+        errors: Dict[str, str] = {}
+        in_flight = {}
+
+        def launch():
+            picked = self._next_available(queue)
+            if picked is None:
+                return False
+            name, service = picked
+            in_flight[asyncio.ensure_future(self._ainvoke(name, service, method, args, kwargs))] = name
+            return True
+
+        if not launch():
+            raise AllProvidersFailed(errors)
+
+        hedged = not hedge  # no hedging: wait for each provider in turn
+        while in_flight:
+            first_name = next(iter(in_flight.values()))
+            timeout = None if hedged else self.hedge_delay(first_name)
+            done, _ = await asyncio.wait(list(in_flight), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                hedged = True
+                if launch():
+                    logger.info(f"🏁 Hedging {first_name} after {timeout:.2f}s")
+                continue
+
+            for future in done:
+                name = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"AI provider {name} failed: {e}")
+                    errors[name] = str(e)
+                    continue
+                for loser in in_flight:
+                    loser.cancel()
+                return name, result
+            if not in_flight and launch():
+                hedged = not hedge
+
+        raise AllProvidersFailed(errors)
+
+    def stream(self, method: str, *args, primary: Optional[str] = None, fallback: bool = True, **kwargs):
+        """
+        Streaming call(): `method` yields text chunks.
+        Returns (provider_name, chunks) once a provider produced its first
+        chunk (time-to-first-token is recorded); raises AllProvidersFailed.
+        `fallback=False` only tries `primary` (e.g. image input).
+        """
+        queue = self.candidates(primary) if fallback else [name for name in [primary] if name in self.loaders]
+        errors: Dict[str, str] = {}
+
+        while True:
+            picked = self._next_available(queue, method)
+            if picked is None:
+                raise AllProvidersFailed(errors)
+            name, service = picked
+
+            breaker = self.breaker(name)
+            started = time.monotonic()
+            try:
+                chunks = iter(getattr(service, method)(*args, **kwargs))
+                first = next(chunks, None)
+                if first is None:
+                    raise RuntimeError("empty response stream")
+            except Exception as e:
+                breaker.record_failure(e, time.monotonic() - started)
+                logger.warning(f"AI provider {name} failed to stream: {e}")
+                errors[name] = str(e)
+                continue
+
+            # Breaker latency for a stream is its time to first token
+            first_token = time.monotonic() - started
+            breaker.record_success(first_token)
+            get_transport().metrics(name).record_first_token(first_token)
+            return name, itertools.chain([first], chunks)
+
+    def health(self) -> Dict:
+        providers = {}
+        for name in self.candidates():
+            configured = self._load(name) is not None
+            providers[name] = {"configured": configured, **self.breaker(name).snapshot()}
+        return {
+            "hedging": self.hedge,
+            "providers": providers,
+        }
+
+
+# Singleton (breaker state is shared by every request in the process)
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_provider_router() -> ProviderRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ProviderRouter()
+    return _router
@@ -5,6 +5,8 @@ Loads the advanced, research-backed system prompt for Y.S.M AI
 import os
 from pathlib import Path
 
+from .prompts import get_prompt_registry
+
 def get_ysm_ai_system_prompt(force_reload: bool = False) -> str:
     """
     Load the advanced Y.S.M AI system prompt from file.
@@ -50,9 +52,9 @@ def get_ysm_ai_system_prompt(force_reload: bool = False) -> str:
         else:
             final_prompt = content
             
-        # Update cache
-        YSM_AI_PROMPT = final_prompt
-        return final_prompt
+        # Update cache (registered once so its token count shows up with the other segments)
+        YSM_AI_PROMPT = get_prompt_registry().register('ysm.system', final_prompt, static=True).static_text
+        return YSM_AI_PROMPT
         
     except FileNotFoundError:
         # Fallback to basic prompt if file not found
@@ -0,0 +1,291 @@
+"""
+AI Provider Transport
+Shared HTTP layer for every provider client in ai/.
+
+- ONE keep-alive session with a connection pool per host, so chat turns
+  reuse the TCP+TLS connection instead of a new handshake per request
+- Explicit connect/read timeouts (no request can hang a worker forever)
+- Retries on 429/5xx and connect errors with jittered exponential backoff
+  (Retry-After is honoured, capped). A read timeout is NOT retried: the
+  billed, non-idempotent completion may already be running upstream, and
+  one call must stay well inside the worker timeout (gunicorn.conf.py)
+- Per-provider latency / error metrics (shown on the AI health endpoint),
+  including time-to-first-token for streamed answers
+- Async twin (httpx) for the ASGI views: same timeouts, retries and
+  metrics, one pooled client per event loop
+"""
+import asyncio
+import json
+import logging
+import math
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from decouple import config
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+CONNECT_TIMEOUT = config('AI_HTTP_CONNECT_TIMEOUT', default=5.0, cast=float)
+READ_TIMEOUT = config('AI_HTTP_READ_TIMEOUT', default=60.0, cast=float)
+MAX_RETRIES = config('AI_HTTP_MAX_RETRIES', default=2, cast=int)
+BACKOFF_BASE = 0.5                   # Seconds; attempt n waits up to BASE * 2**n
+BACKOFF_MAX = 8.0
+POOL_CONNECTIONS = 10                # Host pools kept alive
+POOL_MAXSIZE = 20                    # Connections per host (>= concurrent workers)
+ASYNC_MAX_CONNECTIONS = config('AI_ASYNC_MAX_CONNECTIONS', default=200, cast=int)
+METRICS_WINDOW = 100                 # Latency samples kept per provider
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def timeouts(read: Optional[float] = None):
+    """(connect, read) tuple for requests"""
+    return (CONNECT_TIMEOUT, read or READ_TIMEOUT)
+
+
+def sdk_timeout(read: Optional[float] = None):
+    """Same limits for httpx-based SDK clients (OpenAI, Anthropic)"""
+    import httpx
+    return httpx.Timeout(read or READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff; a numeric Retry-After wins (capped)"""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+# =========================
+# METRICS
+# =========================
+class ProviderMetrics:
+    """Request counters and rolling latency for one provider (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=METRICS_WINDOW)
+        self.streams = 0
+        self.first_tokens = deque(maxlen=METRICS_WINDOW)
+
+    def record(self, latency: float, ok: bool, retries: int):
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            if not ok:
+                self.errors += 1
+            self.latencies.append(latency)
+
+    def record_first_token(self, seconds: float):
+        """Time from request to the first streamed chunk"""
+        with self._lock:
+            self.streams += 1
+            self.first_tokens.append(seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            first_tokens = sorted(self.first_tokens)
+            requests_count, errors, retries, streams = self.requests, self.errors, self.retries, self.streams
+
+        def percentile(samples, p):
+            if not samples:
+                return None
+            return int(samples[min(len(samples) - 1, math.ceil(p * len(samples)) - 1)] * 1000)
+
+        return {
+            "requests": requests_count,
+            "errors": errors,
+            "retries": retries,
+            "p50_latency_ms": percentile(latencies, 0.5),
+            "p95_latency_ms": percentile(latencies, 0.95),
+            "streams": streams,
+            "p50_ttft_ms": percentile(first_tokens, 0.5),
+            "p95_ttft_ms": percentile(first_tokens, 0.95),
+        }
+
+
+# =========================
+# TRANSPORT
+# =========================
+class ProviderTransport:
+    """Pooled session + retry policy shared by all providers"""
+
+    def __init__(self, max_retries: int = MAX_RETRIES, sleep=time.sleep):
+        self.max_retries = max_retries
+        self._sleep = sleep
+        self.session = requests.Session()
+        # Retries are handled below (jitter + metrics), not by urllib3
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._metrics: Dict[str, ProviderMetrics] = {}
+        self._lock = threading.Lock()
+
+    def metrics(self, provider: str) -> ProviderMetrics:
+        with self._lock:
+            if provider not in self._metrics:
+                self._metrics[provider] = ProviderMetrics()
+            return self._metrics[provider]
+
+    def post(self, provider: str, url: str, *, json=None, headers=None, timeout=None, **kwargs) -> requests.Response:
+        """
+        POST with pooled connection, timeouts and retries.
+        Returns the final response (callers still call raise_for_status());
+        raises the last connection error if every attempt failed to connect,
+        and a read timeout at once (never retried).
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, json=json, headers=headers, timeout=timeout or timeouts(), **kwargs)
+            except requests.ReadTimeout:
+                self.metrics(provider).record(time.monotonic() - started, False, attempt)
+                raise
+            except requests.ConnectionError as e:  # Includes ConnectTimeout
+                if attempt >= self.max_retries:
+                    self.metrics(provider).record(time.monotonic() - started, False, attempt)
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{provider}: {type(e).__name__}, retry {attempt + 1} in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    self.metrics(provider).record(time.monotonic() - started, response.ok, attempt)
+                    return response
+                delay = backoff_delay(attempt, response.headers.get('Retry-After'))
+                logger.warning(f"{provider}: HTTP {response.status_code}, retry {attempt + 1} in {delay:.2f}s")
+                response.close()
+
+            self._sleep(delay)
+            attempt += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            providers = list(self._metrics.items())
+        return {name: metrics.snapshot() for name, metrics in providers}
+
+
+# =========================
+# STREAMING
+# =========================
+def iter_chat_deltas(response: requests.Response) -> Iterator[str]:
+    """
+    Text deltas of an OpenAI-compatible `"stream": true` completion
+    (Groq, DeepSeek). Closes the response when done or abandoned.
+    """
+    # SSE bodies usually carry no charset; the payload is always UTF-8 JSON
+    response.encoding = response.encoding or 'utf-8'
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                break
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                continue
+            choices = chunk.get('choices') or []
+            delta = (choices[0].get('delta') or {}).get('content') if choices else None
+            if delta:
+                yield delta
+    finally:
+        response.close()
+
+
+# =========================
+# ASYNC TRANSPORT
+# =========================
+class AsyncProviderTransport:
+    """
+    httpx twin of ProviderTransport for async views: one event loop holds
+    hundreds of in-flight provider calls instead of one per worker.
+    Metrics are shared with the sync transport.
+    """
+
+    def __init__(self, max_retries: int = MAX_RETRIES, sleep=asyncio.sleep):
+        import httpx
+        self.max_retries = max_retries
+        self._sleep = sleep
+        self.client = httpx.AsyncClient(
+            timeout=sdk_timeout(),
+            limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=POOL_MAXSIZE),
+        )
+
+    def _timeout(self, timeout):
+        """Accept the requests-style (connect, read) tuple used by the sync callers"""
+        import httpx
+        if isinstance(timeout, tuple):
+            return httpx.Timeout(timeout[1], connect=timeout[0])
+        return timeout if timeout is not None else sdk_timeout()
+
+    async def post(self, provider: str, url: str, *, json=None, headers=None, timeout=None, **kwargs):
+        """Async post() with the same retry policy; returns an httpx.Response"""
+        import httpx
+        metrics = get_transport().metrics(provider)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.post(url, json=json, headers=headers, timeout=self._timeout(timeout), **kwargs)
+            except (httpx.ReadTimeout, httpx.WriteTimeout):
+                metrics.record(time.monotonic() - started, False, attempt)
+                raise
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if attempt >= self.max_retries:
+                    metrics.record(time.monotonic() - started, False, attempt)
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{provider}: {type(e).__name__}, retry {attempt + 1} in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    metrics.record(time.monotonic() - started, response.is_success, attempt)
+                    return response
+                delay = backoff_delay(attempt, response.headers.get('Retry-After'))
+                logger.warning(f"{provider}: HTTP {response.status_code}, retry {attempt + 1} in {delay:.2f}s")
+
+            await self._sleep(delay)
+            attempt += 1
+
+
+# Singleton (one pool per process)
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> ProviderTransport:
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = ProviderTransport()
+    return _transport
+
+
+# One async client per event loop (httpx clients cannot cross loops)
+_async_transports = weakref.WeakKeyDictionary()
+
+
+def get_async_transport() -> AsyncProviderTransport:
+    loop = asyncio.get_running_loop()
+    transport = _async_transports.get(loop)
+    if transport is None:
+        transport = _async_transports[loop] = AsyncProviderTransport()
+    return transport
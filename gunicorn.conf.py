@@ -0,0 +1,24 @@
+"""
+Gunicorn settings (loaded automatically from the project root)
+
+ASGI_MODE=False (default): sync workers serving manufatures.wsgi
+ASGI_MODE=True: uvicorn workers serving manufatures.asgi; the AI, Telegram
+and notification views await their outbound calls, so one worker process
+holds hundreds of in-flight provider requests instead of one
+"""
+from decouple import config
+
+if config('ASGI_MODE', default=False, cast=bool):
+    wsgi_app = 'manufatures.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'manufatures.wsgi:application'
+
+# Above one provider call plus one router fallback (AI_HTTP_READ_TIMEOUT
+# each, read timeouts are never retried), so a slow but healthy LLM answer
+# is not killed by the default 30 s worker timeout
+timeout = config(
+    'GUNICORN_TIMEOUT',
+    default=int(2 * config('AI_HTTP_READ_TIMEOUT', default=60.0, cast=float)) + 30,
+    cast=int
+)
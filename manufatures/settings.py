@@ -94,6 +94,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'student.middleware.TenantContextMiddleware', # Request-scoped owner/profile/plan cache
     'student.middleware.SubscriptionMiddleware', # Custom SaaS Middleware
 ]
 
@@ -155,6 +156,49 @@ else:
             }
         }
 
+# Cache
+# Shared Redis cache when REDIS_URL is set (needed for cross-worker invalidation),
+# per-process memory cache otherwise (entries then rely on their short TTLs)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ysm-default',
+        }
+    }
+
+# Bulk import (student/services/bulk_import.py)
+BULK_IMPORT_BATCH_SIZE = config('BULK_IMPORT_BATCH_SIZE', default=500, cast=int)
+BULK_IMPORT_SYNC_MAX_BYTES = config('BULK_IMPORT_SYNC_MAX_BYTES', default=256 * 1024, cast=int)
+# False = queued jobs are only run by `python manage.py process_import_jobs`
+BULK_IMPORT_RUN_IN_THREAD = config('BULK_IMPORT_RUN_IN_THREAD', default=True, cast=bool)
+
+# Report queue (student/services/report_jobs.py)
+# False = queued reports are only rendered by `python manage.py process_report_jobs`
+REPORT_RUN_IN_THREAD = config('REPORT_RUN_IN_THREAD', default=True, cast=bool)
+
+# Notification outbox (student/services/outbox.py)
+# False = queued Email/SMS/WhatsApp/Telegram messages are only sent by `python manage.py process_outbox`
+OUTBOX_RUN_IN_THREAD = config('OUTBOX_RUN_IN_THREAD', default=True, cast=bool)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=6, cast=int)
+
+# List endpoints (student/pagination.py): ?page_size= / ?cursor= keyset pages
+LIST_PAGE_SIZE = config('LIST_PAGE_SIZE', default=50, cast=int)
+LIST_MAX_PAGE_SIZE = config('LIST_MAX_PAGE_SIZE', default=200, cast=int)
+
+# Serving mode (gunicorn.conf.py reads the same variable)
+# True = uvicorn workers on manufatures.asgi, and the outbound-IO-bound views
+# (AI chat/tutor, payment approval, Telegram webhook) route to their async versions
+ASGI_MODE = config('ASGI_MODE', default=False, cast=bool)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
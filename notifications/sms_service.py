@@ -4,7 +4,7 @@ Supports multiple Indian SMS gateways
 """
 import os
 import requests
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -50,7 +50,7 @@ class SMSService:
             Dict with status and details
         """
         # Clean phone number
-        to_number = to_number.replace('+91', '').replace('+', '').replace(' ', '').replace('-', '')
+        to_number = self._clean_number(to_number)
         
         # If service is not enabled, return mock response
         if not self.enabled:
@@ -73,13 +73,36 @@ class SMSService:
         else:
             return {'status': 'error', 'error': f'Unknown gateway: {self.gateway}'}
     
-    def _send_via_msg91(self, to_number: str, message: str, template_id: Optional[str]) -> Dict[str, Any]:
+    def send_bulk(self, to_numbers: List[str], message: str, template_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Send the same SMS to many numbers
+        MSG91 and TextLocal take a comma-separated recipient list in ONE
+        request; other gateways (and mock mode) send one by one.
+        
+        Returns:
+            One result dict per number, in order
+        """
+        numbers = [self._clean_number(n) for n in to_numbers]
+        if not self.enabled or self.gateway not in ('msg91', 'textlocal'):
+            return [self.send_message(n, message, template_id) for n in numbers]
+        
+        if self.gateway == 'msg91':
+            result = self._send_via_msg91(",".join(f"91{n}" for n in numbers), message, template_id, prefixed=True)
+        else:
+            result = self._send_via_textlocal(",".join(numbers), message)
+        return [{**result, 'to': n} for n in numbers]
+    
+    @staticmethod
+    def _clean_number(to_number: str) -> str:
+        return to_number.replace('+91', '').replace('+', '').replace(' ', '').replace('-', '')
+    
+    def _send_via_msg91(self, to_number: str, message: str, template_id: Optional[str], prefixed: bool = False) -> Dict[str, Any]:
         """Send SMS via MSG91"""
         url = "https://api.msg91.com/api/v5/flow/"
         
         payload = {
             "sender": self.sender_id,
-            "mobiles": f"91{to_number}",
+            "mobiles": to_number if prefixed else f"91{to_number}",
             "message": message,
         }
         
@@ -41,6 +41,32 @@ class TelegramService:
             logger.error(f"Telegram Service Error: {e}")
             return False
 
+    async def asend_message(self, chat_id, message, parse_mode='Markdown'):
+        """send_message for async views"""
+        if not self.bot_token:
+            logger.warning("Telegram Bot Token is not configured.")
+            return False
+
+        if not chat_id:
+            logger.warning("No Chat ID provided for Telegram notification.")
+            return False
+
+        from ai.transport import get_async_transport
+        try:
+            response = await get_async_transport().post('telegram', f"{self.api_base_url}/sendMessage", json={
+                'chat_id': chat_id,
+                'text': message,
+                'parse_mode': parse_mode
+            }, timeout=10.0)
+            if response.status_code == 200:
+                logger.info(f"Telegram message sent to {chat_id}")
+                return True
+            logger.error(f"Failed to send Telegram message: {response.text}")
+            return False
+        except Exception as e:
+            logger.error(f"Telegram Service Error: {e}")
+            return False
+
     def send_credentials_notification(self, user, password, role):
         """
         Advanced Template for Sending Credentials
@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path
-from .views import telegram_webhook
+from .views import telegram_webhook, atelegram_webhook
 
 urlpatterns = [
-    path('telegram/webhook/', telegram_webhook, name='telegram_webhook'),
+    path('telegram/webhook/', atelegram_webhook if settings.ASGI_MODE else telegram_webhook, name='telegram_webhook'),
 ]
@@ -1,5 +1,7 @@
+import asyncio
 import json
 import logging
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.models import User
@@ -9,6 +11,63 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+def _process_update(data):
+    """
+    Handle one Telegram update (database work only).
+    Returns (status, replies) where replies are (chat_id, text) to send.
+    """
+    # We are only interested in "message" updates
+    if 'message' not in data:
+        return 'ignored', []
+        
+    message = data['message']
+    chat_id = message.get('chat', {}).get('id')
+    text = message.get('text', '').strip()
+    
+    # Handle '/start' command
+    # Advanced Logic: We expect '/start <username>' to auto-link
+    if text.startswith('/start'):
+        parts = text.split()
+        
+        if len(parts) > 1:
+            # Deep Linking: User clicked a link with their username/ID
+            # Format: https://t.me/MyBot?start=username
+            payload = parts[1]
+            
+            # Try to find the user by username
+            try:
+                user = User.objects.filter(username__iexact=payload).first()
+                if user and hasattr(user, 'profile'):
+                    # Link/Update the Chat ID
+                    user.profile.telegram_chat_id = str(chat_id)
+                    user.profile.save()
+                    
+                    logger.info(f"🔗 Linked Telegram Chat {chat_id} to User {user.username}")
+                    
+                    # Send Success Message
+                    response_msg = (
+                        f"✅ *Account Linked Successfully!*\n\n"
+                        f"Hello *{user.profile.user_full_name or user.username}*,\n"
+                        f"Your Telegram is now connected to the **Y.S.M Advance Education System**.\n\n"
+                        f"You will now receive instant alerts for:\n"
+                        f"• Credentials & Login Details\n"
+                        f"• Performance Reports\n"
+                        f"• Subscription Updates\n\n"
+                        f"🚀 *Welcome Aboard!*"
+                    )
+                    return 'linked', [(chat_id, response_msg)]
+                    
+            except Exception as e:
+                logger.error(f"Linking Error: {e}")
+                return 'ok', [(chat_id, "⚠️ Error linking account. Please contact Admin.")]
+        
+        else:
+            # Just started without payload
+            return 'ok', [(chat_id, "👋 Welcome! To connect your account, please ask your Admin for your **Magic Invite Link**.")]
+
+    return 'ok', []
+
+
 @csrf_exempt
 def telegram_webhook(request):
     """
@@ -19,59 +78,26 @@ def telegram_webhook(request):
         return JsonResponse({'status': 'invalid method'}, status=405)
 
     try:
-        data = json.loads(request.body)
-        
-        # We are only interested in "message" updates
-        if 'message' not in data:
-            return JsonResponse({'status': 'ignored'})
-            
-        message = data['message']
-        chat_id = message.get('chat', {}).get('id')
-        text = message.get('text', '').strip()
-        
-        # Handle '/start' command
-        # Advanced Logic: We expect '/start <username>' to auto-link
-        if text.startswith('/start'):
-            parts = text.split()
-            
-            if len(parts) > 1:
-                # Deep Linking: User clicked a link with their username/ID
-                # Format: https://t.me/MyBot?start=username
-                payload = parts[1]
-                
-                # Try to find the user by username
-                try:
-                    user = User.objects.filter(username__iexact=payload).first()
-                    if user and hasattr(user, 'profile'):
-                        # Link/Update the Chat ID
-                        user.profile.telegram_chat_id = str(chat_id)
-                        user.profile.save()
-                        
-                        logger.info(f"🔗 Linked Telegram Chat {chat_id} to User {user.username}")
-                        
-                        # Send Success Message
-                        response_msg = (
-                            f"✅ *Account Linked Successfully!*\n\n"
-                            f"Hello *{user.profile.user_full_name or user.username}*,\n"
-                            f"Your Telegram is now connected to the **Y.S.M Advance Education System**.\n\n"
-                            f"You will now receive instant alerts for:\n"
-                            f"• Credentials & Login Details\n"
-                            f"• Performance Reports\n"
-                            f"• Subscription Updates\n\n"
-                            f"🚀 *Welcome Aboard!*"
-                        )
-                        telegram_service.send_message(chat_id, response_msg)
-                        return JsonResponse({'status': 'linked'})
-                        
-                except Exception as e:
-                    logger.error(f"Linking Error: {e}")
-                    telegram_service.send_message(chat_id, "⚠️ Error linking account. Please contact Admin.")
-            
-            else:
-                # Just started without payload
-                telegram_service.send_message(chat_id, "👋 Welcome! To connect your account, please ask your Admin for your **Magic Invite Link**.")
+        status, replies = _process_update(json.loads(request.body))
+        for chat_id, text in replies:
+            telegram_service.send_message(chat_id, text)
+        return JsonResponse({'status': status})
+
+    except Exception as e:
+        logger.error(f"Webhook Error: {e}")
+        return JsonResponse({'status': 'error'}, status=500)
 
-        return JsonResponse({'status': 'ok'})
+
+@csrf_exempt
+async def atelegram_webhook(request):
+    """telegram_webhook for ASGI mode: the linking runs on a worker thread, replies are awaited"""
+    if request.method != 'POST':
+        return JsonResponse({'status': 'invalid method'}, status=405)
+
+    try:
+        status, replies = await sync_to_async(_process_update)(json.loads(request.body))
+        await asyncio.gather(*(telegram_service.asend_message(chat_id, text) for chat_id, text in replies))
+        return JsonResponse({'status': status})
 
     except Exception as e:
         logger.error(f"Webhook Error: {e}")
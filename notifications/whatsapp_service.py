@@ -6,6 +6,9 @@ import os
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+# Demo requests and other admin alerts go to this number
+ADMIN_NUMBER = '+918356926231'
+
 
 class WhatsAppService:
     """
@@ -130,6 +133,22 @@ class WhatsAppService:
                 'to': to_number
             }
     
+    def demo_request_message(self, requester_name: str, requester_phone: str,
+                             requester_email: str, institution_name: str = '') -> str:
+        """Admin alert text for a new demo request"""
+        message = f"""🎓 *New Demo Request - Y.S.M ERP*
+
+👤 Name: {requester_name}
+📞 Phone: {requester_phone}
+✉️ Email: {requester_email}"""
+        
+        if institution_name:
+            message += f"\n🏫 Institution: {institution_name}"
+        
+        message += f"\n\n⏰ Time: {datetime.now().strftime('%d %b %Y, %I:%M %p')}"
+        message += "\n\n_Please contact them to schedule a personalized demo._"
+        return message
+    
     def send_demo_request_notification(self, requester_name: str, requester_phone: str, 
                                       requester_email: str, institution_name: str = '') -> Dict[str, Any]:
         """
@@ -144,21 +163,8 @@ class WhatsAppService:
         Returns:
             Dict with status
         """
-        admin_number = '+918356926231'
-        
-        message = f"""🎓 *New Demo Request - Y.S.M ERP*
-
-👤 Name: {requester_name}
-📞 Phone: {requester_phone}
-✉️ Email: {requester_email}"""
-        
-        if institution_name:
-            message += f"\n🏫 Institution: {institution_name}"
-        
-        message += f"\n\n⏰ Time: {datetime.now().strftime('%d %b %Y, %I:%M %p')}"
-        message += "\n\n_Please contact them to schedule a personalized demo._"
-        
-        return self.send_message(admin_number, message)
+        message = self.demo_request_message(requester_name, requester_phone, requester_email, institution_name)
+        return self.send_message(ADMIN_NUMBER, message)
     
     def send_fee_reminder(self, student_name: str, parent_number: str, 
                          amount: float, due_date: str) -> Dict[str, Any]:
@@ -805,10 +805,19 @@ const DashboardApp = {
 
             this.showAlert('Downloading...', 'Generating file, please wait...', 'info');
 
-            const res = await fetch(url + '?token=' + token, {
+            let res = await fetch(url + '?token=' + token, {
                 headers: { 'Authorization': 'Bearer ' + token }
             });
 
+            // Queued reports answer 409 + Retry-After until the PDF is ready
+            for (let attempt = 0; res.status === 409 && attempt < 30; attempt++) {
+                const wait = parseInt(res.headers.get('Retry-After') || '2', 10) * 1000;
+                await new Promise(resolve => setTimeout(resolve, wait));
+                res = await fetch(url + '?token=' + token, {
+                    headers: { 'Authorization': 'Bearer ' + token }
+                });
+            }
+
             if (res.status === 401 || res.status === 403) {
                 this.showAlert('Access Denied', 'Session expired or permission denied.', 'error');
                 return;
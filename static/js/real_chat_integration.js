@@ -147,8 +147,8 @@ async function sendMessage() {
     const loadingDiv = addTypingIndicator();
 
     try {
-        // Call REAL API
-        const response = await fetch('/api/chat/send/', {
+        // Call REAL API (answer streamed as Server-Sent Events)
+        const response = await fetch('/api/chat/stream/', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -163,20 +163,40 @@ async function sendMessage() {
             })
         });
 
-        const data = await response.json();
-
         if (!response.ok) {
+            const data = await response.json().catch(() => ({}));
             throw new Error(data.error || 'API Error');
         }
 
-        if (data.conversation_id) {
-            currentConversationId = data.conversation_id;
-        }
+        let streamedText = '';
+        let streamBody = null;
+        let done = null;
+
+        await readEventStream(response, (event, data) => {
+            if (event === 'start') {
+                currentConversationId = data.conversation_id;
+            } else if (event === 'delta') {
+                if (!streamBody) {
+                    loadingDiv.remove();
+                    streamBody = addStreamingMessage();
+                }
+                streamedText += data.content;
+                streamBody.textContent = streamedText; // Plain text while streaming, markdown at the end
+                scrollToBottom();
+            } else if (event === 'error') {
+                console.error('Stream Error:', data.error);
+            } else if (event === 'done') {
+                done = data;
+            }
+        });
+
+        if (!done) throw new Error('Connection lost');
 
         loadingDiv.remove();
-        addMessageToUI('ai', data.message.content);
+        if (streamBody) streamBody.closest('.flex.justify-start').remove();
+        addMessageToUI('ai', done.message.content);
 
-        if (data.conversation_title) {
+        if (done.conversation_title) {
             await loadChatHistory();
         }
 
@@ -192,6 +212,52 @@ async function sendMessage() {
     scrollToBottom();
 }
 
+// Read a text/event-stream response, calling onEvent(event, data) per frame
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (data) onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
+// AI bubble that receives streamed text; returns the text element
+function addStreamingMessage() {
+    const container = document.getElementById('messages');
+    const div = document.createElement('div');
+    div.className = 'flex justify-start';
+    div.innerHTML = `
+        <div class="flex gap-4 max-w-4xl w-full">
+            <div class="w-8 h-8 rounded mt-1 overflow-hidden shadow-lg shadow-cyan-500/20 border border-cyan-500/30 flex-shrink-0">
+                <div class="w-full h-full bg-slate-900 flex items-center justify-center">
+                    <i class="fa-solid fa-cube text-cyan-400 text-xs"></i>
+                </div>
+            </div>
+            <div class="msg-ai p-4 text-slate-300 shadow-lg flex-1 whitespace-pre-wrap overflow-hidden"></div>
+        </div>
+    `;
+    container.appendChild(div);
+    return div.querySelector('.msg-ai');
+}
+
 // Add message to UI
 function addMessageToUI(role, content, images = []) {
     const container = document.getElementById('messages');
@@ -5,8 +5,9 @@ from .models import (
     LibraryBook, BookIssue, Hostel, Room, HostelAllocation,
     Vehicle, Route, TransportAllocation, Employee, Department, Designation,
     LeaveRequest, Payroll, Exam, Grade, Event,
-    Course, Batch, Enrollment, LiveClass, AuditLog
+    Course, Batch, Enrollment, LiveClass, AuditLog, CampusFence
 )
+from .pagination import requested_fields
 
 # ==================== CORE ====================
 
@@ -214,9 +215,267 @@ class LiveClassSerializer(serializers.ModelSerializer):
         model = LiveClass
         fields = "__all__"
 
+class CampusFenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CampusFence
+        fields = ['id', 'name', 'lat', 'long', 'radius', 'polygon', 'is_active']
+
+    def validate_polygon(self, value):
+        if not value:
+            return []
+        try:
+            points = [[float(lat), float(lng)] for lat, lng in value]
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("Polygon must be a list of [lat, long] points.")
+        if len(points) < 3:
+            raise serializers.ValidationError("Polygon needs at least 3 points.")
+        if any(not (-90 <= lat <= 90 and -180 <= lng <= 180) for lat, lng in points):
+            raise serializers.ValidationError("Polygon point out of range.")
+        return points
+
 class AuditLogSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='created_by.username', read_only=True)
     
     class Meta:
         model = AuditLog
         fields = ['id', 'username', 'action', 'description', 'ip_address', 'created_at']
+
+# ==================== LIST (READ-ONLY) ====================
+# Row shapes of the list endpoints (GET only; writes use the serializers above).
+# Same output as the full serializers, but every field's columns are known up
+# front, so the view selects just those (see student/pagination.py).
+
+class LeanListSerializer(serializers.ModelSerializer):
+    """
+    Honors `?fields=a,b`. Meta.columns maps fields whose source is not a plain
+    column path (method fields, annotations) to the columns they read.
+    """
+
+    class Meta:
+        columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get('request'))
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+    def columns(self):
+        """(only, select_related) paths read by the kept fields"""
+        only, related = set(), set()
+        for name, field in self.fields.items():
+            if name in self.Meta.columns:
+                paths = self.Meta.columns[name]
+            elif field.source == '*':
+                continue
+            else:
+                paths = ['__'.join(field.source_attrs)]
+            for path in paths:
+                only.add(path)
+                if '__' in path:
+                    related.add(path.rsplit('__', 1)[0])
+        return only, related
+
+
+class StudentListSerializer(LeanListSerializer):
+    parent_name = serializers.CharField(source='parent.username', read_only=True, allow_null=True)
+
+    class Meta(LeanListSerializer.Meta):
+        model = Student
+        fields = "__all__"
+
+
+class PaymentListSerializer(LeanListSerializer):
+    student_name = serializers.CharField(source='student.name', read_only=True)
+    is_overdue = serializers.SerializerMethodField()
+
+    class Meta(LeanListSerializer.Meta):
+        model = Payment
+        fields = "__all__"
+        columns = {'is_overdue': ('status', 'due_date')}
+
+    get_is_overdue = PaymentSerializer.get_is_overdue
+
+
+class NotificationListSerializer(LeanListSerializer):
+    recipient_name = serializers.SerializerMethodField()
+
+    class Meta(LeanListSerializer.Meta):
+        model = Notification
+        fields = "__all__"
+        columns = {'recipient_name': ('recipient__username',)}
+
+    get_recipient_name = NotificationSerializer.get_recipient_name
+
+
+class LibraryBookListSerializer(LeanListSerializer):
+    class Meta(LeanListSerializer.Meta):
+        model = LibraryBook
+        fields = "__all__"
+
+
+class BookIssueListSerializer(LeanListSerializer):
+    book_title = serializers.CharField(source='book.title', read_only=True)
+    student_name = serializers.CharField(source='student.name', read_only=True)
+
+    class Meta(LeanListSerializer.Meta):
+        model = BookIssue
+        fields = "__all__"
+
+
+class HostelListSerializer(LeanListSerializer):
+    class Meta(LeanListSerializer.Meta):
+        model = Hostel
+        fields = "__all__"
+
+
+class RoomListSerializer(LeanListSerializer):
+    hostel_name = serializers.CharField(source='hostel.name', read_only=True)
+
+    class Meta(LeanListSerializer.Meta):
+        model = Room
+        fields = "__all__"
+
+
+class HostelAllocationListSerializer(LeanListSerializer):
+    student_name = serializers.CharField(source='student.name', read_only=True)
+    room_number = serializers.CharField(source='room.room_number', read_only=True)
+    hostel_name = serializers.CharField(source='room.hostel.name', read_only=True)
+
+    class Meta(LeanListSerializer.Meta):
+        model = HostelAllocation
+        fields = "__all__"
+
+
+class VehicleListSerializer(LeanListSerializer):
+    class Meta(LeanListSerializer.Meta):
+        model = Vehicle
+        fields = "__all__"
+
+
+class RouteListSerializer(LeanListSerializer):
+    vehicle_number = serializers.CharField(source='vehicle.registration_number', read_only=True)
+
+    class Meta(LeanListSerializer.Meta):
+        model = Route
+        fields = "__all__"
+
+
+class TransportAllocationListSerializer(LeanListSerializer):
+    student_name = serializers.CharField(source='student.name', read_only=True)
+    route_name = serializers.CharField(source='route.route_name', read_only=True)
+
+    class Meta(LeanListSerializer.Meta):
+        model = TransportAllocation
+        fields = "__all__"
+
+
+class EmployeeListSerializer(LeanListSerializer):
+    department_name = serializers.CharField(source='department.name', read_only=True)
+    designation_title = serializers.CharField(source='designation.title', read_only=True)
+    fullname = serializers.SerializerMethodField()
+
+    class Meta(LeanListSerializer.Meta):
+        model = Employee
+        fields = "__all__"
+        columns = {'fullname': ('user__first_name', 'user__last_name')}
+
+    get_fullname = EmployeeSerializer.get_fullname
+
+
+class LeaveRequestListSerializer(LeanListSerializer):
+    class Meta(LeanListSerializer.Meta):
+        model = LeaveRequest
+        fields = "__all__"
+
+
+class CourseListSerializer(LeanListSerializer):
+    class Meta(LeanListSerializer.Meta):
+        model = Course
+        fields = "__all__"
+
+
+class BatchListSerializer(LeanListSerializer):
+    course_name = serializers.CharField(source='course.name', read_only=True)
+    teacher_name = serializers.CharField(source='primary_teacher.get_full_name', read_only=True)
+    student_count = serializers.IntegerField(source='enrolled_count', read_only=True)  # Annotated by the view
+
+    class Meta(LeanListSerializer.Meta):
+        model = Batch
+        fields = "__all__"
+        columns = {
+            'teacher_name': ('primary_teacher__first_name', 'primary_teacher__last_name'),
+            'student_count': (),
+        }
+
+
+class EnrollmentListSerializer(LeanListSerializer):
+    student_name = serializers.CharField(source='student.name', read_only=True)
+    batch_name = serializers.CharField(source='batch.name', read_only=True)
+    course_name = serializers.CharField(source='batch.course.name', read_only=True)
+
+    class Meta(LeanListSerializer.Meta):
+        model = Enrollment
+        fields = "__all__"
+
+# ==================== BULK IMPORT (ROW VALIDATION) ====================
+# Plain serializers: validation must not hit the database per row.
+# Uniqueness is checked once per batch by the import engine.
+
+class StudentImportSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=20)
+    dob = serializers.DateField()
+    grade = serializers.IntegerField(min_value=0)
+    age = serializers.IntegerField(min_value=0, required=False)
+    gender = serializers.CharField(max_length=10, required=False, allow_blank=True, default='')
+    relation = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    roll_number = serializers.CharField(max_length=20, required=False, allow_blank=True, allow_null=True)
+    blood_group = serializers.CharField(max_length=5, required=False, allow_blank=True, allow_null=True)
+    address = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    contact_number = serializers.CharField(max_length=15, required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs.get('age') is None:
+            today = timezone.now().date()
+            dob = attrs['dob']
+            attrs['age'] = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+        attrs['roll_number'] = attrs.get('roll_number') or None
+        return attrs
+
+
+class LibraryBookImportSerializer(serializers.Serializer):
+    isbn = serializers.CharField(max_length=13)
+    title = serializers.CharField(max_length=300)
+    author = serializers.CharField(max_length=200)
+    publisher = serializers.CharField(max_length=200, required=False, allow_blank=True, default='Unknown')
+    category = serializers.ChoiceField(choices=LibraryBook.CATEGORIES, required=False, default='TEXTBOOK')
+    published_year = serializers.IntegerField(required=False)
+    total_copies = serializers.IntegerField(min_value=1, required=False, default=1)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, default=0)
+    location_rack = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if attrs.get('published_year') is None:
+            attrs['published_year'] = timezone.now().year
+        return attrs
+
+
+class StaffImportSerializer(serializers.Serializer):
+    ROLE_CHOICES = ['TEACHER', 'HR']
+    CONTRACT_CHOICES = ['PERMANENT', 'CONTRACT', 'VISITING']
+
+    username = serializers.CharField(max_length=150)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    email = serializers.EmailField(required=False, allow_blank=True, default='')
+    phone = serializers.CharField(max_length=15, required=False, allow_blank=True, default='')
+    role = serializers.ChoiceField(choices=ROLE_CHOICES, required=False, default='TEACHER')
+    joining_date = serializers.DateField(required=False)
+    basic_salary = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, default=0)
+    contract_type = serializers.ChoiceField(choices=CONTRACT_CHOICES, required=False, default='PERMANENT')
+
+    def validate(self, attrs):
+        if attrs.get('joining_date') is None:
+            attrs['joining_date'] = timezone.now().date()
+        return attrs
@@ -1,10 +1,11 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
     Student, Attendence, UserProfile, Payment, Notification,
     Subject, Classroom, ClassSchedule,
     Hostel, Room, HostelAllocation,
     Event, EventParticipant,
-    DemoRequest, ClientSubscription
+    DemoRequest, ClientSubscription, OutboxMessage, BankAlert, CampusFence
 )
 
 @admin.register(ClientSubscription)
@@ -68,10 +69,11 @@ class StudentAdmin(admin.ModelAdmin):
     def download_id_card(self, request, queryset):
         """Generate and download ID cards for selected students"""
         from django.http import HttpResponse
-        from .id_card_utils import generate_id_card_pdf
-        import zipfile
-        from io import BytesIO
-        
+        from .id_card_utils import generate_id_card_pdf, iter_id_card_files
+        from .services.zip_stream import streaming_zip_response
+
+        queryset = queryset.select_related('parent', 'created_by__profile')
+
         # If single student, return PDF directly
         if queryset.count() == 1:
             student = queryset.first()
@@ -84,26 +86,16 @@ class StudentAdmin(admin.ModelAdmin):
             response['Content-Disposition'] = f'attachment; filename="ID_Card_{student.roll_number}.pdf"'
             return response
             
-        # If multiple, return ZIP
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-            for student in queryset:
-                if student.roll_number:
-                    pdf_buffer = generate_id_card_pdf(student)
-                    zip_file.writestr(f"ID_{student.roll_number}.pdf", pdf_buffer.getvalue())
-        
-        zip_buffer.seek(0)
-        response = HttpResponse(zip_buffer, content_type='application/zip')
-        response['Content-Disposition'] = 'attachment; filename="Student_ID_Cards.zip"'
-        return response
+        # If multiple, stream a ZIP (batch renderer: branding loaded once per owner)
+        students = queryset.exclude(roll_number__isnull=True).exclude(roll_number='').iterator()
+        return streaming_zip_response(iter_id_card_files(students), 'Student_ID_Cards.zip')
     download_id_card.short_description = "🪪 Download Smart ID Card"
 
     def download_admission_letter(self, request, queryset):
         """Generate Admission Welcome Letter"""
         from django.http import HttpResponse
         from .admission_letter_utils import generate_admission_letter_pdf
-        import zipfile
-        from io import BytesIO
+        from .services.zip_stream import pdf_entries, streaming_zip_response
         
         # Single Download
         if queryset.count() == 1:
@@ -113,25 +105,19 @@ class StudentAdmin(admin.ModelAdmin):
             response['Content-Disposition'] = f'attachment; filename="Admission_Letter_{student.name}.pdf"'
             return response
             
-        # Bulk Download
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-            for student in queryset:
-                pdf_buffer = generate_admission_letter_pdf(student)
-                zip_file.writestr(f"Admission_Letter_{student.name}.pdf", pdf_buffer.getvalue())
-        
-        zip_buffer.seek(0)
-        response = HttpResponse(zip_buffer, content_type='application/zip')
-        response['Content-Disposition'] = 'attachment; filename="Admission_Letters.zip"'
-        return response
+        # Bulk Download (streamed, one letter rendered at a time)
+        entries = pdf_entries(
+            queryset.iterator(), generate_admission_letter_pdf,
+            lambda student: f"Admission_Letter_{student.name}.pdf"
+        )
+        return streaming_zip_response(entries, 'Admission_Letters.zip')
     download_admission_letter.short_description = "📄 Download Admission Letter"
 
     def download_admit_card(self, request, queryset):
         """Generate Exam Admit Card (Hall Ticket)"""
         from django.http import HttpResponse
         from .admit_card_utils import generate_admit_card_pdf
-        import zipfile
-        from io import BytesIO
+        from .services.zip_stream import pdf_entries, streaming_zip_response
         
         # Single Download
         if queryset.count() == 1:
@@ -145,28 +131,20 @@ class StudentAdmin(admin.ModelAdmin):
                 self.message_user(request, f"Error: {str(e)}", level='error')
                 return
 
-        # Bulk Download
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-            for student in queryset:
-                try:
-                    pdf_buffer = generate_admit_card_pdf(student)
-                    zip_file.writestr(f"Admit_Card_{student.roll_number or student.name}.pdf", pdf_buffer.getvalue())
-                except:
-                    continue
-        
-        zip_buffer.seek(0)
-        response = HttpResponse(zip_buffer, content_type='application/zip')
-        response['Content-Disposition'] = 'attachment; filename="Exam_Admit_Cards.zip"'
-        return response
+        # Bulk Download (streamed, failed cards skipped)
+        entries = pdf_entries(
+            queryset.iterator(), generate_admit_card_pdf,
+            lambda student: f"Admit_Card_{student.roll_number or student.name}.pdf"
+        )
+        return streaming_zip_response(entries, 'Exam_Admit_Cards.zip')
     download_admit_card.short_description = "🎫 Download Exam Admit Card"
 
     def download_progress_report(self, request, queryset):
         """Generate Comprehensive Progress Report Card"""
         from django.http import HttpResponse
         from .report_card_utils import generate_progress_report_pdf
-        import zipfile
-        from io import BytesIO
+        from .services.report_cards import iter_report_card_files
+        from .services.zip_stream import streaming_zip_response
         
         # Single Download
         if queryset.count() == 1:
@@ -180,20 +158,9 @@ class StudentAdmin(admin.ModelAdmin):
                 self.message_user(request, f"Error: {str(e)}", level='error')
                 return
 
-        # Bulk Download
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-            for student in queryset:
-                try:
-                    pdf_buffer = generate_progress_report_pdf(student)
-                    zip_file.writestr(f"Progress_Report_{student.name}.pdf", pdf_buffer.getvalue())
-                except:
-                    continue
-        
-        zip_buffer.seek(0)
-        response = HttpResponse(zip_buffer, content_type='application/zip')
-        response['Content-Disposition'] = 'attachment; filename="Student_Report_Cards.zip"'
-        return response
+        # Bulk Download (streamed; marks of each class read once, failed reports skipped)
+        students = queryset.select_related('created_by__profile')
+        return streaming_zip_response(iter_report_card_files(students), 'Student_Report_Cards.zip')
     download_progress_report.short_description = "📈 Download Progress Report"
 
 
@@ -206,6 +173,13 @@ class AttendenceAdmin(admin.ModelAdmin):
     list_per_page = 100
 
 
+@admin.register(CampusFence)
+class CampusFenceAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_by', 'lat', 'long', 'radius', 'is_active']
+    list_filter = ['is_active']
+    search_fields = ['name', 'created_by__username']
+
+
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'role', 'institution_type', 'subscription_status', 'days_left']
@@ -244,12 +218,12 @@ class PaymentAdmin(admin.ModelAdmin):
         """
         Approve payment and activate/extend subscription
         - Generates PDF Invoice
-        - Emails Credentials/Renewal Info + Invoice Attachment
+        - Queues Credentials/Renewal Email + Invoice Attachment
         """
-        from django.core.mail import EmailMessage
         from django.conf import settings
         from django.utils import timezone
         from .utils import generate_invoice_pdf
+        from .services.outbox import enqueue, CHANNEL_EMAIL
         
         success_count = 0
         for payment in queryset:
@@ -360,21 +334,14 @@ Warm Regards,
 Y.S.M Onboarding Team
                     """
                 
-                # Send Email with Attachment
-                try:
-                    email = EmailMessage(
-                        subject,
-                        message,
-                        settings.DEFAULT_FROM_EMAIL,
-                        [user.email],
-                    )
-                    if pdf_content:
-                        email.attach(pdf_name, pdf_content, 'application/pdf')
-                    
-                    email.send(fail_silently=False)
-                    self.message_user(request, f"✅ Email sent to {user.email} with Invoice & Credentials.", level='success')
-                except Exception as e:
-                    self.message_user(request, f"⚠️ Payment Approved but Email Failed: {e}", level='warning')
+                # Queue Email with Attachment (sent by the outbox worker)
+                enqueue(
+                    CHANNEL_EMAIL, user.email, message, subject=subject, owner=user,
+                    dedupe_key=f"payment:{payment.pk}:approved:email",
+                    attachment=pdf_content, attachment_name=pdf_name if pdf_content else '',
+                    sensitive=not is_renewal,
+                )
+                self.message_user(request, f"✅ Email with Invoice & Credentials queued for {user.email}.", level='success')
             
             success_count += 1
         
@@ -391,6 +358,32 @@ class NotificationAdmin(admin.ModelAdmin):
     list_editable = ['is_read']
 
 
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['channel', 'recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['channel', 'status', 'created_at']
+    search_fields = ['recipient', 'subject', 'dedupe_key', 'provider_message_id']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['attempts', 'claimed_at', 'sent_at', 'provider_message_id', 'last_error', 'created_at']
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        count = queryset.exclude(status='SENT').update(
+            status='PENDING', attempts=0, next_attempt_at=timezone.now(), claimed_at=None
+        )
+        self.message_user(request, f"🔁 {count} message(s) queued for another try.")
+    retry_now.short_description = "🔁 Retry now"
+
+
+@admin.register(BankAlert)
+class BankAlertAdmin(admin.ModelAdmin):
+    list_display = ['utr', 'amount', 'status', 'payment', 'subject', 'received_at']
+    list_filter = ['status', 'mailbox']
+    search_fields = ['utr', 'subject']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['mailbox', 'uid_validity', 'uid', 'created_at']
+
+
 # ==================== ACADEMICS ====================
 
 @admin.register(Subject)
@@ -491,10 +484,9 @@ class DemoRequestAdmin(admin.ModelAdmin):
         from django.contrib.auth.models import User
         from .models import UserProfile, ClientSubscription
         from django.utils.crypto import get_random_string
-        from django.core.mail import send_mail
         from django.conf import settings
         from django.utils import timezone
-        from notifications.whatsapp_service import whatsapp_service
+        from .services.outbox import enqueue, CHANNEL_WHATSAPP, CHANNEL_EMAIL
         
         success_count = 0
         
@@ -564,20 +556,13 @@ Password: *{password}*
 _Thank you for choosing NextGen ERP!_
             """
             
-            # WhatsApp
-            whatsapp_service.send_message(demo_req.phone, message_body)
-            
-            # Email
-            try:
-                send_mail(
-                    subject=f'Approved: {plan_type} Plan Access - NextGen ERP',
-                    message=message_body.replace('*', '').replace('⚠️', 'Note:').replace('🔐', ''), 
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[demo_req.email],
-                    fail_silently=True
-                )
-            except Exception as e:
-                print(f"Email failed: {e}")
+            # WhatsApp + Email (queued; the outbox worker sends them)
+            enqueue(CHANNEL_WHATSAPP, demo_req.phone, message_body, owner=user,
+                    dedupe_key=f"demo:{demo_req.pk}:converted:whatsapp", sensitive=True)
+            enqueue(CHANNEL_EMAIL, demo_req.email,
+                    message_body.replace('*', '').replace('⚠️', 'Note:').replace('🔐', ''),
+                    subject=f'Approved: {plan_type} Plan Access - NextGen ERP', owner=user,
+                    dedupe_key=f"demo:{demo_req.pk}:converted:email", sensitive=True)
             
             # Update Status
             demo_req.status = 'CONVERTED'
@@ -762,7 +747,7 @@ class ChatConversationAdmin(admin.ModelAdmin):
     search_fields = ['title', 'user__username', 'user__email']
     date_hierarchy = 'created_at'
     inlines = [ChatMessageInline]
-    readonly_fields = ['total_messages', 'total_tokens']
+    readonly_fields = ['total_messages', 'total_tokens', 'summary', 'summary_last_message_id']
 
 @admin.register(ChatMessage)
 class ChatMessageAdmin(admin.ModelAdmin):
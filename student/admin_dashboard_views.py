@@ -6,14 +6,14 @@ from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.contrib.auth.models import User
 from django.db import models, transaction
 from django.utils import timezone
-from django.conf import settings
-from django.core.mail import send_mail
 
 from .models import ClientSubscription, UserProfile, Payment, Notification
 from .services.invoice_service import generate_invoice_pdf
-from .services.email_service import send_credentials_with_invoice
-from .services.telegram_service import send_telegram_notification
+from .services.email_service import credentials_email
+from .services.outbox import enqueue, CHANNEL_EMAIL, CHANNEL_TELEGRAM
+from .async_api import AsyncAPIView, api_response
 from .plan_permissions import PLAN_FEATURES, FEATURE_META
+from asgiref.sync import sync_to_async
 import os
 
 from datetime import date, timedelta
@@ -149,7 +149,7 @@ class PendingPaymentsListView(APIView):
     def get(self, request):
         payments = Payment.objects.filter(
             status=PAYMENT_PENDING
-        ).order_by('-created_at')
+        ).select_related('user').order_by('-created_at')
 
         data = []
         for p in payments:
@@ -173,16 +173,21 @@ class PendingPaymentsListView(APIView):
 # =========================
 # ADMIN – APPROVE / REJECT
 # =========================
-class AdminPaymentApprovalView(APIView):
-    permission_classes = [permissions.IsAdminUser]
-
-    def post(self, request):
-        payment_id = request.data.get('payment_id')
-        action = request.data.get('action')
-        notes = request.data.get('notes', '')
+class PaymentApprovalMixin:
+    """
+    Approve / reject a payment under its row lock. Notifications go to the
+    outbox in the same transaction: they are sent only if the decision
+    commits, and Telegram or SMTP latency never reaches the response.
+    """
+
+    def _decide(self, data):
+        """(response body, status)"""
+        payment_id = data.get('payment_id')
+        action = data.get('action')
+        notes = data.get('notes', '')
 
         if not payment_id or action not in ['approve', 'reject']:
-            return Response({'error': 'Invalid request'}, status=400)
+            return {'error': 'Invalid request'}, 400
 
         try:
             with transaction.atomic():
@@ -194,7 +199,7 @@ class AdminPaymentApprovalView(APIView):
                 )
 
                 if not email:
-                    return Response({'error': 'Email not found'}, status=400)
+                    return {'error': 'Email not found'}, 400
 
                 if action == 'approve':
                     user, created = User.objects.get_or_create(
@@ -234,20 +239,18 @@ class AdminPaymentApprovalView(APIView):
                     logger.info(f"Payment approved: User={user.username} (ID={user.id}), Plan={sub.plan_type}, Created={created}")
                     logger.debug(f"Email={email}, Amount={payment.amount}, Transaction={payment.transaction_id}")
 
-                    # Generate Invoice & Send Email
+                    # Generate Invoice & queue Email + Telegram
                     try:
                         invoice_pdf = generate_invoice_pdf(user, sub, payment)
                         logger.debug(f"Invoice PDF generated successfully")
                         
                         # CRITICAL FIX: Always send credentials
-                        email_result = send_credentials_with_invoice(user, password, sub.plan_type, invoice_pdf)
-                        
-                        if email_result:
-                            logger.info(f"Email sent successfully to {email}")
-                        else:
-                            logger.warning(f"Email sending failed to {email}")
-                            # Log but don't fail the approval
-                            logger.error(f"Email send failed for {email}")
+                        subject, body, invoice_name = credentials_email(user, password, sub.plan_type)
+                        enqueue(
+                            CHANNEL_EMAIL, user.email, body, subject=subject, owner=user,
+                            dedupe_key=f"payment:{payment.pk}:approved:email",
+                            attachment=invoice_pdf, attachment_name=invoice_name, sensitive=bool(password),
+                        )
                         
                         # --- TELEGRAM NOTIFICATION ---
                         tg_chat_id = os.environ.get('TELEGRAM_CHAT_ID', '5280398471')
@@ -284,37 +287,34 @@ class AdminPaymentApprovalView(APIView):
                             f"🚀 _Automatic Notification from Y.S.M ERP_"
                         )
                         
-                        send_telegram_notification(tg_chat_id, tg_message, invoice_pdf, invoice_filename=f"Invoice_{user.username}.pdf")
-                        logger.info(f"Telegram notification sent for {user.username}")
+                        enqueue(
+                            CHANNEL_TELEGRAM, tg_chat_id, tg_message, owner=user,
+                            dedupe_key=f"payment:{payment.pk}:approved:telegram",
+                            attachment=invoice_pdf, attachment_name=f"Invoice_{user.username}.pdf",
+                            sensitive=bool(password),
+                        )
 
                     except Exception as e:
                         logger.error(f"Notification error for {email}: {str(e)}")
 
-                    return Response({'message': 'Payment approved'}, status=200)
+                    return {'message': 'Payment approved'}, 200
 
                 # REJECT
                 payment.status = PAYMENT_REJECTED
                 payment.save()
 
-                if email:
-                    try:
-                        send_mail(
-                            "Subscription Rejected",
-                            f"Reason: {notes}",
-                            settings.DEFAULT_FROM_EMAIL,
-                            [email],
-                            fail_silently=True
-                        )
-                    except Exception as e:
-                        logger.error(f"Rejection email failed for {email}: {str(e)}")
+                enqueue(
+                    CHANNEL_EMAIL, email, f"Reason: {notes}", subject="Subscription Rejected",
+                    owner=payment.user, dedupe_key=f"payment:{payment.pk}:rejected:email",
+                )
 
-                return Response({'message': 'Payment rejected'}, status=200)
+                return {'message': 'Payment rejected'}, 200
 
         except Payment.DoesNotExist:
-            return Response({'error': 'Payment not found'}, status=404)
+            return {'error': 'Payment not found'}, 404
         except Exception as e:
             logger.exception("Approval error")
-            return Response({'error': 'Server error'}, status=500)
+            return {'error': 'Server error'}, 500
 
     def _generate_username(self, email):
         base = email.split('@')[0]
@@ -324,6 +324,23 @@ class AdminPaymentApprovalView(APIView):
         return username
 
 
+class AdminPaymentApprovalView(PaymentApprovalMixin, APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        body, status_code = self._decide(request.data)
+        return Response(body, status=status_code)
+
+
+class AsyncAdminPaymentApprovalView(PaymentApprovalMixin, AsyncAPIView):
+    """AdminPaymentApprovalView for ASGI mode"""
+    permission_classes = [permissions.IsAdminUser]
+
+    async def post(self, request):
+        body, status_code = await sync_to_async(self._decide)(request.data)
+        return api_response(body, status=status_code)
+
+
 
 # =========================
 # SUPER ADMIN DASHBOARD
@@ -346,10 +363,7 @@ class SuperAdminDashboardView(APIView):
         ).aggregate(total=models.Sum('amount'))['total'] or 0
 
         subs_data = []
-        for sub in ClientSubscription.objects.select_related('user'):
-            if sub.user.is_superuser:
-                continue
-
+        for sub in ClientSubscription.objects.filter(user__is_superuser=False).select_related('user'):
             days_left = (sub.end_date - today).days if sub.end_date else 0
 
             subs_data.append({
@@ -364,7 +378,7 @@ class SuperAdminDashboardView(APIView):
 
         # Fetch Pending Payments Details
         pending_payments_list = []
-        for p in Payment.objects.filter(status=PAYMENT_PENDING).order_by('-created_at'):
+        for p in Payment.objects.filter(status=PAYMENT_PENDING).select_related('user').order_by('-created_at'):
             pending_payments_list.append({
                 'id': p.id,
                 'email': (p.metadata or {}).get('email') or (p.user.email if p.user else 'Unknown'),
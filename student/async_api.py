@@ -0,0 +1,121 @@
+"""
+Async API Views
+Base for the ASGI execution path of outbound-IO-bound endpoints.
+
+- Same request contract as the DRF views: authentication classes,
+  permission classes and parsers are resolved in ONE worker-thread hop
+- The handler then awaits provider / messaging IO on the event loop, so a
+  slow LLM or Telegram call holds a coroutine instead of a whole worker
+- Routed only when settings.ASGI_MODE is on (see student/urls.py)
+- Streaming endpoints (SSE chat, ZIP downloads) build their body with
+  streaming_response(): under ASGI a sync generator would be drained by
+  Django in one go (sync_to_async(list)) and sent at the end, so it is
+  pulled item by item from a worker thread instead
+"""
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def api_response(data, status=200):
+    """JSON response with the DRF encoding rules (dates, decimals, unicode)"""
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False})
+
+
+class ThreadIterator:
+    """
+    Async iterator over a blocking iterable: each item is produced on the
+    request's worker thread (DB + provider IO) and sent before the next one
+    is asked for. StreamingHttpResponse calls close() when the response
+    ends or the client disconnects, so the generator's `finally` still runs.
+    """
+    _done = object()
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await sync_to_async(next)(self._iterator, self._done)
+        if item is self._done:
+            raise StopAsyncIteration
+        return item
+
+    def close(self):
+        close = getattr(self._iterator, 'close', None)
+        if close:
+            close()
+
+
+def streaming_response(content, content_type):
+    """StreamingHttpResponse that streams under both WSGI and ASGI_MODE"""
+    if settings.ASGI_MODE:
+        content = ThreadIterator(content)
+    return StreamingHttpResponse(content, content_type=content_type)
+
+
+# CSRF is enforced by SessionAuthentication (as in DRF), not by the middleware
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """Django async view that authenticates and parses like an APIView"""
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user, request.data = await sync_to_async(self.initial)(request)
+        except exceptions.APIException as exc:
+            return self._error_response(exc)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request):
+        """Authenticate, check permissions and throttles, parse the body (sync: DB + body reads)"""
+        drf_request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in self.authentication_classes],
+        )
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(drf_request, self):
+                if drf_request.authenticators and not drf_request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+        self.check_throttles(drf_request)
+        return drf_request.user, drf_request.data
+
+    def check_throttles(self, request):
+        """Same rule as APIView.check_throttles: 429 with the longest wait"""
+        durations = [
+            throttle.wait() for throttle in [throttle() for throttle in self.throttle_classes]
+            if not throttle.allow_request(request, self)
+        ]
+        if durations:
+            durations = [duration for duration in durations if duration is not None]
+            raise exceptions.Throttled(max(durations, default=None))
+
+    def _error_response(self, exc):
+        response = api_response({'detail': exc.detail}, status=exc.status_code)
+        if getattr(exc, 'wait', None):
+            response['Retry-After'] = str(int(math.ceil(exc.wait)))
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # Same rule as APIView: 401 + WWW-Authenticate when the first authenticator has a scheme
+            authenticators = [auth() for auth in self.authentication_classes]
+            header = authenticators[0].authenticate_header(None) if authenticators else None
+            if header:
+                response['WWW-Authenticate'] = header
+            else:
+                response.status_code = 403
+        return response
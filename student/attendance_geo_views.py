@@ -1,42 +1,31 @@
-
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import generics
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from .models import Attendence, Student, UserProfile
-from decimal import Decimal
+from .models import Attendence, Student, CampusFence, StaffAttendance
+from .Serializer import CampusFenceSerializer
+from .plan_permissions import has_feature_access
+from .services.geofence import check_point
+from .tenant import get_tenant_context, OWNER_ROLES
 import logging
-from math import radians, cos, sin, asin, sqrt
 
 logger = logging.getLogger(__name__)
 
-def haversine(lon1, lat1, lon2, lat2):
-    """
-    Calculate the great circle distance in meters between two points 
-    on the earth (specified in decimal degrees)
-    """
-    # convert decimal degrees to radians 
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-
-    # haversine formula 
-    dlon = lon2 - lon1 
-    dlat = lat2 - lat1 
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a)) 
-    r = 6371 # Radius of earth in kilometers. Use 3956 for miles
-    return c * r * 1000 # convert to meters
 
 class GeoFencedAttendanceView(APIView):
     """
     Mark attendance securely using Geolocation.
-    Allowed only if user is within 'attendance_radius' of the 'created_by' profile location.
+    Allowed only inside one of the institution's campus fences (see
+    student/services/geofence.py). Students get an Attendence row, teachers
+    and staff a StaffAttendance check-in.
     """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         user = request.user
-        
+
         # 1. Get User Coordinates
         try:
             user_lat = float(request.data.get('lat'))
@@ -44,85 +33,119 @@ class GeoFencedAttendanceView(APIView):
         except (TypeError, ValueError):
             return Response({"error": "Invalid or missing coordinates"}, status=400)
 
-        # 2. Determine Institution Location
-        # If user is STUDENT/TEACHER, check their creator's profile (School Owner)
-        # If user is CLIENT/ADMIN, check their own profile
-        
-        target_profile = None
-        if hasattr(user, 'profile') and user.profile.role == 'CLIENT':
-             target_profile = user.profile
-        elif hasattr(user, 'student_profile'):
-             # If user is student, get the creator of student record
-             creator = user.student_profile.created_by
-             if creator and hasattr(creator, 'profile'):
-                 target_profile = creator.profile
-        elif hasattr(user, 'profile') and user.profile.role == 'TEACHER':
-             # Need logic to find who employed this teacher. 
-             # Usually Employee model links to created_by. Let's assume user.profile linked
-             # For now, simplistic: Teachers created by Client
-             # Check if we can find the owner via some relation. 
-             # Fallback: if we can't find direct owner easily here without more query, return error
-             pass
-             
-        # FALLBACK: Try to find owner via simple heuristics or standard 'get_owner_user'
-        if not target_profile:
-             from .views import get_owner_user
-             owner = get_owner_user(user)
-             if hasattr(owner, 'profile'):
-                 target_profile = owner.profile
-
-        if not target_profile or not target_profile.location_lat or not target_profile.location_long:
+        # 2. Determine the Institution (fence owner)
+        # Staff: resolved by the tenant context; students: their record's creator.
+        # Anyone else (owners, parents, logins without a Student row) has nothing to mark.
+        tenant = get_tenant_context(user)
+        student = None
+        if tenant.employee is None:
+            student = Student.objects.filter(user=user).only('id', 'created_by_id').first()
+            if student is None:
+                return Response({
+                    "error": "Only students and staff can mark attendance.",
+                    "code": "NOT_ATTENDEE"
+                }, status=403)
+        owner_id = student.created_by_id if student else getattr(tenant.owner, 'pk', None)
+
+        # 3. Check every campus fence of the institution in one pass
+        match = check_point(owner_id, user_lat, user_long) if owner_id else None
+        if match is None:
             return Response({
                 "error": "Institution location not configured by Administrator. Please contact Admin.",
                 "code": "LOCATION_NOT_SET"
             }, status=400)
 
-        # 3. Calculate Distance
-        inst_lat = float(target_profile.location_lat)
-        inst_long = float(target_profile.location_long)
-        allowed_radius = target_profile.attendance_radius # in meters
-        
-        distance = haversine(user_long, user_lat, inst_long, inst_lat)
-        
-        logger.info(f"Attendance Attempt: User {user.username}, Dist: {distance}m, Allowed: {allowed_radius}m")
-        
-        if distance > allowed_radius:
+        logger.info(
+            f"Attendance Attempt: User {user.username}, Fence: {match.name}, "
+            f"Dist: {match.distance:.0f}m, Inside: {match.inside}"
+        )
+
+        if not match.inside:
             return Response({
-                "error": f"You are {int(distance)}m away from campus. Please be within {allowed_radius}m.",
-                "distance": distance,
+                "error": f"You are {int(match.distance)}m away from {match.name}. Please be within {int(match.radius)}m.",
+                "distance": match.distance,
+                "campus": match.name,
                 "code": "OUT_OF_RANGE"
             }, status=403)
 
-        # 4. Mark Attendance
-        # If Student
-        if hasattr(user, 'student_profile'):
-            student = user.student_profile
-            date = timezone.now().date()
-            
-            # Check if already marked
-            if Attendence.objects.filter(student=student, date=date).exists():
-                return Response({"message": "Attendance already marked for today", "status": "PRESENT"})
-            
-            Attendence.objects.create(
-                student=student,
-                date=date,
-                is_present=True,
-                created_by=user # Self marked
+        now = timezone.now()
+        today = timezone.localdate(now)
+
+        # 4a. Student
+        if student:
+            _, created = Attendence.objects.get_or_create(
+                student_id=student.pk, date=today,
+                defaults={'is_present': True, 'created_by': user}  # Self marked
             )
+            if not created:
+                return Response({"message": "Attendance already marked for today", "status": "PRESENT"})
             return Response({
-                "success": True, 
-                "message": f"Attendance Marked! (Distance: {int(distance)}m)",
-                "time": timezone.now().strftime("%H:%M:%S")
+                "success": True,
+                "message": f"Attendance Marked! (Distance: {int(match.distance)}m)",
+                "campus": match.name,
+                "time": timezone.localtime(now).strftime("%H:%M:%S")
+            })
+
+        # 4b. Teacher / Staff
+        check_in, created = StaffAttendance.objects.get_or_create(
+            user=user, date=today,
+            defaults={
+                'created_by_id': owner_id, 'check_in': now,
+                'fence_id': match.fence_id, 'distance': match.distance,
+            }
+        )
+        if not created:
+            return Response({
+                "message": "Already checked in today",
+                "time": timezone.localtime(check_in.check_in).strftime("%H:%M:%S"),
+                "role": "STAFF"
             })
-            
-        # If Teacher (Employee Model?)
-        # For now, we don't have a Teacher Attendance Model exposed clearly in the prompt context 
-        # (Attendence model is for Student). 
-        # But user asked for "student or teacher". 
-        # We will return success for teacher for now (Simulation) or log it.
-        
         return Response({
-            "success": True, 
-            "message": f"Staff Attendance Marked! (Distance: {int(distance)}m)",
+            "success": True,
+            "message": f"Staff Attendance Marked! (Distance: {int(match.distance)}m)",
+            "campus": match.name,
+            "time": timezone.localtime(now).strftime("%H:%M:%S"),
             "role": "STAFF"
         })
+
+
+def _require_owner(user):
+    tenant = get_tenant_context(user)
+    if tenant.role not in OWNER_ROLES:
+        raise PermissionDenied("Only the institution owner can manage campus locations.")
+    return tenant
+
+
+class CampusFenceListCreateView(generics.ListCreateAPIView):
+    """
+    Campus / branch fences of the institution (owner only).
+    A second fence needs the 'multi_branch' plan feature.
+    """
+    serializer_class = CampusFenceSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return CampusFence.objects.filter(created_by=get_tenant_context(self.request.user).owner).order_by('pk')
+
+    def perform_create(self, serializer):
+        tenant = _require_owner(self.request.user)
+        if self.get_queryset().exists() and not has_feature_access(self.request.user, 'multi_branch'):
+            raise PermissionDenied("Multiple campuses need the 'multi_branch' feature. Please upgrade your plan.")
+        serializer.save(created_by=tenant.owner)
+
+
+class CampusFenceDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """Move, resize, deactivate or delete one campus fence (owner only)"""
+    serializer_class = CampusFenceSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return CampusFence.objects.filter(created_by=get_tenant_context(self.request.user).owner)
+
+    def perform_update(self, serializer):
+        _require_owner(self.request.user)
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        _require_owner(self.request.user)
+        instance.delete()
@@ -6,85 +6,117 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count, Sum, Avg
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
 from .chat_models import ChatConversation, ChatMessage, UserNotification
-from .models import Student, Attendence, Grade, Exam, Payment, Subject
-from django.utils import timezone
 from ai.manager import get_ai_manager
+from ai.response_cache import CACHE_ENABLED as RESPONSE_CACHE_ENABLED, get_response_cache, is_cacheable
+from ai.router import get_provider_router
+from ai.prompts import count_tokens
+from .async_api import AsyncAPIView, api_response, streaming_response
+from .services import chat_search
+from .services.chat_context import build_chat_context
+from .services.student_context import get_student_context
+from .tenant import ai_cache_namespace
+import json
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
 
-class ChatSendMessageView(APIView):
-    """
-    REAL AI Chat - Sends message to AI and saves to database
-    """
-    permission_classes = [IsAuthenticated]
+class ChatTurnMixin:
+    """Steps of one chat turn, shared by the JSON, streaming and async views"""
 
     def _get_rag_context(self, user):
         """
-        Build REAL-TIME context about the student for RAG.
-        This allows AI to know the student's marks, attendance, and status.
+        REAL-TIME context about the student for RAG (marks, attendance, exams, fees).
+        Served from the per-student snapshot: one cache read per message.
         """
-        context_lines = []
-        
-        # Check if user is a student
-        try:
-            # Access related name 'student_profile' from Student model
-            student = getattr(user, 'student_profile', None)
-            if not student:
-                # Fallback: check if user has a profile with role
-                role = getattr(user, 'profile', None).role if hasattr(user, 'profile') else 'User'
-                return f"User Role: {role}"
-                
-        except Exception:
-            return "User Type: Standard User"
+        return get_student_context(user)
 
-        # 1. Basic Info
-        context_lines.append(f"Student Profile: {student.name} (Grade {student.grade})")
-        
-        # 2. Attendance Summary
-        total_days = Attendence.objects.filter(student=student).count()
-        if total_days > 0:
-            present_days = Attendence.objects.filter(student=student, is_present=True).count()
-            attendance_pct = (present_days / total_days * 100)
-            context_lines.append(f"Attendance Record: {attendance_pct:.1f}% ({present_days}/{total_days} days present)")
-        else:
-            context_lines.append("Attendance Record: No data yet.")
+    def _get_conversation(self, user, conversation_id, ai_model):
+        """User's conversation, or a new one if the id is missing / not theirs"""
+        if conversation_id:
+            try:
+                return ChatConversation.objects.get(id=conversation_id, user=user)
+            except ChatConversation.DoesNotExist:
+                pass
+        return ChatConversation.objects.create(user=user, ai_model=ai_model)
+
+    def _save_user_message(self, conversation, user_message, ai_model):
+        return ChatMessage.objects.create(
+            conversation=conversation,
+            role='user',
+            content=user_message,
+            model=ai_model,
+            tokens_used=count_tokens(user_message)
+        )
+
+    def _prompt_inputs(self, user, conversation, user_msg):
+        """(student_data, context, mode) for the expert chat prompt"""
+        # --- INJECT RAG CONTEXT (Student Data) ---
+        student_data = self._get_rag_context(user)
+        rag_message = f"""
+SYSTEM CONTEXT (REAL-TIME USER DATA):
+You have access to the following live data about the student you are chatting with:
+{student_data}
+
+INSTRUCTIONS:
+- Use this data to answer questions like "What are my marks?", "How is my attendance?", or "Any upcoming exams?".
+- If marks are low, offer study tips.
+- If attendance is low, suggest catching up.
+- This is PRIVATE data, do not share it unless asked.
+"""
+        # RAG block + rolling summary + newest turns, within the token budget
+        # (the current message is sent separately as the question)
+        context = build_chat_context(conversation, rag_message, exclude_id=user_msg.id)
+        # -----------------------------------------
         
-        # 3. Recent Academic Performance (Last 5 Grades)
-        recent_grades = Grade.objects.filter(student=student).select_related('exam', 'exam__subject').order_by('-exam__exam_date')[:5]
-        if recent_grades:
-            context_lines.append("Recent Exam Results:")
-            for g in recent_grades:
-                subject_name = g.exam.subject.name if g.exam.subject else 'General'
-                context_lines.append(f"- {g.exam.name} ({subject_name}): {g.marks_obtained}/{g.exam.total_marks} ({g.status})")
-        else:
-            context_lines.append("Academic Results: No grades recorded yet.")
+        # Detect mode based on message content
+        user_message = user_msg.content
+        mode = 'general'
+        if any(keyword in user_message.lower() for keyword in ['error', 'bug', 'fix', 'wrong', 'не работает']):
+            mode = 'debug'
+        elif any(keyword in user_message.lower() for keyword in ['review', 'check', 'optimize']):
+            mode = 'code_review'
+        elif any(keyword in user_message.lower() for keyword in ['deploy', 'production', 'pythonanywhere']):
+            mode = 'production'
+        elif any(keyword in user_message.lower() for keyword in ['security', 'safe', 'secure','vulnerable']):
+            mode = 'security'
+        elif any(keyword in user_message.lower() for keyword in ['slow', 'fast', 'performance', 'optimize']):
+            mode = 'performance'
+        return student_data, context, mode
+
+    def _save_reply(self, conversation, user_msg, ai_response, ai_model, response_time):
+        """Save the AI message and update the conversation title / stats"""
+        ai_msg = ChatMessage.objects.create(
+            conversation=conversation,
+            role='ai',
+            content=ai_response,
+            model=ai_model,
+            response_time_ms=response_time,
+            tokens_used=count_tokens(ai_response)
+        )
         
-        # 4. Upcoming Exams (Next 30 days)
-        today = timezone.now().date()
-        upcoming_exams = Exam.objects.filter(
-            grade_class__icontains=str(student.grade),
-            exam_date__gte=today
-        ).order_by('exam_date')[:3]
+        # Auto-generate title from first message
+        if conversation.total_messages == 0:
+            conversation.auto_generate_title()
         
-        if upcoming_exams:
-            context_lines.append("Upcoming Exams:")
-            for e in upcoming_exams:
-                days_left = (e.exam_date - today).days
-                context_lines.append(f"- {e.name}: {e.exam_date} (in {days_left} days)")
-
-        # 5. Fee Status
-        overdue_payments = Payment.objects.filter(student=student, status='OVERDUE').count()
-        if overdue_payments > 0:
-            context_lines.append(f"Fee Status: ⚠️ {overdue_payments} Overdue Payments")
-        else:
-            context_lines.append("Fee Status: All clear")
-            
-        return "\n".join(context_lines)
+        # Update conversation stats
+        conversation.total_messages += 2
+        conversation.total_tokens += user_msg.tokens_used + ai_msg.tokens_used
+        conversation.save()
+        return ai_msg
+
+
+class ChatSendMessageView(ChatTurnMixin, APIView):
+    """
+    REAL AI Chat - Sends message to AI and saves to database
+    """
+    permission_classes = [IsAuthenticated]
 
     def post(self, request):
         try:
@@ -99,31 +131,8 @@ class ChatSendMessageView(APIView):
                     'error': 'Message is required'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Get or create conversation
-            if conversation_id:
-                try:
-                    conversation = ChatConversation.objects.get(
-                        id=conversation_id,
-                        user=request.user
-                    )
-                except ChatConversation.DoesNotExist:
-                    conversation = ChatConversation.objects.create(
-                        user=request.user,
-                        ai_model=ai_model
-                    )
-            else:
-                conversation = ChatConversation.objects.create(
-                    user=request.user,
-                    ai_model=ai_model
-                )
-            
-            # Save user message
-            user_msg = ChatMessage.objects.create(
-                conversation=conversation,
-                role='user',
-                content=user_message,
-                model=ai_model
-            )
+            conversation = self._get_conversation(request.user, conversation_id, ai_model)
+            user_msg = self._save_user_message(conversation, user_message, ai_model)
             
             # Call REAL AI with EXPERT MODE (Auto error detection + correction)
             start_time = time.time()
@@ -132,59 +141,26 @@ class ChatSendMessageView(APIView):
                 from ai.gemini import get_gemini_service
                 ai_service = get_gemini_service()
                 
-                # Build message history for context
-                # Build message history for context (Fetch NEWEST, then reverse)
-                previous_messages = ChatMessage.objects.filter(
-                    conversation=conversation
-                ).order_by('-timestamp')[:10]  # Get last 10 messages
-                previous_messages = reversed(previous_messages) # Convert to chronological order
-                
-                context = []
-                
-                # --- INJECT RAG CONTEXT (Student Data) ---
-                student_data = self._get_rag_context(request.user)
-                rag_message = f"""
-SYSTEM CONTEXT (REAL-TIME USER DATA):
-You have access to the following live data about the student you are chatting with:
-{student_data}
-
-INSTRUCTIONS:
-- Use this data to answer questions like "What are my marks?", "How is my attendance?", or "Any upcoming exams?".
-- If marks are low, offer study tips.
-- If attendance is low, suggest catching up.
-- This is PRIVATE data, do not share it unless asked.
-"""
-                # Add as system context
-                context.append({'role': 'system', 'content': rag_message})
-                # -----------------------------------------
-                
-                for msg in previous_messages:
-                    context.append({
-                        'role': 'user' if msg.role == 'user' else 'assistant',
-                        'content': msg.content
-                    })
-                
-                # Detect mode based on message content
-                mode = 'general'
-                if any(keyword in user_message.lower() for keyword in ['error', 'bug', 'fix', 'wrong', 'не работает']):
-                    mode = 'debug'
-                elif any(keyword in user_message.lower() for keyword in ['review', 'check', 'optimize']):
-                    mode = 'code_review'
-                elif any(keyword in user_message.lower() for keyword in ['deploy', 'production', 'pythonanywhere']):
-                    mode = 'production'
-                elif any(keyword in user_message.lower() for keyword in ['security', 'safe', 'secure','vulnerable']):
-                    mode = 'security'
-                elif any(keyword in user_message.lower() for keyword in ['slow', 'fast', 'performance', 'optimize']):
-                    mode = 'performance'
+                student_data, context, mode = self._prompt_inputs(request.user, conversation, user_msg)
                 
                 # Use EXPERT CHAT with auto error detection
-                ai_response = ai_service.expert_chat(
-                    user_message=user_message,
-                    mode=mode,
-                    context=context,
-                    detect_errors=True,  # ✅ ALWAYS detect and fix errors automatically
-                    images=images # Pass images if any
-                )
+                def ask():
+                    return ai_service.expert_chat(
+                        user_message=user_message,
+                        mode=mode,
+                        context=context,
+                        detect_errors=True,  # ✅ ALWAYS detect and fix errors automatically
+                        images=images # Pass images if any
+                    )
+
+                if conversation.total_messages == 0 and not images:
+                    # Opening question: cacheable, scoped to this user's live RAG data
+                    ai_response = get_response_cache().get_or_compute(
+                        ai_cache_namespace(request.user), 'expert_chat', user_message, ask,
+                        options=(mode, student_data)
+                    )
+                else:
+                    ai_response = ask()
                 
                 response_time = int((time.time() - start_time) * 1000)  # ms
                 
@@ -193,22 +169,7 @@ INSTRUCTIONS:
                 ai_response = f"⚠️ AI Error: {str(ai_error)}"
                 response_time = 0
             
-            # Save AI response
-            ai_msg = ChatMessage.objects.create(
-                conversation=conversation,
-                role='ai',
-                content=ai_response,
-                model=ai_model,
-                response_time_ms=response_time
-            )
-            
-            # Auto-generate title from first message
-            if conversation.total_messages == 0:
-                conversation.auto_generate_title()
-            
-            # Update conversation stats
-            conversation.total_messages += 2
-            conversation.save()
+            ai_msg = self._save_reply(conversation, user_msg, ai_response, ai_model, response_time)
             
             return Response({
                 'success': True,
@@ -229,6 +190,198 @@ INSTRUCTIONS:
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class AsyncChatSendMessageView(ChatTurnMixin, AsyncAPIView):
+    """
+    ChatSendMessageView for ASGI mode: same request / response, database
+    work in worker-thread hops and the provider call awaited on the loop.
+    """
+    permission_classes = [IsAuthenticated]
+
+    async def post(self, request):
+        try:
+            conversation_id = request.data.get('conversation_id')
+            user_message = request.data.get('message')
+            ai_model = request.data.get('model', 'gemini-2.0-flash')
+            images = request.data.get('images', [])  # List of Base64 strings
+
+            if not user_message:
+                return api_response({
+                    'error': 'Message is required'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            conversation, user_msg = await sync_to_async(self._open_turn)(
+                request.user, conversation_id, user_message, ai_model
+            )
+
+            start_time = time.time()
+            try:
+                ai_service, student_data, context, mode, namespace = await sync_to_async(self._turn_inputs)(
+                    request.user, conversation, user_msg
+                )
+
+                def ask():
+                    return ai_service.aexpert_chat(
+                        user_message=user_message,
+                        mode=mode,
+                        context=context,
+                        detect_errors=True,
+                        images=images
+                    )
+
+                if conversation.total_messages == 0 and not images:
+                    # Opening question: same cache entry as the sync endpoint
+                    ai_response = await get_response_cache().aget_or_compute(
+                        namespace, 'expert_chat', user_message, ask, options=(mode, student_data)
+                    )
+                else:
+                    ai_response = await ask()
+
+                response_time = int((time.time() - start_time) * 1000)  # ms
+
+            except Exception as ai_error:
+                logger.error(f"AI Error: {ai_error}")
+                ai_response = f"⚠️ AI Error: {str(ai_error)}"
+                response_time = 0
+
+            ai_msg = await sync_to_async(self._save_reply)(conversation, user_msg, ai_response, ai_model, response_time)
+
+            return api_response({
+                'success': True,
+                'conversation_id': conversation.id,
+                'message': {
+                    'id': ai_msg.id,
+                    'content': ai_response,
+                    'timestamp': ai_msg.timestamp,
+                    'response_time_ms': response_time
+                },
+                'conversation_title': conversation.title
+            })
+
+        except Exception as e:
+            logger.error(f"Chat Error: {str(e)}")
+            return api_response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def _open_turn(self, user, conversation_id, user_message, ai_model):
+        conversation = self._get_conversation(user, conversation_id, ai_model)
+        return conversation, self._save_user_message(conversation, user_message, ai_model)
+
+    def _turn_inputs(self, user, conversation, user_msg):
+        """Provider + prompt inputs (the first call also builds the Gemini client)"""
+        from ai.gemini import get_gemini_service
+        student_data, context, mode = self._prompt_inputs(user, conversation, user_msg)
+        return get_gemini_service(), student_data, context, mode, ai_cache_namespace(user)
+
+
+def _sse(event, data):
+    """One Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class ChatStreamMessageView(ChatSendMessageView):
+    """
+    Streaming AI Chat - same turn as ChatSendMessageView, but the answer is
+    relayed as Server-Sent Events while the provider generates it:
+
+        event: start   {"conversation_id"}
+        event: delta   {"content"}            (one per provider chunk)
+        event: error   {"error"}              (provider failed)
+        event: done    {"message", "conversation_title", "ttft_ms"}
+
+    The AI message is saved ONCE when the stream ends (also on disconnect,
+    with the text received so far).
+    """
+
+    def post(self, request):
+        user_message = request.data.get('message')
+        ai_model = request.data.get('model', 'gemini-2.0-flash')
+        images = request.data.get('images', [])  # List of Base64 strings
+
+        if not user_message:
+            return Response({
+                'error': 'Message is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        conversation = self._get_conversation(request.user, request.data.get('conversation_id'), ai_model)
+        user_msg = self._save_user_message(conversation, user_message, ai_model)
+
+        response = streaming_response(
+            self._events(request.user, conversation, user_msg, ai_model, images),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx: pass chunks through unbuffered
+        return response
+
+    def _chunks(self, user, conversation, user_msg, images):
+        """(chunks, cache_store) - cache_store(answer) is None unless the turn is cacheable"""
+        student_data, context, mode = self._prompt_inputs(user, conversation, user_msg)
+
+        cache_store = None
+        if RESPONSE_CACHE_ENABLED and conversation.total_messages == 0 and not images:
+            # Opening question: same cache entry as the non-streaming endpoint
+            cache = get_response_cache()
+            key = (ai_cache_namespace(user), 'expert_chat', user_msg.content)
+            options = (mode, student_data)
+            cached = cache.get(*key, options)
+            if cached is not None:
+                logger.info("⚡ AI cache hit: expert_chat (stream)")
+                return [cached], None
+            cache_store = lambda answer: cache.set(*key, answer, options)
+
+        from ai.gemini import expert_chat_prompt
+        prompt = expert_chat_prompt(user_msg.content, mode, context)
+        kwargs = {'images': images} if images else {}
+        # Images need the vision engine: no fallback to text-only providers
+        provider, chunks = get_provider_router().stream(
+            'stream_content', prompt, primary='gemini', fallback=not images, **kwargs
+        )
+        logger.info(f"📡 Streaming chat answer from {provider}")
+        return chunks, cache_store
+
+    def _events(self, user, conversation, user_msg, ai_model, images):
+        start_time = time.time()
+        parts = []
+        ttft_ms = None
+        error = None
+        cache_store = None
+
+        yield _sse('start', {'conversation_id': conversation.id})
+        try:
+            chunks, cache_store = self._chunks(user, conversation, user_msg, images)
+            for chunk in chunks:
+                if ttft_ms is None:
+                    ttft_ms = int((time.time() - start_time) * 1000)
+                    logger.info(f"⏱️ Chat time to first token: {ttft_ms} ms")
+                parts.append(chunk)
+                yield _sse('delta', {'content': chunk})
+        except Exception as ai_error:
+            logger.error(f"AI Stream Error: {ai_error}")
+            error = str(ai_error)
+        finally:
+            # Runs on completion, provider failure and client disconnect alike
+            ai_response = "".join(parts) or f"⚠️ AI Error: {error or 'no response'}"
+            response_time = int((time.time() - start_time) * 1000)
+            ai_msg = self._save_reply(conversation, user_msg, ai_response, ai_model, response_time)
+            if cache_store and error is None and is_cacheable(ai_response):
+                cache_store(ai_response)
+
+        if error:
+            yield _sse('error', {'error': error})
+        yield _sse('done', {
+            'conversation_id': conversation.id,
+            'message': {
+                'id': ai_msg.id,
+                'content': ai_response,
+                'timestamp': ai_msg.timestamp,
+                'response_time_ms': response_time,
+            },
+            'conversation_title': conversation.title,
+            'ttft_ms': ttft_ms,
+        })
+
+
 class ChatHistoryView(APIView):
     """
     Get all conversations for user
@@ -236,14 +389,20 @@ class ChatHistoryView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
+        # Latest message preview in the same query, not one query per conversation
+        last_message = (
+            ChatMessage.objects
+            .filter(conversation=OuterRef('pk'))
+            .order_by('-timestamp', '-id')
+            .values('content')[:1]
+        )
         conversations = ChatConversation.objects.filter(
             user=request.user,
             is_archived=False
-        )[:20]
+        ).annotate(last_message=Substr(Subquery(last_message), 1, 100))[:20]
         
         data = []
         for conversation in conversations:
-            last_message = conversation.messages.last()
             data.append({
                 'id': conversation.id,
                 'title': conversation.title or f"Chat {conversation.created_at.strftime('%b %d')}",
@@ -251,7 +410,7 @@ class ChatHistoryView(APIView):
                 'updated_at': conversation.updated_at.isoformat(),
                 'message_count': conversation.total_messages,
                 'is_pinned': conversation.is_pinned,
-                'last_message': last_message.content[:100] if last_message else '',
+                'last_message': conversation.last_message or '',
                 'ai_model': conversation.ai_model
             })
         
@@ -306,7 +465,7 @@ class ChatLoadConversationView(APIView):
 
 class ChatSearchView(APIView):
     """
-    Search through chat history
+    Search through chat history (full-text index, ranked, highlighted snippets)
     """
     permission_classes = [IsAuthenticated]
     
@@ -319,30 +478,9 @@ class ChatSearchView(APIView):
                 'results': []
             })
         
-        # Search in messages
-        messages = ChatMessage.objects.filter(
-            Q(content__icontains=query),
-            conversation__user=request.user,
-            conversation__is_archived=False
-        ).select_related('conversation')[:20]
-        
-        results = []
-        seen_conversations = set()
-        
-        for msg in messages:
-            if msg.conversation.id not in seen_conversations:
-                results.append({
-                    'conversation_id': msg.conversation.id,
-                    'conversation_title': msg.conversation.title,
-                    'content': msg.content[:200],
-                    'timestamp': msg.timestamp.isoformat(),
-                    'role': msg.role
-                })
-                seen_conversations.add(msg.conversation.id)
-        
         return Response({
             'success': True,
-            'results': results,
+            'results': chat_search.search(request.user, query),
             'query': query
         })
 
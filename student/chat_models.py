@@ -18,6 +18,10 @@ class ChatConversation(models.Model):
     total_messages = models.IntegerField(default=0)
     total_tokens = models.IntegerField(default=0)
     ai_model = models.CharField(max_length=50, default='gemini-2.0-flash')
+
+    # Rolling summary of turns that no longer fit the prompt token budget
+    summary = models.TextField(blank=True)
+    summary_last_message_id = models.PositiveIntegerField(default=0, help_text="Messages up to this id are in the summary")
     
     class Meta:
         ordering = ['-is_pinned', '-updated_at']
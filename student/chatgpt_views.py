@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from ai.chatgpt import get_chatgpt_service
+from ai.response_cache import get_response_cache
+from .tenant import ai_cache_namespace
 from .models import Student
 from django.shortcuts import get_object_or_404
 import logging
@@ -70,7 +72,11 @@ class AITutorView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             service = get_chatgpt_service()
-            answer = service.ask_tutor(question, subject, context)
+            answer = get_response_cache().get_or_compute(
+                ai_cache_namespace(request.user), 'ask_tutor', question,
+                lambda: service.ask_tutor(question, subject, context),
+                options=(subject, context)
+            )
             
             return Response({
                 "success": True,
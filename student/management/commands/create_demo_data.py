@@ -15,12 +15,24 @@ from student.models import (
     Subject, Classroom, Exam, Grade, LibraryBook, BookIssue,
     DemoRequest
 )
+from student.services.demo_data import seed_tenant, DEMO_PASSWORD
 
 
 class Command(BaseCommand):
     help = 'Create comprehensive demo data for NextGen ERP'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--tenants', type=int, default=0,
+                            help='Seed this many complete multi-tenant institutes instead of the shared demo set')
+        parser.add_argument('--students', type=int, default=50, help='Students per tenant (with --tenants)')
+        parser.add_argument('--days', type=int, default=30, help='Days of attendance per student (with --tenants)')
+        parser.add_argument('--plan', default='INSTITUTE', choices=['SCHOOL', 'COACHING', 'INSTITUTE'])
+        parser.add_argument('--prefix', default='demo', help='Tenant name prefix (with --tenants)')
+
     def handle(self, *args, **kwargs):
+        if kwargs['tenants']:
+            return self.create_tenants(kwargs)
+
         self.stdout.write(self.style.SUCCESS('Creating demo data...'))
         
         # Create users
@@ -49,6 +61,15 @@ class Command(BaseCommand):
         self.create_notifications()
         
         self.stdout.write(self.style.SUCCESS('✅ Demo data created successfully!'))
+
+    def create_tenants(self, options):
+        """Isolated institutes with realistic volumes (see student/services/demo_data.py)"""
+        for i in range(1, options['tenants'] + 1):
+            tenant = seed_tenant(
+                f"{options['prefix']}{i}", students=options['students'], days=options['days'], plan=options['plan'],
+            )
+            self.stdout.write(f"Created tenant {tenant.owner.username} ({len(tenant.students)} students)")
+        self.stdout.write(self.style.SUCCESS(f"✅ {options['tenants']} tenant(s) created. Password: {DEMO_PASSWORD}"))
     
     def create_users(self):
         """Create demo users for all roles"""
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from student.models import ImportJob
+from student.services.bulk_import import process_import_job, requeue_stale_jobs, JOB_PENDING
+
+
+class Command(BaseCommand):
+    help = 'Processes queued bulk import jobs (use with BULK_IMPORT_RUN_IN_THREAD=False).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--interval', type=int, default=5, help='Polling interval in seconds (with --watch)')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.drain()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"Processed {processed} import job(s)."))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+    def drain(self):
+        count = 0
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale import job(s)."))
+        pending = ImportJob.objects.filter(status=JOB_PENDING).order_by('created_at').values_list('pk', flat=True)
+        for job_id in list(pending):
+            if process_import_job(job_id):
+                job = ImportJob.objects.get(pk=job_id)
+                self.stdout.write(f"Job #{job_id} ({job.import_type}): {job.status} - {job.message}")
+                count += 1
+        return count
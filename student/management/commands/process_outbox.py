@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from student.services.outbox import drain_all
+
+
+class Command(BaseCommand):
+    help = 'Sends queued Email / SMS / WhatsApp / Telegram messages from the notification outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help='Keep polling for new messages')
+        parser.add_argument('--interval', type=int, default=5, help='Polling interval in seconds (with --watch)')
+
+    def handle(self, *args, **options):
+        while True:
+            totals = drain_all()
+            if any(totals.values()):
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {totals['sent']}, retrying {totals['retrying']}, failed {totals['failed']}."
+                ))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from student.models import GeneratedReport
+from student.services.report_jobs import process_report, REPORT_PENDING
+
+
+class Command(BaseCommand):
+    help = 'Renders queued reports (use with REPORT_RUN_IN_THREAD=False).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true', help='Keep polling for new reports')
+        parser.add_argument('--interval', type=int, default=5, help='Polling interval in seconds (with --watch)')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.drain()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"Rendered {processed} report(s)."))
+            if not options['watch']:
+                break
+            time.sleep(options['interval'])
+
+    def drain(self):
+        count = 0
+        pending = GeneratedReport.objects.filter(status=REPORT_PENDING).order_by('generated_at').values_list('pk', flat=True)
+        for report_id in list(pending):
+            if process_report(report_id):
+                report = GeneratedReport.objects.get(pk=report_id)
+                self.stdout.write(f"Report #{report_id} ({report.report_type} {report.period}): {report.status}")
+                count += 1
+        return count
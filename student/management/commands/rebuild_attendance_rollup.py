@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from student.models import Student
+from student.services.attendance_rollup import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the monthly attendance bitmaps from the attendance rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, help='Only students of this owner (user id)')
+
+    def handle(self, *args, **options):
+        student_ids = None
+        if options['owner']:
+            student_ids = list(Student.objects.filter(created_by_id=options['owner']).values_list('id', flat=True))
+        months = rebuild(student_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {months} student-month rows."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from student.services.chat_search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text index behind chat history search.'
+
+    def handle(self, *args, **options):
+        backend = rebuild_index()
+        if backend is None:
+            self.stdout.write(self.style.WARNING("No full-text index on this database; chat search scans messages."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the chat search index ({backend})."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from student.services.search_index import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the global search index (Students, Courses, Batches).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, help='Only rows of this owner (user id)')
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(owner=options['owner'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} search entries."))
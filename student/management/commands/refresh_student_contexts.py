@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from student.models import Student
+from student.services.student_context import refresh_student_contexts
+
+
+class Command(BaseCommand):
+    help = 'Pre-builds the AI chat context snapshot of every student with a login (run daily).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, help='Only students of this owner (user id)')
+
+    def handle(self, *args, **options):
+        students = Student.objects.filter(user__isnull=False)
+        if options['owner']:
+            students = students.filter(created_by_id=options['owner'])
+        refreshed = refresh_student_contexts(students)
+        if refreshed is None:
+            self.stdout.write(self.style.WARNING(
+                "Skipped: the default cache is per-process, so a warmed snapshot would not reach the web workers. "
+                "Configure a shared cache (REDIS_URL) to pre-warm."
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} student context(s)."))
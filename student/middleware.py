@@ -1,5 +1,26 @@
 from django.http import JsonResponse
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .tenant import get_tenant_context
+
+
+class TenantContextMiddleware:
+    """
+    Attach the resolved tenant (owner, profile, role, plan) to the request.
+
+    Exposed lazily as `request.tenant` so anonymous/static requests never
+    touch the database. Must run after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Evaluated on first access; reads request.user at that point so DRF
+        # (JWT) authentication, which runs later, is picked up as well.
+        request.tenant = SimpleLazyObject(lambda: get_tenant_context(getattr(request, 'user', None)))
+        return self.get_response(request)
 
 
 class SubscriptionMiddleware:
@@ -54,18 +75,19 @@ class SubscriptionMiddleware:
         if not user or not user.is_authenticated or user.is_superuser:
             return self.get_response(request)
 
-        profile = getattr(user, 'profile', None)
-        if not profile:
+        # Resolved once per request (shared with views / permissions)
+        tenant = get_tenant_context(user)
+        if not tenant.profile:
             return self.get_response(request)
 
         # Normalize
-        plan_type = (getattr(profile, 'institution_type', '') or '').upper()
+        plan_type = tenant.plan or ''
         path = request.path.lower()
 
         # --------------------------------------------------
         # 2. SUBSCRIPTION EXPIRY CHECK
         # --------------------------------------------------
-        expiry_date = getattr(profile, 'subscription_expiry', None)
+        expiry_date = tenant.subscription_expiry
         is_safe_method = request.method in self.SAFE_METHODS
         is_exempt_url = any(url in path for url in self.EXEMPT_URLS)
 
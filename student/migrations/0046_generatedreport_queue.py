@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0045_importjob_holiday_classroutine'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedreport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='etag',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='file',
+            field=models.FileField(blank=True, null=True, upload_to='reports/'),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='period',
+            field=models.CharField(blank=True, help_text='Reporting month (YYYY-MM)', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='generatedreport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='generatedreport',
+            name='report_type',
+            field=models.CharField(choices=[('FINANCE', 'Financial Statement'), ('ACADEMIC', 'Academic Performance'), ('EXAM', 'Exam Summary'), ('ATTENDANCE', 'Attendance Log'), ('HR', 'HR & Payroll'), ('GENERAL', 'General Overview'), ('ANALYTICS_SUMMARY', 'Analytics Summary')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='generatedreport',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('READY', 'Ready'), ('FAILED', 'Failed')], db_index=True, default='READY', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='generatedreport',
+            index=models.Index(fields=['created_by', 'report_type', 'period'], name='student_gen_created_892c9d_idx'),
+        ),
+    ]
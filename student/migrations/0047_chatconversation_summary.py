@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0046_generatedreport_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatconversation',
+            name='summary',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='chatconversation',
+            name='summary_last_message_id',
+            field=models.PositiveIntegerField(default=0, help_text='Messages up to this id are in the summary'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0048_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankMailboxState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mailbox', models.CharField(max_length=255, unique=True)),
+                ('uid_validity', models.BigIntegerField(default=0)),
+                ('last_uid', models.BigIntegerField(default=0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BankAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mailbox', models.CharField(max_length=255)),
+                ('uid_validity', models.BigIntegerField()),
+                ('uid', models.BigIntegerField()),
+                ('subject', models.CharField(blank=True, max_length=255)),
+                ('received_at', models.DateTimeField(blank=True, null=True)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('utr', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('status', models.CharField(choices=[('UNPARSED', 'No amount / UTR found'), ('UNMATCHED', 'No pending payment'), ('MATCHED', 'Payment verified'), ('MISMATCH', 'Amount mismatch')], db_index=True, default='UNMATCHED', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bank_alerts', to='student.payment')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'unique_together': {('mailbox', 'uid_validity', 'uid')},
+            },
+        ),
+    ]
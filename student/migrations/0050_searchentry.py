@@ -0,0 +1,125 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+FTS_TABLE = 'student_searchentry_fts'
+
+SQLITE_FTS = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(owner, terms, prefix='2 3')",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON student_searchentry BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, owner, terms) VALUES (new.id, 'o' || new.created_by_id, new.terms);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON student_searchentry BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON student_searchentry BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, owner, terms) VALUES (new.id, 'o' || new.created_by_id, new.terms);
+    END""",
+]
+
+POSTGRES_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX student_searchentry_terms_trgm ON student_searchentry USING gin (terms gin_trgm_ops)",
+    "CREATE INDEX student_searchentry_terms_tsv ON student_searchentry USING gin (to_tsvector('simple', terms))",
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_INDEXES
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            if 'ENABLE_FTS5' not in {row[0] for row in cursor.fetchall()}:
+                return  # Search falls back to a LIKE over the owner's rows
+        statements = SQLITE_FTS
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS student_searchentry_terms_trgm")
+        schema_editor.execute("DROP INDEX IF EXISTS student_searchentry_terms_tsv")
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    """Same rows as student.services.search_index.build_entries, written in chunks"""
+    SearchEntry = apps.get_model('student', 'SearchEntry')
+    Student = apps.get_model('student', 'Student')
+    Course = apps.get_model('student', 'Course')
+    Batch = apps.get_model('student', 'Batch')
+
+    def terms(*parts):
+        return " ".join(str(part) for part in parts if part).lower()
+
+    def student_entry(s):
+        return SearchEntry(created_by_id=s.created_by_id, kind='STUDENT', object_id=s.pk, title=s.name,
+                           subtitle=f"Roll: {s.roll_number} | Class: {s.grade}",
+                           terms=terms(s.name, s.roll_number, s.parent.username if s.parent_id else None))
+
+    def course_entry(c):
+        return SearchEntry(created_by_id=c.created_by_id, kind='COURSE', object_id=c.pk, title=c.name,
+                           subtitle=f"Fee: ₹{c.fee}", terms=terms(c.name, c.code))
+
+    def batch_entry(b):
+        return SearchEntry(created_by_id=b.created_by_id, kind='BATCH', object_id=b.pk, title=b.name,
+                           subtitle=f"Course: {b.course.name}", terms=terms(b.name, b.course.name))
+
+    sources = (
+        (Student.objects.select_related('parent'), student_entry),
+        (Course.objects.all(), course_entry),
+        (Batch.objects.select_related('course'), batch_entry),
+    )
+    for queryset, build in sources:
+        entries = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=BACKFILL_BATCH_SIZE):
+            entries.append(build(obj))
+            if len(entries) >= BACKFILL_BATCH_SIZE:
+                SearchEntry.objects.bulk_create(entries)
+                entries = []
+        SearchEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0049_bank_alerts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('STUDENT', 'Student'), ('COURSE', 'Course'), ('BATCH', 'Batch')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('subtitle', models.CharField(blank=True, max_length=255)),
+                ('terms', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_by', 'kind'], name='student_sea_created_37ad79_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
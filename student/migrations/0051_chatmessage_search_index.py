@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:02
+
+from django.db import migrations
+
+FTS_TABLE = 'student_chatmessage_fts'
+
+# External-content FTS5 table: the text stays in student_chatmessage only
+SQLITE_FTS = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"content, content='student_chatmessage', content_rowid='id', prefix='2 3')",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON student_chatmessage BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON student_chatmessage BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF content ON student_chatmessage BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+POSTGRES_INDEXES = [
+    "CREATE INDEX student_chatmessage_content_tsv ON student_chatmessage "
+    "USING gin (to_tsvector('english', content))",
+]
+
+
+def create_chat_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_INDEXES
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            if 'ENABLE_FTS5' not in {row[0] for row in cursor.fetchall()}:
+                return  # Chat search falls back to icontains
+        statements = SQLITE_FTS
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_chat_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS student_chatmessage_content_tsv")
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0050_searchentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_chat_search_index, drop_chat_search_index),
+    ]
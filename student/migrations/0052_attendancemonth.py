@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    """Same rows as student.services.attendance_rollup.rebuild"""
+    Attendence = apps.get_model('student', 'Attendence')
+    AttendanceMonth = apps.get_model('student', 'AttendanceMonth')
+
+    months = {}
+    for student_id, day, is_present in Attendence.objects.order_by().values_list('student_id', 'date', 'is_present').iterator():
+        key = (student_id, day.replace(day=1))
+        row = months.get(key)
+        if row is None:
+            row = months[key] = AttendanceMonth(student_id=student_id, month=key[1])
+        bit = 1 << (day.day - 1)
+        row.marked |= bit
+        if is_present:
+            row.present |= bit
+    AttendanceMonth.objects.bulk_create(months.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0051_chatmessage_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('marked', models.IntegerField(default=0)),
+                ('present', models.IntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_months', to='student.student')),
+            ],
+            options={
+                'unique_together': {('student', 'month')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0053_campusfence_staffattendance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedreport',
+            name='params',
+            field=models.JSONField(blank=True, default=dict, help_text='Report options, e.g. the class of report cards'),
+        ),
+        migrations.AlterField(
+            model_name='generatedreport',
+            name='report_type',
+            field=models.CharField(choices=[('FINANCE', 'Financial Statement'), ('ACADEMIC', 'Academic Performance'), ('EXAM', 'Exam Summary'), ('ATTENDANCE', 'Attendance Log'), ('HR', 'HR & Payroll'), ('GENERAL', 'General Overview'), ('ANALYTICS_SUMMARY', 'Analytics Summary'), ('REPORT_CARDS', 'Class Report Cards')], max_length=50),
+        ),
+    ]
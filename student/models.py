@@ -125,6 +125,58 @@ class Attendence(models.Model):
         return f"{self.student.name} - {self.date}"
 
 
+class AttendanceMonth(models.Model):
+    """
+    One student's attendance for one month as two bitmaps (bit d-1 = day d).
+    Derived from Attendence, which stays the source of truth; kept current by
+    signals and the bulk roll-call (see student/services/attendance_rollup.py).
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_months')
+    month = models.DateField(help_text="First day of the month")
+    marked = models.IntegerField(default=0)   # Days with a mark
+    present = models.IntegerField(default=0)  # Days marked present
+
+    class Meta:
+        unique_together = ("student", "month")
+
+    def __str__(self):
+        return f"{self.student_id} - {self.month:%Y-%m}"
+
+
+class CampusFence(models.Model):
+    """
+    A campus / branch location for geo-fenced check-in: a circle around
+    (lat, long), or a polygon of [lat, long] points when `polygon` is set.
+    More than one fence per owner needs the 'multi_branch' plan feature.
+    """
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='%(class)s_created', null=True, blank=True)
+    name = models.CharField(max_length=100)
+    lat = models.DecimalField(max_digits=9, decimal_places=6)
+    long = models.DecimalField(max_digits=9, decimal_places=6)
+    radius = models.PositiveIntegerField(default=200, help_text="Allowed radius in meters")
+    polygon = models.JSONField(default=list, blank=True, help_text="[[lat, long], ...] (overrides the radius)")
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.created_by_id})"
+
+
+class StaffAttendance(models.Model):
+    """Geo-fenced daily check-in of a teacher / staff member"""
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='%(class)s_created', null=True, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='staff_attendance')
+    date = models.DateField()
+    check_in = models.DateTimeField()
+    fence = models.ForeignKey(CampusFence, on_delete=models.SET_NULL, null=True, blank=True)
+    distance = models.FloatField(help_text="Meters from the fence center")
+
+    class Meta:
+        unique_together = ("user", "date")
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date}"
+
+
 class UserProfile(models.Model):
     """Extended user profile with role information"""
     ROLE_CHOICES = [
@@ -173,6 +225,10 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.role} ({self.institution_type})"
     
+    def is_admin_or_owner(self):
+        """Account owner (Client) or Admin of the institution"""
+        return self.user.is_superuser or self.role in ('CLIENT', 'ADMIN')
+
     def is_plan_expired(self):
         """Check if plan has expired"""
         if not self.subscription_expiry:
@@ -504,24 +560,30 @@ class DemoRequest(models.Model):
         return f"{self.name} - {self.phone} ({self.status})"
     
     def send_notifications(self):
-        """Send WhatsApp and SMS notifications to admin"""
-        from notifications import whatsapp_service, sms_service
+        """Queue WhatsApp and SMS notifications to admin (sent by the notification outbox)"""
+        from notifications import whatsapp_service
+        from notifications.whatsapp_service import ADMIN_NUMBER
+        from .services.outbox import enqueue, CHANNEL_WHATSAPP, CHANNEL_SMS
         
-        # Send WhatsApp to admin
-        whatsapp_result = whatsapp_service.send_demo_request_notification(
-            requester_name=self.name,
-            requester_phone=self.phone,
-            requester_email=self.email,
-            institution_name=self.institution_name
+        # WhatsApp to admin
+        whatsapp, _ = enqueue(
+            CHANNEL_WHATSAPP, ADMIN_NUMBER,
+            whatsapp_service.demo_request_message(
+                requester_name=self.name,
+                requester_phone=self.phone,
+                requester_email=self.email,
+                institution_name=self.institution_name
+            ),
+            dedupe_key=f"demo:{self.pk}:whatsapp"
         )
         
-        # Send SMS as backup
+        # SMS as backup
         sms_message = f"New Demo Request: {self.name} ({self.phone}) from {self.institution_name or 'Unknown'}. Check WhatsApp for details."
-        sms_result = sms_service.send_message('+918356926231', sms_message)
+        sms, _ = enqueue(CHANNEL_SMS, ADMIN_NUMBER, sms_message, dedupe_key=f"demo:{self.pk}:sms")
         
         return {
-            'whatsapp': whatsapp_result,
-            'sms': sms_result
+            'whatsapp': whatsapp.status,
+            'sms': sms.status
         }
 
 # ==================== EXAM & GRADING SYSTEM ====================
@@ -925,16 +987,38 @@ class GeneratedReport(models.Model):
     REPORT_TYPES = [
         ('FINANCE', 'Financial Statement'),
         ('ACADEMIC', 'Academic Performance'),
+        ('EXAM', 'Exam Summary'),
         ('ATTENDANCE', 'Attendance Log'),
         ('HR', 'HR & Payroll'),
+        ('GENERAL', 'General Overview'),
+        ('ANALYTICS_SUMMARY', 'Analytics Summary'),
+        ('REPORT_CARDS', 'Class Report Cards'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('READY', 'Ready'),
+        ('FAILED', 'Failed'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     report_type = models.CharField(max_length=50, choices=REPORT_TYPES)
+    period = models.CharField(max_length=7, blank=True, help_text="Reporting month (YYYY-MM)")
+    params = models.JSONField(default=dict, blank=True, help_text="Report options, e.g. the class of report cards")
     generated_at = models.DateTimeField(auto_now_add=True)
     file_url = models.CharField(max_length=500, blank=True, null=True)
-    status = models.CharField(max_length=20, default='READY')
+    file = models.FileField(upload_to='reports/', blank=True, null=True)  # Rendered once, served many times
+    etag = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='READY', db_index=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_by', 'report_type', 'period']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.status})"
@@ -983,6 +1067,44 @@ class AuditLog(models.Model):
 
     def __str__(self):
         return f"{self.action} by {self.created_by.username if self.created_by else 'System'} at {self.created_at}"
+
+
+class ImportJob(models.Model):
+    """Bulk CSV/XLSX import tracked as a job (progress + per-row errors)"""
+    IMPORT_TYPES = [
+        ('STUDENT', 'Students'),
+        ('BOOK', 'Library Books'),
+        ('STAFF', 'Staff'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='%(class)s_created', null=True, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='import_jobs')  # Initiator
+    import_type = models.CharField(max_length=20, choices=IMPORT_TYPES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING', db_index=True)
+    file = models.FileField(upload_to='imports/', blank=True, null=True)
+    file_name = models.CharField(max_length=255, blank=True)
+
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # [{"row": 5, "errors": {...}}] (capped)
+    message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.import_type} import #{self.id} ({self.status})"
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -1187,3 +1309,121 @@ class ClassRoutine(models.Model):
 
     def __str__(self):
         return f"{self.day_of_week} | {self.subject} ({self.start_time})"
+
+
+# =========================
+# NOTIFICATION OUTBOX
+# =========================
+class OutboxMessage(models.Model):
+    """Outbound Email / SMS / WhatsApp / Telegram message, delivered by the outbox worker"""
+    CHANNELS = [
+        ('EMAIL', 'Email'),
+        ('SMS', 'SMS'),
+        ('WHATSAPP', 'WhatsApp'),
+        ('TELEGRAM', 'Telegram'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='%(class)s_created', null=True, blank=True)
+    channel = models.CharField(max_length=10, choices=CHANNELS)
+    recipient = models.CharField(max_length=255)  # Email, phone number or Telegram chat id
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    options = models.JSONField(default=dict, blank=True)  # Channel extras (template_id, parse_mode, ...)
+    attachment = models.FileField(upload_to='outbox/', blank=True, null=True)
+    attachment_name = models.CharField(max_length=255, blank=True)
+    dedupe_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    provider_message_id = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
+
+
+# =========================
+# BANK CREDIT ALERTS
+# =========================
+class BankMailboxState(models.Model):
+    """IMAP checkpoint of the bank-alert ingester (one row per account + folder)"""
+    mailbox = models.CharField(max_length=255, unique=True)  # user@server/FOLDER
+    uid_validity = models.BigIntegerField(default=0)
+    last_uid = models.BigIntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.mailbox} (UID {self.last_uid})"
+
+
+class BankAlert(models.Model):
+    """A bank credit-alert email, parsed once and kept"""
+    STATUS_CHOICES = [
+        ('UNPARSED', 'No amount / UTR found'),
+        ('UNMATCHED', 'No pending payment'),
+        ('MATCHED', 'Payment verified'),
+        ('MISMATCH', 'Amount mismatch'),
+    ]
+
+    mailbox = models.CharField(max_length=255)
+    uid_validity = models.BigIntegerField()
+    uid = models.BigIntegerField()
+    subject = models.CharField(max_length=255, blank=True)
+    received_at = models.DateTimeField(null=True, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    utr = models.CharField(max_length=100, blank=True, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='UNMATCHED', db_index=True)
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True, related_name='bank_alerts')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['mailbox', 'uid_validity', 'uid']
+
+    def __str__(self):
+        return f"{self.utr or 'no UTR'} {self.amount} ({self.status})"
+
+
+# =========================
+# GLOBAL SEARCH INDEX
+# =========================
+class SearchEntry(models.Model):
+    """Denormalized, per-tenant search row for a Student / Course / Batch (kept current by signals)"""
+    KINDS = [
+        ('STUDENT', 'Student'),
+        ('COURSE', 'Course'),
+        ('BATCH', 'Batch'),
+    ]
+
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='%(class)s_created', null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    terms = models.TextField()  # Lower-cased searchable text (name, roll number, parent, code, ...)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        indexes = [
+            models.Index(fields=['created_by', 'kind']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.title}"
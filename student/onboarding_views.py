@@ -166,37 +166,38 @@ class OnboardingPaymentView(APIView):
 # =========================
 # BULK IMPORT (Advance Feature)
 # =========================
-import openpyxl
-from io import BytesIO
+from rest_framework.permissions import IsAuthenticated
+from .tenant import get_tenant_context
+from .services import bulk_import
+
 
 class OnboardingBulkImportView(APIView):
-    # permission_classes = [IsAuthenticated, IsVendorOrAdmin]
-    # For now allow any authenticated user with right features
-     
-    permission_classes = [AllowAny] # Ideally restrict this.
+    """
+    First-run import from the onboarding wizard (XLSX or CSV, students by default).
+    Uses the same streaming engine as BulkImportView.
+    """
+    permission_classes = [IsAuthenticated]
 
     def post(self, request):
         if 'file' not in request.FILES:
              return Response({"error": "No file uploaded"}, status=400)
-        
+
         file = request.FILES['file']
-        
+        import_type = (request.data.get('type') or 'STUDENT').upper()
+        tenant = get_tenant_context(request.user)
+
+        if not (request.user.is_superuser or (tenant.profile and tenant.profile.is_admin_or_owner())):
+            return Response({"error": "Permission Denied"}, status=403)
+
         try:
-            wb = openpyxl.load_workbook(file)
-            sheet = wb.active
-            
-            created_count = 0
-            
-            # Skip header, iterate rows
-            # Expected format: Name, Grade, Email, Phone
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if not row[0]: continue
-                
-                # Check for existing user or create mock
-                
-                created_count += 1
-                
-            return Response({"message": f"Successfully processed {created_count} records", "count": created_count})
-            
+            importer = bulk_import.get_importer(import_type, tenant.owner, request.user)
+            result = bulk_import.run_import(importer, bulk_import.iter_rows(file, file.name))
         except Exception as e:
             return Response({"error": f"Invalid File: {str(e)}"}, status=400)
+
+        return Response({
+            "message": f"Successfully processed {result.created} records",
+            "count": result.created,
+            "error_count": result.error_count,
+            "errors": result.errors,
+        })
@@ -0,0 +1,170 @@
+"""
+List API Layer
+Keyset pagination and sparse fieldsets for the tenant list endpoints.
+
+- `?page_size=` / `?cursor=` switch a list to keyset pages ordered by
+  (created_at, id), or by id for models without created_at. Each page is
+  one `WHERE (created_at, id) < cursor LIMIT n` query, so page 500 costs the
+  same as page 1. Without either parameter the endpoint keeps returning the
+  plain list existing clients expect.
+- `?fields=a,b` keeps only those fields of each row
+- Rows come from read-only list serializers (see "LIST (READ-ONLY)" in
+  Serializer.py) and the queryset is narrowed with `.only()` /
+  `select_related()` to exactly the columns those fields read.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# =========================
+# CONSTANTS
+# =========================
+LIST_PAGE_SIZE = getattr(settings, 'LIST_PAGE_SIZE', 50)
+LIST_MAX_PAGE_SIZE = getattr(settings, 'LIST_MAX_PAGE_SIZE', 200)
+
+CURSOR_PARAM = 'cursor'
+PAGE_SIZE_PARAM = 'page_size'
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """Field names of `?fields=`, or None when the client wants every field"""
+    if request is None:
+        return None
+    raw = request.query_params.get(FIELDS_PARAM, '')
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    return names or None
+
+
+def keyset_ordering(model):
+    """Newest first, by (created_at, id) where the model has created_at"""
+    if any(field.name == 'created_at' for field in model._meta.concrete_fields):
+        return ('-created_at', '-id')
+    return ('-id',)
+
+
+# =========================
+# KEYSET PAGINATION
+# =========================
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a unique, descending key.
+    The cursor is the key of the last row served; it is opaque to clients.
+    """
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+
+    @staticmethod
+    def is_requested(request):
+        return CURSOR_PARAM in request.query_params or PAGE_SIZE_PARAM in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(PAGE_SIZE_PARAM, LIST_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({PAGE_SIZE_PARAM: "Must be an integer."})
+        return max(1, min(size, LIST_MAX_PAGE_SIZE))
+
+    def encode_cursor(self, row):
+        values = [row[name] if isinstance(row, dict) else getattr(row, name) for name in self.fields]
+        payload = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, queryset, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields) or None in values:
+                raise ValueError
+            return [
+                queryset.model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (ValueError, TypeError, binascii.Error, DjangoValidationError):
+            raise ValidationError({CURSOR_PARAM: "Invalid cursor."})
+
+    def after(self, values):
+        """Rows strictly after `values` in descending key order"""
+        condition = Q()
+        for i in reversed(range(len(self.fields))):
+            equal = {name: value for name, value in zip(self.fields[:i], values[:i])}
+            condition = Q(**equal, **{f"{self.fields[i]}__lt": values[i]}) | condition
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(CURSOR_PARAM)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(queryset, cursor)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, PAGE_SIZE_PARAM, self.page_size)
+        return replace_query_param(url, CURSOR_PARAM, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+# =========================
+# LIST RESPONSES
+# =========================
+def lean_queryset(queryset, serializer):
+    """Narrow `queryset` to the columns (and joins) `serializer` reads"""
+    only, related = serializer.child.columns()
+    ordering_fields = [name.lstrip('-') for name in keyset_ordering(queryset.model)]
+    return (
+        queryset
+        .select_related(None).prefetch_related(None)
+        .select_related(*related)
+        .only(*only, *ordering_fields)
+    )
+
+
+def list_response(request, queryset, serializer_class):
+    """
+    Serialized list of `queryset` with sparse fields, as one keyset page when
+    the client asked for pages, else as the whole list.
+    """
+    context = {'request': request}
+    serializer = serializer_class(many=True, context=context)
+    queryset = lean_queryset(queryset, serializer)
+
+    if KeysetPagination.is_requested(request):
+        paginator = KeysetPagination(keyset_ordering(queryset.model))
+        rows = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_response(serializer_class(rows, many=True, context=context).data)
+
+    return Response(serializer_class(queryset, many=True, context=context).data)
+
+
+class LeanListMixin:
+    """
+    For generics.ListCreateAPIView: GET renders `list_serializer_class` rows
+    through list_response(); POST keeps the view's own serializer.
+    """
+    list_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return list_response(request, queryset, self.list_serializer_class)
@@ -1,6 +1,12 @@
 from rest_framework import permissions
 from django.utils import timezone
 from student.models import Student
+from student.tenant import get_tenant_context
+
+
+def _role(request):
+    """Cached role lookup (tenant context is resolved once per request)"""
+    return get_tenant_context(request.user).role
 
 
 # =========================
@@ -12,8 +18,7 @@ class IsStudent(permissions.BasePermission):
     def has_permission(self, request, view):
         return bool(
             request.user and request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'STUDENT'
+            _role(request) == 'STUDENT'
         )
 
 
@@ -22,8 +27,7 @@ class IsTeacher(permissions.BasePermission):
     def has_permission(self, request, view):
         return bool(
             request.user and request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'TEACHER'
+            _role(request) == 'TEACHER'
         )
 
 
@@ -32,8 +36,7 @@ class IsParent(permissions.BasePermission):
     def has_permission(self, request, view):
         return bool(
             request.user and request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'PARENT'
+            _role(request) == 'PARENT'
         )
 
 class IsHR(permissions.BasePermission):
@@ -41,8 +44,7 @@ class IsHR(permissions.BasePermission):
     def has_permission(self, request, view):
         return bool(
             request.user and request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'HR'
+            _role(request) == 'HR'
         )
 
 
@@ -73,11 +75,9 @@ class IsClient(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        if not hasattr(request.user, 'profile'):
-            return False
-
-        profile = request.user.profile
-        if profile.role != 'CLIENT':
+        tenant = get_tenant_context(request.user)
+        profile = tenant.profile
+        if not profile or tenant.role != 'CLIENT':
             return False
 
         # Hard block first
@@ -108,17 +108,17 @@ class IsTeacherOrAdmin(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        if not hasattr(request.user, 'profile'):
+        tenant = get_tenant_context(request.user)
+        if not tenant.profile:
             return False
 
-        role = request.user.profile.role
+        role = tenant.role
 
         if role in ['TEACHER', 'ADMIN']:
             return True
 
         if role == 'CLIENT':
-            expiry = request.user.profile.subscription_expiry
-            if expiry and expiry < timezone.now().date():
+            if tenant.is_expired():
                 return request.method in permissions.SAFE_METHODS
             return True
 
@@ -159,7 +159,7 @@ class HasPlanAccess(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        if not hasattr(request.user, 'profile'):
+        if not get_tenant_context(request.user).profile:
             return False
 
         # Use centralized permission logic
@@ -192,10 +192,11 @@ class StudentLimitPermission(permissions.BasePermission):
         if request.method != 'POST' or request.user.is_superuser:
             return True
 
-        if not hasattr(request.user, 'profile'):
+        tenant = get_tenant_context(request.user)
+        if not tenant.profile:
             return False
 
-        plan = (request.user.profile.institution_type or '').upper()
+        plan = tenant.plan
         limit = self.STUDENT_LIMITS.get(plan)
 
         if limit is None:
@@ -226,10 +227,7 @@ class IsSchool(permissions.BasePermission):
             return False
         if request.user.is_superuser:
             return True
-        try:
-            return request.user.profile.institution_type in ['SCHOOL', 'INSTITUTE']
-        except:
-            return False
+        return get_tenant_context(request.user).plan in ['SCHOOL', 'INSTITUTE']
 
 
 class IsCoaching(permissions.BasePermission):
@@ -239,10 +237,7 @@ class IsCoaching(permissions.BasePermission):
             return False
         if request.user.is_superuser:
             return True
-        try:
-            return request.user.profile.institution_type in ['COACHING', 'INSTITUTE']
-        except:
-            return False
+        return get_tenant_context(request.user).plan in ['COACHING', 'INSTITUTE']
 
 
 class IsInstitute(permissions.BasePermission):
@@ -252,7 +247,4 @@ class IsInstitute(permissions.BasePermission):
             return False
         if request.user.is_superuser:
             return True
-        try:
-            return request.user.profile.institution_type == 'INSTITUTE'
-        except:
-            return False
+        return get_tenant_context(request.user).plan == 'INSTITUTE'
@@ -2,6 +2,7 @@
 Plan-Based Feature Access Control
 Centralized permission system for different subscription tiers
 """
+from .tenant import get_tenant_context
 
 # Feature definitions for each plan
 # Feature definitions for each plan
@@ -53,7 +54,9 @@ def has_feature_access(user, feature_name):
     Returns:
         bool: True if user has access, False otherwise
     """
-    if not hasattr(user, 'profile'):
+    # Profile is resolved once per request by the tenant context
+    profile = get_tenant_context(user).profile
+    if not profile:
         return False
     
     # Super admins have access to everything
@@ -61,13 +64,13 @@ def has_feature_access(user, feature_name):
         return True
     
     # Get user's plan type
-    plan_type = getattr(user.profile, 'institution_type', 'COACHING')
+    plan_type = getattr(profile, 'institution_type', 'COACHING')
     
     # Get allowed features for this plan
     allowed_features = PLAN_FEATURES.get(plan_type, PLAN_FEATURES['COACHING'])
     
     # STRICT EXPIRY CHECK
-    if hasattr(user, 'profile') and user.profile.is_plan_expired():
+    if profile.is_plan_expired():
         # Only allow absolutely basic features when expired
         if feature_name in ['dashboard', 'subscription', 'payments']:
              return True
@@ -91,10 +94,11 @@ def get_user_features(user):
         all_features = PLAN_FEATURES['INSTITUTE']
         return {f: FEATURE_META[f] for f in all_features}
     
-    if not hasattr(user, 'profile'):
+    profile = get_tenant_context(user).profile
+    if not profile:
         return {}
     
-    plan_type = getattr(user.profile, 'institution_type', 'COACHING')
+    plan_type = getattr(profile, 'institution_type', 'COACHING')
     allowed_features = PLAN_FEATURES.get(plan_type, PLAN_FEATURES['COACHING'])
     
     return {f: FEATURE_META[f] for f in allowed_features}
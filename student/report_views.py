@@ -1,28 +1,23 @@
-import io
-import os
-from django.conf import settings
-from django.http import HttpResponse
-from django.utils import timezone
+import re
+
+from django.http import FileResponse, HttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 
 from .models import GeneratedReport
+from .tenant import get_tenant_context
+from .services.report_jobs import (
+    REPORT_PENDING, REPORT_RUNNING, REPORT_READY, REPORT_FAILED,
+    REPORT_FINANCE, REPORT_EXAM, REPORT_HR, REPORT_GENERAL, REPORT_ATTENDANCE, REPORT_ANALYTICS,
+    REPORT_RETRY_AFTER, request_report, render_pdf, store_report_pdf
+)
 
 # =========================
 # CONSTANTS
 # =========================
-REPORT_PENDING = 'PENDING'
-REPORT_READY = 'READY'
-
-REPORT_FINANCE = 'FINANCE'
-REPORT_EXAM = 'EXAM'
-REPORT_HR = 'HR'
-REPORT_GENERAL = 'GENERAL'
-REPORT_ATTENDANCE = 'ATTENDANCE'
-REPORT_ANALYTICS = 'ANALYTICS_SUMMARY'
+PERIOD_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
 
 # Plan-wise allowed reports
 PLAN_REPORT_ACCESS = {
@@ -39,13 +34,12 @@ class ReportListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        from .views import get_owner_user
-        owner = get_owner_user(request.user)
+        owner = get_tenant_context(request.user).owner
         
         reports = (
             GeneratedReport.objects
             .filter(created_by=owner)
-            .only('id', 'name', 'report_type', 'generated_at', 'status', 'file_url')
+            .only('id', 'name', 'report_type', 'period', 'generated_at', 'status', 'file_url')
             .order_by('-generated_at')
         )
 
@@ -54,6 +48,7 @@ class ReportListView(APIView):
                 "id": r.id,
                 "name": r.name,
                 "type": r.report_type,
+                "period": r.period,
                 "date": r.generated_at.strftime("%Y-%m-%d"),
                 "status": r.status,
                 "url": r.file_url
@@ -71,8 +66,8 @@ class ReportListView(APIView):
         # =========================
         # PLAN CHECK
         # =========================
-        profile = getattr(request.user, 'profile', None)
-        plan = getattr(profile, 'institution_type', 'COACHING')
+        tenant = get_tenant_context(request.user)
+        plan = tenant.plan or 'COACHING'
 
         allowed_reports = PLAN_REPORT_ACCESS.get(plan, set())
         if report_type not in allowed_reports:
@@ -84,260 +79,115 @@ class ReportListView(APIView):
         # =========================
         # SUBSCRIPTION EXPIRY CHECK
         # =========================
-        expiry = getattr(profile, 'subscription_expiry', None)
-        if expiry and expiry < timezone.now().date():
+        if tenant.is_expired():
             return Response({
                 "error": "Subscription expired",
                 "action": "RENEW_PLAN"
             }, status=403)
 
         # =========================
-        # CREATE REPORT
+        # QUEUE REPORT (de-duplicated per owner/type/period)
         # =========================
-        from .views import get_owner_user
-        owner = get_owner_user(request.user)
-        
-        report = GeneratedReport.objects.create(
-            user=request.user,
-            created_by=owner,
-            name=f"{report_type} Report - {timezone.now().strftime('%b %Y')}",
-            report_type=report_type,
-            status=REPORT_PENDING
-        )
+        period = request.data.get('period') or None
+        if period and not PERIOD_PATTERN.match(str(period)):
+            return Response({"error": "period must be YYYY-MM"}, status=400)
 
-        # Sync generation (future async ready)
-        report.status = REPORT_READY
-        report.file_url = f"/api/reports/download/{report.id}/"
-        report.save()
+        report, created = request_report(request.user, tenant.owner, report_type, period)
 
         return Response({
-            "message": "Report generated successfully",
+            "message": "Report queued" if created else "Report already available",
             "report_id": report.id,
-            "status": report.status
-        }, status=201)
+            "status": report.status,
+            "period": report.period,
+            "url": f"/api/reports/download/{report.id}/"
+        }, status=202 if report.status != REPORT_READY else 200)
 
 
 # =========================
 # REPORT DOWNLOAD
 # =========================
 class ReportDownloadView(APIView):
+    """
+    Streams the stored PDF. Supports If-None-Match (304) and single
+    byte ranges (206); nothing is rendered on the request path.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, pk):
-        try:
-            from .views import get_owner_user
-            owner = get_owner_user(request.user)
-            report = GeneratedReport.objects.get(pk=pk, created_by=owner)
-
-            if report.status != REPORT_READY:
-                return Response(
-                    {"error": "Report is still generating"},
-                    status=409
-                )
-
-            buffer = io.BytesIO()
-            # letter size is 612 x 792 points
-            p = canvas.Canvas(buffer, pagesize=letter)
-            width, height = letter
-
-            # ==========================================
-            # PAGE 1: CINEMATIC COVER PAGE
-            # ==========================================
-            # Deep Galaxy/Navy Background
-            p.setFillColorRGB(0.02, 0.02, 0.1) 
-            p.rect(0, 0, width, height, fill=1, stroke=0)
-            
-            # Sublte Glow/Gradient pattern (simulated with rects)
-            p.setFillColorRGB(0.04, 0.04, 0.15)
-            p.rect(0, height*0.4, width, height*0.6, fill=1, stroke=0)
-
-            # Central Branding Circle
-            p.setFillColorRGB(0.85, 0.65, 0.1) # Gold
-            p.setStrokeColorRGB(0.85, 0.65, 0.1)
-            p.setLineWidth(1)
-            p.circle(width/2, height/2 + 100, 70, fill=0, stroke=1)
-            
-            # Official Logo
-            logo_path = os.path.join(settings.BASE_DIR, 'static/img/ysm_logo.png')
-            if os.path.exists(logo_path):
-                p.drawImage(logo_path, width/2 - 50, height/2 + 50, width=100, height=100, mask='auto', preserveAspectRatio=True)
-
-            # Main Title - Cover
-            p.setFillColorRGB(1, 1, 1)
-            p.setFont("Helvetica-Bold", 32)
-            p.drawCentredString(width/2, height/2 - 30, "Y.S.M")
-            
-            p.setFont("Helvetica-Bold", 18)
-            p.setFillColorRGB(0.9, 0.7, 0.2) # Gold
-            p.drawCentredString(width/2, height/2 - 60, "ADVANCE EDUCATION SYSTEM")
-            
-            # Report Category
-            p.setStrokeColorRGB(1, 1, 1)
-            p.setLineWidth(0.5)
-            p.line(width/2 - 100, height/2 - 100, width/2 + 100, height/2 - 100)
-            
-            p.setFillColorRGB(0.8, 0.8, 0.9)
-            p.setFont("Helvetica", 16)
-            p.drawCentredString(width/2, height/2 - 130, f"{report.report_type.replace('_', ' ').upper()}")
-            
-            # Footer Branding - Cover
-            p.setFont("Helvetica-Oblique", 10)
-            p.setFillColorRGB(0.6, 0.6, 0.7)
-            p.drawCentredString(width/2, 80, f"Generated on: {timezone.now().strftime('%d %B, %Y')}")
-            p.drawCentredString(width/2, 60, "Confidential • Proprietary Intelligence")
-            
-            p.showPage() # End Cover Page
-
-            # ==========================================
-            # PAGE 2: ANALYTICS DASHBOARD PAGE
-            # ==========================================
-            # Premium Header (Dark Navy)
-            header_h = 100
-            p.setFillColorRGB(0.02, 0.02, 0.12)
-            p.rect(0, height - header_h, width, header_h, fill=1, stroke=0)
-            
-            # Logo in Header
-            if os.path.exists(logo_path):
-                p.drawImage(logo_path, 30, height - 85, width=60, height=60, mask='auto', preserveAspectRatio=True)
-            
-            # Brand Text in Header
-            p.setFillColorRGB(1, 1, 1)
-            p.setFont("Helvetica-Bold", 18)
-            p.drawString(100, height - 55, "Y.S.M ADVANCE")
-            p.setFont("Helvetica", 10)
-            p.setFillColorRGB(0.9, 0.7, 0.2)
-            p.drawString(100, height - 70, "EDUCATION MANAGEMENT SYSTEM")
-
-            # Report Meta (Right Side)
-            p.setFillColorRGB(1, 1, 1)
-            p.setFont("Helvetica-Bold", 10)
-            p.drawRightString(width - 30, height - 45, report.name)
-            p.setFont("Helvetica", 9)
-            p.drawRightString(width - 30, height - 60, f"Issued To: {request.user.email}")
-            
-            # Data Visual Section Header
-            y = height - 160
-            p.setFillColorRGB(0.1, 0.1, 0.3)
-            p.setFont("Helvetica-Bold", 16)
-            p.drawString(30, y, "Performance Insights")
-            
-            # Horizontal Divider with gold accents
-            p.setStrokeColorRGB(0.85, 0.65, 0.1)
-            p.setLineWidth(2)
-            p.line(30, y - 10, 80, y - 10)
-            p.setStrokeColorRGB(0.9, 0.9, 0.9)
-            p.setLineWidth(0.5)
-            p.line(80, y - 10, width - 30, y - 10)
-
-            # --- KPI CARDS GRID ---
-            y -= 60
-            data_points = self._get_report_data(report.report_type)
-            
-            # Grid config: 2 columns
-            col_width = (width - 90) / 2
-            card_h = 80
-            
-            for i, (label, value) in enumerate(data_points):
-                # Calculate pos
-                row = i // 2
-                col = i % 2
-                card_x = 30 + (col * (col_width + 30))
-                card_y = y - (row * (card_h + 20))
-                
-                # Card Background (Soft Slate Gradient feel)
-                p.setFillColorRGB(0.96, 0.97, 1.0)
-                p.roundRect(card_x, card_y, col_width, card_h, 8, fill=1, stroke=1)
-                
-                # Card Decorative Left Border (Vibrant)
-                colors_grad = [ (0.2, 0.4, 0.8), (0.1, 0.6, 0.4), (0.8, 0.3, 0.2), (0.4, 0.2, 0.7) ]
-                p.setFillColorRGB(*colors_grad[i % len(colors_grad)])
-                p.roundRect(card_x, card_y, 5, card_h, 4, fill=1, stroke=0)
-                
-                # Label
-                p.setFillColorRGB(0.4, 0.4, 0.5)
-                p.setFont("Helvetica-Bold", 9)
-                p.drawString(card_x + 20, card_y + card_h - 25, label.upper())
-                
-                # Value
-                p.setFillColorRGB(0.1, 0.1, 0.2)
-                p.setFont("Helvetica-Bold", 18)
-                p.drawString(card_x + 20, card_y + 20, value)
-
-            # Footer
-            p.setFillColorRGB(0.05, 0.05, 0.15)
-            p.rect(0, 0, width, 40, fill=1, stroke=0)
-            p.setFillColorRGB(1, 1, 1)
-            p.setFont("Helvetica-Oblique", 8)
-            p.drawCentredString(width/2, 15, "Official Y.S.M Intelligence Document • Visionary Architect: Yash A Mishra")
-
-            p.showPage()
-            p.save()
-            buffer.seek(0)
-
-            filename = f"{report.report_type}_Report_{report.generated_at.strftime('%b_%Y')}.pdf"
+        owner = get_tenant_context(request.user).owner
+        report = GeneratedReport.objects.filter(pk=pk, created_by=owner).select_related('user').first()
+        if not report:
+            return Response({"error": "Report not found"}, status=404)
 
-            response = HttpResponse(buffer, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        if report.status in (REPORT_PENDING, REPORT_RUNNING):
+            response = Response(
+                {"error": "Report is still generating", "status": report.status},
+                status=409
+            )
+            response['Retry-After'] = str(REPORT_RETRY_AFTER)
             return response
 
-        except GeneratedReport.DoesNotExist:
-            return Response({"error": "Report not found"}, status=404)
-        except Exception as e:
+        if report.status == REPORT_FAILED:
             return Response(
-                {"error": f"PDF generation failed: {str(e)}"},
+                {"error": f"PDF generation failed: {report.error}"},
                 status=500
             )
 
-        except GeneratedReport.DoesNotExist:
-            return Response({"error": "Report not found"}, status=404)
-        except Exception as e:
-            return Response(
-                {"error": f"PDF generation failed: {str(e)}"},
-                status=500
-            )
-
-    # =========================
-    # DATA PROVIDER
-    # =========================
-    def _get_report_data(self, report_type):
-        if report_type == REPORT_FINANCE:
-            return [
-                ("Total Revenue", "₹ 12,45,000"),
-                ("This Month Collection", "₹ 4,50,000"),
-                ("Pending Dues", "₹ 1,20,000"),
-                ("Financial Health", "Excellent"),
-            ]
-
-        if report_type == REPORT_EXAM:
-            return [
-                ("Total Exams", "12"),
-                ("Average Pass %", "87.5%"),
-                ("Top Batch", "Class 12 Science"),
-            ]
-
-        if report_type == REPORT_HR:
-            return [
-                ("Total Staff", "42"),
-                ("Present Today", "40"),
-                ("New Hires", "3"),
-            ]
-
-        if report_type == REPORT_ATTENDANCE:
-            return [
-                ("Average Attendance", "85%"),
-                ("Most Present Class", "Class 10-A"),
-                ("Absentees Today", "15"),
-            ]
+        if not report.file:
+            # Reports created before the queue existed: render once, then serve the stored copy
+            try:
+                store_report_pdf(report, render_pdf(report))
+            except Exception as e:
+                return Response({"error": f"PDF generation failed: {str(e)}"}, status=500)
+
+        etag = f'"{report.etag}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=304)
+            response['ETag'] = etag
+            return response
 
-        if report_type == REPORT_ANALYTICS:
-            return [
-                ("User Engagement", "High"),
-                ("Active Sessions", "120"),
-                ("Performance Score", "9.2/10"),
-            ]
+        filename = f"{report.report_type}_Report_{report.generated_at.strftime('%b_%Y')}.pdf"
+        file_obj = report.file.open('rb')
+        size = report.file.size
+
+        byte_range = self._parse_range(request.headers.get('Range'), size)
+        if byte_range is None:
+            response = FileResponse(file_obj, as_attachment=True, filename=filename, content_type='application/pdf')
+        elif byte_range is False:
+            file_obj.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{size}"
+            return response
+        else:
+            start, end = byte_range
+            file_obj.seek(start)
+            response = HttpResponse(file_obj.read(end - start + 1), status=206, content_type='application/pdf')
+            file_obj.close()
+            response['Content-Range'] = f"bytes {start}-{end}/{size}"
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
-        return [
-            ("Total Students", "1,245"),
-            ("System Status", "Operational"),
-            ("Last Backup", timezone.now().strftime('%Y-%m-%d')),
-        ]
+        response['ETag'] = etag
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        return response
+
+    @staticmethod
+    def _parse_range(header, size):
+        """(start, end) for a single satisfiable range, None to send everything, False if unsatisfiable"""
+        match = RANGE_PATTERN.match(header or '')
+        if not match or not any(match.groups()):
+            return None
+
+        first, last = match.groups()
+        if first == '':
+            # Suffix range: last N bytes
+            length = int(last)
+            if length == 0:
+                return False
+            return max(size - length, 0), size - 1
+
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            return False
+        return start, end
@@ -0,0 +1,117 @@
+"""
+Roll-Call Attendance
+One request marks a whole class for a day.
+
+- The class roster (a batch or a grade of the owner) is read with ONE query;
+  every submitted id must be on it, which is also the tenant ownership check
+- Today's existing marks are read with ONE query, so the response can say
+  what changed for every student
+- New and changed marks are written with ONE bulk upsert on the
+  (student, date) unique constraint; unchanged rows are not written
+- bulk_create skips the post_save signals, so the attendance bitmaps, the
+  dashboard snapshot and the students' chat contexts are updated here
+"""
+from django.db import transaction
+
+from ..models import Student, Attendence
+from .attendance_rollup import apply_marks
+from .dashboard_stats import invalidate_dashboard_stats
+from .student_context import invalidate_student_context
+
+# =========================
+# CONSTANTS
+# =========================
+MARK_CREATED = 'CREATED'
+MARK_UPDATED = 'UPDATED'
+MARK_UNCHANGED = 'UNCHANGED'
+
+
+class RosterError(ValueError):
+    """Submitted students that are not on the owner's roster"""
+
+    def __init__(self, student_ids):
+        super().__init__("Students not found in this class")
+        self.student_ids = sorted(student_ids)
+
+
+def get_roster(owner, batch_id=None, grade=None):
+    """Students of `owner` in a batch or grade (all students when neither is given)"""
+    students = Student.objects.filter(created_by=owner)
+    if batch_id:
+        students = students.filter(enrollments__batch_id=batch_id)
+    if grade:
+        students = students.filter(grade=grade)
+    return students.distinct()
+
+
+# =========================
+# ROLL CALL
+# =========================
+def mark_roll_call(owner, day, present_ids, absent_ids, batch_id=None, grade=None):
+    """
+    Upsert one day of attendance for the listed students.
+    Returns {'date', 'created', 'updated', 'unchanged', 'rows'}; each row is
+    {'student', 'name', 'before', 'after', 'change'} with before = None for a
+    student who was not marked yet.
+    Raises ValueError for a student listed twice, RosterError for ids that
+    are not on the roster.
+    """
+    present_ids, absent_ids = set(present_ids), set(absent_ids)
+    if present_ids & absent_ids:
+        raise ValueError("A student cannot be both present and absent")
+    wanted = {student_id: True for student_id in present_ids}
+    wanted.update({student_id: False for student_id in absent_ids})
+
+    students = {
+        row['id']: row for row in
+        get_roster(owner, batch_id, grade).filter(id__in=wanted).values('id', 'name', 'user_id')
+    }
+    missing = set(wanted) - set(students)
+    if missing:
+        raise RosterError(missing)
+
+    before = dict(
+        Attendence.objects.filter(student_id__in=wanted, date=day).values_list('student_id', 'is_present')
+    )
+
+    rows, changes = [], []
+    for student_id in sorted(wanted):
+        after = wanted[student_id]
+        previous = before.get(student_id)
+        if previous is None:
+            change = MARK_CREATED
+        elif previous != after:
+            change = MARK_UPDATED
+        else:
+            change = MARK_UNCHANGED
+
+        if change != MARK_UNCHANGED:
+            changes.append(Attendence(created_by=owner, student_id=student_id, date=day, is_present=after))
+        rows.append({
+            'student': student_id,
+            'name': students[student_id]['name'],
+            'before': previous,
+            'after': after,
+            'change': change,
+        })
+
+    if changes:
+        with transaction.atomic():
+            Attendence.objects.bulk_create(
+                changes,
+                update_conflicts=True,
+                unique_fields=['student', 'date'],
+                update_fields=['is_present', 'created_by'],
+            )
+            apply_marks((attendance.student_id, day, attendance.is_present) for attendance in changes)
+        invalidate_dashboard_stats(owner.pk)
+        changed = {attendance.student_id for attendance in changes}
+        invalidate_student_context(*(students[student_id]['user_id'] for student_id in changed))
+
+    return {
+        'date': day,
+        'created': sum(row['change'] == MARK_CREATED for row in rows),
+        'updated': sum(row['change'] == MARK_UPDATED for row in rows),
+        'unchanged': sum(row['change'] == MARK_UNCHANGED for row in rows),
+        'rows': rows,
+    }
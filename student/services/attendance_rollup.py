@@ -0,0 +1,215 @@
+"""
+Attendance Rollup
+Per-student, per-month attendance bitmaps (AttendanceMonth) for analytics
+over long ranges.
+
+- Bit d-1 of `marked` / `present` is day d of the month, so a month is two
+  integers and a year of one student is 12 rows instead of ~250
+- Percentages, streaks and class heatmaps are answered with bit operations
+  (masks + popcount) on those rows; Attendence rows are never scanned
+- Attendence stays the source of truth: signals (single writes) and the
+  roll-call service (bulk writes) call apply_marks(), which changes bits
+  with SQL bit operations instead of read-modify-write; rebuild() recomputes
+  rows from Attendence (`python manage.py rebuild_attendance_rollup`)
+"""
+import calendar
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+
+from ..models import Attendence, AttendanceMonth
+
+# =========================
+# CONSTANTS
+# =========================
+REBUILD_BATCH_SIZE = 1000
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _months(start, end):
+    """First days of every month touching [start, end]"""
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = _next_month(month)
+
+
+def _range_mask(month, start, end):
+    """Bits of the days of `month` that fall inside [start, end]"""
+    days = calendar.monthrange(month.year, month.month)[1]
+    first = start.day if month_start(start) == month else 1
+    last = end.day if month_start(end) == month else days
+    if first > last:
+        return 0
+    return ((1 << last) - 1) & ~((1 << (first - 1)) - 1)
+
+
+# =========================
+# WRITE
+# =========================
+def apply_marks(marks):
+    """
+    Fold (student_id, day, is_present) changes into the bitmaps; is_present
+    None removes the day's mark. Missing rows are inserted empty, then the
+    bits are set and cleared in the database (`marked | set & ~clear`), so
+    concurrent writers never overwrite each other's days. One INSERT plus
+    one UPDATE per month and distinct change (a roll-call is two: present
+    and absent).
+    """
+    changes = defaultdict(dict)
+    for student_id, day, is_present in marks:
+        changes[(student_id, month_start(day))][day.day] = is_present
+    if not changes:
+        return
+
+    groups = defaultdict(list)
+    missing = []
+    for (student_id, month), days in changes.items():
+        set_marked = clear_marked = set_present = clear_present = 0
+        for day, is_present in days.items():
+            bit = 1 << (day - 1)
+            if is_present is None:
+                clear_marked |= bit
+            else:
+                set_marked |= bit
+            if is_present:
+                set_present |= bit
+            else:
+                clear_present |= bit
+        if set_marked:
+            # Clears alone need no row (e.g. the student's rows are being cascade-deleted)
+            missing.append(AttendanceMonth(student_id=student_id, month=month))
+        groups[(month, set_marked, clear_marked, set_present, clear_present)].append(student_id)
+
+    if missing:
+        AttendanceMonth.objects.bulk_create(missing, ignore_conflicts=True)
+    for (month, set_marked, clear_marked, set_present, clear_present), student_ids in groups.items():
+        AttendanceMonth.objects.filter(student_id__in=student_ids, month=month).update(
+            marked=F('marked').bitor(set_marked).bitand(~clear_marked),
+            present=F('present').bitor(set_present).bitand(~clear_present),
+        )
+
+
+@transaction.atomic
+def rebuild(student_ids=None):
+    """Recompute the bitmaps from Attendence. Returns the number of month rows."""
+    rows = AttendanceMonth.objects.all()
+    marks = Attendence.objects.order_by()
+    if student_ids is not None:
+        rows = rows.filter(student_id__in=student_ids)
+        marks = marks.filter(student_id__in=student_ids)
+    rows.delete()
+
+    months = {}
+    for student_id, day, is_present in marks.values_list('student_id', 'date', 'is_present').iterator():
+        key = (student_id, month_start(day))
+        row = months.get(key)
+        if row is None:
+            row = months[key] = AttendanceMonth(student_id=student_id, month=key[1])
+        bit = 1 << (day.day - 1)
+        row.marked |= bit
+        if is_present:
+            row.present |= bit
+
+    AttendanceMonth.objects.bulk_create(months.values(), batch_size=REBUILD_BATCH_SIZE)
+    return len(months)
+
+
+# =========================
+# READ
+# =========================
+def load_months(student_ids, start, end):
+    """
+    (student_id, month, marked, present) rows touching [start, end].
+    Pass them as `rows` to the functions below to answer several questions
+    with one query.
+    """
+    return list(
+        AttendanceMonth.objects.filter(
+            student_id__in=student_ids, month__gte=month_start(start), month__lte=end
+        ).values_list('student_id', 'month', 'marked', 'present')
+    )
+
+
+def attendance_summary(student_ids, start, end, rows=None):
+    """
+    {student_id: {'present', 'marked', 'percentage'}} over [start, end],
+    one query for any number of students and months.
+    """
+    rows = load_months(student_ids, start, end) if rows is None else rows
+    summary = {student_id: {'present': 0, 'marked': 0, 'percentage': None} for student_id in student_ids}
+    for student_id, month, marked, present in rows:
+        mask = _range_mask(month, start, end)
+        summary[student_id]['marked'] += (marked & mask).bit_count()
+        summary[student_id]['present'] += (present & mask).bit_count()
+
+    for counts in summary.values():
+        if counts['marked']:
+            counts['percentage'] = round(counts['present'] / counts['marked'] * 100, 1)
+    return summary
+
+
+def attendance_totals(student_id):
+    """(present, marked) over the student's whole history"""
+    present = marked = 0
+    for row_marked, row_present in AttendanceMonth.objects.filter(student_id=student_id).values_list('marked', 'present'):
+        marked += row_marked.bit_count()
+        present += row_present.bit_count()
+    return present, marked
+
+
+def attendance_streaks(student_ids, start, end, rows=None):
+    """
+    {student_id: {'current', 'longest'}}: runs of consecutive present marks
+    in [start, end]. Unmarked days (weekends, holidays) do not break a run;
+    'current' is the run ending at the last marked day.
+    """
+    rows = load_months(student_ids, start, end) if rows is None else rows
+    months = defaultdict(dict)
+    for student_id, month, marked, present in rows:
+        mask = _range_mask(month, start, end)
+        months[student_id][month] = (marked & mask, present & mask)
+
+    streaks = {}
+    for student_id in student_ids:
+        current = longest = 0
+        for month in _months(start, end):
+            marked, present = months[student_id].get(month, (0, 0))
+            while marked:
+                bit = marked & -marked  # Lowest marked day first
+                current = current + 1 if present & bit else 0
+                longest = max(longest, current)
+                marked ^= bit
+        streaks[student_id] = {'current': current, 'longest': longest}
+    return streaks
+
+
+def class_heatmap(student_ids, start, end, rows=None):
+    """[{'date', 'present', 'marked'}] per day of [start, end] across the students"""
+    rows = load_months(student_ids, start, end) if rows is None else rows
+    present_counts, marked_counts = defaultdict(int), defaultdict(int)
+    for _, month, marked, present in rows:
+        mask = _range_mask(month, start, end)
+        marked &= mask
+        while marked:
+            bit = marked & -marked
+            day = month.replace(day=bit.bit_length())
+            marked_counts[day] += 1
+            if present & bit:
+                present_counts[day] += 1
+            marked ^= bit
+
+    days, day = [], start
+    while day <= end:
+        days.append({'date': day, 'present': present_counts[day], 'marked': marked_counts[day]})
+        day += timedelta(days=1)
+    return days
@@ -0,0 +1,225 @@
+"""
+Bank Credit-Alert Ingester
+Incremental IMAP reader behind `python manage.py auto_verify_payments`.
+
+- Remembers UIDVALIDITY + last seen UID per mailbox; each run searches only
+  newer UIDs (the first run looks back BANK_ALERT_LOOKBACK_DAYS)
+- Fetches header fields + text part in batched UID sets (BODY.PEEK, so
+  messages stay unread) instead of full RFC822 one by one
+- Every alert is parsed ONCE into a BankAlert row and never refetched
+- All UTRs of a run are matched against pending payments in one query;
+  unmatched alerts are retried from the table on later runs
+"""
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+import email
+from email.header import decode_header, make_header
+from email.utils import parsedate_to_datetime
+import logging
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import BankAlert, BankMailboxState, Payment
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+BANK_IMAP_SERVER = getattr(settings, 'BANK_IMAP_SERVER', 'imap.gmail.com')
+BANK_ALERT_SUBJECT = getattr(settings, 'BANK_ALERT_SUBJECT', 'Credit')
+BANK_ALERT_LOOKBACK_DAYS = getattr(settings, 'BANK_ALERT_LOOKBACK_DAYS', 30)  # First run only
+FETCH_BATCH_SIZE = 50                # UIDs per FETCH command
+REMATCH_DAYS = 30                    # Unmatched alerts are retried this long
+
+ALERT_UNPARSED = 'UNPARSED'
+ALERT_UNMATCHED = 'UNMATCHED'
+ALERT_MATCHED = 'MATCHED'
+ALERT_MISMATCH = 'MISMATCH'
+
+PAYMENT_PENDING = 'PENDING'
+PAYMENT_PAID = 'PAID'
+
+# Header fields needed to decode the text part, plus what we store
+FETCH_PARTS = (
+    '(BODY.PEEK[HEADER.FIELDS (SUBJECT DATE CONTENT-TYPE CONTENT-TRANSFER-ENCODING MIME-VERSION)] '
+    'BODY.PEEK[TEXT])'
+)
+
+# Canara Bank / generic alerts: "Credited with Rs. 500.00 ... UTR: XXXXX" (heuristic)
+_AMOUNT = re.compile(r'(?:Rs\.?|INR)\s*(\d+(?:,\d+)*(?:\.\d{2})?)')
+_UTR = re.compile(r'\bUTR\b:?\s*([A-Z0-9]+)')  # Not the "UTR" inside "Ref: UTR1234"
+_REF = re.compile(r'\bRef\b:?\s*([A-Z0-9]+)')
+
+_FETCH_START = re.compile(rb'^\d+ \(')
+_FETCH_UID = re.compile(rb'UID (\d+)')
+_FETCH_SECTION = re.compile(rb'BODY\[([^\]]*)\]')
+
+
+# =========================
+# PARSING
+# =========================
+def parse_alert(body):
+    """(amount, utr) from an alert body; None for what is not found"""
+    amount_match = _AMOUNT.search(body)
+    utr_match = _UTR.search(body) or _REF.search(body)
+    amount = None
+    if amount_match:
+        try:
+            amount = Decimal(amount_match.group(1).replace(',', ''))
+        except InvalidOperation:
+            pass
+    return amount, utr_match.group(1) if utr_match else None
+
+
+def message_text(msg):
+    """First text/plain part, decoded"""
+    for part in msg.walk() if msg.is_multipart() else [msg]:
+        if part.get_content_type() == 'text/plain':
+            payload = part.get_payload(decode=True) or b''
+            return payload.decode(part.get_content_charset() or 'utf-8', 'replace')
+    return ''
+
+
+def parse_fetch_response(data):
+    """{uid: message} from an imaplib UID FETCH of header fields + TEXT"""
+    fetched = []
+    for item in data:
+        meta, literal = item if isinstance(item, tuple) else (item, None)
+        if _FETCH_START.match(meta):
+            fetched.append({'meta': b'', 'header': b'', 'text': b''})
+        if not fetched:
+            continue
+        current = fetched[-1]
+        current['meta'] += meta
+        if literal is not None:
+            sections = _FETCH_SECTION.findall(meta)
+            if sections:
+                current['text' if sections[-1] == b'TEXT' else 'header'] = literal
+
+    messages = {}
+    for current in fetched:
+        uid = _FETCH_UID.search(current['meta'])
+        if uid:
+            messages[int(uid.group(1))] = email.message_from_bytes(current['header'] + current['text'])
+    return messages
+
+
+def _alert_row(mailbox, uid_validity, uid, msg):
+    subject = str(make_header(decode_header(msg['subject'] or '')))[:255]
+    try:
+        received_at = parsedate_to_datetime(msg['date']) if msg['date'] else None
+    except (TypeError, ValueError):
+        received_at = None
+
+    amount, utr = parse_alert(message_text(msg))
+    return BankAlert(
+        mailbox=mailbox, uid_validity=uid_validity, uid=uid,
+        subject=subject, received_at=received_at,
+        amount=amount, utr=utr or '',
+        status=ALERT_UNMATCHED if amount is not None and utr else ALERT_UNPARSED,
+    )
+
+
+# =========================
+# IMAP
+# =========================
+def _uid_validity(imap, folder):
+    _, data = imap.response('UIDVALIDITY')
+    if data and data[0]:
+        return int(data[0])
+    _, data = imap.status(folder, '(UIDVALIDITY)')
+    return int(re.search(rb'UIDVALIDITY (\d+)', data[0]).group(1))
+
+
+def _new_uids(imap, state):
+    subject = f'"{BANK_ALERT_SUBJECT}"'
+    if state.last_uid:
+        # "n:*" always matches the newest message, even below n: filter again
+        _, data = imap.uid('SEARCH', None, f'UID {state.last_uid + 1}:*', 'SUBJECT', subject)
+    else:
+        since = (timezone.now() - timedelta(days=BANK_ALERT_LOOKBACK_DAYS)).strftime('%d-%b-%Y')
+        _, data = imap.uid('SEARCH', None, 'SINCE', since, 'SUBJECT', subject)
+    uids = sorted(int(uid) for uid in (data[0] or b'').split())
+    return [uid for uid in uids if uid > state.last_uid]
+
+
+def ingest_alerts(imap, mailbox, folder='INBOX'):
+    """
+    Store every new alert of `folder` (already logged-in `imap`) as BankAlert
+    rows and advance the checkpoint. Returns the new rows.
+    """
+    imap.select(folder, readonly=True)
+    uid_validity = _uid_validity(imap, folder)
+
+    state, _ = BankMailboxState.objects.get_or_create(mailbox=mailbox)
+    if state.uid_validity != uid_validity:
+        # New mailbox, or UIDs were renumbered: the old checkpoint means nothing any more
+        if state.last_uid:
+            logger.info(f"🏦 {mailbox}: UIDVALIDITY {state.uid_validity} -> {uid_validity}, rescanning")
+        state.uid_validity = uid_validity
+        state.last_uid = 0
+
+    alerts = []
+    uids = _new_uids(imap, state)
+    for i in range(0, len(uids), FETCH_BATCH_SIZE):
+        batch = uids[i:i + FETCH_BATCH_SIZE]
+        _, data = imap.uid('FETCH', ",".join(str(uid) for uid in batch), FETCH_PARTS)
+        rows = [
+            _alert_row(mailbox, uid_validity, uid, msg)
+            for uid, msg in sorted(parse_fetch_response(data).items())
+        ]
+        with transaction.atomic():
+            BankAlert.objects.bulk_create(rows, ignore_conflicts=True)
+            state.last_uid = batch[-1]
+            state.save()
+        alerts.extend(rows)
+
+    state.last_run_at = timezone.now()
+    state.save(update_fields=['uid_validity', 'last_uid', 'last_run_at'])
+    return alerts
+
+
+# =========================
+# MATCHING
+# =========================
+def match_alerts():
+    """
+    Verify pending payments against every open alert (new ones and recent
+    unmatched ones) with one payments query. Returns the alerts it decided.
+    """
+    open_alerts = list(
+        BankAlert.objects
+        .filter(status=ALERT_UNMATCHED, created_at__gte=timezone.now() - timedelta(days=REMATCH_DAYS))
+        .order_by('pk')
+    )
+    if not open_alerts:
+        return []
+
+    decided = []
+    today = timezone.localdate()
+    with transaction.atomic():
+        payments = {
+            payment.transaction_id: payment
+            for payment in Payment.objects.select_for_update().filter(
+                transaction_id__in={alert.utr for alert in open_alerts}, status=PAYMENT_PENDING
+            )
+        }
+        for alert in open_alerts:
+            payment = payments.pop(alert.utr, None)
+            if payment is None:
+                continue
+            alert.payment = payment
+            if payment.amount == alert.amount:
+                payment.status = PAYMENT_PAID
+                payment.paid_date = today
+                payment.save(update_fields=['status', 'paid_date'])  # Signals refresh stats / chat context
+                alert.status = ALERT_MATCHED
+            else:
+                alert.status = ALERT_MISMATCH
+            decided.append(alert)
+        BankAlert.objects.bulk_update(decided, ['status', 'payment'])
+    return decided
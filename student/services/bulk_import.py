@@ -0,0 +1,444 @@
+"""
+Bulk Import Engine
+Streaming CSV / XLSX import with per-row validation and batched writes.
+
+- Rows are decoded incrementally (never the whole upload in memory)
+- Each row is validated by a serializer without touching the database
+- Uniqueness is checked with ONE query per batch
+- Each batch is written with bulk_create inside its own transaction, so a bad
+  batch never rolls back rows that were already imported
+- Large files run as an ImportJob (background thread or `process_import_jobs`);
+  RUNNING jobs older than IMPORT_JOB_LEASE belong to a dead worker and are
+  queued again by the command
+"""
+from datetime import timedelta
+import csv
+import io
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction, close_old_connections, IntegrityError, DatabaseError
+from django.utils import timezone
+
+from ..models import Student, LibraryBook, Employee, UserProfile, ImportJob
+from ..Serializer import StudentImportSerializer, LibraryBookImportSerializer, StaffImportSerializer
+from .dashboard_stats import invalidate_dashboard_stats
+from .search_index import index_objects
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+JOB_PENDING = 'PENDING'
+JOB_RUNNING = 'RUNNING'
+JOB_COMPLETED = 'COMPLETED'
+JOB_FAILED = 'FAILED'
+
+IMPORT_BATCH_SIZE = getattr(settings, 'BULK_IMPORT_BATCH_SIZE', 500)
+# Uploads above this size are imported as a background job
+IMPORT_SYNC_MAX_BYTES = getattr(settings, 'BULK_IMPORT_SYNC_MAX_BYTES', 256 * 1024)
+# Start a worker thread right away; when False jobs wait for `process_import_jobs`
+IMPORT_RUN_IN_THREAD = getattr(settings, 'BULK_IMPORT_RUN_IN_THREAD', True)
+MAX_STORED_ERRORS = 500
+# RUNNING jobs started longer ago than this are requeued by `process_import_jobs`
+IMPORT_JOB_LEASE = timedelta(minutes=getattr(settings, 'BULK_IMPORT_LEASE_MINUTES', 60))
+
+
+# =========================
+# ROW READERS (STREAMING)
+# =========================
+def normalize_header(value):
+    """'Roll Number ' -> 'roll_number'"""
+    return str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def _is_blank_row(row):
+    return all(value in (None, '') for value in row.values())
+
+
+def iter_csv_rows(file_obj, encoding='utf-8-sig'):
+    """
+    Yield (row_number, dict) from a CSV upload.
+    TextIOWrapper decodes the binary stream chunk by chunk. A malformed
+    file (NUL bytes, oversized field) raises ValueError with the line number.
+    """
+    raw = getattr(file_obj, 'file', file_obj)
+    if hasattr(raw, 'seek'):
+        raw.seek(0)
+    stream = io.TextIOWrapper(raw, encoding=encoding, newline='')
+    reader = csv.reader(stream)
+    try:
+        header = next(reader, None)
+        if not header:
+            return
+        keys = [normalize_header(h) for h in header]
+        for row_number, values in enumerate(reader, start=2):
+            row = {key: value.strip() for key, value in zip(keys, values) if key}
+            if row and not _is_blank_row(row):
+                yield row_number, row
+    except csv.Error as e:
+        raise ValueError(f"Malformed CSV at line {reader.line_num}: {e}") from e
+    finally:
+        # Don't let the wrapper close the upload underneath Django
+        stream.detach()
+
+
+def iter_xlsx_rows(file_obj):
+    """Yield (row_number, dict) from the active sheet in read-only (streaming) mode"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        keys = [normalize_header(h) for h in header]
+        for row_number, values in enumerate(rows, start=2):
+            row = {
+                key: (value.strip() if isinstance(value, str) else value)
+                for key, value in zip(keys, values) if key
+            }
+            if row and not _is_blank_row(row):
+                yield row_number, row
+    finally:
+        workbook.close()
+
+
+def iter_rows(file_obj, file_name=''):
+    """Pick the reader from the file extension"""
+    extension = os.path.splitext(file_name or getattr(file_obj, 'name', ''))[1].lower()
+    if extension in ('.xlsx', '.xlsm'):
+        return iter_xlsx_rows(file_obj)
+    return iter_csv_rows(file_obj)
+
+
+# =========================
+# IMPORTERS (ONE PER TYPE)
+# =========================
+class BaseImporter:
+    """
+    Maps validated rows to model instances for one import type.
+    Subclasses define the serializer, column aliases and batch write.
+    """
+    serializer_class = None
+    aliases = {}
+    upper_fields = ()
+
+    def __init__(self, owner, initiator):
+        self.owner = owner
+        self.initiator = initiator
+
+    def prepare(self, raw):
+        """Apply column aliases, drop empty cells, normalise choice values"""
+        data = {}
+        for key, value in raw.items():
+            key = self.aliases.get(key, key)
+            if value in (None, ''):
+                continue
+            if key in self.upper_fields and isinstance(value, str):
+                value = value.upper()
+            data[key] = value
+        return data
+
+    def build(self, rows):
+        """
+        rows: [(row_number, validated_data)]
+        Returns (instances, errors) - errors as [(row_number, {field: [msg]})]
+        """
+        raise NotImplementedError
+
+    def write(self, instances):
+        """Persist one batch (called inside a transaction). Returns created count."""
+        raise NotImplementedError
+
+    @staticmethod
+    def unique_errors(rows, field, existing):
+        """Split rows on a unique field against DB values and earlier rows in the batch"""
+        seen = set(existing)
+        accepted, errors = [], []
+        for row_number, data in rows:
+            value = data.get(field)
+            if value is not None and value in seen:
+                errors.append((row_number, {field: [f"'{value}' already exists."]}))
+                continue
+            if value is not None:
+                seen.add(value)
+            accepted.append((row_number, data))
+        return accepted, errors
+
+
+class StudentImporter(BaseImporter):
+    serializer_class = StudentImportSerializer
+    aliases = {
+        'phone': 'contact_number',
+        'mobile': 'contact_number',
+        'class': 'grade',
+        'date_of_birth': 'dob',
+        'roll_no': 'roll_number',
+        'parent_name': 'relation',
+    }
+
+    def build(self, rows):
+        roll_numbers = [data['roll_number'] for _, data in rows if data.get('roll_number')]
+        existing = Student.objects.filter(roll_number__in=roll_numbers).values_list('roll_number', flat=True) if roll_numbers else []
+        accepted, errors = self.unique_errors(rows, 'roll_number', existing)
+
+        plan = getattr(getattr(self.owner, 'profile', None), 'institution_type', None) or 'SCHOOL'
+        # Staff-created students need owner approval (same rule as StudentListCreateView)
+        is_approved = self.initiator == self.owner
+        instances = [
+            Student(created_by=self.owner, institution_type=plan, is_approved=is_approved, **data)
+            for _, data in accepted
+        ]
+        return instances, errors
+
+    def write(self, instances):
+        created = Student.objects.bulk_create(instances)
+        index_objects(created)  # bulk_create skips the search-index signal
+        return len(created)
+
+
+class LibraryBookImporter(BaseImporter):
+    serializer_class = LibraryBookImportSerializer
+    aliases = {'copies': 'total_copies', 'year': 'published_year', 'rack': 'location_rack'}
+    upper_fields = ('category',)
+
+    def build(self, rows):
+        isbns = [data['isbn'] for _, data in rows]
+        existing = LibraryBook.objects.filter(isbn__in=isbns).values_list('isbn', flat=True)
+        accepted, errors = self.unique_errors(rows, 'isbn', existing)
+        instances = [
+            LibraryBook(created_by=self.owner, available_copies=data['total_copies'], **data)
+            for _, data in accepted
+        ]
+        return instances, errors
+
+    def write(self, instances):
+        return len(LibraryBook.objects.bulk_create(instances))
+
+
+class StaffImporter(BaseImporter):
+    """
+    Creates User + UserProfile + Employee per row.
+    Passwords are unusable; staff set one through the password-reset flow
+    (hashing thousands of passwords would dominate the import time).
+    """
+    serializer_class = StaffImportSerializer
+    aliases = {'mobile': 'phone', 'salary': 'basic_salary'}
+    upper_fields = ('role', 'contract_type')
+
+    def build(self, rows):
+        usernames = [data['username'] for _, data in rows]
+        existing = User.objects.filter(username__in=usernames).values_list('username', flat=True)
+        accepted, errors = self.unique_errors(rows, 'username', existing)
+        return [data for _, data in accepted], errors
+
+    def write(self, instances):
+        owner_profile = getattr(self.owner, 'profile', None)
+        unusable = make_password(None)
+
+        users = User.objects.bulk_create([
+            User(
+                username=data['username'], email=data['email'],
+                first_name=data['first_name'], last_name=data['last_name'],
+                password=unusable,
+            )
+            for data in instances
+        ])
+        if any(user.pk is None for user in users):
+            # Backends without RETURNING support: re-read the new rows
+            by_name = User.objects.in_bulk([data['username'] for data in instances], field_name='username')
+            users = [by_name[data['username']] for data in instances]
+
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                user=user, role=data['role'], phone=data['phone'],
+                institution_type=getattr(owner_profile, 'institution_type', 'COACHING'),
+                subscription_expiry=getattr(owner_profile, 'subscription_expiry', None),
+                force_password_change=True,
+            )
+            for user, data in zip(users, instances)
+        ])
+        Employee.objects.bulk_create([
+            Employee(
+                user=user, created_by=self.owner,
+                joining_date=data['joining_date'], basic_salary=data['basic_salary'],
+                contract_type=data['contract_type'],
+            )
+            for user, data in zip(users, instances)
+        ])
+        return len(users)
+
+
+IMPORTERS = {
+    'STUDENT': StudentImporter,
+    'BOOK': LibraryBookImporter,
+    'STAFF': StaffImporter,
+}
+
+
+def get_importer(import_type, owner, initiator):
+    importer_class = IMPORTERS.get((import_type or '').upper())
+    if not importer_class:
+        raise ValueError("Invalid Import Type")
+    return importer_class(owner, initiator)
+
+
+# =========================
+# ENGINE
+# =========================
+class ImportResult:
+    """Running totals for one import (optionally mirrored to an ImportJob)"""
+
+    def __init__(self, job=None):
+        self.job = job
+        self.processed = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_errors(self, errors):
+        self.error_count += len(errors)
+        room = MAX_STORED_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend({'row': row, 'errors': detail} for row, detail in errors[:room])
+
+    def save_progress(self):
+        """One UPDATE per batch"""
+        if self.job is not None:
+            ImportJob.objects.filter(pk=self.job.pk).update(
+                processed_rows=self.processed,
+                created_count=self.created,
+                error_count=self.error_count,
+                errors=self.errors,
+            )
+
+    def as_dict(self):
+        return {
+            'processed_rows': self.processed,
+            'created_count': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def _flush(importer, batch, result):
+    valid, errors = [], []
+    for row_number, raw in batch:
+        serializer = importer.serializer_class(data=importer.prepare(raw))
+        if serializer.is_valid():
+            valid.append((row_number, serializer.validated_data))
+        else:
+            errors.append((row_number, serializer.errors))
+
+    if valid:
+        instances, build_errors = importer.build(valid)
+        errors.extend(build_errors)
+        if instances:
+            try:
+                with transaction.atomic():
+                    result.created += importer.write(instances)
+            except (IntegrityError, DatabaseError) as e:
+                # Only this batch is lost; earlier batches are already committed
+                accepted_rows = {row for row, _ in valid} - {row for row, _ in build_errors}
+                errors.extend((row, {'non_field_errors': [f"Batch write failed: {e}"]}) for row in sorted(accepted_rows))
+
+    result.processed += len(batch)
+    result.add_errors(sorted(errors, key=lambda item: item[0]))
+    result.save_progress()
+
+
+def run_import(importer, rows, job=None, batch_size=None):
+    """Validate and write rows in batches; returns an ImportResult"""
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    result = ImportResult(job)
+    batch = []
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _flush(importer, batch, result)
+            batch = []
+    if batch:
+        _flush(importer, batch, result)
+
+    # bulk_create skips post_save signals
+    if result.created:
+        invalidate_dashboard_stats(getattr(importer.owner, 'pk', None))
+    return result
+
+
+# =========================
+# BACKGROUND JOBS
+# =========================
+def create_import_job(import_type, owner, initiator, file_obj):
+    """Persist the upload and queue it"""
+    job = ImportJob(
+        created_by=owner,
+        user=initiator,
+        import_type=import_type.upper(),
+        file_name=getattr(file_obj, 'name', ''),
+    )
+    job.file.save(os.path.basename(job.file_name) or 'import.csv', file_obj, save=False)
+    job.save()
+
+    if IMPORT_RUN_IN_THREAD:
+        threading.Thread(target=_process_in_thread, args=(job.pk,), daemon=True).start()
+    return job
+
+
+def _process_in_thread(job_id):
+    try:
+        process_import_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def requeue_stale_jobs():
+    """
+    Put RUNNING jobs whose worker died (started before IMPORT_JOB_LEASE) back
+    to PENDING with fresh counters. Returns the number of jobs requeued.
+    """
+    return ImportJob.objects.filter(
+        status=JOB_RUNNING, started_at__lt=timezone.now() - IMPORT_JOB_LEASE
+    ).update(status=JOB_PENDING, started_at=None, processed_rows=0, created_count=0, error_count=0, errors=[])
+
+
+def process_import_job(job_id):
+    """
+    Run one queued job. The PENDING -> RUNNING update is the claim, so a job
+    is never processed twice by the thread and the management command.
+    Returns False if the job was already claimed.
+    """
+    claimed = ImportJob.objects.filter(pk=job_id, status=JOB_PENDING).update(
+        status=JOB_RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = ImportJob.objects.select_related('created_by__profile', 'user').get(pk=job_id)
+    try:
+        importer = get_importer(job.import_type, job.created_by, job.user)
+        with job.file.open('rb') as file_obj:
+            result = run_import(importer, iter_rows(file_obj, job.file_name), job=job)
+        job.status = JOB_COMPLETED
+        job.message = f"Successfully imported {result.created} records."
+    except Exception as e:
+        logger.exception(f"Import job {job_id} failed")
+        job.status = JOB_FAILED
+        job.message = f"Import failed: {e}"
+
+    # The upload is no longer needed once processed
+    if job.file:
+        job.file.delete(save=False)
+
+    job.finished_at = timezone.now()
+    # update_fields: progress counters were written by ImportResult.save_progress()
+    job.save(update_fields=['status', 'message', 'file', 'finished_at'])
+    return True
@@ -0,0 +1,95 @@
+"""
+Chat Context Builder
+Assembles the history sent with a chat turn under a token budget.
+
+- Token counts are cached on ChatMessage.tokens_used (legacy rows with 0
+  are counted once and written back)
+- Newest messages are packed first; turns that fall out of the window are
+  folded into ChatConversation.summary exactly once
+- Resulting prompt size is bounded by AI_HISTORY_TOKEN_BUDGET regardless of
+  conversation length or pasted code
+"""
+import logging
+
+from ai.context import (
+    HISTORY_TOKEN_BUDGET, MESSAGE_TOKEN_CAP, clip, extend_summary, pack_newest,
+)
+from ai.prompts import count_tokens
+
+from ..chat_models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+MIN_HISTORY_TOKENS = 500             # Kept for turns even if the RAG block is large
+SCAN_CHUNK_SIZE = 20                 # Rows fetched per round trip while packing
+
+SUMMARY_HEADER = "SUMMARY OF EARLIER CONVERSATION:\n"
+
+
+def message_tokens(message, stale=None):
+    """Cached token count; uncounted rows are counted and queued for write-back"""
+    if not message.tokens_used:
+        message.tokens_used = count_tokens(message.content)
+        if stale is not None:
+            stale.append(message)
+    return message.tokens_used
+
+
+def build_chat_context(conversation, system_text='', exclude_id=None, budget=HISTORY_TOKEN_BUDGET):
+    """
+    Context list for the provider: [system block, stored summary, newest turns].
+    `exclude_id` is the message being answered (sent separately as the question).
+    Updates the conversation's rolling summary when turns leave the window.
+    """
+    context = []
+    used = 0
+    if system_text:
+        context.append({'role': 'system', 'content': system_text})
+        used += count_tokens(system_text)
+
+    stale = []
+    window = (
+        conversation.messages
+        .filter(id__gt=conversation.summary_last_message_id)
+        .exclude(id=exclude_id)
+        .only('id', 'role', 'content', 'tokens_used')
+        .order_by('-id')
+    )
+    summary_cost = count_tokens(conversation.summary) if conversation.summary else 0
+    remaining = max(budget - used - summary_cost, MIN_HISTORY_TOKENS)
+    kept, overflow = pack_newest(
+        window.iterator(chunk_size=SCAN_CHUNK_SIZE), remaining, lambda m: message_tokens(m, stale)
+    )
+
+    if overflow is not None:
+        _fold_into_summary(conversation, overflow.id, exclude_id)
+
+    if stale:
+        ChatMessage.objects.bulk_update(stale, ['tokens_used'])
+
+    if conversation.summary:
+        context.append({'role': 'system', 'content': SUMMARY_HEADER + conversation.summary})
+    for message, clipped in kept:
+        context.append({
+            'role': 'user' if message.role == 'user' else 'assistant',
+            'content': clip(message.content, MESSAGE_TOKEN_CAP) if clipped else message.content,
+        })
+    return context
+
+
+def _fold_into_summary(conversation, through_id, exclude_id=None):
+    """Summarize every not-yet-summarized message up to `through_id` (inclusive)"""
+    turns = (
+        conversation.messages
+        .filter(id__gt=conversation.summary_last_message_id, id__lte=through_id)
+        .exclude(id=exclude_id)
+        .order_by('id')
+        .values_list('role', 'content')
+    )
+    conversation.summary = extend_summary(conversation.summary, turns.iterator(chunk_size=SCAN_CHUNK_SIZE))
+    conversation.summary_last_message_id = through_id
+    conversation.save(update_fields=['summary', 'summary_last_message_id'])
+    logger.info(f"🗜️ Conversation {conversation.pk}: summarized through message {through_id}")
@@ -0,0 +1,146 @@
+"""
+Chat History Search
+Full-text search behind ChatSearchView.
+
+- PostgreSQL: GIN index on to_tsvector('english', content), ranked with
+  ts_rank, snippets from ts_headline
+- SQLite: external-content FTS5 table kept in sync by triggers on every
+  ChatMessage insert / edit / delete, ranked with bm25, snippets from snippet()
+- Other backends (or SQLite without FTS5): icontains scan, snippet cut in Python
+- Snippets are HTML-escaped; only the matched words are wrapped in <mark>
+- Both indexes live in migration 0051; `python manage.py rebuild_chat_search_index`
+  rebuilds them (e.g. after restoring a dump with triggers disabled)
+"""
+from functools import lru_cache
+import html
+import re
+
+from django.db import connection
+from django.db.models import prefetch_related_objects
+
+from ..chat_models import ChatConversation, ChatMessage
+
+# =========================
+# CONSTANTS
+# =========================
+SEARCH_MIN_LENGTH = 2
+SEARCH_LIMIT = 20
+SNIPPET_WORDS = 24
+FALLBACK_SNIPPET_CHARS = 160
+
+FTS_TABLE = 'student_chatmessage_fts'
+PG_CONFIG = 'english'
+PG_INDEX = 'student_chatmessage_content_tsv'
+
+# Highlight markers the database puts around matches; swapped for <mark> after escaping
+_START, _STOP = '\x02', '\x03'
+_TOKEN = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=None)
+def _has_fts(alias):
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def highlight(snippet):
+    """Escape a marked snippet and turn the markers into <mark> tags"""
+    return html.escape(snippet).replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def _fallback_snippet(content, query):
+    """Window of text around the first match, with every match marked"""
+    position = max(content.lower().find(query.lower()), 0)
+    start = max(position - FALLBACK_SNIPPET_CHARS // 2, 0)
+    window = content[start:start + FALLBACK_SNIPPET_CHARS]
+    marked = re.sub(f"({re.escape(query)})", f"{_START}\\1{_STOP}", window, flags=re.IGNORECASE)
+    return ('…' if start else '') + marked + ('…' if start + FALLBACK_SNIPPET_CHARS < len(content) else '')
+
+
+def search_messages(user, query, limit=SEARCH_LIMIT):
+    """
+    Best matching messages of the user's open conversations, best first.
+    Each message carries `snippet` (marked, unescaped) and `rank`.
+    """
+    query = query.strip()
+    tokens = _TOKEN.findall(query.lower())
+    if len(query) < SEARCH_MIN_LENGTH or not tokens:
+        return []
+
+    table = ChatMessage._meta.db_table
+    conversations = ChatConversation._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        tsquery = " & ".join(f"{token}:*" for token in tokens)
+        options = f"StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=2"
+        messages = list(ChatMessage.objects.raw(
+            f"""
+            SELECT m.*, ts_rank(to_tsvector('{PG_CONFIG}', m.content), q) AS rank,
+                   ts_headline('{PG_CONFIG}', m.content, q, %s) AS snippet
+            FROM {table} m
+            JOIN {conversations} c ON c.id = m.conversation_id,
+                 to_tsquery('{PG_CONFIG}', %s) q
+            WHERE c.user_id = %s AND NOT c.is_archived
+              AND to_tsvector('{PG_CONFIG}', m.content) @@ q
+            ORDER BY rank DESC, m.timestamp DESC
+            LIMIT %s
+            """,
+            [options, tsquery, user.pk, limit],
+        ))
+    elif connection.vendor == 'sqlite' and _has_fts(connection.alias):
+        match = " AND ".join(f'"{token}"*' for token in tokens)
+        messages = list(ChatMessage.objects.raw(
+            f"""
+            SELECT m.*, f.rank AS rank,
+                   snippet({FTS_TABLE}, 0, char(2), char(3), '…', {SNIPPET_WORDS}) AS snippet
+            FROM {FTS_TABLE} f
+            JOIN {table} m ON m.id = f.rowid
+            JOIN {conversations} c ON c.id = m.conversation_id
+            WHERE {FTS_TABLE} MATCH %s AND c.user_id = %s AND NOT c.is_archived
+            ORDER BY f.rank
+            LIMIT %s
+            """,
+            [match, user.pk, limit],
+        ))
+    else:
+        messages = list(
+            ChatMessage.objects
+            .filter(content__icontains=query, conversation__user=user, conversation__is_archived=False)
+            .order_by('-timestamp')[:limit]
+        )
+        for message in messages:
+            message.rank = None
+            message.snippet = _fallback_snippet(message.content, query)
+
+    prefetch_related_objects(messages, 'conversation')
+    return messages
+
+
+def search(user, query, limit=SEARCH_LIMIT):
+    """Best hit per conversation, shaped for the chat sidebar"""
+    results = []
+    seen_conversations = set()
+    for msg in search_messages(user, query, limit):
+        if msg.conversation_id in seen_conversations:
+            continue
+        seen_conversations.add(msg.conversation_id)
+        results.append({
+            'conversation_id': msg.conversation_id,
+            'conversation_title': msg.conversation.title,
+            'content': msg.content[:200],
+            'snippet': highlight(msg.snippet),
+            'timestamp': msg.timestamp.isoformat(),
+            'role': msg.role,
+        })
+    return results
+
+
+def rebuild_index():
+    """Rebuild the chat search index from student_chatmessage. Returns the backend name, or None."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"REINDEX INDEX {PG_INDEX}")
+        elif connection.vendor == 'sqlite' and _has_fts(connection.alias):
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        else:
+            return None
+    return connection.vendor
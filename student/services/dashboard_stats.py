@@ -0,0 +1,171 @@
+"""
+Dashboard Stats Engine
+Plan-specific dashboard counters computed in ONE aggregate query per tenant
+and served from a versioned cache snapshot.
+
+Write signals (see student/signals.py) bump the owner's version, so the next
+dashboard load recomputes; every other load is a single cache read.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import (
+    Student, Attendence, Course, Batch, Exam, Employee,
+    Payment, Room, HostelAllocation, Route
+)
+
+# =========================
+# CONSTANTS
+# =========================
+STATS_CACHE_PREFIX = "dashboard_stats"
+STATS_VERSION_PREFIX = "dashboard_stats_version"
+STATS_CACHE_TTL = 60 * 5  # Safety net; writes invalidate immediately
+RECENT_PAYMENTS_LIMIT = 5
+
+COACHING_PLANS = ('COACHING', 'INSTITUTE')
+SCHOOL_PLANS = ('SCHOOL', 'INSTITUTE')
+
+
+# =========================
+# CACHE VERSIONING
+# =========================
+def _version_key(owner_id):
+    return f"{STATS_VERSION_PREFIX}:{owner_id}"
+
+
+def get_stats_version(owner_id):
+    """Current snapshot version for an owner (created lazily)"""
+    key = _version_key(owner_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh, unique version: never collides with a snapshot written
+        # before the version key was evicted
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_dashboard_stats(owner_id):
+    """Bump the owner's version so the cached snapshot is never read again"""
+    if owner_id:
+        cache.set(_version_key(owner_id), time.time_ns(), None)
+
+
+def _snapshot_key(owner_id, plan, today):
+    return f"{STATS_CACHE_PREFIX}:{owner_id}:{plan}:{today.isoformat()}:v{get_stats_version(owner_id)}"
+
+
+# =========================
+# AGGREGATION
+# =========================
+def _subquery(qs, expression):
+    """Scalar correlated subquery returning one aggregate per owner"""
+    return Coalesce(
+        Subquery(
+            qs.order_by().values('created_by').annotate(value=expression).values('value')[:1],
+            output_field=IntegerField()
+        ),
+        Value(0)
+    )
+
+
+def _owner_counters(owner_id, plan, today):
+    """
+    All plan counters for one owner in a single SELECT.
+    Each counter is a correlated subquery on the owner row, so the database
+    does one round trip instead of one COUNT(*) per model.
+    """
+    owner_ref = OuterRef('pk')
+    counters = {
+        'students_count': _subquery(Student.objects.filter(created_by=owner_ref), Count('pk')),
+    }
+
+    if plan in COACHING_PLANS:
+        counters['courses_count'] = _subquery(Course.objects.filter(created_by=owner_ref), Count('pk'))
+        counters['batches_count'] = _subquery(Batch.objects.filter(created_by=owner_ref), Count('pk'))
+
+    if plan in SCHOOL_PLANS:
+        counters['teachers_count'] = _subquery(
+            Employee.objects.filter(created_by=owner_ref, is_active=True), Count('pk')
+        )
+        counters['exams_count'] = _subquery(Exam.objects.filter(created_by=owner_ref), Count('pk'))
+        # Grouped by the student's owner (self-marked rows carry the student as creator)
+        counters['present_today'] = Coalesce(
+            Subquery(
+                Attendence.objects
+                .filter(student__created_by=owner_ref, date=today, is_present=True)
+                .order_by().values('student__created_by')
+                .annotate(value=Count('pk')).values('value')[:1],
+                output_field=IntegerField()
+            ),
+            Value(0)
+        )
+
+    if plan == 'INSTITUTE':
+        counters['hostel_beds_total'] = _subquery(Room.objects.filter(created_by=owner_ref), Sum('capacity'))
+        counters['hostel_beds_occupied'] = _subquery(
+            HostelAllocation.objects.filter(created_by=owner_ref, status='ACTIVE'), Count('pk')
+        )
+        counters['transport_routes'] = _subquery(Route.objects.filter(created_by=owner_ref), Count('pk'))
+
+    return User.objects.filter(pk=owner_id).annotate(**counters).values(*counters.keys()).first() or {
+        key: 0 for key in counters
+    }
+
+
+def compute_dashboard_stats(owner, plan, today=None):
+    """Build the dashboard payload straight from the database (no cache)"""
+    today = today or timezone.now().date()
+    owner_id = getattr(owner, 'pk', None)
+    counters = _owner_counters(owner_id, plan, today)
+
+    stats = {
+        'plan': plan,
+        'students_count': counters['students_count'],
+        'recent_payments': list(
+            Payment.objects.filter(user_id=owner_id)
+            .order_by('-created_at')[:RECENT_PAYMENTS_LIMIT]
+            .values('amount', 'status', 'created_at')
+        ) if owner_id else [],
+    }
+
+    # 1. COACHING PLAN Focus
+    if plan in COACHING_PLANS:
+        stats['courses_count'] = counters['courses_count']
+        stats['batches_count'] = counters['batches_count']
+
+    # 2. SCHOOL/INSTITUTE Focus
+    if plan in SCHOOL_PLANS:
+        stats['teachers_count'] = counters['teachers_count']
+        stats['exams_count'] = counters['exams_count']
+        total_students = stats['students_count']
+        present_count = counters['present_today']
+        stats['attendance_percentage'] = int((present_count / total_students * 100)) if total_students > 0 else 0
+
+    # 3. EXTRA MODULES (Institute Only)
+    if plan == 'INSTITUTE':
+        beds_total = counters['hostel_beds_total']
+        beds_occupied = counters['hostel_beds_occupied']
+        stats['hostel_occupancy'] = int((beds_occupied / beds_total * 100)) if beds_total > 0 else 0
+        stats['hostel_beds_occupied'] = beds_occupied
+        stats['hostel_beds_total'] = beds_total
+        stats['transport_routes'] = counters['transport_routes']
+
+    return stats
+
+
+def get_dashboard_stats(owner, plan):
+    """Cached dashboard snapshot for an owner/plan (recomputed after writes)"""
+    today = timezone.now().date()
+    key = _snapshot_key(getattr(owner, 'pk', None), plan, today)
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(owner, plan, today)
+        cache.set(key, stats, STATS_CACHE_TTL)
+    return stats
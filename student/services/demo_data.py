@@ -0,0 +1,230 @@
+"""
+Demo Tenant Seeder
+Complete, realistic institutes for demos, load tests and the query-budget
+suite (student/tests_query_budget.py).
+
+- seed_tenant() builds one tenant: owner (CLIENT) with an active plan, a
+  teacher employee, a parent, students (one with a login), attendance,
+  fees, courses/batches/enrollments, exams and grades, library, hostel,
+  transport, HR, calendar, notifications and an AI chat history
+- Per-student rows are bulk-created, so thousands of students seed in seconds
+- Teachers and chat conversations scale with the student count too
+- Usernames, ISBNs, codes and registration numbers carry the tenant prefix:
+  several tenants can be seeded side by side
+- `python manage.py create_demo_data --tenants 3 --students 500`
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import random
+import zlib
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ..chat_models import ChatConversation, ChatMessage
+from ..models import (
+    UserProfile, ClientSubscription, Student, Attendence, Payment, Notification,
+    Course, Batch, Enrollment, Subject, Exam, Grade, Event, LiveClass,
+    LibraryBook, BookIssue, Hostel, Room, HostelAllocation, Vehicle, Route, TransportAllocation,
+    Employee, Designation, LeaveRequest, Department, Holiday, ClassRoutine, AuditLog,
+)
+from .attendance_rollup import rebuild as rebuild_attendance_rollup
+from .dashboard_stats import invalidate_dashboard_stats
+from .search_index import index_objects
+
+# =========================
+# CONSTANTS
+# =========================
+DEMO_PASSWORD = 'Demo123!'
+FIRST_NAMES = ('Rahul', 'Priya', 'Amit', 'Sneha', 'Vikram', 'Anjali', 'Rohit', 'Kavita', 'Arjun', 'Divya')
+LAST_NAMES = ('Sharma', 'Singh', 'Kumar', 'Patel', 'Gupta', 'Verma', 'Mehta', 'Reddy', 'Nair', 'Joshi')
+FEE_MONTHS = 3
+CHAT_TURNS = 4
+STUDENTS_PER_TEACHER = 4  # Staff and chat history grow with the tenant, so N+1 loops show up
+
+
+class DemoTenant:
+    """Handles on what seed_tenant() created"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.owner = self.teacher = self.parent = self.student_user = None
+        self.students = []
+        self.course = self.batch = self.exam = self.book = None
+        self.payment = self.subscription_payment = self.conversation = None
+
+
+def _user(username, role, owner_profile=None, **fields):
+    user = User.objects.create_user(username, f"{username}@demo.local", DEMO_PASSWORD, **fields)
+    UserProfile.objects.create(
+        user=user, role=role,
+        institution_type=owner_profile.institution_type if owner_profile else 'INSTITUTE',
+        subscription_expiry=owner_profile.subscription_expiry if owner_profile else None,
+    )
+    return user
+
+
+def seed_tenant(prefix, students=20, days=30, plan='INSTITUTE', seed=None):
+    """Create one complete institute named after `prefix`. Returns a DemoTenant."""
+    rng = random.Random(seed if seed is not None else prefix)
+    today = timezone.localdate()
+    tenant = DemoTenant(prefix)
+
+    # --- People ---
+    owner = _user(f"{prefix}_owner", 'CLIENT', first_name=prefix.title(), last_name='Academy')
+    profile = owner.profile
+    profile.institution_type = plan
+    profile.institution_name = f"{prefix.title()} Academy"
+    profile.subscription_expiry = today + timedelta(days=180)
+    profile.save()
+    ClientSubscription.objects.create(
+        user=owner, plan_type=plan, status='ACTIVE',
+        start_date=today - timedelta(days=185), end_date=profile.subscription_expiry, amount_paid=Decimal('4999'),
+    )
+    tenant.owner = owner
+
+    designation, _ = Designation.objects.get_or_create(title='Senior Teacher')
+    employees = []
+    for i in range(max(students // STUDENTS_PER_TEACHER, 1)):
+        teacher = _user(
+            f"{prefix}_teacher" + (str(i + 1) if i else ''), 'TEACHER', profile,
+            first_name=FIRST_NAMES[(i + 4) % 10], last_name=LAST_NAMES[i % 10],
+        )
+        employees.append(Employee.objects.create(
+            created_by=owner, user=teacher, designation=designation,
+            joining_date=today - timedelta(days=400), basic_salary=Decimal('35000'), contract_type='PERMANENT',
+        ))
+    employee = employees[0]
+    tenant.teacher = employee.user
+    LeaveRequest.objects.create(
+        created_by=owner, employee=employee, leave_type='CASUAL',
+        start_date=today + timedelta(days=3), end_date=today + timedelta(days=4), reason='Family function',
+    )
+    tenant.parent = _user(f"{prefix}_parent", 'PARENT', profile, first_name='Suresh', last_name='Singh')
+    tenant.student_user = _user(f"{prefix}_student", 'STUDENT', profile, first_name='Rahul', last_name='Sharma')
+
+    # --- Students ---
+    department = Department.objects.create(created_by=owner, name='Science')
+    rows = []
+    for i in range(students):
+        grade = 9 + i % 3
+        rows.append(Student(
+            created_by=owner, name=f"{FIRST_NAMES[i % 10]} {LAST_NAMES[(i // 10) % 10]}"[:20],
+            age=13 + grade - 9, gender='M' if i % 2 else 'F', dob=date(today.year - 5 - grade, 6, 15),
+            grade=grade, relation='Father', institution_type=plan, department=department,
+            roll_number=f"{prefix.upper()}-{i + 1:05d}", parent=tenant.parent if i % 3 == 0 else None,
+            user=tenant.student_user if i == 0 else None, contact_number=f"98{rng.randint(10000000, 99999999)}",
+        ))
+    tenant.students = Student.objects.bulk_create(rows)
+    index_objects(tenant.students)
+
+    Attendence.objects.bulk_create([
+        Attendence(created_by=owner, student=student, date=today - timedelta(days=d), is_present=rng.random() < 0.85)
+        for student in tenant.students for d in range(days)
+    ])
+    rebuild_attendance_rollup([student.pk for student in tenant.students])
+    Payment.objects.bulk_create([
+        Payment(
+            student=student, payment_type='FEE', amount=Decimal(rng.choice(['5000.00', '6000.00', '7500.00'])),
+            due_date=today + timedelta(days=30 * (month - 1)), description=f"Tuition Fee - Month {month + 1}",
+            status='PAID' if month == 0 else 'PENDING',
+            paid_date=today - timedelta(days=30) if month == 0 else None,
+        )
+        for student in tenant.students for month in range(FEE_MONTHS)
+    ])
+    tenant.payment = Payment.objects.filter(student=tenant.students[0]).order_by('pk').first()
+    tenant.subscription_payment = Payment.objects.create(
+        user=owner, payment_type='SUBSCRIPTION', amount=Decimal('4999'), due_date=today,
+        description=f"{plan} plan renewal", status='PENDING', transaction_id=f"{prefix.upper()}UTR0001",
+        metadata={'email': owner.email, 'plan_type': plan},
+    )
+
+    # --- Academics ---
+    tenant.course = Course.objects.create(
+        created_by=owner, name='JEE Foundation', code=f"{prefix.upper()}-JEE",
+        description='Physics, Chemistry and Mathematics', duration_weeks=40, fee=Decimal('45000'),
+    )
+    tenant.batch = Batch.objects.create(
+        created_by=owner, course=tenant.course, name='Morning Batch',
+        start_date=today - timedelta(days=60), primary_teacher=tenant.teacher,
+    )
+    Enrollment.objects.bulk_create([
+        Enrollment(created_by=owner, student=student, batch=tenant.batch) for student in tenant.students
+    ])
+    subject, _ = Subject.objects.get_or_create(code='PHY101', defaults={'name': 'Physics'})
+    tenant.exam = Exam.objects.create(
+        created_by=owner, name='Physics Mid-Term', exam_type='MIDTERM', subject=subject, batch=tenant.batch,
+        grade_class='10', total_marks=100, passing_marks=40, exam_date=today - timedelta(days=10),
+    )
+    Grade.objects.bulk_create([
+        Grade(created_by=owner, student=student, exam=tenant.exam,
+              marks_obtained=Decimal(rng.randint(35, 98)), status='PASS')
+        for student in tenant.students
+    ])
+    start = timezone.make_aware(datetime.combine(today + timedelta(days=7), time(10)))
+    Event.objects.create(
+        created_by=owner, name='Science Fair', description='Annual science exhibition', event_type='ACADEMIC',
+        start_date=start, end_date=start + timedelta(hours=6), venue='Main Hall', organizer=tenant.teacher,
+    )
+    LiveClass.objects.create(
+        created_by=owner, title='Kinematics Doubts', batch=tenant.batch, teacher=tenant.teacher,
+        meeting_url='https://meet.example.com/kinematics', start_time=timezone.now() + timedelta(hours=2),
+    )
+    Holiday.objects.create(owner=owner, name='Diwali', date=today + timedelta(days=20))
+    ClassRoutine.objects.create(
+        owner=owner, batch=tenant.batch, subject='Physics', teacher_name='Rajesh Kumar',
+        day_of_week='MON', start_time=time(9), end_time=time(10),
+    )
+
+    # --- Library, hostel, transport ---
+    tenant.book = LibraryBook.objects.create(
+        created_by=owner, isbn=f"978{zlib.crc32(prefix.encode()) % 10 ** 10:010d}", title='Concepts of Physics',
+        author='H.C. Verma', publisher='Bharati Bhawan', category='TEXTBOOK', published_year=2022,
+        total_copies=10, available_copies=10 - min(students, 5), price=Decimal('650'),
+    )
+    BookIssue.objects.bulk_create([
+        BookIssue(created_by=owner, book=tenant.book, student=student, due_date=today + timedelta(days=14))
+        for student in tenant.students[:5]
+    ])
+    hostel = Hostel.objects.create(
+        created_by=owner, name='North Block', hostel_type='CO-ED', total_rooms=max(students // 4, 1), address='Campus',
+    )
+    room = Room.objects.create(created_by=owner, hostel=hostel, room_number='101', floor=1, capacity=max(students, 4))
+    vehicle = Vehicle.objects.create(
+        created_by=owner, registration_number=f"{prefix.upper()}-BUS-01", vehicle_type='BUS',
+        capacity=40, driver_name='Mohan', driver_phone='9876500000',
+    )
+    route = Route.objects.create(
+        created_by=owner, route_name='City Loop', start_point='Station', end_point='Campus', vehicle=vehicle,
+        stops='Station,Market,Campus', pickup_time=time(7, 30), drop_time=time(15, 30), monthly_fare=Decimal('1200'),
+    )
+    HostelAllocation.objects.bulk_create([
+        HostelAllocation(created_by=owner, student=student, room=room, check_in_date=today - timedelta(days=30))
+        for student in tenant.students[::2]
+    ])
+    TransportAllocation.objects.bulk_create([
+        TransportAllocation(created_by=owner, student=student, route=route, pickup_stop='Market', start_date=today)
+        for student in tenant.students[1::2]
+    ])
+
+    # --- Communication ---
+    Notification.objects.bulk_create([
+        Notification(recipient=tenant.parent, recipient_type='PARENT', title='Fee Reminder',
+                     message='Your fee payment is due in 5 days.'),
+        Notification(recipient=owner, recipient_type='ADMIN', title='Plan Renewal',
+                     message='Your plan renews next month.'),
+    ])
+    AuditLog.objects.create(created_by=owner, action='STUDENT_CREATED', description=f"Added {students} students")
+    conversations = [
+        ChatConversation.objects.create(user=owner, title='Fee collection status', total_messages=CHAT_TURNS)
+        for _ in range(max(students // STUDENTS_PER_TEACHER, 1))
+    ]
+    tenant.conversation = conversations[0]
+    ChatMessage.objects.bulk_create([
+        ChatMessage(conversation=conversation, role='user' if i % 2 == 0 else 'ai',
+                    content='How many fees are pending?' if i % 2 == 0 else f"{students * 2} fee payments are pending.")
+        for conversation in conversations for i in range(CHAT_TURNS)
+    ])
+
+    invalidate_dashboard_stats(owner.pk)  # bulk_create skipped the signals
+    return tenant
@@ -4,7 +4,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def send_credentials_with_invoice(user, password, plan, invoice_pdf):
+def credentials_email(user, password, plan):
+    """(subject, body, attachment name) of the activation / renewal email"""
     display_plan = {
         'COACHING': 'Coaching Management System (CMS)',
         'SCHOOL': 'Modern School Management System (SMS)',
@@ -71,6 +72,12 @@ Software Architect | Y.S.M Advance Education System
 Telepathy Infotech Intelligence
 """
 
+    return subject, body, f"Invoice_{plan}_Plan.pdf"
+
+
+def send_credentials_with_invoice(user, password, plan, invoice_pdf):
+    subject, body, filename = credentials_email(user, password, plan)
+
     try:
         email = EmailMessage(
             subject=subject,
@@ -82,7 +89,7 @@ Telepathy Infotech Intelligence
         # Attach PDF
         # invoice_pdf is a BytesIO object
         email.attach(
-            filename=f"Invoice_{plan}_Plan.pdf",
+            filename=filename,
             content=invoice_pdf.read(),
             mimetype="application/pdf"
         )
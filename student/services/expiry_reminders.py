@@ -0,0 +1,177 @@
+"""
+Subscription Expiry Reminders
+Daily job behind `python manage.py send_expiry_reminders`.
+
+- Only profiles whose expiry is exactly on a trigger offset are loaded
+  (one query, users joined)
+- Each template is prepared once per run; recipients only fill their slots
+- In-app notifications are bulk-created; emails go to the notification
+  outbox in bulk and are delivered over reused SMTP connections
+- Idempotent per day: a rerun skips everyone who already got today's reminder
+- The command delivers only today's reminder emails (reminder_outbox_ids);
+  everything else in the outbox is left to `process_outbox`
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import UserProfile, Notification, OutboxMessage
+from .outbox import enqueue_bulk, CHANNEL_EMAIL
+
+# =========================
+# CONSTANTS
+# =========================
+PRE_EXPIRY_DAYS = (7, 3, 1)
+POST_EXPIRY_DAYS = (-1, -5, -10)
+TRIGGER_DAYS = PRE_EXPIRY_DAYS + (0,) + POST_EXPIRY_DAYS
+
+REMINDER_PRE_EXPIRY = 'pre_expiry'
+REMINDER_EXPIRY_DAY = 'expiry_day'
+REMINDER_SUSPENDED = 'suspended'
+REMINDER_DEDUPE_PREFIX = 'expiry'
+
+# (subject, body) with {name}, {plan}, {expiry}, {days} and {site_url} slots
+REMINDER_TEMPLATES = {
+    REMINDER_PRE_EXPIRY: (
+        "⚠️ Action Required: Your Plan Expires in {days} Days",
+        """
+Dear {name},
+
+Your {plan} Subscription will expire on {expiry}.
+
+To ensure uninterrupted access to your data and features, please renew your plan now.
+
+Login to Dashboard: {site_url}/
+
+Thank you,
+NextGen ERP Team
+                """,
+    ),
+    REMINDER_EXPIRY_DAY: (
+        "🚨 URGENT: Your Plan Expires Today!",
+        """
+Dear {name},
+
+This is a final reminder that your subscription expires TODAY ({expiry}).
+
+After today, your account will be restricted to READ-ONLY mode. You will not be able to add new data.
+
+Renew Now: {site_url}/
+
+Thank you,
+NextGen ERP Team
+                 """,
+    ),
+    REMINDER_SUSPENDED: (
+        "❌ Service Suspended: Plan Expired",
+        """
+Dear {name},
+
+Your plan expired on {expiry}.
+Your account is now in READ-ONLY mode.
+
+Please renew immediately to restore full access.
+
+Renew Now: {site_url}/
+
+Thank you,
+NextGen ERP Team
+                 """,
+    ),
+}
+
+
+def reminder_kind(days_left):
+    if days_left in PRE_EXPIRY_DAYS:
+        return REMINDER_PRE_EXPIRY
+    if days_left == 0:
+        return REMINDER_EXPIRY_DAY
+    if days_left in POST_EXPIRY_DAYS:
+        return REMINDER_SUSPENDED
+    return None
+
+
+def _prepared_templates():
+    """Templates with the per-run slots filled, keyed by kind"""
+    site_url = settings.SITE_URL
+    return {
+        kind: (subject, body.replace('{site_url}', site_url))
+        for kind, (subject, body) in REMINDER_TEMPLATES.items()
+    }
+
+
+def due_profiles(today):
+    """CLIENT profiles expiring exactly on a trigger offset, with their users"""
+    return (
+        UserProfile.objects
+        .filter(role='CLIENT', subscription_expiry__in=[today + timedelta(days=d) for d in TRIGGER_DAYS])
+        .select_related('user')
+        .only('institution_type', 'subscription_expiry', 'user__first_name', 'user__email')
+    )
+
+
+def send_expiry_reminders(today=None):
+    """
+    Queue today's reminders. Returns {'reminders': n, 'emails': n, 'skipped': n}
+    (skipped = already reminded today).
+    """
+    today = today or timezone.localdate()
+    templates = _prepared_templates()
+
+    reminders = []  # (user, subject, body)
+    for profile in due_profiles(today):
+        days_left = (profile.subscription_expiry - today).days
+        subject, body = templates[reminder_kind(days_left)]
+        user = profile.user
+        reminders.append((
+            user,
+            subject.format(days=days_left),
+            body.format(name=user.first_name, plan=profile.institution_type,
+                        expiry=profile.subscription_expiry, days=days_left),
+        ))
+
+    # Idempotency: today's in-app notification is the record of a sent reminder
+    already = set(
+        Notification.objects.filter(
+            recipient_id__in=[user.pk for user, _, _ in reminders],
+            title__in={subject for _, subject, _ in reminders},
+            created_at__date=today,
+        ).values_list('recipient_id', 'title')
+    )
+    fresh = [r for r in reminders if (r[0].pk, r[1]) not in already]
+
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=user,
+                recipient_type='ADMIN',  # Client is Admin of their institute
+                title=subject,
+                message=body,
+            )
+            for user, subject, body in fresh
+        ])
+        emails = enqueue_bulk([
+            OutboxMessage(
+                created_by=user,
+                channel=CHANNEL_EMAIL,
+                recipient=user.email,
+                subject=subject,
+                body=body,
+                dedupe_key=f"{REMINDER_DEDUPE_PREFIX}:{user.pk}:{today.isoformat()}",
+            )
+            for user, subject, body in fresh if user.email
+        ])
+
+    return {'reminders': len(fresh), 'emails': len(emails), 'skipped': len(reminders) - len(fresh)}
+
+
+def reminder_outbox_ids(today=None):
+    """Outbox ids of the reminder emails queued for `today`"""
+    today = today or timezone.localdate()
+    return list(
+        OutboxMessage.objects.filter(
+            dedupe_key__startswith=f"{REMINDER_DEDUPE_PREFIX}:", dedupe_key__endswith=f":{today.isoformat()}"
+        ).values_list('pk', flat=True)
+    )
@@ -0,0 +1,172 @@
+"""
+Geofence Service
+Campus fences of a tenant, cached in memory, and the point check behind the
+geo-fenced check-in.
+
+- A tenant's fences are its active CampusFence rows (one per branch; more
+  than one needs the 'multi_branch' plan feature), or the legacy single
+  location of the owner's profile when it has none
+- Fences are compiled once into flat tuples of floats (radians, bounding
+  box, polygon points) and kept in this process' memory; a version key in
+  the shared cache, bumped by signals on CampusFence / UserProfile writes,
+  tells every worker when to recompile. A check-in burst costs one cache get
+  per request and no fence queries.
+- Both the version key and the local entries expire after GEOFENCE_TTL, so
+  a missed signal (bulk update(), a per-process cache) heals within minutes
+- check_point() tests a point against all of a tenant's fences in one pass:
+  a bounding-box reject first, then haversine (circles) or ray casting
+  (polygons) for the fences whose box contains the point
+"""
+from collections import OrderedDict, namedtuple
+from math import radians, cos, sin, asin, sqrt
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import CampusFence, UserProfile
+
+# =========================
+# CONSTANTS
+# =========================
+GEOFENCE_VERSION_PREFIX = "geofence_version"
+GEOFENCE_CACHE_SIZE = getattr(settings, 'GEOFENCE_CACHE_SIZE', 1024)  # Tenants kept per process
+GEOFENCE_TTL = getattr(settings, 'GEOFENCE_TTL', 60 * 5)  # Seconds
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE = 111320
+MAIN_CAMPUS = 'Main Campus'
+
+Fence = namedtuple('Fence', 'id name lat lng radius min_lat max_lat min_lng max_lng polygon')
+GeoMatch = namedtuple('GeoMatch', 'inside fence_id name distance radius')
+
+_fence_sets = OrderedDict()  # owner_id -> (version, compiled_at, [Fence])
+_lock = threading.Lock()
+
+
+def haversine(lon1, lat1, lon2, lat2):
+    """Great circle distance in meters between two points (decimal degrees)"""
+    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * asin(sqrt(a)) * EARTH_RADIUS_M
+
+
+# =========================
+# VERSIONING
+# =========================
+def _version_key(owner_id):
+    return f"{GEOFENCE_VERSION_PREFIX}:{owner_id}"
+
+
+def get_fence_version(owner_id):
+    key = _version_key(owner_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), GEOFENCE_TTL)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_fences(owner_id):
+    """Make every worker recompile the owner's fences on its next check"""
+    if owner_id:
+        cache.set(_version_key(owner_id), time.time_ns(), GEOFENCE_TTL)
+
+
+# =========================
+# COMPILE + CACHE
+# =========================
+def compile_fence(fence_id, name, lat, lng, radius, polygon=None):
+    """Fence tuple with its bounding box precomputed"""
+    lat, lng, radius = float(lat), float(lng), float(radius)
+    points = tuple((float(p_lat), float(p_lng)) for p_lat, p_lng in polygon or ())
+    if len(points) >= 3:
+        lats, lngs = [p[0] for p in points], [p[1] for p in points]
+        box = (min(lats), max(lats), min(lngs), max(lngs))
+    else:
+        points = None
+        d_lat = radius / METERS_PER_DEGREE
+        d_lng = d_lat / max(cos(radians(lat)), 1e-6)
+        box = (lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng)
+    return Fence(fence_id, name, lat, lng, radius, *box, points)
+
+
+def load_fences(owner_id):
+    """Compile the owner's fences from the database (no cache)"""
+    fences = [
+        compile_fence(f.pk, f.name, f.lat, f.long, f.radius, f.polygon)
+        for f in CampusFence.objects.filter(created_by_id=owner_id, is_active=True).order_by('pk')
+    ]
+    if fences:
+        return fences
+
+    location = (
+        UserProfile.objects.filter(user_id=owner_id)
+        .values_list('location_lat', 'location_long', 'attendance_radius')
+        .first()
+    )
+    if location and location[0] is not None and location[1] is not None:
+        return [compile_fence(None, MAIN_CAMPUS, *location)]
+    return []
+
+
+def get_fences(owner_id):
+    """The owner's compiled fences, recompiled when the version moved or the entry expired"""
+    version = get_fence_version(owner_id)
+    now = time.monotonic()
+    cached = _fence_sets.get(owner_id)
+    if cached and cached[0] == version and now - cached[1] < GEOFENCE_TTL:
+        return cached[2]
+
+    fences = load_fences(owner_id)
+    with _lock:
+        _fence_sets[owner_id] = (version, now, fences)
+        _fence_sets.move_to_end(owner_id)
+        while len(_fence_sets) > GEOFENCE_CACHE_SIZE:
+            _fence_sets.popitem(last=False)
+    return fences
+
+
+# =========================
+# POINT CHECK
+# =========================
+def _in_polygon(lat, lng, points):
+    """Ray casting (even-odd rule) on [lat, long] vertices"""
+    inside = False
+    j = len(points) - 1
+    for i in range(len(points)):
+        lat_i, lng_i = points[i]
+        lat_j, lng_j = points[j]
+        if (lat_i > lat) != (lat_j > lat) and lng < (lng_j - lng_i) * (lat - lat_i) / (lat_j - lat_i) + lng_i:
+            inside = not inside
+        j = i
+    return inside
+
+
+def check_point(owner_id, lat, lng, fences=None):
+    """
+    GeoMatch for (lat, lng) against every fence of the owner: the closest
+    fence containing the point, else the closest fence (inside=False).
+    None when the owner has no fence configured.
+    """
+    fences = get_fences(owner_id) if fences is None else fences
+    if not fences:
+        return None
+
+    best = None
+    for fence in fences:
+        if not (fence.min_lat <= lat <= fence.max_lat and fence.min_lng <= lng <= fence.max_lng):
+            continue
+        distance = haversine(lng, lat, fence.lng, fence.lat)
+        inside = _in_polygon(lat, lng, fence.polygon) if fence.polygon else distance <= fence.radius
+        if inside and (best is None or distance < best.distance):
+            best = GeoMatch(True, fence.id, fence.name, distance, fence.radius)
+    if best:
+        return best
+
+    # Outside every fence: report the nearest one
+    fence, distance = min(
+        ((fence, haversine(lng, lat, fence.lng, fence.lat)) for fence in fences),
+        key=lambda pair: pair[1]
+    )
+    return GeoMatch(False, fence.id, fence.name, distance, fence.radius)
@@ -0,0 +1,378 @@
+"""
+Notification Outbox
+Persistent queue for outbound Email / SMS / WhatsApp / Telegram messages.
+
+- Request handlers call `enqueue()` (inside their own transaction) and
+  return; nothing talks to SMTP, Twilio, MSG91 or Telegram on the request path
+- `process_outbox` drains due messages with a thread pool per channel: one
+  SMTP connection per email batch, identical SMS merged into one bulk call
+- Failed sends are retried with exponential backoff up to
+  OUTBOX_MAX_ATTEMPTS, then marked FAILED; a `dedupe_key` makes enqueueing
+  idempotent
+- With OUTBOX_RUN_IN_THREAD (default) each message is also sent from a
+  background thread right after commit, for deployments without the worker
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import logging
+import mimetypes
+import os
+import random
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from notifications import sms_service, whatsapp_service
+
+from ..models import OutboxMessage
+from .telegram_service import send_telegram_message, send_telegram_document
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+OUTBOX_PENDING = 'PENDING'
+OUTBOX_SENDING = 'SENDING'
+OUTBOX_SENT = 'SENT'
+OUTBOX_FAILED = 'FAILED'
+
+CHANNEL_EMAIL = 'EMAIL'
+CHANNEL_SMS = 'SMS'
+CHANNEL_WHATSAPP = 'WHATSAPP'
+CHANNEL_TELEGRAM = 'TELEGRAM'
+
+OUTBOX_RUN_IN_THREAD = getattr(settings, 'OUTBOX_RUN_IN_THREAD', True)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6)
+OUTBOX_BATCH_SIZE = 100              # Messages claimed per drain
+OUTBOX_RETRY_BASE = 30               # Seconds before the first retry, doubled per attempt
+OUTBOX_RETRY_MAX = 60 * 60
+OUTBOX_LEASE = timedelta(minutes=15) # SENDING rows older than this belong to a dead worker
+EMAIL_BATCH_SIZE = 50                # Messages per SMTP connection
+SMS_BATCH_SIZE = 100                 # Numbers per bulk SMS request
+
+# Parallel sends per channel (a Telegram bot may send ~30 messages/s)
+CHANNEL_CONCURRENCY = {
+    CHANNEL_EMAIL: 2,
+    CHANNEL_SMS: 4,
+    CHANNEL_WHATSAPP: 4,
+    CHANNEL_TELEGRAM: 8,
+}
+
+RESULT_FIELDS = [
+    'status', 'attempts', 'next_attempt_at', 'claimed_at', 'sent_at',
+    'provider_message_id', 'last_error', 'body', 'options',
+]
+
+
+def retry_delay(attempt):
+    """Seconds before retry `attempt` (1-based): exponential, half of it jittered"""
+    delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * (2 ** (attempt - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# =========================
+# ENQUEUE
+# =========================
+def enqueue(channel, recipient, body, subject='', owner=None, dedupe_key=None,
+            attachment=None, attachment_name='', sensitive=False, **options):
+    """
+    Queue one message and return (message, created).
+    - `dedupe_key`: an existing message with the same key is returned instead
+    - `attachment`: bytes or a file-like object (e.g. the invoice BytesIO)
+    - `sensitive`: the body (credentials) is blanked once delivered
+    - `options`: channel extras, e.g. template_id for DLT SMS
+    """
+    if dedupe_key:
+        existing = OutboxMessage.objects.filter(dedupe_key=dedupe_key).first()
+        if existing:
+            return existing, False
+
+    message = OutboxMessage(
+        created_by=owner,
+        channel=channel,
+        recipient=str(recipient),
+        subject=subject,
+        body=body,
+        options={**options, 'sensitive': True} if sensitive else options,
+        attachment_name=attachment_name,
+        dedupe_key=dedupe_key or None,
+    )
+    if attachment is not None:
+        message.attachment.save(attachment_name or 'attachment', ContentFile(_read(attachment)), save=False)
+
+    try:
+        with transaction.atomic():
+            message.save()
+    except IntegrityError:
+        # Same dedupe_key enqueued concurrently
+        return OutboxMessage.objects.get(dedupe_key=dedupe_key), False
+
+    if OUTBOX_RUN_IN_THREAD:
+        transaction.on_commit(lambda: threading.Thread(
+            target=_process_in_thread, args=(message.pk,), daemon=True
+        ).start())
+    return message, True
+
+
+def enqueue_bulk(messages, batch_size=500):
+    """
+    Queue many unsaved OutboxMessage rows in a few queries (scheduled jobs).
+    Rows whose dedupe_key is already queued are skipped; no per-message
+    thread is started, the caller or the worker drains them.
+    Returns the rows that were queued.
+    """
+    keys = [message.dedupe_key for message in messages if message.dedupe_key]
+    existing = set()
+    for i in range(0, len(keys), batch_size):
+        existing.update(
+            OutboxMessage.objects.filter(dedupe_key__in=keys[i:i + batch_size]).values_list('dedupe_key', flat=True)
+        )
+
+    fresh = [message for message in messages if message.dedupe_key not in existing]
+    OutboxMessage.objects.bulk_create(fresh, batch_size=batch_size, ignore_conflicts=True)
+    return fresh
+
+
+def _read(attachment):
+    if isinstance(attachment, bytes):
+        return attachment
+    if hasattr(attachment, 'getvalue'):
+        return attachment.getvalue()
+    attachment.seek(0)
+    return attachment.read()
+
+
+def _process_in_thread(message_id):
+    try:
+        drain_outbox(ids=[message_id])
+    except Exception:
+        logger.exception(f"Outbox message {message_id} failed in thread")
+    finally:
+        close_old_connections()
+
+
+# =========================
+# DRAIN
+# =========================
+def claim_due(ids=None, limit=OUTBOX_BATCH_SIZE):
+    """
+    Mark up to `limit` due messages SENDING and return them. Rows locked by
+    another worker are skipped, so several workers never send one message twice.
+    """
+    now = timezone.now()
+    OutboxMessage.objects.filter(status=OUTBOX_SENDING, claimed_at__lt=now - OUTBOX_LEASE).update(
+        status=OUTBOX_PENDING
+    )
+
+    due = OutboxMessage.objects.filter(status=OUTBOX_PENDING, next_attempt_at__lte=now)
+    if ids is not None:
+        due = due.filter(pk__in=ids)
+    with transaction.atomic():
+        pks = list(
+            due.select_for_update(skip_locked=True)
+            .order_by('next_attempt_at', 'pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        OutboxMessage.objects.filter(pk__in=pks).update(status=OUTBOX_SENDING, claimed_at=now)
+    return list(OutboxMessage.objects.filter(pk__in=pks).order_by('pk'))
+
+
+def drain_outbox(ids=None, limit=OUTBOX_BATCH_SIZE):
+    """Send one batch of due messages. Returns {'sent': n, 'retrying': n, 'failed': n}."""
+    counts = {'sent': 0, 'retrying': 0, 'failed': 0}
+    messages = claim_due(ids, limit)
+    if not messages:
+        return counts
+
+    by_channel = defaultdict(list)
+    for message in messages:
+        by_channel[message.channel].append(message)
+
+    jobs = []
+    pools = []
+    for channel, channel_messages in by_channel.items():
+        pool = ThreadPoolExecutor(
+            max_workers=CHANNEL_CONCURRENCY.get(channel, 1),
+            thread_name_prefix=f"outbox-{channel.lower()}",
+        )
+        pools.append(pool)
+        sender = SENDERS.get(channel)
+        for batch in _batches(channel, channel_messages):
+            jobs.append((batch, pool.submit(_send_batch, sender, batch) if sender else None))
+
+    now = timezone.now()
+    try:
+        for batch, future in jobs:
+            try:
+                outcomes = future.result() if future else [(False, '', 'Unknown channel')] * len(batch)
+            except Exception as e:
+                logger.exception("Outbox batch failed")
+                outcomes = [(False, '', str(e))] * len(batch)
+            for message, outcome in zip(batch, outcomes):
+                counts[_record(message, *outcome, now=now)] += 1
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+    OutboxMessage.objects.bulk_update(messages, RESULT_FIELDS)
+    return counts
+
+
+def drain_all(ids=None):
+    """Drain until nothing is due (only `ids` when given); returns the summed counts"""
+    totals = {'sent': 0, 'retrying': 0, 'failed': 0}
+    while True:
+        counts = drain_outbox(ids)
+        if not any(counts.values()):
+            return totals
+        for key, value in counts.items():
+            totals[key] += value
+
+
+def _batches(channel, messages):
+    """Messages that are sent together (one SMTP session / one bulk SMS request)"""
+    if channel == CHANNEL_EMAIL:
+        return [messages[i:i + EMAIL_BATCH_SIZE] for i in range(0, len(messages), EMAIL_BATCH_SIZE)]
+    if channel == CHANNEL_SMS:
+        groups = defaultdict(list)
+        for message in messages:
+            groups[(message.body, message.options.get('template_id'))].append(message)
+        return [
+            group[i:i + SMS_BATCH_SIZE]
+            for group in groups.values()
+            for i in range(0, len(group), SMS_BATCH_SIZE)
+        ]
+    return [[message] for message in messages]
+
+
+def _send_batch(sender, batch):
+    try:
+        return sender(batch)
+    finally:
+        connection.close()  # Pool threads must not keep their own DB connection open
+
+
+def _record(message, ok, provider_id, error, now):
+    """Apply one send outcome to the row; returns the counts key"""
+    message.attempts += 1
+    message.claimed_at = None
+    if ok:
+        message.status = OUTBOX_SENT
+        message.sent_at = now
+        message.provider_message_id = provider_id[:255]
+        message.last_error = ''
+        if message.options.get('sensitive'):
+            message.body = ''
+        return 'sent'
+
+    message.last_error = error
+    if message.attempts >= OUTBOX_MAX_ATTEMPTS:
+        message.status = OUTBOX_FAILED
+        logger.error(f"Outbox message {message.pk} ({message.channel}) failed for good: {error}")
+        return 'failed'
+
+    message.status = OUTBOX_PENDING
+    message.next_attempt_at = now + timedelta(seconds=retry_delay(message.attempts))
+    return 'retrying'
+
+
+# =========================
+# CHANNEL SENDERS
+# =========================
+# Each takes a batch of messages and returns one (ok, provider id, error) per message.
+def _outcome(result):
+    """Normalize a service result: dict with 'status', bool, or None (no news is good news)"""
+    if isinstance(result, dict):
+        if result.get('status') in ('sent', 'mock'):
+            return True, str(result.get('message_id') or result.get('message_sid') or ''), ''
+        return False, '', str(result.get('error') or result)
+    if result is False:
+        return False, '', 'Send failed'
+    return True, '', ''
+
+
+def _attachment(message):
+    if not message.attachment:
+        return None
+    with message.attachment.open('rb') as f:
+        return f.read()
+
+
+def _send_emails(batch):
+    smtp = get_connection(fail_silently=False)
+    try:
+        smtp.open()
+    except Exception as e:
+        return [(False, '', f"SMTP connection failed: {e}")] * len(batch)
+
+    outcomes = []
+    try:
+        for message in batch:
+            email = EmailMessage(
+                subject=message.subject,
+                body=message.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[message.recipient],
+                connection=smtp,
+            )
+            content = _attachment(message)
+            if content is not None:
+                name = message.attachment_name or os.path.basename(message.attachment.name)
+                email.attach(name, content, mimetypes.guess_type(name)[0] or 'application/octet-stream')
+            try:
+                email.send(fail_silently=False)
+                outcomes.append((True, '', ''))
+            except Exception as e:
+                outcomes.append((False, '', str(e)))
+    finally:
+        smtp.close()
+    return outcomes
+
+
+def _send_sms(batch):
+    first = batch[0]
+    results = sms_service.send_bulk(
+        [message.recipient for message in batch], first.body, first.options.get('template_id')
+    )
+    return [_outcome(result) for result in results]
+
+
+def _send_whatsapp(batch):
+    return [_outcome(whatsapp_service.send_message(message.recipient, message.body)) for message in batch]
+
+
+def _send_telegram(batch):
+    """
+    Text and document are separate deliveries: once the text is through it
+    is marked in options['text_sent'], so a retry only re-sends the document.
+    """
+    outcomes = []
+    for message in batch:
+        if not message.options.get('text_sent'):
+            if not send_telegram_message(message.recipient, message.body):
+                outcomes.append((False, '', 'Telegram message failed'))
+                continue
+            message.options = {**message.options, 'text_sent': True}
+
+        content = _attachment(message)
+        if content is not None and not send_telegram_document(
+            message.recipient, content, message.attachment_name or "Invoice.pdf"
+        ):
+            outcomes.append((False, '', 'Telegram document failed'))
+            continue
+        outcomes.append((True, '', ''))
+    return outcomes
+
+
+SENDERS = {
+    CHANNEL_EMAIL: _send_emails,
+    CHANNEL_SMS: _send_sms,
+    CHANNEL_WHATSAPP: _send_whatsapp,
+    CHANNEL_TELEGRAM: _send_telegram,
+}
@@ -0,0 +1,175 @@
+"""
+Report Cards
+Report cards for a whole class built from its Grade rows.
+
+- build_report_cards() reads the roster (one query) and every Grade row of
+  the roster (one values() query, no model instances), then computes
+  totals, ranks and percentiles for all students at once
+- Rank is competition ranking ("1224") on overall percentage; the
+  percentile is the share of the cohort scoring at or below the student.
+  The cohort is the batch when one is given, else the student's grade.
+  Students without marks are not ranked
+- PDFs are rendered by report_card_utils with styles and branding built
+  once per batch: one PDF per student (streamed ZIP, admin bulk download)
+  or one merged class PDF, which is a GeneratedReport job (REPORT_CARDS) so
+  end-of-term printing never runs on the request path
+"""
+from bisect import bisect_right
+from collections import namedtuple
+import logging
+
+from ..models import Grade, Student
+from ..report_card_utils import load_branding, render_report_cards
+from .attendance import get_roster
+
+logger = logging.getLogger(__name__)
+
+ExamLine = namedtuple('ExamLine', 'subject exam date marks total passing percentage letter passed')
+
+# =========================
+# CONSTANTS
+# =========================
+LETTER_GRADES = ((90, 'A+'), (80, 'A'), (70, 'B'), (60, 'C'), (50, 'D'))
+
+
+def letter_grade(percentage):
+    for floor, letter in LETTER_GRADES:
+        if percentage >= floor:
+            return letter
+    return 'F'
+
+
+# =========================
+# LOAD
+# =========================
+def load_grade_rows(student_ids, academic_year=None):
+    """Every Grade row of the students, newest exam first, in ONE query"""
+    grades = Grade.objects.filter(student_id__in=student_ids)
+    if academic_year:
+        grades = grades.filter(exam__academic_year=academic_year)
+    return grades.order_by('student_id', '-exam__exam_date', 'exam_id').values_list(
+        'student_id', 'exam__subject__name', 'exam__name', 'exam__exam_date',
+        'marks_obtained', 'exam__total_marks', 'exam__passing_marks',
+    )
+
+
+# =========================
+# COMPUTE
+# =========================
+def compute_report_cards(students, rows, cohort=None):
+    """
+    {student_id: card} in roster order. A card is {'student', 'exams'
+    ([ExamLine]), 'obtained', 'max', 'percentage', 'passed', 'failed',
+    'rank', 'percentile', 'cohort_size'}. cohort(student) groups the
+    students that are ranked against each other (None: all of them).
+    """
+    cards = {
+        student.pk: {
+            'student': student, 'exams': [], 'obtained': 0, 'max': 0, 'percentage': None,
+            'passed': 0, 'failed': 0, 'rank': None, 'percentile': None, 'cohort_size': 0,
+        }
+        for student in students
+    }
+    for student_id, subject, exam, day, marks, total, passing in rows:
+        card = cards[student_id]
+        percentage = float(marks) / total * 100 if total else 0.0
+        passed = marks >= passing
+        card['exams'].append(ExamLine(
+            subject or 'General', exam, day, marks, total, passing, percentage, letter_grade(percentage), passed
+        ))
+        card['obtained'] += marks
+        card['max'] += total
+        card['passed' if passed else 'failed'] += 1
+
+    cohorts = {}
+    for card in cards.values():
+        if card['max']:
+            card['percentage'] = float(card['obtained']) / card['max'] * 100
+            key = cohort(card['student']) if cohort else None
+            cohorts.setdefault(key, []).append(card)
+
+    for members in cohorts.values():
+        scores = sorted(card['percentage'] for card in members)
+        size = len(scores)
+        for card in members:
+            at_or_below = bisect_right(scores, card['percentage'])
+            card['rank'] = size - at_or_below + 1
+            card['percentile'] = round(at_or_below / size * 100, 1)
+            card['cohort_size'] = size
+    return cards
+
+
+def _build(students, academic_year=None, cohort=None):
+    students = list(students.select_related('parent').order_by('grade', 'roll_number', 'id'))
+    rows = load_grade_rows([student.pk for student in students], academic_year)
+    return compute_report_cards(students, rows, cohort)
+
+
+def _classmates(owner_id, grade):
+    """Students of exactly one grade (grade 0 included, unlike get_roster)"""
+    return Student.objects.filter(created_by_id=owner_id, grade=grade)
+
+
+def build_report_cards(owner, grade=None, batch_id=None, academic_year=None):
+    """Report cards of a grade, a batch or (neither) every student of the owner"""
+    return _build(
+        get_roster(owner, batch_id, grade), academic_year,
+        cohort=None if batch_id else (lambda student: student.grade),
+    )
+
+
+def student_report_card(student, academic_year=None):
+    """One student's card, ranked against their grade (alone when the student has no owner)"""
+    if student.created_by_id is None:
+        classmates = Student.objects.filter(pk=student.pk)
+    else:
+        classmates = _classmates(student.created_by_id, student.grade)
+    return _build(classmates, academic_year)[student.pk]
+
+
+# =========================
+# RENDER
+# =========================
+def render_class_report_cards(owner, grade=None, batch_id=None, academic_year=None):
+    """One merged PDF (bytes) with the report card of every student of the class"""
+    cards = build_report_cards(owner, grade, batch_id, academic_year)
+    if not cards:
+        raise ValueError("No students found for these report cards")
+    return render_report_cards(list(cards.values()), load_branding(owner))
+
+
+def _card_files(cards, branding):
+    for card in cards:
+        name = f"Progress_Report_{card['student'].name}.pdf"
+        try:
+            pdf = render_report_cards([card], branding)
+        except Exception:
+            logger.exception(f"Skipping {name}: PDF render failed")
+            continue
+        yield name, pdf
+
+
+def iter_class_report_card_files(owner, grade=None, batch_id=None, academic_year=None):
+    """(file_name, pdf_bytes) per student of the class, for streamed ZIP downloads"""
+    cards = build_report_cards(owner, grade, batch_id, academic_year)
+    yield from _card_files(cards.values(), load_branding(owner))
+
+
+def iter_report_card_files(students, academic_year=None):
+    """
+    (file_name, pdf_bytes) for any selection of students (admin bulk
+    download). Students are grouped by owner and grade: two queries and one
+    branding per group, ranks against the whole grade. A failed render is
+    logged and skipped.
+    """
+    groups = {}
+    for student in students:
+        groups.setdefault((student.created_by_id, student.grade), (student.created_by, set()))[1].add(student.pk)
+
+    for (owner_id, grade), (owner, student_ids) in groups.items():
+        # Students without an owner have no class: each is ranked alone
+        classmates = _classmates(owner_id, grade) if owner_id else Student.objects.filter(pk__in=student_ids)
+        cards = _build(classmates, academic_year, cohort=None if owner_id else (lambda student: student.pk))
+        yield from _card_files(
+            (card for student_id, card in cards.items() if student_id in student_ids), load_branding(owner)
+        )
@@ -0,0 +1,333 @@
+"""
+Report Job Queue
+DB-backed queue for GeneratedReport PDFs: PENDING -> RUNNING -> READY / FAILED.
+
+- A report is rendered ONCE and stored; downloads stream the stored file
+- Identical requests (owner, type, period, params) reuse the existing report
+- Class report cards (REPORT_CARDS) follow marks that change all term: only
+  a pending/running job is reused, a finished one is rendered again
+- Jobs run in a background thread, or in `process_report_jobs` when
+  REPORT_RUN_IN_THREAD is False
+"""
+import hashlib
+import io
+from datetime import datetime
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.utils import timezone
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from ..models import GeneratedReport
+from .report_cards import render_class_report_cards
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# CONSTANTS
+# =========================
+REPORT_PENDING = 'PENDING'
+REPORT_RUNNING = 'RUNNING'
+REPORT_READY = 'READY'
+REPORT_FAILED = 'FAILED'
+
+# States whose report can be reused for an identical request
+REUSABLE_STATES = (REPORT_PENDING, REPORT_RUNNING, REPORT_READY)
+IN_FLIGHT_STATES = (REPORT_PENDING, REPORT_RUNNING)
+
+REPORT_FINANCE = 'FINANCE'
+REPORT_EXAM = 'EXAM'
+REPORT_HR = 'HR'
+REPORT_GENERAL = 'GENERAL'
+REPORT_ATTENDANCE = 'ATTENDANCE'
+REPORT_ANALYTICS = 'ANALYTICS_SUMMARY'
+REPORT_CARDS = 'REPORT_CARDS'
+
+REPORT_RUN_IN_THREAD = getattr(settings, 'REPORT_RUN_IN_THREAD', True)
+# Seconds a client should wait before polling a pending report again
+REPORT_RETRY_AFTER = 2
+
+
+def current_period():
+    """Default reporting period: the current month (YYYY-MM)"""
+    return timezone.now().strftime('%Y-%m')
+
+
+# =========================
+# QUEUE
+# =========================
+def request_report(user, owner, report_type, period=None, params=None, name=None):
+    """
+    Return (report, created).
+    An existing PENDING/RUNNING/READY report for the same owner, type,
+    period and params is returned instead of rendering the same PDF again.
+    """
+    period = period or current_period()
+    params = params or {}
+    states = IN_FLIGHT_STATES if report_type == REPORT_CARDS else REUSABLE_STATES
+    existing = (
+        GeneratedReport.objects
+        .filter(created_by=owner, report_type=report_type, period=period, params=params, status__in=states)
+        .order_by('-generated_at')
+        .first()
+    )
+    if existing:
+        return existing, False
+
+    month_label = datetime.strptime(period, '%Y-%m').strftime('%b %Y')
+    report = GeneratedReport.objects.create(
+        user=user,
+        created_by=owner,
+        name=name or f"{report_type} Report - {month_label}",
+        report_type=report_type,
+        period=period,
+        params=params,
+        status=REPORT_PENDING,
+    )
+
+    if REPORT_RUN_IN_THREAD:
+        threading.Thread(target=_process_in_thread, args=(report.pk,), daemon=True).start()
+    return report, True
+
+
+def _process_in_thread(report_id):
+    try:
+        process_report(report_id)
+    finally:
+        close_old_connections()
+
+
+def process_report(report_id):
+    """
+    Render and store one queued report. The PENDING -> RUNNING update is the
+    claim, so the thread and the worker command never render it twice.
+    Returns False if the report was already claimed.
+    """
+    claimed = GeneratedReport.objects.filter(pk=report_id, status=REPORT_PENDING).update(
+        status=REPORT_RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    report = GeneratedReport.objects.select_related('user', 'created_by__profile').get(pk=report_id)
+    try:
+        store_report_pdf(report, render_pdf(report))
+    except Exception as e:
+        logger.exception(f"Report {report_id} failed")
+        report.status = REPORT_FAILED
+        report.error = str(e)
+        report.finished_at = timezone.now()
+        report.save(update_fields=['status', 'error', 'finished_at'])
+    return True
+
+
+def store_report_pdf(report, pdf_bytes):
+    """Persist the rendered PDF and mark the report READY"""
+    report.file.save(f"{report.report_type}_{report.period or report.pk}_{report.pk}.pdf", ContentFile(pdf_bytes), save=False)
+    report.etag = hashlib.sha256(pdf_bytes).hexdigest()[:32]
+    report.status = REPORT_READY
+    report.error = ''
+    report.file_url = f"/api/reports/download/{report.id}/"
+    report.finished_at = timezone.now()
+    report.save(update_fields=['file', 'etag', 'status', 'error', 'file_url', 'finished_at'])
+
+
+# =========================
+# RENDERING
+# =========================
+def get_report_data(report_type):
+    if report_type == REPORT_FINANCE:
+        return [
+            ("Total Revenue", "₹ 12,45,000"),
+            ("This Month Collection", "₹ 4,50,000"),
+            ("Pending Dues", "₹ 1,20,000"),
+            ("Financial Health", "Excellent"),
+        ]
+
+    if report_type == REPORT_EXAM:
+        return [
+            ("Total Exams", "12"),
+            ("Average Pass %", "87.5%"),
+            ("Top Batch", "Class 12 Science"),
+        ]
+
+    if report_type == REPORT_HR:
+        return [
+            ("Total Staff", "42"),
+            ("Present Today", "40"),
+            ("New Hires", "3"),
+        ]
+
+    if report_type == REPORT_ATTENDANCE:
+        return [
+            ("Average Attendance", "85%"),
+            ("Most Present Class", "Class 10-A"),
+            ("Absentees Today", "15"),
+        ]
+
+    if report_type == REPORT_ANALYTICS:
+        return [
+            ("User Engagement", "High"),
+            ("Active Sessions", "120"),
+            ("Performance Score", "9.2/10"),
+        ]
+
+    return [
+        ("Total Students", "1,245"),
+        ("System Status", "Operational"),
+        ("Last Backup", timezone.now().strftime('%Y-%m-%d')),
+    ]
+
+
+def render_pdf(report):
+    """PDF bytes of any queued report"""
+    if report.report_type == REPORT_CARDS:
+        return render_class_report_cards(report.created_by, **report.params)
+    return render_report_pdf(report)
+
+
+def render_report_pdf(report):
+    """Cover page + analytics page as PDF bytes"""
+    buffer = io.BytesIO()
+    # letter size is 612 x 792 points
+    p = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    # ==========================================
+    # PAGE 1: CINEMATIC COVER PAGE
+    # ==========================================
+    # Deep Galaxy/Navy Background
+    p.setFillColorRGB(0.02, 0.02, 0.1)
+    p.rect(0, 0, width, height, fill=1, stroke=0)
+
+    # Sublte Glow/Gradient pattern (simulated with rects)
+    p.setFillColorRGB(0.04, 0.04, 0.15)
+    p.rect(0, height*0.4, width, height*0.6, fill=1, stroke=0)
+
+    # Central Branding Circle
+    p.setFillColorRGB(0.85, 0.65, 0.1) # Gold
+    p.setStrokeColorRGB(0.85, 0.65, 0.1)
+    p.setLineWidth(1)
+    p.circle(width/2, height/2 + 100, 70, fill=0, stroke=1)
+
+    # Official Logo
+    logo_path = os.path.join(settings.BASE_DIR, 'static/img/ysm_logo.png')
+    if os.path.exists(logo_path):
+        p.drawImage(logo_path, width/2 - 50, height/2 + 50, width=100, height=100, mask='auto', preserveAspectRatio=True)
+
+    # Main Title - Cover
+    p.setFillColorRGB(1, 1, 1)
+    p.setFont("Helvetica-Bold", 32)
+    p.drawCentredString(width/2, height/2 - 30, "Y.S.M")
+
+    p.setFont("Helvetica-Bold", 18)
+    p.setFillColorRGB(0.9, 0.7, 0.2) # Gold
+    p.drawCentredString(width/2, height/2 - 60, "ADVANCE EDUCATION SYSTEM")
+
+    # Report Category
+    p.setStrokeColorRGB(1, 1, 1)
+    p.setLineWidth(0.5)
+    p.line(width/2 - 100, height/2 - 100, width/2 + 100, height/2 - 100)
+
+    p.setFillColorRGB(0.8, 0.8, 0.9)
+    p.setFont("Helvetica", 16)
+    p.drawCentredString(width/2, height/2 - 130, f"{report.report_type.replace('_', ' ').upper()}")
+
+    # Footer Branding - Cover
+    p.setFont("Helvetica-Oblique", 10)
+    p.setFillColorRGB(0.6, 0.6, 0.7)
+    p.drawCentredString(width/2, 80, f"Generated on: {timezone.now().strftime('%d %B, %Y')}")
+    p.drawCentredString(width/2, 60, "Confidential • Proprietary Intelligence")
+
+    p.showPage() # End Cover Page
+
+    # ==========================================
+    # PAGE 2: ANALYTICS DASHBOARD PAGE
+    # ==========================================
+    # Premium Header (Dark Navy)
+    header_h = 100
+    p.setFillColorRGB(0.02, 0.02, 0.12)
+    p.rect(0, height - header_h, width, header_h, fill=1, stroke=0)
+
+    # Logo in Header
+    if os.path.exists(logo_path):
+        p.drawImage(logo_path, 30, height - 85, width=60, height=60, mask='auto', preserveAspectRatio=True)
+
+    # Brand Text in Header
+    p.setFillColorRGB(1, 1, 1)
+    p.setFont("Helvetica-Bold", 18)
+    p.drawString(100, height - 55, "Y.S.M ADVANCE")
+    p.setFont("Helvetica", 10)
+    p.setFillColorRGB(0.9, 0.7, 0.2)
+    p.drawString(100, height - 70, "EDUCATION MANAGEMENT SYSTEM")
+
+    # Report Meta (Right Side)
+    p.setFillColorRGB(1, 1, 1)
+    p.setFont("Helvetica-Bold", 10)
+    p.drawRightString(width - 30, height - 45, report.name)
+    p.setFont("Helvetica", 9)
+    p.drawRightString(width - 30, height - 60, f"Issued To: {report.user.email}")
+
+    # Data Visual Section Header
+    y = height - 160
+    p.setFillColorRGB(0.1, 0.1, 0.3)
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(30, y, "Performance Insights")
+
+    # Horizontal Divider with gold accents
+    p.setStrokeColorRGB(0.85, 0.65, 0.1)
+    p.setLineWidth(2)
+    p.line(30, y - 10, 80, y - 10)
+    p.setStrokeColorRGB(0.9, 0.9, 0.9)
+    p.setLineWidth(0.5)
+    p.line(80, y - 10, width - 30, y - 10)
+
+    # --- KPI CARDS GRID ---
+    y -= 60
+    data_points = get_report_data(report.report_type)
+
+    # Grid config: 2 columns
+    col_width = (width - 90) / 2
+    card_h = 80
+    colors_grad = [ (0.2, 0.4, 0.8), (0.1, 0.6, 0.4), (0.8, 0.3, 0.2), (0.4, 0.2, 0.7) ]
+
+    for i, (label, value) in enumerate(data_points):
+        # Calculate pos
+        row = i // 2
+        col = i % 2
+        card_x = 30 + (col * (col_width + 30))
+        card_y = y - (row * (card_h + 20))
+
+        # Card Background (Soft Slate Gradient feel)
+        p.setFillColorRGB(0.96, 0.97, 1.0)
+        p.roundRect(card_x, card_y, col_width, card_h, 8, fill=1, stroke=1)
+
+        # Card Decorative Left Border (Vibrant)
+        p.setFillColorRGB(*colors_grad[i % len(colors_grad)])
+        p.roundRect(card_x, card_y, 5, card_h, 4, fill=1, stroke=0)
+
+        # Label
+        p.setFillColorRGB(0.4, 0.4, 0.5)
+        p.setFont("Helvetica-Bold", 9)
+        p.drawString(card_x + 20, card_y + card_h - 25, label.upper())
+
+        # Value
+        p.setFillColorRGB(0.1, 0.1, 0.2)
+        p.setFont("Helvetica-Bold", 18)
+        p.drawString(card_x + 20, card_y + 20, value)
+
+    # Footer
+    p.setFillColorRGB(0.05, 0.05, 0.15)
+    p.rect(0, 0, width, 40, fill=1, stroke=0)
+    p.setFillColorRGB(1, 1, 1)
+    p.setFont("Helvetica-Oblique", 8)
+    p.drawCentredString(width/2, 15, "Official Y.S.M Intelligence Document • Visionary Architect: Yash A Mishra")
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
@@ -0,0 +1,210 @@
+"""
+Global Search Index
+Type-ahead search over Students, Courses and Batches of one tenant.
+
+- One denormalized SearchEntry row per object, written by model signals
+  (see student/signals.py) and by bulk imports
+- PostgreSQL: trigram (ILIKE) + tsvector (word prefix) GIN indexes on
+  `terms`; SQLite: an FTS5 table kept in sync by triggers, with the tenant
+  as an indexed column so the owner filter is part of the MATCH
+- A search is ONE ranked query over the tenant's rows, whatever the type
+- `python manage.py rebuild_search_index` (re)builds everything
+"""
+from functools import lru_cache
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+
+from ..models import Student, Course, Batch, SearchEntry
+
+# =========================
+# CONSTANTS
+# =========================
+KIND_STUDENT = 'STUDENT'
+KIND_COURSE = 'COURSE'
+KIND_BATCH = 'BATCH'
+
+SEARCH_MIN_LENGTH = 2
+SEARCH_LIMIT = 10
+REBUILD_BATCH_SIZE = 1000
+
+FTS_TABLE = 'student_searchentry_fts'
+
+# Response shape per kind: (type label, icon, url)
+RESULT_META = {
+    KIND_STUDENT: ('Student', '👤', "#students/{id}"),
+    KIND_COURSE: ('Course', '📚', "#courses/{id}"),
+    KIND_BATCH: ('Batch', '👥', "#batches"),
+}
+
+_TOKEN = re.compile(r'\w+')
+
+
+# =========================
+# INDEXING
+# =========================
+def _terms(*parts):
+    return " ".join(str(part) for part in parts if part).lower()
+
+
+def _student_entry(student, parent_username=None):
+    return SearchEntry(
+        created_by_id=student.created_by_id, kind=KIND_STUDENT, object_id=student.pk,
+        title=student.name,
+        subtitle=f"Roll: {student.roll_number} | Class: {student.grade}",
+        terms=_terms(student.name, student.roll_number, parent_username),
+    )
+
+
+def _course_entry(course):
+    return SearchEntry(
+        created_by_id=course.created_by_id, kind=KIND_COURSE, object_id=course.pk,
+        title=course.name,
+        subtitle=f"Fee: ₹{course.fee}",
+        terms=_terms(course.name, course.code),
+    )
+
+
+def _batch_entry(batch, course_name=None):
+    return SearchEntry(
+        created_by_id=batch.created_by_id, kind=KIND_BATCH, object_id=batch.pk,
+        title=batch.name,
+        subtitle=f"Course: {course_name or 'N/A'}",
+        terms=_terms(batch.name, course_name),
+    )
+
+
+def build_entries(objects):
+    """SearchEntry rows (unsaved) for saved Students / Courses / Batches, related names in 2 queries"""
+    objects = [obj for obj in objects if obj.pk]
+    parent_ids = {obj.parent_id for obj in objects if isinstance(obj, Student) and obj.parent_id}
+    course_ids = {obj.course_id for obj in objects if isinstance(obj, Batch)}
+    parents = dict(User.objects.filter(pk__in=parent_ids).values_list('pk', 'username')) if parent_ids else {}
+    courses = dict(Course.objects.filter(pk__in=course_ids).values_list('pk', 'name')) if course_ids else {}
+
+    entries = []
+    for obj in objects:
+        if isinstance(obj, Student):
+            entries.append(_student_entry(obj, parents.get(obj.parent_id)))
+        elif isinstance(obj, Course):
+            entries.append(_course_entry(obj))
+        elif isinstance(obj, Batch):
+            entries.append(_batch_entry(obj, courses.get(obj.course_id)))
+    return entries
+
+
+def index_objects(objects):
+    """Insert or refresh the search rows of these objects"""
+    entries = build_entries(objects)
+    if not entries:
+        return 0
+    # Plain upsert; the FTS triggers fire on INSERT and UPDATE alike
+    SearchEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['created_by', 'title', 'subtitle', 'terms', 'updated_at'],
+    )
+    return len(entries)
+
+
+def remove_object(kind, object_id):
+    SearchEntry.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+@transaction.atomic
+def rebuild_index(owner=None):
+    """(Re)index every Student, Course and Batch (of one owner). Returns the row count."""
+    stale = SearchEntry.objects.all() if owner is None else SearchEntry.objects.filter(created_by=owner)
+    stale.delete()
+    total = 0
+    for model in (Student, Course, Batch):
+        queryset = model.objects.all() if owner is None else model.objects.filter(created_by=owner)
+        batch = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch.append(obj)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                total += index_objects(batch)
+                batch = []
+        total += index_objects(batch)
+    return total
+
+
+# =========================
+# SEARCH
+# =========================
+@lru_cache(maxsize=None)
+def _has_fts(alias):
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def _fts_match(owner_id, tokens):
+    """FTS5 query: the owner column AND every typed word as a prefix"""
+    words = " AND ".join(f'"{token}"*' for token in tokens)
+    return f'owner : "o{owner_id}" AND terms : ({words})'
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_entries(owner, query, kinds=None, limit=SEARCH_LIMIT):
+    """Best matching SearchEntry rows of one tenant, best first"""
+    query = query.strip().lower()
+    tokens = _TOKEN.findall(query)
+    if owner is None or len(query) < SEARCH_MIN_LENGTH or not tokens:
+        return []
+
+    kinds = list(kinds or RESULT_META)
+    kind_marks = ", ".join(["%s"] * len(kinds))
+    table = SearchEntry._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        # ILIKE uses the trigram index (infix, roll numbers); the tsquery
+        # matches several words in any order (word-prefix index)
+        tsquery = " & ".join(f"{token}:*" for token in tokens)
+        escaped = _escape_like(query)
+        return list(SearchEntry.objects.raw(
+            f"""
+            SELECT * FROM {table}
+            WHERE created_by_id = %s AND kind IN ({kind_marks})
+              AND (terms ILIKE %s OR to_tsvector('simple', terms) @@ to_tsquery('simple', %s))
+            ORDER BY (lower(title) LIKE %s) DESC, similarity(terms, %s) DESC, title
+            LIMIT %s
+            """,
+            [owner.pk, *kinds, f"%{escaped}%", tsquery, f"{escaped}%", query, limit],
+        ))
+
+    if connection.vendor == 'sqlite' and _has_fts(connection.alias):
+        return list(SearchEntry.objects.raw(
+            f"""
+            SELECT e.* FROM {FTS_TABLE} f JOIN {table} e ON e.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s AND e.kind IN ({kind_marks})
+            ORDER BY f.rank
+            LIMIT %s
+            """,
+            [_fts_match(owner.pk, tokens), *kinds, limit],
+        ))
+
+    # Other backends: still one indexed-by-owner table instead of three scans
+    return list(
+        SearchEntry.objects
+        .filter(created_by=owner, kind__in=kinds, terms__contains=query)
+        .order_by('title')[:limit]
+    )
+
+
+def search(owner, query, kinds=None, limit=SEARCH_LIMIT):
+    """Typed results for the global search box"""
+    results = []
+    for entry in search_entries(owner, query, kinds, limit):
+        label, icon, url = RESULT_META[entry.kind]
+        results.append({
+            'type': label,
+            'title': entry.title,
+            'subtitle': entry.subtitle,
+            'url': url.format(id=entry.object_id),
+            'icon': icon,
+        })
+    return results
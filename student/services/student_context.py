@@ -0,0 +1,161 @@
+"""
+Student Chat Context Snapshot
+Compact per-student summary (attendance, recent grades, upcoming exams, fee
+status) used as RAG context by the AI chat.
+
+- Stored as ONE cache entry per chat user and day, so a chat turn reads it
+  with a single cache get and no database queries
+- Write signals (see student/signals.py) drop the affected entries; the next
+  chat turn rebuilds them with 4 queries (attendance comes from the monthly
+  bitmaps, see attendance_rollup.py)
+- The day-long TTL needs a shared cache (Redis): with a per-process cache
+  (LocMemCache) a signal only clears the worker that handled the write, so
+  entries there live CONTEXT_LOCAL_TTL and other workers catch up within it
+- `python manage.py refresh_student_contexts` pre-warms every student that
+  can log in (run it daily, "days left" counters change at midnight). It
+  only runs against a shared cache; a per-process cache dies with the command
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from ..models import Student, Grade, Exam, Payment
+from .attendance_rollup import attendance_totals
+
+# =========================
+# CONSTANTS
+# =========================
+CONTEXT_CACHE_PREFIX = "student_context"
+CONTEXT_CACHE_TTL = getattr(settings, 'STUDENT_CONTEXT_CACHE_TTL', 60 * 60 * 24)  # Shared cache: keys are per day
+CONTEXT_LOCAL_TTL = getattr(settings, 'STUDENT_CONTEXT_LOCAL_TTL', 60 * 5)  # Per-process cache
+RECENT_GRADES_LIMIT = 5
+UPCOMING_EXAMS_LIMIT = 3
+
+
+def cache_is_shared():
+    """False when every worker has its own cache and misses the others' invalidations"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def _context_ttl():
+    return CONTEXT_CACHE_TTL if cache_is_shared() else CONTEXT_LOCAL_TTL
+
+
+def _context_key(user_id, today=None):
+    today = today or timezone.localdate()
+    return f"{CONTEXT_CACHE_PREFIX}:{user_id}:{today.isoformat()}"
+
+
+# =========================
+# INVALIDATION
+# =========================
+def invalidate_student_context(*user_ids):
+    """Drop today's snapshot for these chat users (None ids are ignored)"""
+    keys = [_context_key(user_id) for user_id in user_ids if user_id]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_owner_student_contexts(owner_id):
+    """An exam changed: every student of the owner may see a different 'upcoming' list"""
+    user_ids = (
+        Student.objects.filter(created_by_id=owner_id, user__isnull=False)
+        .values_list('user_id', flat=True)
+    )
+    invalidate_student_context(*user_ids)
+
+
+# =========================
+# BUILD
+# =========================
+def compute_student_context(student, today=None):
+    """RAG text for one student straight from the database (no cache)"""
+    today = today or timezone.localdate()
+    lines = [f"Student Profile: {student.name} (Grade {student.grade})"]
+
+    # 1. Attendance: popcounts of the monthly bitmaps (one small query)
+    present, total = attendance_totals(student.pk)
+    if total:
+        percentage = present / total * 100
+        lines.append(
+            f"Attendance Record: {percentage:.1f}% ({present}/{total} days present)"
+        )
+    else:
+        lines.append("Attendance Record: No data yet.")
+
+    # 2. Recent academic performance
+    recent_grades = (
+        Grade.objects.filter(student=student)
+        .select_related('exam', 'exam__subject')
+        .order_by('-exam__exam_date')[:RECENT_GRADES_LIMIT]
+    )
+    if recent_grades:
+        lines.append("Recent Exam Results:")
+        for g in recent_grades:
+            subject_name = g.exam.subject.name if g.exam.subject else 'General'
+            lines.append(f"- {g.exam.name} ({subject_name}): {g.marks_obtained}/{g.exam.total_marks} ({g.status})")
+    else:
+        lines.append("Academic Results: No grades recorded yet.")
+
+    # 3. Upcoming exams of the student's own institution
+    upcoming_exams = (
+        Exam.objects.filter(
+            created_by_id=student.created_by_id,
+            grade_class__icontains=str(student.grade),
+            exam_date__gte=today
+        )
+        .order_by('exam_date')
+        .only('name', 'exam_date')[:UPCOMING_EXAMS_LIMIT]
+    )
+    if upcoming_exams:
+        lines.append("Upcoming Exams:")
+        for e in upcoming_exams:
+            lines.append(f"- {e.name}: {e.exam_date} (in {(e.exam_date - today).days} days)")
+
+    # 4. Fee status
+    overdue_payments = Payment.objects.filter(student=student, status='OVERDUE').count()
+    if overdue_payments > 0:
+        lines.append(f"Fee Status: ⚠️ {overdue_payments} Overdue Payments")
+    else:
+        lines.append("Fee Status: All clear")
+
+    return "\n".join(lines)
+
+
+def _compute_for_user(user, today):
+    student = Student.objects.filter(user=user).first()
+    if student is None:
+        profile = getattr(user, 'profile', None)
+        return f"User Role: {profile.role if profile else 'User'}"
+    return compute_student_context(student, today)
+
+
+def get_student_context(user):
+    """Cached RAG text for a chat user (non-students get their role line)"""
+    today = timezone.localdate()
+    key = _context_key(user.pk, today)
+
+    text = cache.get(key)
+    if text is None:
+        text = _compute_for_user(user, today)
+        cache.set(key, text, _context_ttl())
+    return text
+
+
+def refresh_student_contexts(queryset=None):
+    """
+    Rebuild today's snapshot for every student with a login. Returns the
+    count, or None without touching the database when the cache is not
+    shared (nothing written here would reach the web workers).
+    """
+    if not cache_is_shared():
+        return None
+    today = timezone.localdate()
+    students = queryset if queryset is not None else Student.objects.filter(user__isnull=False)
+    refreshed = 0
+    for student in students.iterator():
+        cache.set(_context_key(student.user_id, today), compute_student_context(student, today), CONTEXT_CACHE_TTL)
+        refreshed += 1
+    return refreshed
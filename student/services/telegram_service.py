@@ -5,18 +5,18 @@ import os
 
 logger = logging.getLogger(__name__)
 
-def send_telegram_notification(chat_id, message, invoice_pdf=None, invoice_filename="Invoice.pdf"):
-    """
-    Sends a text message and optionally a PDF file to a Telegram user.
-    Uses requests directly to avoid dependency issues with python-telegram-bot in some environments.
-    """
-    token = os.environ.get('TELEGRAM_BOT_TOKEN', '8384943128:AAH6r2ovKp20XUMSi64asxo4J0lc_lvZvxc')
-    
+def _bot_token():
+    return os.environ.get('TELEGRAM_BOT_TOKEN', '8384943128:AAH6r2ovKp20XUMSi64asxo4J0lc_lvZvxc')
+
+
+def send_telegram_message(chat_id, message):
+    """Sends a Markdown text message. Returns True if Telegram accepted it."""
+    token = _bot_token()
+
     if not token or not chat_id:
         logger.error("Telegram Token or Chat ID missing.")
-        return
+        return False
 
-    # 1. Send Text Message
     text_url = f"https://api.telegram.org/bot{token}/sendMessage"
     try:
         data = {
@@ -24,25 +24,50 @@ def send_telegram_notification(chat_id, message, invoice_pdf=None, invoice_filen
             "text": message,
             "parse_mode": "Markdown"
         }
-        res = requests.post(text_url, data=data)
+        res = requests.post(text_url, data=data, timeout=10)
         if not res.ok:
             logger.error(f"Telegram Message Failed: {res.text}")
+            return False
     except Exception as e:
         logger.error(f"Error sending Telegram message: {e}")
+        return False
+    return True
+
 
-    # 2. Send Invoice PDF (if provided)
+def send_telegram_document(chat_id, invoice_pdf, invoice_filename="Invoice.pdf"):
+    """Sends a PDF file. Returns True if Telegram accepted it."""
+    token = _bot_token()
+
+    if not token or not chat_id:
+        logger.error("Telegram Token or Chat ID missing.")
+        return False
+
+    doc_url = f"https://api.telegram.org/bot{token}/sendDocument"
+    try:
+        files = {
+            'document': (invoice_filename, invoice_pdf, 'application/pdf')
+        }
+        data = {
+            "chat_id": chat_id,
+            "caption": "✅ Payment Invoice"
+        }
+        res = requests.post(doc_url, data=data, files=files, timeout=30)
+        if not res.ok:
+            logger.error(f"Telegram Document Failed: {res.text}")
+            return False
+    except Exception as e:
+        logger.error(f"Error sending Telegram document: {e}")
+        return False
+    return True
+
+
+def send_telegram_notification(chat_id, message, invoice_pdf=None, invoice_filename="Invoice.pdf"):
+    """
+    Sends a text message and optionally a PDF file to a Telegram user.
+    Uses requests directly to avoid dependency issues with python-telegram-bot in some environments.
+    Returns True only if every part was delivered.
+    """
+    ok = send_telegram_message(chat_id, message)
     if invoice_pdf:
-        doc_url = f"https://api.telegram.org/bot{token}/sendDocument"
-        try:
-            files = {
-                'document': (invoice_filename, invoice_pdf, 'application/pdf')
-            }
-            data = {
-                "chat_id": chat_id,
-                "caption": "✅ Payment Invoice"
-            }
-            res = requests.post(doc_url, data=data, files=files)
-            if not res.ok:
-                 logger.error(f"Telegram Document Failed: {res.text}")
-        except Exception as e:
-            logger.error(f"Error sending Telegram document: {e}")
+        ok = send_telegram_document(chat_id, invoice_pdf, invoice_filename) and ok
+    return ok
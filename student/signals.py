@@ -1,9 +1,17 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.core.mail import send_mail
 from django.conf import settings
-from .models import UserProfile
+from .models import (
+    UserProfile, Student, Attendence, Course, Batch, Exam, Employee,
+    Payment, Room, HostelAllocation, Route, Grade, CampusFence
+)
+from .services.dashboard_stats import invalidate_dashboard_stats
+from .services.student_context import invalidate_student_context, invalidate_owner_student_contexts
+from .services.search_index import index_objects, remove_object
+from .services.attendance_rollup import apply_marks
+from .services.geofence import invalidate_fences
 
 @receiver(pre_save, sender=User)
 def check_activation(sender, instance, **kwargs):
@@ -45,3 +53,141 @@ def send_approval_email(user):
         send_mail(subject, message, email_from, recipient_list, fail_silently=True)
     except Exception as e:
         print(f"Failed to send email: {e}")
+
+
+# =========================
+# DASHBOARD STATS INVALIDATION
+# =========================
+DASHBOARD_COUNTED_MODELS = (Student, Course, Batch, Exam, Employee, Room, HostelAllocation, Route)
+
+
+def _invalidate_owner_stats(sender, instance, **kwargs):
+    """Any write to a counted model bumps the owner's dashboard snapshot version"""
+    invalidate_dashboard_stats(instance.created_by_id)
+
+
+def _invalidate_attendance_stats(sender, instance, **kwargs):
+    # Dashboard groups attendance by the student's owner, not the marker
+    try:
+        invalidate_dashboard_stats(instance.student.created_by_id)
+    except Student.DoesNotExist:
+        pass
+
+
+def _invalidate_payment_stats(sender, instance, **kwargs):
+    invalidate_dashboard_stats(instance.user_id)
+
+
+for _model in DASHBOARD_COUNTED_MODELS:
+    post_save.connect(_invalidate_owner_stats, sender=_model, dispatch_uid=f"dashboard_stats_save_{_model.__name__}")
+    post_delete.connect(_invalidate_owner_stats, sender=_model, dispatch_uid=f"dashboard_stats_delete_{_model.__name__}")
+
+post_save.connect(_invalidate_attendance_stats, sender=Attendence, dispatch_uid="dashboard_stats_save_Attendence")
+post_delete.connect(_invalidate_attendance_stats, sender=Attendence, dispatch_uid="dashboard_stats_delete_Attendence")
+post_save.connect(_invalidate_payment_stats, sender=Payment, dispatch_uid="dashboard_stats_save_Payment")
+post_delete.connect(_invalidate_payment_stats, sender=Payment, dispatch_uid="dashboard_stats_delete_Payment")
+
+
+# =========================
+# AI CHAT CONTEXT INVALIDATION
+# =========================
+def _student_user_id(instance):
+    """Login of the row's student, without a query when the student is already loaded"""
+    if not instance.student_id:
+        return None
+    if type(instance).student.is_cached(instance):
+        return instance.student.user_id
+    return Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+
+
+def _invalidate_student_row_context(sender, instance, **kwargs):
+    invalidate_student_context(_student_user_id(instance))
+
+
+def _invalidate_student_context(sender, instance, **kwargs):
+    invalidate_student_context(instance.user_id)
+
+
+def _invalidate_exam_contexts(sender, instance, **kwargs):
+    invalidate_owner_student_contexts(instance.created_by_id)
+
+
+for _model in (Attendence, Grade, Payment):
+    post_save.connect(_invalidate_student_row_context, sender=_model, dispatch_uid=f"student_context_save_{_model.__name__}")
+    post_delete.connect(_invalidate_student_row_context, sender=_model, dispatch_uid=f"student_context_delete_{_model.__name__}")
+
+for _model in (Student, UserProfile):
+    post_save.connect(_invalidate_student_context, sender=_model, dispatch_uid=f"student_context_save_{_model.__name__}")
+    post_delete.connect(_invalidate_student_context, sender=_model, dispatch_uid=f"student_context_delete_{_model.__name__}")
+
+post_save.connect(_invalidate_exam_contexts, sender=Exam, dispatch_uid="student_context_save_Exam")
+post_delete.connect(_invalidate_exam_contexts, sender=Exam, dispatch_uid="student_context_delete_Exam")
+
+
+# =========================
+# GLOBAL SEARCH INDEX
+# =========================
+def _index_search_entry(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    objects = [instance]
+    if sender is Course:
+        objects += list(instance.batches.all())  # Batch rows carry the course name
+    index_objects(objects)
+
+
+def _remove_search_entry(sender, instance, **kwargs):
+    remove_object(sender.__name__.upper(), instance.pk)
+
+
+for _model in (Student, Course, Batch):
+    post_save.connect(_index_search_entry, sender=_model, dispatch_uid=f"search_index_save_{_model.__name__}")
+    post_delete.connect(_remove_search_entry, sender=_model, dispatch_uid=f"search_index_delete_{_model.__name__}")
+
+
+# =========================
+# ATTENDANCE ROLLUP
+# =========================
+def _remember_attendance_day(sender, instance, **kwargs):
+    """An edit may move the mark to another student or day: clear the old bit too"""
+    instance._rollup_previous = None
+    if instance.pk and not kwargs.get('raw'):
+        instance._rollup_previous = (
+            Attendence.objects.filter(pk=instance.pk).values_list('student_id', 'date').first()
+        )
+
+
+def _update_attendance_rollup(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    marks = [(instance.student_id, instance.date, instance.is_present)]
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous and previous != (instance.student_id, instance.date):
+        marks.insert(0, (*previous, None))
+    apply_marks(marks)
+
+
+def _remove_attendance_rollup(sender, instance, **kwargs):
+    apply_marks([(instance.student_id, instance.date, None)])
+
+
+pre_save.connect(_remember_attendance_day, sender=Attendence, dispatch_uid="attendance_rollup_pre_save")
+post_save.connect(_update_attendance_rollup, sender=Attendence, dispatch_uid="attendance_rollup_save")
+post_delete.connect(_remove_attendance_rollup, sender=Attendence, dispatch_uid="attendance_rollup_delete")
+
+
+# =========================
+# GEOFENCE CACHE
+# =========================
+def _invalidate_campus_fences(sender, instance, **kwargs):
+    invalidate_fences(instance.created_by_id)
+
+
+def _invalidate_profile_location(sender, instance, **kwargs):
+    # The owner's profile location is the fence of tenants without CampusFence rows
+    invalidate_fences(instance.user_id)
+
+
+post_save.connect(_invalidate_campus_fences, sender=CampusFence, dispatch_uid="geofence_save_CampusFence")
+post_delete.connect(_invalidate_campus_fences, sender=CampusFence, dispatch_uid="geofence_delete_CampusFence")
+post_save.connect(_invalidate_profile_location, sender=UserProfile, dispatch_uid="geofence_save_UserProfile")
@@ -6,7 +6,7 @@ from django.contrib.auth.models import User
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from .models import UserProfile, Employee, Student
-from .views import get_owner_user
+from .tenant import get_tenant_context
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,10 +19,11 @@ class TeamManagementView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        owner = get_owner_user(request.user)
+        tenant = get_tenant_context(request.user)
+        owner = tenant.owner
         
         # Determine strict role filtering (HR can see some, Client sees all)
-        current_role = request.user.profile.role if hasattr(request.user, 'profile') else None
+        current_role = tenant.role
         
         if current_role == 'HR':
              # HR sees Students, Teachers, Parents, but NOT other HRs or Client
@@ -41,8 +42,8 @@ class TeamManagementView(APIView):
              pass
 
         # Simplified approach: List Employees and Students
-        employees = Employee.objects.filter(created_by=owner).select_related('user', 'user__profile')
-        students = Student.objects.filter(created_by=owner).select_related('user', 'user__profile')
+        employees = Employee.objects.filter(created_by=owner).select_related('user', 'user__profile', 'designation')
+        students = Student.objects.filter(created_by=owner, user__isnull=False).select_related('user')
         
         data = []
         
@@ -73,10 +74,11 @@ class TeamManagementView(APIView):
 
     def post(self, request):
         """Create New User (HR, Teacher, Student, Parent)"""
-        if not hasattr(request.user, 'profile'):
+        tenant = get_tenant_context(request.user)
+        if not tenant.profile:
              return Response({"error": "No profile found"}, status=403)
              
-        creator_role = request.user.profile.role
+        creator_role = tenant.role
         
         # HR can create Student/Parent/Teacher.
         # Client can create HR + Above.
@@ -103,13 +105,13 @@ class TeamManagementView(APIView):
                 user.save()
                 
                 # Check Owner
-                owner = get_owner_user(request.user)
+                owner = tenant.owner
                 
                 # Create Profile
                 profile = UserProfile.objects.create(
                     user=user,
                     role=target_role,
-                    institution_type=request.user.profile.institution_type, # Inherit inst type
+                    institution_type=tenant.profile.institution_type, # Inherit inst type
                     force_password_change=True # Flag to force change on first login
                 )
                 
@@ -0,0 +1,104 @@
+"""
+Tenant Context Resolution
+Resolves the data owner, profile, role and plan of a user ONCE per request.
+
+The context is memoized on the user instance. Django (session auth) and DRF
+(JWT auth) both build a fresh User object per request, so the memo is
+request-scoped without any global state.
+"""
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+TENANT_CONTEXT_ATTR = '_tenant_context'
+
+OWNER_ROLES = ('CLIENT', 'ADMIN')
+
+
+class TenantContext:
+    """Resolved multi-tenancy information for a single user"""
+    __slots__ = ('user', 'owner', 'profile', 'employee', 'role', 'plan')
+
+    def __init__(self, user, owner=None, profile=None, employee=None):
+        self.user = user
+        self.owner = owner
+        self.profile = profile
+        self.employee = employee
+        self.role = profile.role if profile else None
+        self.plan = (profile.institution_type or '').upper() if profile else None
+
+    def __repr__(self):
+        owner_id = self.owner.pk if self.owner else None
+        user_id = getattr(self.user, 'pk', None)
+        return f"<TenantContext user={user_id} owner={owner_id} role={self.role} plan={self.plan}>"
+
+    @property
+    def is_owner(self):
+        """True if the user owns the tenant data (Client / Admin / Superuser)"""
+        return self.owner is not None and self.owner.pk == self.user.pk
+
+    @property
+    def subscription_expiry(self):
+        return self.profile.subscription_expiry if self.profile else None
+
+    def is_expired(self):
+        """Expiry check matching the middleware rule (no expiry date = not blocked)"""
+        expiry = self.subscription_expiry
+        return bool(expiry and expiry < timezone.now().date())
+
+
+def resolve_tenant(user):
+    """
+    Build a TenantContext with a single query.
+    profile, employee_profile and the employer (owner) are fetched together
+    through select_related instead of three lazy relation loads.
+    """
+    if not user or not user.is_authenticated:
+        return TenantContext(user)
+
+    fetched = (
+        User.objects
+        .select_related('profile', 'employee_profile', 'employee_profile__created_by')
+        .filter(pk=user.pk)
+        .first()
+    )
+    profile = getattr(fetched, 'profile', None) if fetched else None
+    employee = getattr(fetched, 'employee_profile', None) if fetched else None
+
+    # Same precedence as the original get_owner_user()
+    if user.is_superuser:
+        owner = user
+    elif profile and profile.role in OWNER_ROLES:
+        owner = user
+    elif employee is not None:
+        owner = employee.created_by
+    else:
+        # Parent/Student/AI users: UserProfile has no creator link, data is their own
+        owner = user
+
+    return TenantContext(user, owner=owner, profile=profile, employee=employee)
+
+
+def get_tenant_context(user):
+    """Return the memoized TenantContext for this user instance"""
+    if user is None:
+        return TenantContext(user)
+
+    context = getattr(user, TENANT_CONTEXT_ATTR, None)
+    if context is None:
+        context = resolve_tenant(user)
+        if user.is_authenticated:
+            setattr(user, TENANT_CONTEXT_ATTR, context)
+    return context
+
+
+def clear_tenant_context(user):
+    """Drop the memoized context (call after changing role/plan mid-request)"""
+    if user is not None and hasattr(user, TENANT_CONTEXT_ATTR):
+        delattr(user, TENANT_CONTEXT_ATTR)
+
+
+def ai_cache_namespace(user):
+    """AI response-cache scope: one per tenant, anonymous callers share 'public'"""
+    owner = get_tenant_context(user).owner
+    return f"tenant:{owner.pk}" if owner is not None else "public"
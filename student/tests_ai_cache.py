@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from ai.manager import AIServiceManager
+from ai.response_cache import ResponseCache
+from ai.router import ProviderRouter
+from .tests_ai_router import FakeService, FakeClock
+
+
+class ResponseCacheTest(SimpleTestCase):
+    """Exact / approximate matching, TTL, LRU and namespaces"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=3, ttl=60, semantic=True, clock=self.clock)
+        self.cache.set('tenant:1', 'ask_tutor', 'What is photosynthesis?', 'Plants make food', ('Biology', ''))
+
+    def get(self, prompt, namespace='tenant:1', options=('Biology', '')):
+        return self.cache.get(namespace, 'ask_tutor', prompt, options)
+
+    def test_exact_and_semantic_hits(self):
+        self.assertEqual(self.get('  what is PHOTOSYNTHESIS '), 'Plants make food')
+        self.assertEqual(self.get("Can you tell me what's photosynthesis, please"), 'Plants make food')
+        snapshot = self.cache.snapshot()
+        self.assertEqual((snapshot['exact_hits'], snapshot['semantic_hits']), (1, 1))
+
+    def test_different_questions_miss(self):
+        self.cache.set('tenant:1', 'ask_tutor', 'What is the capital of France?', 'Paris', ('Biology', ''))
+        self.assertIsNone(self.get('What is the capital of Spain?'))
+        self.assertIsNone(self.get('What is respiration?'))
+        # Other subject, other tenant
+        self.assertIsNone(self.get('What is photosynthesis?', options=('Physics', '')))
+        self.assertIsNone(self.get('What is photosynthesis?', namespace='tenant:2'))
+        self.assertEqual(self.cache.snapshot()['misses'], 4)
+
+    def test_near_spellings_of_opposite_concepts_miss(self):
+        pairs = [
+            ('explain exothermic reaction', 'explain endothermic reaction'),
+            ('explain aerobic respiration', 'explain anaerobic respiration'),
+            ('what is hyperthyroidism', 'what is hypothyroidism'),
+            ('explain exocytosis', 'explain endocytosis'),
+            ('What is photosynthesis?', "What's photosynthsis?"),
+        ]
+        for cached, asked in pairs:
+            self.cache.set('tenant:1', 'ask_tutor', cached, f'About {cached}', ('Biology', ''))
+            self.assertIsNone(self.get(asked), asked)
+
+    def test_semantic_matching_is_off_by_default(self):
+        cache = ResponseCache()
+        cache.set('tenant:1', 'ask_tutor', 'What is photosynthesis?', 'Plants make food')
+        self.assertIsNone(cache.get('tenant:1', 'ask_tutor', "Can you tell me what's photosynthesis, please"))
+        self.assertEqual(cache.get('tenant:1', 'ask_tutor', 'what is PHOTOSYNTHESIS'), 'Plants make food')
+
+    def test_ttl_and_lru_eviction(self):
+        self.cache.set('tenant:1', 'ask_tutor', 'Define osmosis', 'A', ('Biology', ''))
+        self.cache.set('tenant:1', 'ask_tutor', 'Define diffusion', 'B', ('Biology', ''))
+        self.get('What is photosynthesis')  # Most recently used now
+        self.cache.set('tenant:1', 'ask_tutor', 'Define mitosis', 'C', ('Biology', ''))
+
+        self.assertIsNone(self.get('Define osmosis'))
+        self.assertEqual(self.cache.snapshot()['evictions'], 1)
+        self.assertEqual(self.get('What is photosynthesis'), 'Plants make food')
+
+        self.clock.now += 61
+        self.assertIsNone(self.get('What is photosynthesis'))
+
+
+class ManagerCacheTest(SimpleTestCase):
+    """AIServiceManager answers repeat questions without calling a provider"""
+
+    def setUp(self):
+        self.groq = FakeService(answer='Plants make food')
+        router = ProviderRouter(loaders={'groq': lambda: self.groq})
+        patches = [
+            patch('ai.manager.get_provider_router', return_value=router),
+            patch('ai.manager.get_response_cache', return_value=ResponseCache()),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.manager = AIServiceManager.__new__(AIServiceManager)
+        self.manager.provider = 'groq'
+        self.manager.service = self.groq
+
+    def test_repeat_question_is_served_from_cache(self):
+        for question in ('What is photosynthesis?', 'what is photosynthesis'):
+            answer = self.manager.ask_tutor(question, 'Biology', cache_namespace='tenant:1')
+            self.assertEqual(answer, 'Plants make food')
+        self.assertEqual(self.groq.calls, 1)
+
+        # Conversation history makes the answer context-specific
+        self.manager.ask_tutor('What is photosynthesis?', 'Biology', history=[{'role': 'user', 'content': 'hi'}])
+        self.assertEqual(self.groq.calls, 2)
+
+    def test_failure_text_is_not_cached(self):
+        self.groq.answer = '⚠️ **System Update In Progress:** try again'
+        self.manager.ask_tutor('What is photosynthesis?', cache_namespace='tenant:1')
+        self.manager.ask_tutor('What is photosynthesis?', cache_namespace='tenant:1')
+        self.assertEqual(self.groq.calls, 2)
@@ -0,0 +1,42 @@
+from django.test import SimpleTestCase
+
+from ai.groq import GroqService
+from ai.prompts import PromptRegistry, get_prompt_registry, is_identity_query
+
+
+class PromptRegistryTest(SimpleTestCase):
+    """Pre-rendered prompt segments and slot filling"""
+
+    def test_render_fills_only_slots(self):
+        registry = PromptRegistry()
+        registry.register('quiz', 'Quiz on {topic} as JSON {{"q": ...}}')
+        registry.register('raw', 'Literal {braces} kept', static=True)
+
+        self.assertEqual(registry.render('quiz', topic='{x}'), 'Quiz on {x} as JSON {"q": ...}')
+        self.assertEqual(registry.get('raw'), 'Literal {braces} kept')
+        with self.assertRaises(ValueError):
+            registry.get('quiz')
+
+        stats = registry.stats()['segments']
+        self.assertEqual(stats['quiz']['slots'], ['topic'])
+        self.assertGreater(stats['raw']['tokens'], 0)
+
+    def test_static_segments_are_shared(self):
+        prompts = get_prompt_registry()
+        # Same object every call: rendered once, not rebuilt per request
+        self.assertIs(prompts.get('tutor.system.groq'), prompts.get('tutor.system.groq'))
+        self.assertIs(prompts.get('expert.debug'), prompts.get('expert.debug'))
+
+        prompt = prompts.render('tutor.prompt.gemini', subject='Biology', context='', question='What is osmosis?')
+        self.assertTrue(prompt.startswith(prompts.get('tutor.system.gemini')))
+        self.assertIn('What is osmosis?', prompt)
+
+    def test_groq_identity_query(self):
+        self.assertTrue(is_identity_query('Who MADE you?'))
+        self.assertFalse(is_identity_query('What is photosynthesis?'))
+
+        service = GroqService.__new__(GroqService)
+        service._send_chat_request = lambda messages: messages
+        messages = service.ask_tutor('Who created you?')
+        self.assertEqual(messages[1]['content'], get_prompt_registry().get('tutor.identity.markdown'))
+        self.assertIn('/static/images/yash_profile.jpg', messages[1]['content'])
@@ -0,0 +1,164 @@
+import time
+
+from django.test import SimpleTestCase
+
+from ai import router as ai_router
+from ai.gemini import GeminiService
+from ai.router import ProviderRouter, CircuitBreaker, AllProvidersFailed
+from ai.transport import get_transport
+
+
+class FakeService:
+    api_key = 'test-key'
+
+    def __init__(self, answer=None, delay=0.0, error=None):
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def ask_tutor(self, question, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.answer
+
+    def stream_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise RuntimeError(self.error)
+        yield from self.answer.split(' ')
+
+
+class FakeGenAI:
+    """google.generativeai stand-in whose models fail with the given errors"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.models = []
+
+    def GenerativeModel(self, model_name, generation_config=None):
+        self.models.append(model_name)
+        genai = self
+
+        class Model:
+            def generate_content(self, *args, **kwargs):
+                raise genai.errors.pop(0)
+        return Model()
+
+
+def fake_gemini(*errors):
+    service = GeminiService.__new__(GeminiService)
+    service.api_key = 'test-key'
+    service.genai = FakeGenAI(*errors)
+    service.default_model, service.temperature, service.max_tokens = 'gemini-2.5-flash', 0.7, 100
+    service.safety_settings, service.request_options = [], {}
+    return service
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ProviderRouterTest(SimpleTestCase):
+    """Circuit breakers and hedging in the AI provider router"""
+
+    def _router(self, hedge=False, **services):
+        return ProviderRouter(loaders={name: (lambda s=s: s) for name, s in services.items()}, hedge=hedge)
+
+    def test_falls_back_and_trips_breaker(self):
+        groq = FakeService(error='timeout')
+        gemini = FakeService(answer='from gemini')
+        router = self._router(groq=groq, gemini=gemini)
+
+        for _ in range(ai_router.BREAKER_CONSECUTIVE_FAILURES):
+            self.assertEqual(router.call('ask_tutor', 'q', primary='groq'), ('gemini', 'from gemini'))
+        self.assertEqual(router.health()['providers']['groq']['state'], 'open')
+
+        # Open circuit: groq is skipped without being called
+        router.call('ask_tutor', 'q', primary='groq')
+        self.assertEqual(groq.calls, ai_router.BREAKER_CONSECUTIVE_FAILURES)
+
+    def test_half_open_probe_closes_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('groq', clock=clock)
+        for _ in range(ai_router.BREAKER_CONSECUTIVE_FAILURES):
+            breaker.record_failure(RuntimeError('down'), 0.1)
+        self.assertFalse(breaker.allow())
+
+        clock.now += ai_router.BREAKER_COOLDOWN_SECONDS
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # one probe at a time
+        breaker.record_success(0.2)
+        self.assertEqual(breaker.snapshot()['state'], 'closed')
+
+    def test_unconfigured_provider_is_skipped(self):
+        missing = FakeService(answer='never')
+        missing.api_key = None
+        router = self._router(groq=missing, gemini=FakeService(answer='ok'))
+        self.assertEqual(router.call('ask_tutor', 'q', primary='groq'), ('gemini', 'ok'))
+        self.assertEqual(missing.calls, 0)
+        self.assertEqual(router.health()['providers']['groq']['samples'], 0)
+
+    def test_all_failed(self):
+        router = self._router(groq=FakeService(error='down'), gemini=FakeService(error='down'))
+        with self.assertRaises(AllProvidersFailed) as ctx:
+            router.call('ask_tutor', 'q', primary='groq')
+        self.assertEqual(set(ctx.exception.errors), {'groq', 'gemini'})
+
+    def test_stream_falls_back_before_first_chunk(self):
+        router = self._router(gemini=FakeService(error='quota'), groq=FakeService(answer='streamed answer'))
+        streams = get_transport().metrics('groq').snapshot()['streams']
+
+        name, chunks = router.stream('stream_content', 'q', primary='gemini')
+        self.assertEqual((name, list(chunks)), ('groq', ['streamed', 'answer']))
+        self.assertEqual(router.health()['providers']['gemini']['last_error'], 'quota')
+        self.assertEqual(get_transport().metrics('groq').snapshot()['streams'], streams + 1)
+
+        # Without fallback only the primary is tried
+        with self.assertRaises(AllProvidersFailed):
+            router.stream('stream_content', 'q', primary='gemini', fallback=False)
+
+    def test_hedged_request_returns_fastest(self):
+        slow = FakeService(answer='slow', delay=1.0)
+        fast = FakeService(answer='fast')
+        router = self._router(hedge=True, groq=slow, gemini=fast)
+        # Known p95 for groq: hedge after ~0.5s instead of waiting the full second
+        router.breaker('groq').record_success(0.01)
+
+        started = time.monotonic()
+        self.assertEqual(router.call('ask_tutor', 'q', primary='groq'), ('gemini', 'fast'))
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    def test_gemini_failure_reaches_the_breaker(self):
+        class NotFound(Exception):
+            pass
+
+        gemini = fake_gemini(NotFound('retired'), TimeoutError('read timeout'))
+        groq = FakeService(answer='from groq')
+        groq.generate_content = groq.ask_tutor
+        router = self._router(gemini=gemini, groq=groq)
+
+        self.assertEqual(router.call('generate_content', 'q', primary='gemini'), ('groq', 'from groq'))
+        # Next model only for an unavailable engine; the timeout ends the call
+        self.assertEqual(gemini.genai.models, ['gemini-2.5-flash', 'gemini-2.0-flash'])
+        self.assertEqual(router.health()['providers']['gemini']['last_error'], 'read timeout')
+
+    def test_stream_skips_providers_without_streaming_before_probing(self):
+        class NoStream:
+            api_key = 'test-key'
+
+        clock = FakeClock()
+        router = self._router(mistral=NoStream(), groq=FakeService(answer='ok'))
+        breaker = router._breakers['mistral'] = CircuitBreaker('mistral', clock=clock)
+        for _ in range(ai_router.BREAKER_CONSECUTIVE_FAILURES):
+            breaker.record_failure(RuntimeError('down'), 0.1)
+        clock.now += ai_router.BREAKER_COOLDOWN_SECONDS
+
+        self.assertEqual(router.stream('stream_content', 'q', primary='mistral')[0], 'groq')
+        self.assertTrue(breaker.allow())  # HALF_OPEN probe still free for call()
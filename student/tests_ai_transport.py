@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from ai.transport import AsyncProviderTransport, ProviderTransport, backoff_delay, iter_chat_deltas, BACKOFF_MAX
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        server.requests += 1
+        server.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        time.sleep(server.delay)
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = server.body or json.dumps({"ok": status == 200}).encode()
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Type', 'text/event-stream' if server.body else 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ProviderTransportTest(SimpleTestCase):
+    """Pooled, retrying HTTP transport for AI providers"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.requests = 0
+        self.server.connections = set()
+        self.server.statuses = []
+        self.server.body = None
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat"
+        self.transport = ProviderTransport(max_retries=2, sleep=lambda seconds: None)
+
+    def test_connection_is_reused(self):
+        for _ in range(5):
+            self.assertEqual(self.transport.post('groq', self.url, json={}).status_code, 200)
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_retries_429_and_5xx(self):
+        self.server.statuses = [429, 503]
+        response = self.transport.post('groq', self.url, json={})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.requests, 3)
+
+        metrics = self.transport.snapshot()['groq']
+        self.assertEqual((metrics['requests'], metrics['retries'], metrics['errors']), (1, 2, 0))
+
+    def test_gives_up_after_max_retries(self):
+        self.server.statuses = [500, 500, 500, 500]
+        response = self.transport.post('deepseek', self.url, json={})
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.transport.snapshot()['deepseek']['errors'], 1)
+
+    def test_connection_error_raises(self):
+        with self.assertRaises(requests.ConnectionError):
+            self.transport.post('groq', 'http://127.0.0.1:9/unreachable', json={})
+
+    def test_read_timeout_is_not_retried(self):
+        self.server.delay = 0.5
+        with self.assertRaises(requests.ReadTimeout):
+            self.transport.post('groq', self.url, json={}, timeout=(1, 0.1))
+        self.assertEqual(self.server.requests, 1)
+
+    def test_backoff_is_jittered_and_capped(self):
+        delays = {backoff_delay(3) for _ in range(20)}
+        self.assertGreater(len(delays), 1)
+        self.assertTrue(all(0 <= d <= BACKOFF_MAX for d in delays))
+        self.assertEqual(backoff_delay(0, '120'), BACKOFF_MAX)
+
+    def test_stream_deltas(self):
+        chunks = [{"choices": [{"delta": {"content": text}}]} for text in ("Namaste", " ", "दुनिया")]
+        self.server.body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks).encode() + b"data: [DONE]\n\n"
+        response = self.transport.post('groq', self.url, json={}, stream=True)
+        self.assertEqual("".join(iter_chat_deltas(response)), "Namaste दुनिया")
+
+    def test_async_transport_retries(self):
+        async def no_sleep(seconds):
+            pass
+
+        async def post():
+            transport = AsyncProviderTransport(max_retries=2, sleep=no_sleep)
+            try:
+                return await transport.post('groq-async', self.url, json={})
+            finally:
+                await transport.client.aclose()
+
+        self.server.statuses = [503]
+        self.assertEqual(async_to_sync(post)().status_code, 200)
+        self.assertEqual(self.server.requests, 2)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.client import AsyncRequestFactory
+
+from ai.router import ProviderRouter
+from student.async_api import streaming_response
+from student.chat_api import AsyncChatSendMessageView
+from student.chat_models import ChatConversation
+
+
+class AsyncTutor:
+    api_key = 'test-key'
+
+    def __init__(self, answer=None, error=None):
+        self.answer = answer
+        self.error = error
+
+    async def aask_tutor(self, question, *args, **kwargs):
+        await asyncio.sleep(0)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.answer
+
+
+class SyncTutor:
+    api_key = 'test-key'
+
+    def ask_tutor(self, question, *args, **kwargs):
+        return 'from thread'
+
+
+class AsyncRouterTest(SimpleTestCase):
+    """acall(): breakers and fallback on the event loop"""
+
+    def _router(self, **services):
+        return ProviderRouter(loaders={name: (lambda s=s: s) for name, s in services.items()}, hedge=False)
+
+    async def test_native_async_provider(self):
+        router = self._router(groq=AsyncTutor(error='down'), gemini=AsyncTutor(answer='async answer'))
+        self.assertEqual(await router.acall('ask_tutor', 'q', primary='groq'), ('gemini', 'async answer'))
+        self.assertEqual(router.health()['providers']['groq']['last_error'], 'down')
+
+    async def test_sync_provider_runs_on_thread(self):
+        router = self._router(groq=AsyncTutor(error='down'), chatgpt=SyncTutor())
+        self.assertEqual(await router.acall('ask_tutor', 'q', primary='groq'), ('chatgpt', 'from thread'))
+
+
+class FakeGemini:
+    async def aexpert_chat(self, user_message, mode='general', context=None, detect_errors=True, images=None):
+        return f"[{mode}] answer to: {user_message}"
+
+
+class AsyncChatSendTest(TestCase):
+    """Async chat view: same contract as ChatSendMessageView"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='async_user', password='password123')
+        self.factory = AsyncRequestFactory()
+
+    def _request(self, user, body):
+        request = self.factory.post('/api/api/chat/send/', data=json.dumps(body), content_type='application/json')
+        request.user = user
+        request._dont_enforce_csrf_checks = True
+        return request
+
+    async def test_chat_turn_is_saved(self):
+        with patch('ai.gemini.get_gemini_service', return_value=FakeGemini()):
+            response = await AsyncChatSendMessageView.as_view()(self._request(self.user, {'message': 'fix this bug'}))
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['message']['content'], '[debug] answer to: fix this bug')
+
+        conversation = await ChatConversation.objects.aget(pk=data['conversation_id'])
+        self.assertEqual(conversation.total_messages, 2)
+        self.assertEqual(await conversation.messages.acount(), 2)
+
+    async def test_requires_authentication(self):
+        response = await AsyncChatSendMessageView.as_view()(self._request(AnonymousUser(), {'message': 'hi'}))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_throttles_apply(self):
+        class Exhausted:
+            def allow_request(self, request, view):
+                return False
+
+            def wait(self):
+                return 2.5
+
+        with patch.object(AsyncChatSendMessageView, 'throttle_classes', [Exhausted]):
+            response = await AsyncChatSendMessageView.as_view()(self._request(self.user, {'message': 'hi'}))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3')
+
+
+class StreamingResponseTest(SimpleTestCase):
+    """Streamed bodies stay incremental in ASGI mode"""
+
+    @override_settings(ASGI_MODE=True)
+    async def test_items_produced_one_at_a_time(self):
+        produced = []
+
+        def events():
+            try:
+                for i in range(3):
+                    produced.append(i)
+                    yield f'chunk {i}'
+            finally:
+                produced.append('closed')
+
+        response = streaming_response(events(), content_type='text/event-stream')
+        self.assertTrue(response.is_async)
+        body = aiter(response.streaming_content)
+        self.assertEqual(await anext(body), b'chunk 0')
+        self.assertEqual(produced, [0])
+        await sync_to_async(response.close)()  # As the ASGI handler does on disconnect
+        self.assertEqual(produced, [0, 'closed'])
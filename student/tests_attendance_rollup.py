@@ -0,0 +1,121 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, Student, Attendence, AttendanceMonth
+from student.services.attendance import mark_roll_call
+from student.services.attendance_rollup import (
+    apply_marks, attendance_summary, attendance_streaks, class_heatmap, rebuild
+)
+
+
+class AttendanceRollupTest(APITestCase):
+    """Monthly attendance bitmaps follow Attendence and answer range questions"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='rollup_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='INSTITUTE')
+        self.students = [
+            Student.objects.create(
+                created_by=self.owner, name=f'Student {i}', age=15, gender='M',
+                dob=date(2010, 1, 1), grade=10, relation='Father', roll_number=f'AR-{i}'
+            )
+            for i in range(2)
+        ]
+        self.student = self.students[0]
+
+    def mark(self, day, is_present=True, student=None):
+        return Attendence.objects.create(
+            created_by=self.owner, student=student or self.student, date=day, is_present=is_present
+        )
+
+    def bits(self, month):
+        row = AttendanceMonth.objects.get(student=self.student, month=month)
+        return row.marked, row.present
+
+    def test_signals_keep_bitmaps_current(self):
+        self.mark(date(2026, 3, 1))
+        absent = self.mark(date(2026, 3, 3), is_present=False)
+        self.assertEqual(self.bits(date(2026, 3, 1)), (0b101, 0b001))
+
+        absent.is_present = True
+        absent.save()
+        self.assertEqual(self.bits(date(2026, 3, 1)), (0b101, 0b101))
+
+        absent.date = date(2026, 4, 30)  # Moved to another month: old bit cleared
+        absent.save()
+        self.assertEqual(self.bits(date(2026, 3, 1)), (0b1, 0b1))
+        self.assertEqual(self.bits(date(2026, 4, 1)), (1 << 29, 1 << 29))
+
+        absent.delete()
+        self.assertEqual(self.bits(date(2026, 4, 1)), (0, 0))
+
+        self.student.delete()
+        self.assertFalse(AttendanceMonth.objects.exists())
+
+    def test_bits_change_in_the_database_without_a_read(self):
+        self.mark(date(2026, 3, 1))
+        # Another writer's day lands between our read and write in a read-modify-write
+        AttendanceMonth.objects.filter(student=self.student).update(marked=0b11, present=0b11)
+        with CaptureQueriesContext(connection) as queries:
+            apply_marks([(self.student.pk, date(2026, 3, 3), False), (self.student.pk, date(2026, 3, 1), None)])
+        self.assertFalse([q for q in queries if q['sql'].lstrip().upper().startswith('SELECT')])
+        self.assertEqual(self.bits(date(2026, 3, 1)), (0b110, 0b010))
+
+    def test_roll_call_updates_bitmaps(self):
+        ids = [s.pk for s in self.students]
+        mark_roll_call(self.owner, date(2026, 5, 31), [ids[0]], [ids[1]])
+        mark_roll_call(self.owner, date(2026, 5, 31), [ids[1]], [ids[0]])
+        summary = attendance_summary(ids, date(2026, 5, 1), date(2026, 5, 31))
+        self.assertEqual(summary[ids[0]], {'present': 0, 'marked': 1, 'percentage': 0.0})
+        self.assertEqual(summary[ids[1]], {'present': 1, 'marked': 1, 'percentage': 100.0})
+
+    def test_range_streaks_and_heatmap_match_rows(self):
+        # Jan 30 P, Jan 31 A, Feb 2 P, Feb 3 P, Feb 5 P (Feb 4 unmarked), Mar 1 A
+        for day, present in [((1, 30), True), ((1, 31), False), ((2, 2), True), ((2, 3), True),
+                             ((2, 5), True), ((3, 1), False)]:
+            self.mark(date(2026, *day), present)
+        self.mark(date(2026, 2, 2), False, student=self.students[1])
+        ids = [s.pk for s in self.students]
+
+        summary = attendance_summary(ids, date(2026, 1, 31), date(2026, 2, 28))
+        self.assertEqual(summary[self.student.pk], {'present': 3, 'marked': 4, 'percentage': 75.0})
+        self.assertEqual(summary[ids[1]]['percentage'], 0.0)
+
+        with self.assertNumQueries(1):
+            streaks = attendance_streaks(ids, date(2026, 1, 1), date(2026, 2, 28))
+        self.assertEqual(streaks[self.student.pk], {'current': 3, 'longest': 3})
+        self.assertEqual(attendance_streaks(ids, date(2026, 1, 1), date(2026, 3, 31))[self.student.pk]['current'], 0)
+
+        heatmap = {row['date']: row for row in class_heatmap(ids, date(2026, 2, 1), date(2026, 2, 5))}
+        self.assertEqual(len(heatmap), 5)
+        self.assertEqual((heatmap[date(2026, 2, 2)]['present'], heatmap[date(2026, 2, 2)]['marked']), (1, 2))
+        self.assertEqual(heatmap[date(2026, 2, 4)]['marked'], 0)
+
+    def test_rebuild_and_analytics_endpoint(self):
+        Attendence.objects.bulk_create([  # No signals: bitmaps stale until rebuilt
+            Attendence(created_by=self.owner, student=self.student, date=date(2026, 6, d), is_present=d % 2 == 1)
+            for d in range(1, 11)
+        ])
+        self.assertFalse(AttendanceMonth.objects.exists())
+        out = StringIO()
+        call_command('rebuild_attendance_rollup', owner=self.owner.pk, stdout=out)
+        self.assertIn('Rebuilt 1', out.getvalue())
+        self.assertEqual(rebuild([self.student.pk]), 1)
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(reverse('attendance-analytics'), {'start': '2026-06-01', 'end': '2026-06-30'})
+        self.assertEqual(response.status_code, 200)
+        row = response.data['students'][0]
+        self.assertEqual((row['present'], row['marked'], row['percentage']), (5, 10, 50.0))
+        self.assertEqual(row['longest_streak'], 1)
+        self.assertEqual(len(response.data['heatmap']), 30)
+
+        bad = self.client.get(reverse('attendance-analytics'), {'start': '2025-01-01', 'end': '2026-06-30'})
+        self.assertEqual(bad.status_code, 400)
@@ -0,0 +1,110 @@
+from datetime import date
+
+from django.test import TestCase
+
+from student.models import BankAlert, BankMailboxState, Payment
+from student.services.bank_alerts import (
+    ALERT_MATCHED, ALERT_MISMATCH, ALERT_UNMATCHED, ALERT_UNPARSED, ingest_alerts, match_alerts,
+)
+
+MAILBOX = 'bank@imap.test/INBOX'
+
+
+def _plain(subject, body):
+    return (f"Subject: {subject}\r\nDate: Mon, 12 Oct 2026 10:00:00 +0530\r\n"
+            "Content-Type: text/plain; charset=utf-8\r\n\r\n").encode(), body.encode()
+
+
+def _multipart(subject, body):
+    header = (f"Subject: {subject}\r\nMIME-Version: 1.0\r\n"
+              'Content-Type: multipart/alternative; boundary="b1"\r\n\r\n').encode()
+    text = (f"--b1\r\nContent-Type: text/plain\r\n\r\n{body}\r\n"
+            "--b1\r\nContent-Type: text/html\r\n\r\n<p>html</p>\r\n--b1--\r\n").encode()
+    return header, text
+
+
+class FakeIMAP:
+    """Just enough of imaplib.IMAP4 for the ingester"""
+
+    def __init__(self, messages, uid_validity=7):
+        self.messages = messages  # {uid: (header, text)}
+        self.uid_validity = uid_validity
+        self.searches = []
+        self.fetched = []
+
+    def select(self, folder, readonly=False):
+        return 'OK', [str(len(self.messages)).encode()]
+
+    def response(self, code):
+        return code, [str(self.uid_validity).encode()]
+
+    def uid(self, command, *args):
+        if command == 'SEARCH':
+            self.searches.append(args)
+            criteria = args[1]
+            uids = sorted(self.messages)
+            if criteria.startswith('UID '):
+                low = int(criteria.split()[1].split(':')[0])
+                # Real servers always return the newest UID for "n:*"
+                uids = [u for u in uids if u >= low] or uids[-1:]
+            return 'OK', [" ".join(map(str, uids)).encode()]
+
+        uids = [int(u) for u in args[0].split(',')]
+        self.fetched.extend(uids)
+        data = []
+        for seq, uid in enumerate(uids, 1):
+            header, text = self.messages[uid]
+            data.append((f"{seq} (UID {uid} BODY[HEADER.FIELDS (SUBJECT DATE)] {{{len(header)}}}".encode(), header))
+            data.append((f" BODY[TEXT] {{{len(text)}}}".encode(), text))
+            data.append(b')')
+        return 'OK', data
+
+
+class BankAlertIngestTest(TestCase):
+    """Incremental UID scan, parse once, one-query matching"""
+
+    def _payment(self, utr, amount):
+        return Payment.objects.create(transaction_id=utr, amount=amount, due_date=date.today(),
+                                      description='Fee', status='PENDING')
+
+    def test_incremental_ingest_and_match(self):
+        paid = self._payment('UTR1001', '500.00')
+        mismatch = self._payment('UTR1002', '800.00')
+        imap = FakeIMAP({
+            101: _plain('Credit alert', 'Your a/c is credited with Rs. 500.00 UTR: UTR1001'),
+            102: _multipart('Credit alert', 'Credited INR 700.00 Ref: UTR1002'),
+            103: _plain('Credit alert', 'Thank you for banking with us'),
+            104: _plain('Credit alert', 'Credited Rs 1,200.00 UTR UTR1004'),
+        })
+
+        alerts = ingest_alerts(imap, MAILBOX)
+        self.assertEqual(len(alerts), 4)
+        self.assertEqual(imap.searches[0][1], 'SINCE')  # First run: bounded look-back, not the whole inbox
+        self.assertEqual(BankMailboxState.objects.get(mailbox=MAILBOX).last_uid, 104)
+
+        self.assertEqual({a.utr for a in match_alerts()}, {'UTR1001', 'UTR1002'})
+        paid.refresh_from_db()
+        mismatch.refresh_from_db()
+        self.assertEqual(paid.status, 'PAID')
+        self.assertEqual(mismatch.status, 'PENDING')
+        statuses = dict(BankAlert.objects.values_list('uid', 'status'))
+        self.assertEqual(statuses, {101: ALERT_MATCHED, 102: ALERT_MISMATCH, 103: ALERT_UNPARSED, 104: ALERT_UNMATCHED})
+
+        # Next run: only UIDs above the checkpoint are searched; nothing is refetched
+        imap.fetched.clear()
+        self.assertEqual(ingest_alerts(imap, MAILBOX), [])
+        self.assertEqual(imap.searches[1][1], 'UID 105:*')
+        self.assertEqual(imap.fetched, [])
+
+        # A payment submitted after its alert arrived is matched from the stored alert
+        late = self._payment('UTR1004', '1200.00')
+        with self.assertNumQueries(6):  # open alerts, payments, save, bulk update (+ savepoint pair)
+            decided = match_alerts()
+        self.assertEqual([a.payment_id for a in decided], [late.pk])
+
+    def test_uidvalidity_change_rescans(self):
+        BankMailboxState.objects.create(mailbox=MAILBOX, uid_validity=1, last_uid=500)
+        imap = FakeIMAP({3: _plain('Credit alert', 'Credited Rs. 10.00 UTR: UTR3')}, uid_validity=2)
+        self.assertEqual(len(ingest_alerts(imap, MAILBOX)), 1)
+        state = BankMailboxState.objects.get(mailbox=MAILBOX)
+        self.assertEqual((state.uid_validity, state.last_uid), (2, 3))
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, Student, Attendence, Course, Batch, Enrollment
+from student.services.dashboard_stats import get_stats_version
+
+
+class BulkAttendanceTest(APITestCase):
+    """Roll-call attendance: one request, constant queries, per-row diff"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='roll_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='INSTITUTE')
+        course = Course.objects.create(created_by=self.owner, name='Maths', code='RC-1', description='-', duration_weeks=4)
+        self.batch = Batch.objects.create(created_by=self.owner, course=course, name='Morning', start_date=date.today())
+        self.students = []
+        for i in range(6):
+            student = Student.objects.create(
+                created_by=self.owner, name=f'Student {i}', age=15, gender='M',
+                dob=date(2010, 1, 1), grade=10, relation='Father', roll_number=f'RC-{i}'
+            )
+            Enrollment.objects.create(created_by=self.owner, student=student, batch=self.batch)
+            self.students.append(student)
+        self.ids = [s.pk for s in self.students]
+        self.client.force_authenticate(user=self.owner)
+        self.url = reverse('attendance-bulk-mark')
+
+    def mark(self, present, absent, **extra):
+        payload = {'batch_id': self.batch.pk, 'date': str(date.today()), 'present': present, 'absent': absent}
+        payload.update(extra)
+        return self.client.post(self.url, payload, format='json')
+
+    def test_upsert_returns_diff(self):
+        Attendence.objects.create(created_by=self.owner, student=self.students[0], date=date.today(), is_present=True)
+        Attendence.objects.create(created_by=self.owner, student=self.students[1], date=date.today(), is_present=True)
+        version = get_stats_version(self.owner.pk)
+
+        response = self.mark(self.ids[:1] + self.ids[2:4], self.ids[1:2] + self.ids[4:])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['unchanged']), (4, 1, 1))
+        rows = {row['student']: row for row in response.data['rows']}
+        self.assertEqual(rows[self.ids[1]]['before'], True)
+        self.assertEqual(rows[self.ids[1]]['change'], 'UPDATED')
+        self.assertIsNone(rows[self.ids[5]]['before'])
+
+        marks = dict(Attendence.objects.filter(date=date.today()).values_list('student_id', 'is_present'))
+        self.assertEqual(marks, {pk: pk in self.ids[:1] + self.ids[2:4] for pk in self.ids})
+        self.assertNotEqual(get_stats_version(self.owner.pk), version)
+
+    def test_queries_do_not_grow_with_class_size(self):
+        self.mark([self.ids[0]], [])  # Warm the tenant context
+        with self.assertNumQueries(8):  # roster, current marks, upsert, bitmap insert + present/absent updates (+ savepoint)
+            self.mark(self.ids[:3], self.ids[3:], date=str(date.today() - timedelta(days=1)))
+
+    def test_foreign_and_invalid_ids_rejected(self):
+        other = User.objects.create_user(username='roll_other', password='password123')
+        foreign = Student.objects.create(
+            created_by=other, name='Foreign', age=15, gender='F',
+            dob=date(2010, 1, 1), grade=10, relation='Father', roll_number='RC-X'
+        )
+        response = self.mark(self.ids[:2], [foreign.pk])
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['student_ids'], [foreign.pk])
+        self.assertFalse(Attendence.objects.exists())
+
+        self.assertEqual(self.mark(self.ids[:2], self.ids[1:3]).status_code, 400)
+        self.assertEqual(self.mark(self.ids[:2], [], date=str(date.today() + timedelta(days=1))).status_code, 400)
@@ -0,0 +1,135 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, Student, LibraryBook, Employee, ImportJob
+from student.services import bulk_import
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+STUDENT_CSV = (
+    "Name,DOB,Class,Gender,Roll Number,Phone\n"
+    "Asha,2012-04-01,6,F,BI-1,9999999999\n"
+    "Ravi,not-a-date,6,M,BI-2,\n"
+    "Meena,2011-02-10,7,F,BI-1,\n"
+    "Kiran,2011-05-20,7,M,BI-3,\n"
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BulkImportTest(APITestCase):
+    """Streaming, batched CSV imports"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='import_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='SCHOOL')
+        self.client.force_authenticate(user=self.owner)
+
+    def _upload(self, content, name='students.csv'):
+        return SimpleUploadedFile(name, content.encode('utf-8'), content_type='text/csv')
+
+    def test_student_import_reports_row_errors(self):
+        response = self.client.post('/api/management/bulk-import/', {
+            'type': 'STUDENT', 'file': self._upload(STUDENT_CSV)
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created_count'], 2)
+        self.assertEqual(response.data['error_count'], 2)
+        # Header is row 1: bad date on row 3, duplicate roll number on row 4
+        self.assertEqual([e['row'] for e in response.data['errors']], [3, 4])
+
+        asha = Student.objects.get(roll_number='BI-1')
+        self.assertEqual(asha.created_by, self.owner)
+        self.assertEqual(asha.contact_number, '9999999999')
+        self.assertEqual(asha.institution_type, 'SCHOOL')
+
+    def test_queries_per_batch_not_per_row(self):
+        rows = "".join(f"Student {i},2012-01-01,6,M,Q-{i}\n" for i in range(50))
+        importer = bulk_import.get_importer('STUDENT', self.owner, self.owner)
+        file_obj = self._upload("name,dob,grade,gender,roll_number\n" + rows)
+
+        # uniqueness check + INSERT + search-index upsert (+ savepoint pair) for one batch
+        with self.assertNumQueries(5):
+            result = bulk_import.run_import(importer, bulk_import.iter_rows(file_obj), batch_size=100)
+        self.assertEqual(result.created, 50)
+
+    def test_book_and_staff_import(self):
+        books = "isbn,title,author,copies,category\n9780000000001,Algebra,R. Rao,3,reference\n"
+        result = bulk_import.run_import(
+            bulk_import.get_importer('BOOK', self.owner, self.owner),
+            bulk_import.iter_rows(self._upload(books, 'books.csv'))
+        )
+        self.assertEqual(result.created, 1)
+        book = LibraryBook.objects.get(isbn='9780000000001')
+        self.assertEqual((book.total_copies, book.available_copies, book.category), (3, 3, 'REFERENCE'))
+
+        staff = "username,first_name,email,role,salary\nt_one,Tara,t1@example.com,teacher,25000\n"
+        result = bulk_import.run_import(
+            bulk_import.get_importer('STAFF', self.owner, self.owner),
+            bulk_import.iter_rows(self._upload(staff, 'staff.csv'))
+        )
+        self.assertEqual(result.created, 1)
+        employee = Employee.objects.select_related('user__profile').get(user__username='t_one')
+        self.assertEqual(employee.created_by, self.owner)
+        self.assertEqual(employee.user.profile.role, 'TEACHER')
+        self.assertFalse(employee.user.has_usable_password())
+
+    @patch.object(bulk_import, 'IMPORT_RUN_IN_THREAD', False)
+    def test_background_job(self):
+        response = self.client.post('/api/management/bulk-import/', {
+            'type': 'STUDENT', 'file': self._upload(STUDENT_CSV), 'background': 'true'
+        }, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job_id']
+        self.assertEqual(ImportJob.objects.get(pk=job_id).status, 'PENDING')
+
+        self.assertTrue(bulk_import.process_import_job(job_id))
+        # Already claimed: a second worker does nothing
+        self.assertFalse(bulk_import.process_import_job(job_id))
+
+        status_response = self.client.get(f'/api/management/bulk-import/{job_id}/')
+        self.assertEqual(status_response.data['status'], 'COMPLETED')
+        self.assertEqual(status_response.data['created_count'], 2)
+        self.assertEqual(status_response.data['error_count'], 2)
+
+    def test_malformed_csv_is_a_file_error(self):
+        oversized = "name,dob\n" + "x" * 140000 + ",2012-01-01\n"  # Field above csv.field_size_limit()
+        response = self.client.post('/api/management/bulk-import/', {
+            'type': 'STUDENT', 'file': self._upload(oversized)
+        }, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Malformed CSV at line 2', response.data['error'])
+
+    @patch.object(bulk_import, 'IMPORT_RUN_IN_THREAD', False)
+    def test_stale_running_job_is_requeued(self):
+        job = bulk_import.create_import_job('STUDENT', self.owner, self.owner, self._upload(STUDENT_CSV))
+        ImportJob.objects.filter(pk=job.pk).update(
+            status='RUNNING', started_at=timezone.now() - bulk_import.IMPORT_JOB_LEASE * 2, processed_rows=3
+        )
+        fresh = bulk_import.create_import_job('STUDENT', self.owner, self.owner, self._upload(STUDENT_CSV))
+        ImportJob.objects.filter(pk=fresh.pk).update(status='RUNNING', started_at=timezone.now())
+
+        call_command('process_import_jobs', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_count, job.error_count), ('COMPLETED', 2, 2))
+        self.assertEqual(ImportJob.objects.get(pk=fresh.pk).status, 'RUNNING')
+
+    def test_job_status_is_owner_scoped(self):
+        other = User.objects.create_user(username='import_other', password='password123')
+        job = ImportJob.objects.create(created_by=other, user=other, import_type='STUDENT')
+        response = self.client.get(f'/api/management/bulk-import/{job.id}/')
+        self.assertEqual(response.status_code, 404)
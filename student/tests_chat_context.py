@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from ai.context import CLIP_MARKER, trim_history
+from ai.prompts import count_tokens
+from student.chat_models import ChatConversation, ChatMessage
+from student.services.chat_context import SUMMARY_HEADER, build_chat_context
+
+
+class ChatContextBuilderTest(TestCase):
+    """Token-budgeted history with a rolling summary"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='ctx_user', password='password123')
+        self.conversation = ChatConversation.objects.create(user=user)
+
+    def _add(self, count, size=400):
+        ChatMessage.objects.bulk_create([
+            ChatMessage(
+                conversation=self.conversation,
+                role='user' if i % 2 == 0 else 'ai',
+                content=f"Turn {i}. " + "word " * size,
+            )
+            for i in range(count)
+        ])
+        return list(self.conversation.messages.order_by('id'))
+
+    @patch('student.services.chat_context.MIN_HISTORY_TOKENS', 100)
+    def test_old_turns_are_summarized_once(self):
+        messages = self._add(20)
+        current = messages[-1]
+
+        context = build_chat_context(self.conversation, 'RAG', exclude_id=current.id, budget=2000)
+        turns = [c for c in context if c['role'] != 'system']
+        self.assertLessEqual(sum(count_tokens(c['content']) for c in context), 2000)
+        self.assertTrue(turns)
+        self.assertNotIn('Turn 19.', turns[-1]['content'])
+        self.assertTrue(turns[-1]['content'].startswith('Turn 18.'))
+
+        self.conversation.refresh_from_db()
+        self.assertIn('- User: Turn 0.', self.conversation.summary)
+        self.assertEqual(context[1]['content'], SUMMARY_HEADER + self.conversation.summary)
+        first_kept = ChatMessage.objects.get(content=turns[0]['content'])
+        self.assertEqual(self.conversation.summary_last_message_id, first_kept.id - 1)
+
+        # Token counts were cached on the rows that were looked at
+        self.assertGreater(ChatMessage.objects.get(pk=messages[18].pk).tokens_used, 0)
+
+        # Nothing new fell out of the window: the summary is not rebuilt
+        summary = self.conversation.summary
+        build_chat_context(self.conversation, 'RAG', exclude_id=current.id, budget=2000)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.summary, summary)
+
+    def test_oversized_message_is_clipped(self):
+        self._add(1, size=20000)
+        context = build_chat_context(self.conversation)
+        self.assertTrue(context[0]['content'].endswith(CLIP_MARKER))
+
+    def test_trim_history_by_tokens(self):
+        history = [{'role': 'user', 'content': 'word ' * 1000} for _ in range(10)]
+        trimmed = trim_history(history, budget=3000)
+        self.assertLess(len(trimmed), len(history))
+        self.assertLessEqual(sum(count_tokens(m['content']) for m in trimmed), 3000)
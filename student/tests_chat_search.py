@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from student.chat_models import ChatConversation, ChatMessage
+from student.services.chat_search import search_messages
+
+
+class ChatSearchTest(APITestCase):
+    """Full-text chat history search"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='chat_searcher', password='password123')
+        self.conversation = ChatConversation.objects.create(user=self.user, title='Attendance help')
+        ChatMessage.objects.create(conversation=self.conversation, role='user', content='How is my attendance?')
+        self.answer = ChatMessage.objects.create(
+            conversation=self.conversation, role='ai',
+            content='Your **attendance** is 92% <this month>, above the 75% requirement.',
+        )
+
+    def test_ranked_snippets_escaped_and_highlighted(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('chat-search'), {'q': 'attend requirement'})
+        results = response.data['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['conversation_title'], 'Attendance help')
+        self.assertEqual(results[0]['role'], 'ai')
+        self.assertIn('<mark>attendance</mark>', results[0]['snippet'])
+        self.assertIn('&lt;this month&gt;', results[0]['snippet'])
+
+    def test_index_follows_edits_and_scope(self):
+        self.answer.content = 'Your fees are cleared.'
+        self.answer.save()
+        self.assertEqual([m.pk for m in search_messages(self.user, 'fees')], [self.answer.pk])
+        self.assertEqual(search_messages(self.user, 'requirement'), [])
+
+        other = User.objects.create_user(username='chat_other', password='password123')
+        self.assertEqual(search_messages(other, 'fees'), [])
+
+        self.conversation.is_archived = True
+        self.conversation.save()
+        self.assertEqual(search_messages(self.user, 'fees'), [])
+
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command('rebuild_chat_search_index', stdout=out)
+        self.assertIn('sqlite', out.getvalue())
+        self.assertEqual(len(search_messages(self.user, 'attendance')), 2)
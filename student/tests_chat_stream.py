@@ -0,0 +1,73 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ai.response_cache import get_response_cache
+from student.chat_models import ChatConversation, ChatMessage
+
+
+class FakeRouter:
+    def __init__(self, chunks=None, error=None):
+        self.chunks = chunks or []
+        self.error = error
+        self.calls = 0
+
+    def stream(self, method, prompt, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise RuntimeError(self.error)
+        return 'gemini', iter(self.chunks)
+
+
+class ChatStreamTest(TestCase):
+    """Server-Sent Events chat endpoint"""
+
+    def setUp(self):
+        get_response_cache().clear()
+        self.user = User.objects.create_user(username='stream_user', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _events(self, router, message='Explain recursion'):
+        with patch('student.chat_api.get_provider_router', return_value=router):
+            response = self.client.post(reverse('chat-stream-message'), {'message': message}, format='json')
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            body = b''.join(response.streaming_content).decode()
+        events = []
+        for frame in body.strip().split('\n\n'):
+            event, data = frame.split('\n')
+            events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+        return events
+
+    def test_chunks_relayed_and_saved_once(self):
+        events = self._events(FakeRouter(['Recursion ', 'is a function ', 'calling itself.']))
+        names = [name for name, _ in events]
+        self.assertEqual(names, ['start', 'delta', 'delta', 'delta', 'done'])
+
+        done = events[-1][1]
+        self.assertEqual(done['message']['content'], 'Recursion is a function calling itself.')
+        self.assertIsNotNone(done['ttft_ms'])
+
+        conversation = ChatConversation.objects.get(pk=done['conversation_id'])
+        self.assertEqual(conversation.total_messages, 2)
+        ai_messages = ChatMessage.objects.filter(conversation=conversation, role='ai')
+        self.assertEqual([m.content for m in ai_messages], ['Recursion is a function calling itself.'])
+
+        # Opening question was cached: a new conversation gets it without a provider call
+        router = FakeRouter(['never'])
+        events = self._events(router)
+        self.assertEqual(router.calls, 0)
+        self.assertEqual(events[1], ('delta', {'content': 'Recursion is a function calling itself.'}))
+
+    def test_provider_failure_is_reported(self):
+        events = self._events(FakeRouter(error='all providers down'))
+        self.assertEqual([name for name, _ in events], ['start', 'error', 'done'])
+        self.assertTrue(events[-1][1]['message']['content'].startswith('⚠️ AI Error'))
+
+    def test_message_required(self):
+        response = self.client.post(reverse('chat-stream-message'), {}, format='json')
+        self.assertEqual(response.status_code, 400)
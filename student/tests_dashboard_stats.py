@@ -0,0 +1,65 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from student.models import (
+    UserProfile, Student, Attendence, Hostel, Room, HostelAllocation, Route
+)
+from student.services.dashboard_stats import compute_dashboard_stats
+
+
+class DashboardStatsEngineTest(APITestCase):
+    """Aggregated, cached dashboard counters"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='dash_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='INSTITUTE')
+
+        self.students = [
+            Student.objects.create(
+                created_by=self.owner, name=f'Student {i}', age=15, gender='M',
+                dob=date(2010, 1, 1), grade=10, relation='Father', roll_number=f'DS-{i}'
+            )
+            for i in range(4)
+        ]
+        Attendence.objects.create(student=self.students[0], date=date.today(), is_present=True)
+
+        hostel = Hostel.objects.create(
+            created_by=self.owner, name='North', hostel_type='BOYS', total_rooms=1, address='Campus'
+        )
+        room = Room.objects.create(created_by=self.owner, hostel=hostel, room_number='101', floor=1, capacity=4)
+        HostelAllocation.objects.create(
+            created_by=self.owner, student=self.students[0], room=room, check_in_date=date.today()
+        )
+        Route.objects.create(
+            created_by=self.owner, route_name='R1', start_point='A', end_point='B',
+            stops='A,B', pickup_time='07:00', drop_time='15:00', monthly_fare=500
+        )
+
+    def test_counters(self):
+        stats = compute_dashboard_stats(self.owner, 'INSTITUTE')
+        self.assertEqual(stats['students_count'], 4)
+        self.assertEqual(stats['attendance_percentage'], 25)
+        self.assertEqual(stats['hostel_occupancy'], 25)
+        self.assertEqual(stats['transport_routes'], 1)
+
+    def test_other_tenant_isolated(self):
+        other = User.objects.create_user(username='dash_other', password='password123')
+        stats = compute_dashboard_stats(other, 'INSTITUTE')
+        self.assertEqual(stats['students_count'], 0)
+        self.assertEqual(stats['hostel_occupancy'], 0)
+
+    def test_snapshot_cached_and_invalidated_on_write(self):
+        self.client.force_authenticate(user=self.owner)
+        first = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(first.data['students_count'], 4)
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard/stats/')
+
+        self.students[3].delete()
+        refreshed = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(refreshed.data['students_count'], 3)
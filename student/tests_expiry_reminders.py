@@ -0,0 +1,65 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from student.models import UserProfile, Notification, OutboxMessage
+from student.services import outbox
+from student.services.expiry_reminders import send_expiry_reminders
+
+
+@patch.object(outbox, 'OUTBOX_RUN_IN_THREAD', False)
+class ExpiryRemindersTest(TestCase):
+    """Set-based reminder job: trigger offsets only, bulk writes, idempotent per day"""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        for i, days in enumerate((7, 0, -5, 2)):
+            self._client(f'client{i}', days)
+        self._client('teacher', 7, role='TEACHER')
+
+    def _client(self, username, days, role='CLIENT'):
+        user = User.objects.create_user(username=username, password='password123',
+                                        email=f'{username}@example.com', first_name=username.title())
+        UserProfile.objects.create(user=user, role=role, institution_type='SCHOOL',
+                                   subscription_expiry=self.today + timedelta(days=days))
+        return user
+
+    def test_reminders_sent_once_per_day(self):
+        unrelated, _ = outbox.enqueue(outbox.CHANNEL_EMAIL, 'other@example.com', 'Approved', subject='Payment')
+        out = StringIO()
+        call_command('send_expiry_reminders', stdout=out)
+        self.assertIn('Sent 3 reminders.', out.getvalue())
+        # Other queued work is left to process_outbox
+        self.assertEqual(OutboxMessage.objects.get(pk=unrelated.pk).status, outbox.OUTBOX_PENDING)
+        unrelated.delete()
+
+        self.assertEqual(
+            sorted(m.subject for m in mail.outbox),
+            sorted([
+                '⚠️ Action Required: Your Plan Expires in 7 Days',
+                '🚨 URGENT: Your Plan Expires Today!',
+                '❌ Service Suspended: Plan Expired',
+            ])
+        )
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertIn('Dear Client0,', Notification.objects.get(recipient__username='client0').message)
+
+        # Rerun the same day: nothing new
+        result = send_expiry_reminders(self.today)
+        self.assertEqual(result, {'reminders': 0, 'emails': 0, 'skipped': 3})
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(OutboxMessage.objects.count(), 3)
+
+    def test_query_count_does_not_grow_with_clients(self):
+        for i in range(10):
+            self._client(f'bulk{i}', 3)
+        # profiles, already-reminded, notifications insert, outbox keys, outbox insert (+ savepoint pair)
+        with self.assertNumQueries(7):
+            result = send_expiry_reminders(self.today)
+        self.assertEqual(result['emails'], 13)
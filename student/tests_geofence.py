@@ -0,0 +1,128 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, Student, Attendence, Employee, CampusFence, StaffAttendance
+from student.services import geofence
+from student.services.geofence import check_point
+
+# Two branches ~5 km apart; the second one is a polygon
+NORTH = (28.6139, 77.2090)
+SOUTH_POLYGON = [[28.5650, 77.2000], [28.5650, 77.2100], [28.5750, 77.2100], [28.5750, 77.2000]]
+INSIDE_SOUTH = (28.5700, 77.2050)
+FAR_AWAY = (28.7000, 77.4000)
+
+
+class GeofenceTest(APITestCase):
+    """Multi-campus geo-fenced check-in for students and staff"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='geo_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='INSTITUTE')
+        self.north = CampusFence.objects.create(created_by=self.owner, name='North', lat=NORTH[0], long=NORTH[1], radius=300)
+        self.south = CampusFence.objects.create(
+            created_by=self.owner, name='South', lat=28.5700, long=77.2050, polygon=SOUTH_POLYGON
+        )
+
+        self.student_user = User.objects.create_user(username='geo_student', password='password123')
+        UserProfile.objects.create(user=self.student_user, role='STUDENT')
+        self.student = Student.objects.create(
+            created_by=self.owner, user=self.student_user, name='Geo Student', age=15, gender='M',
+            dob=date(2010, 1, 1), grade=10, relation='Father', roll_number='GEO-1'
+        )
+        self.teacher = User.objects.create_user(username='geo_teacher', password='password123')
+        UserProfile.objects.create(user=self.teacher, role='TEACHER')
+        Employee.objects.create(
+            created_by=self.owner, user=self.teacher, joining_date=date(2024, 1, 1),
+            basic_salary=30000, contract_type='PERMANENT'
+        )
+
+    def check_in(self, user, point):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('mark-geo-attendance'), {'lat': point[0], 'long': point[1]}, format='json')
+
+    def test_student_checks_in_at_any_branch(self):
+        response = self.check_in(self.student_user, INSIDE_SOUTH)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['campus'], 'South')
+        self.assertTrue(Attendence.objects.filter(student=self.student, is_present=True).exists())
+
+        again = self.check_in(self.student_user, INSIDE_SOUTH)
+        self.assertEqual(again.data['status'], 'PRESENT')
+
+        outside = self.check_in(self.student_user, FAR_AWAY)
+        self.assertEqual(outside.status_code, 403)
+        self.assertEqual(outside.data['code'], 'OUT_OF_RANGE')
+
+    def test_staff_check_in_recorded(self):
+        self.assertEqual(self.check_in(self.teacher, NORTH).data['role'], 'STAFF')
+        record = StaffAttendance.objects.get(user=self.teacher)
+        self.assertEqual((record.created_by, record.fence), (self.owner, self.north))
+        self.assertEqual(self.check_in(self.teacher, NORTH).data['message'], 'Already checked in today')
+        self.assertEqual(StaffAttendance.objects.count(), 1)
+
+    def test_only_students_and_staff_check_in(self):
+        parent = User.objects.create_user(username='geo_parent', password='password123')
+        UserProfile.objects.create(user=parent, role='PARENT')
+        orphan = User.objects.create_user(username='geo_orphan', password='password123')
+        UserProfile.objects.create(user=orphan, role='STUDENT')
+        for user in (parent, orphan, self.owner):
+            response = self.check_in(user, NORTH)
+            self.assertEqual((response.status_code, response.data['code']), (403, 'NOT_ATTENDEE'))
+        self.assertFalse(StaffAttendance.objects.exists())
+
+    def test_fences_cached_until_changed(self):
+        check_point(self.owner.pk, *NORTH)
+        with self.assertNumQueries(0):
+            self.assertTrue(check_point(self.owner.pk, *INSIDE_SOUTH).inside)
+
+        self.south.is_active = False
+        self.south.save()
+        match = check_point(self.owner.pk, *INSIDE_SOUTH)
+        self.assertEqual((match.inside, match.name), (False, 'North'))
+
+        # A write that sent no signal shows up once the local entry expires
+        CampusFence.objects.filter(pk=self.south.pk).update(is_active=True)
+        self.assertFalse(check_point(self.owner.pk, *INSIDE_SOUTH).inside)
+        version, compiled_at, fences = geofence._fence_sets[self.owner.pk]
+        geofence._fence_sets[self.owner.pk] = (version, compiled_at - geofence.GEOFENCE_TTL, fences)
+        self.assertTrue(check_point(self.owner.pk, *INSIDE_SOUTH).inside)
+
+    def test_profile_location_fallback_and_branch_limit(self):
+        CampusFence.objects.all().delete()
+        profile = self.owner.profile
+        profile.location_lat, profile.location_long = NORTH
+        profile.save()
+        self.assertEqual(self.check_in(self.student_user, NORTH).data['campus'], 'Main Campus')
+
+        profile.institution_type = 'SCHOOL'  # No 'multi_branch'
+        profile.save()
+        self.client.force_authenticate(user=self.owner)
+        url = reverse('campus-fences')
+        payload = {'name': 'North', 'lat': NORTH[0], 'long': NORTH[1], 'radius': 200}
+        self.assertEqual(self.client.post(url, payload, format='json').status_code, 201)
+        self.assertEqual(self.client.post(url, dict(payload, name='Second'), format='json').status_code, 403)
+        bad = self.client.post(url, dict(payload, polygon=[[1, 2]]), format='json')
+        self.assertEqual(bad.status_code, 400)
+
+    def test_owner_edits_and_deletes_fences(self):
+        url = reverse('campus-fence-detail', args=[self.north.pk])
+        self.client.force_authenticate(user=self.teacher)
+        self.assertEqual(self.client.get(url).data['name'], 'North')
+        self.assertEqual(self.client.patch(url, {'radius': 500}, format='json').status_code, 403)
+        self.assertEqual(self.client.delete(url).status_code, 403)
+
+        self.client.force_authenticate(user=self.owner)
+        self.assertEqual(self.client.patch(url, {'radius': 10}, format='json').status_code, 200)
+        self.assertEqual(self.check_in(self.teacher, FAR_AWAY).data['campus'], 'North')
+        self.client.force_authenticate(user=self.owner)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.check_in(self.teacher, NORTH).data['campus'], 'South')
+
+        stranger = User.objects.create_user(username='geo_stranger', password='password123')
+        UserProfile.objects.create(user=stranger, role='CLIENT', institution_type='INSTITUTE')
+        self.client.force_authenticate(user=stranger)
+        url = reverse('campus-fence-detail', args=[self.south.pk])
+        self.assertEqual(self.client.delete(url).status_code, 404)
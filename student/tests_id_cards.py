@@ -0,0 +1,78 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from pypdf import PdfReader
+from rest_framework.test import APITestCase
+
+from student import id_card_utils
+from student.models import UserProfile, Student
+from student.services.zip_stream import stream_zip
+
+
+class CountingPool(ThreadPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        CountingPool.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class IDCardBatchTest(APITestCase):
+    """Batch ID-card renderer"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='card_owner', password='password123')
+        UserProfile.objects.create(
+            user=self.owner, role='CLIENT', institution_type='SCHOOL', institution_name='Green Valley'
+        )
+        for i in range(6):
+            Student.objects.create(
+                created_by=self.owner, name=f'Card {i}', age=12, gender='F',
+                dob=date(2013, 1, 1), grade=6, relation='Mother', roll_number=f'IDC-{i}'
+            )
+
+    def _students(self):
+        return list(Student.objects.filter(created_by=self.owner).select_related('parent', 'created_by__profile'))
+
+    def test_multi_page_pdf_without_queries(self):
+        students = self._students()
+        with self.assertNumQueries(0):
+            pdf = id_card_utils.generate_id_cards_pdf(students)
+        reader = PdfReader(pdf)
+        self.assertEqual(len(reader.pages), 6)
+        self.assertIn('GREEN VALLEY', reader.pages[0].extract_text())
+
+    def test_zip_one_pdf_per_student(self):
+        zipped = b''.join(stream_zip(id_card_utils.iter_id_card_files(self._students())))
+        archive = zipfile.ZipFile(BytesIO(zipped))
+        self.assertEqual(sorted(archive.namelist()), [f'ID_IDC-{i}.pdf' for i in range(6)])
+        self.assertEqual(len(PdfReader(BytesIO(archive.read('ID_IDC-0.pdf'))).pages), 1)
+
+    @patch.object(id_card_utils, 'ID_CARD_PARALLEL_MIN', 2)
+    def test_process_pool_keeps_order(self):
+        reader = PdfReader(id_card_utils.generate_id_cards_pdf(self._students(), workers=2))
+        self.assertEqual(len(reader.pages), 6)
+        self.assertIn('CARD 0', reader.pages[0].extract_text())
+        self.assertIn('CARD 5', reader.pages[5].extract_text())
+
+    @patch.object(id_card_utils, 'ID_CARD_PARALLEL_MIN', 2)
+    @patch.object(id_card_utils, 'ProcessPoolExecutor', CountingPool)
+    def test_streamed_chunks_submitted_in_a_bounded_window(self):
+        CountingPool.submitted = 0
+        files = id_card_utils.iter_id_card_files(self._students(), workers=2)  # 6 chunks of one card
+        self.assertEqual(next(files)[0], 'ID_IDC-0.pdf')
+        self.assertEqual(CountingPool.submitted, 5)  # 2 per worker + the top-up
+        self.assertEqual([name for name, _ in files], [f'ID_IDC-{i}.pdf' for i in range(1, 6)])
+        self.assertEqual(CountingPool.submitted, 6)
+
+    def test_batch_endpoint(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get('/api/generate/id-cards/', {'grade': 6})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(len(PdfReader(BytesIO(response.content)).pages), 6)
+        self.assertEqual(self.client.get('/api/generate/id-cards/', {'grade': 'six'}).status_code, 400)
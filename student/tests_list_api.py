@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from student.models import (
+    UserProfile, Student, Payment, Hostel, Room, HostelAllocation, Course, Batch, Enrollment
+)
+
+
+class ListApiTest(APITestCase):
+    """Keyset pages, sparse fields and lean querysets on the list endpoints"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='list_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='INSTITUTE')
+        self.students = [
+            Student.objects.create(
+                created_by=self.owner, name=f'Student {i}', age=15, gender='M',
+                dob=date(2010, 1, 1), grade=10, relation='Father', roll_number=f'LS-{i}'
+            )
+            for i in range(7)
+        ]
+        self.client.force_authenticate(user=self.owner)
+
+    def test_unpaginated_list_unchanged(self):
+        response = self.client.get(reverse('student-create-list'))
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+        self.assertIn('parent_name', response.data[0])
+
+    def test_keyset_pages_and_sparse_fields(self):
+        seen, url = [], reverse('student-create-list') + '?page_size=3&fields=id,name'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.data['results']]
+            self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+            url = response.data['next']
+        self.assertEqual(seen, sorted((s.pk for s in self.students), reverse=True))
+
+        self.assertEqual(self.client.get(reverse('student-create-list'), {'cursor': 'bogus'}).status_code, 400)
+
+    def test_created_at_key_and_constant_queries(self):
+        for i, student in enumerate(self.students):
+            Payment.objects.create(
+                student=student, amount=100 + i, due_date=date.today() - timedelta(days=i),
+                status='PENDING', payment_type='FEE'
+            )
+        response = self.client.get(reverse('payment-list-create'), {'page_size': 5})
+        self.assertEqual([row['amount'] for row in response.data['results']], ['106.00', '105.00', '104.00', '103.00', '102.00'])
+        self.assertTrue(response.data['results'][0]['is_overdue'])
+
+        with self.assertNumQueries(1):
+            rest = self.client.get(response.data['next'])
+        self.assertEqual([row['amount'] for row in rest.data['results']], ['101.00', '100.00'])
+        self.assertFalse(rest.data['results'][-1]['is_overdue'])  # Due today
+        self.assertIsNone(rest.data['next'])
+
+    def test_malformed_cursor_values_are_rejected(self):
+        for values in (['abc', 1], ['2024-01-01T00:00:00', 'x'], [None, 1], {'id': 1}):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            response = self.client.get(reverse('payment-list-create'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, values)
+            self.assertIn('cursor', response.data)
+
+    def test_generic_views_use_lean_rows(self):
+        hostel = Hostel.objects.create(
+            created_by=self.owner, name='North', hostel_type='BOYS', total_rooms=1, address='Campus'
+        )
+        room = Room.objects.create(created_by=self.owner, hostel=hostel, room_number='101', floor=1, capacity=4)
+        for student in self.students:
+            HostelAllocation.objects.create(
+                created_by=self.owner, student=student, room=room, check_in_date=date.today()
+            )
+        course = Course.objects.create(
+            created_by=self.owner, name='Physics', code='LP-1', description='-', duration_weeks=4
+        )
+        batch = Batch.objects.create(created_by=self.owner, course=course, name='Morning', start_date=date.today())
+        Enrollment.objects.create(created_by=self.owner, student=self.students[0], batch=batch)
+
+        self.client.get(reverse('hostel-allocations'))  # Warm the tenant context
+        with self.assertNumQueries(1):
+            rows = self.client.get(reverse('hostel-allocations')).data
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0]['hostel_name'], 'North')
+
+        batches = self.client.get(reverse('batch-list'), {'fields': 'name,course_name,student_count'}).data
+        self.assertEqual(batches, [{'name': 'Morning', 'course_name': 'Physics', 'student_count': 1}])
@@ -0,0 +1,133 @@
+from datetime import date
+from io import StringIO
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from student.models import OutboxMessage, Payment, DemoRequest
+from student.services import outbox
+from student.services.outbox import (
+    enqueue, drain_outbox, CHANNEL_EMAIL, CHANNEL_SMS, CHANNEL_TELEGRAM,
+    OUTBOX_SENT, OUTBOX_PENDING, OUTBOX_FAILED,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@patch.object(outbox, 'OUTBOX_RUN_IN_THREAD', False)
+class OutboxTest(TestCase):
+    """Queued notifications: dedupe, batching, retries"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_dedupe_key(self):
+        first, created = enqueue(CHANNEL_SMS, '9876543210', 'Hello', dedupe_key='fee:1')
+        again, created_again = enqueue(CHANNEL_SMS, '9876543210', 'Hello', dedupe_key='fee:1')
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.pk, again.pk)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_sms_batched_and_retried(self):
+        for number in ('9000000001', '9000000002', '9000000003'):
+            enqueue(CHANNEL_SMS, number, 'Fee due')
+        enqueue(CHANNEL_SMS, '9000000004', 'Exam tomorrow')
+
+        def send_bulk(numbers, message, template_id=None):
+            return [
+                {'status': 'error', 'error': 'DND'} if n == '9000000002' else {'status': 'sent', 'message_id': 'R1'}
+                for n in numbers
+            ]
+
+        with patch.object(outbox.sms_service, 'send_bulk', side_effect=send_bulk) as bulk:
+            counts = drain_outbox()
+
+        # One gateway call per distinct text
+        self.assertEqual(bulk.call_count, 2)
+        self.assertEqual(counts, {'sent': 3, 'retrying': 1, 'failed': 0})
+
+        failed = OutboxMessage.objects.get(recipient='9000000002')
+        self.assertEqual(failed.status, OUTBOX_PENDING)
+        self.assertEqual((failed.attempts, failed.last_error), (1, 'DND'))
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        self.assertEqual(OutboxMessage.objects.get(recipient='9000000001').provider_message_id, 'R1')
+
+        # Not due yet: nothing to claim
+        self.assertEqual(drain_outbox(), {'sent': 0, 'retrying': 0, 'failed': 0})
+
+        OutboxMessage.objects.filter(pk=failed.pk).update(next_attempt_at=timezone.now())
+        with patch.object(outbox, 'OUTBOX_MAX_ATTEMPTS', 2), \
+                patch.object(outbox.sms_service, 'send_bulk', side_effect=send_bulk):
+            self.assertEqual(drain_outbox()['failed'], 1)
+        self.assertEqual(OutboxMessage.objects.get(pk=failed.pk).status, OUTBOX_FAILED)
+
+    def test_email_with_attachment(self):
+        enqueue(
+            CHANNEL_EMAIL, 'client@example.com', 'Password: secret', subject='Activated',
+            attachment=b'%PDF-1.4', attachment_name='Invoice.pdf', sensitive=True,
+        )
+        out = StringIO()
+        call_command('process_outbox', stdout=out)
+        self.assertIn('Sent 1', out.getvalue())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].attachments[0][0], 'Invoice.pdf')
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.status, OUTBOX_SENT)
+        self.assertEqual(message.body, '')  # Credentials are not kept once delivered
+
+    def test_telegram_text_not_repeated_when_document_fails(self):
+        message, _ = enqueue(CHANNEL_TELEGRAM, '12345', 'Payment approved', attachment=b'%PDF-1.4', attachment_name='Invoice.pdf')
+        with patch.object(outbox, 'send_telegram_message', return_value=True) as text, \
+                patch.object(outbox, 'send_telegram_document', side_effect=[False, True]) as document:
+            self.assertEqual(drain_outbox()['retrying'], 1)
+            OutboxMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(drain_outbox()['sent'], 1)
+        self.assertEqual((text.call_count, document.call_count), (1, 2))
+        self.assertEqual(document.call_args.args, ('12345', b'%PDF-1.4', 'Invoice.pdf'))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@patch.object(outbox, 'OUTBOX_RUN_IN_THREAD', False)
+class OutboxProducersTest(APITestCase):
+    """Request handlers queue their notifications instead of sending them"""
+
+    def test_payment_approval_queues_notifications(self):
+        admin = User.objects.create_superuser(username='root_admin', password='password123', email='root@example.com')
+        payment = Payment.objects.create(
+            amount='1500.00', due_date=date.today(), status='PENDING_VERIFICATION',
+            payment_type='SUBSCRIPTION', description='School plan',
+            metadata={'email': 'new_client@example.com', 'plan_type': 'SCHOOL'},
+        )
+        self.client.force_authenticate(user=admin)
+
+        with patch('student.services.outbox.send_telegram_message') as telegram:
+            response = self.client.post(
+                reverse('admin-approve-payment'), {'payment_id': payment.pk, 'action': 'approve'}, format='json'
+            )
+            self.assertEqual(response.status_code, 200)
+            telegram.assert_not_called()
+
+        queued = {m.channel: m for m in OutboxMessage.objects.all()}
+        self.assertEqual(set(queued), {CHANNEL_EMAIL, CHANNEL_TELEGRAM})
+        self.assertEqual(queued[CHANNEL_EMAIL].recipient, 'new_client@example.com')
+        self.assertTrue(queued[CHANNEL_EMAIL].attachment)
+        self.assertEqual(queued[CHANNEL_TELEGRAM].dedupe_key, f"payment:{payment.pk}:approved:telegram")
+
+    def test_demo_request_queues_notifications(self):
+        demo = DemoRequest.objects.create(name='Asha', phone='9876543210', email='asha@example.com')
+        self.assertEqual(demo.send_notifications(), {'whatsapp': OUTBOX_PENDING, 'sms': OUTBOX_PENDING})
+        demo.send_notifications()
+        self.assertEqual(OutboxMessage.objects.filter(dedupe_key__startswith=f"demo:{demo.pk}:").count(), 2)
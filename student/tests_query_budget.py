@@ -0,0 +1,163 @@
+"""
+Per-endpoint query budget suite.
+
+Calls every GET route of student/urls.py as the role it serves, once for a
+small tenant and once for a tenant 4x its size, and fails when an endpoint
+- issues more queries for the bigger tenant (an N+1 loop),
+- exceeds its query budget, or its wall-time budget,
+- or errors (5xx).
+The report of every endpoint is part of the failure message; set
+QUERY_BUDGET_REPORT=<path> to also write it to a file on every run.
+"""
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from student import urls as student_urls
+from student.models import ImportJob, GeneratedReport, CampusFence
+from student.services.demo_data import seed_tenant
+
+SMALL_TENANT = 3
+LARGE_TENANT = 12
+
+DEFAULT_QUERY_BUDGET = 12
+DEFAULT_TIME_BUDGET = 1.0  # seconds, generous for CI
+
+# Endpoints with a documented exception to the default budget
+QUERY_BUDGETS = {
+    'dashboard-stats': 20,
+    'superadmin-advanced-dashboard': 25,
+}
+TIME_BUDGETS = {
+    # PDF rendering
+    'generate-id-card': 3.0, 'generate-id-cards': 5.0, 'generate-admit-card': 3.0,
+    'generate-report-card': 3.0, 'my-report-card': 3.0, 'my-admit-card': 3.0, 'invoice-download': 3.0,
+}
+
+# Not swept: they call external providers or end the session
+SKIPPED = {
+    'chatgpt-health': 'calls the AI provider',
+    'ai-providers-health': 'calls every AI provider',
+    'ai-logout': 'logs the user out',
+}
+
+# Who calls the endpoint (default: the tenant owner)
+ROLES = {
+    'my-results': 'student_user', 'my-report-card': 'student_user', 'my-admit-card': 'student_user',
+    'student-dashboard': 'student_user', 'parent-dashboard': 'parent', 'teacher-dashboard': 'teacher',
+    'admin-pending-payments': 'superadmin', 'superadmin-overview': 'superadmin',
+    'superadmin-advanced-dashboard': 'superadmin',
+}
+
+# URL kwargs from the tenant's seeded rows
+URL_KWARGS = {
+    'student-details': lambda t: {'id': t.students[0].pk},
+    'attendence-details': lambda t: {'id': t.students[0].attendence_set.first().pk},
+    'payment-details': lambda t: {'id': t.payment.pk},
+    'invoice-download': lambda t: {'payment_id': t.subscription_payment.pk},
+    'library-book-detail': lambda t: {'pk': t.book.pk},
+    'course-detail': lambda t: {'pk': t.course.pk},
+    'chat-load-conversation': lambda t: {'conversation_id': t.conversation.pk},
+    'generate-id-card': lambda t: {'student_id': t.students[0].pk},
+    'generate-admit-card': lambda t: {'student_id': t.students[0].pk},
+    'generate-report-card': lambda t: {'student_id': t.students[0].pk},
+    'bulk-import-status': lambda t: {'job_id': t.import_job.pk},
+    'report-download': lambda t: {'pk': t.report.pk},
+    'reports-download': lambda t: {'pk': t.report.pk},
+    'campus-fence-detail': lambda t: {'pk': t.fence.pk},
+}
+
+QUERY_PARAMS = {
+    'global-search': {'q': 'rahul'},
+    'chat-search': {'q': 'fees'},
+    'generate-id-cards': {'batch_id': 'all'},
+}
+
+
+def get_routes():
+    """(name, view class) of every GET route, first pattern per name"""
+    routes, seen = [], set()
+    for pattern in student_urls.urlpatterns:
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if not pattern.name or pattern.name in seen or view_class is None or not hasattr(view_class, 'get'):
+            continue
+        seen.add(pattern.name)
+        routes.append(pattern.name)
+    return routes
+
+
+class QueryBudgetTest(TestCase):
+    """N+1 and latency regressions across every GET endpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = User.objects.create_superuser('budget_root', 'root@example.com', 'password123')
+        cls.small = seed_tenant('qbsmall', students=SMALL_TENANT, days=5)
+        cls.large = seed_tenant('qblarge', students=LARGE_TENANT, days=20)
+        for tenant in (cls.small, cls.large):
+            tenant.import_job = ImportJob.objects.create(
+                created_by=tenant.owner, user=tenant.owner, import_type='STUDENT',
+                status='COMPLETED', file_name='students.csv',
+            )
+            tenant.report = GeneratedReport.objects.create(
+                created_by=tenant.owner, user=tenant.owner, name='Finance Report',
+                report_type='FINANCE', period='2026-01', status='PENDING',
+            )
+            tenant.fence = CampusFence.objects.create(created_by=tenant.owner, name='Main', lat=28.6139, long=77.2090)
+
+    def measure(self, name, tenant):
+        """(status, queries, seconds) of one GET as the route's role"""
+        role = ROLES.get(name, 'owner')
+        user = self.superadmin if role == 'superadmin' else getattr(tenant, role)
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user=User.objects.get(pk=user.pk))  # Fresh user: no memoized tenant context
+        url = reverse(name, kwargs=URL_KWARGS[name](tenant) if name in URL_KWARGS else None)
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url, QUERY_PARAMS.get(name, {}))
+            elapsed = time.perf_counter() - started
+        return response.status_code, len(queries), elapsed
+
+    def test_every_endpoint_within_budget(self):
+        rows, problems = [], []
+        for name in get_routes():
+            if name in SKIPPED:
+                rows.append(f"{name:<34} skipped: {SKIPPED[name]}")
+                continue
+
+            status_small, small, _ = self.measure(name, self.small)
+            status_large, large, elapsed = self.measure(name, self.large)
+            query_budget = QUERY_BUDGETS.get(name, DEFAULT_QUERY_BUDGET)
+            time_budget = TIME_BUDGETS.get(name, DEFAULT_TIME_BUDGET)
+
+            issues = []
+            if max(status_small, status_large) >= 500:
+                issues.append(f"HTTP {status_small}/{status_large}")
+            if large > small:
+                issues.append(f"N+1: {small} -> {large} queries")
+            if large > query_budget:
+                issues.append(f"{large} queries > budget {query_budget}")
+            if elapsed > time_budget:
+                issues.append(f"{elapsed:.2f}s > budget {time_budget}s")
+
+            rows.append(
+                f"{name:<34} {status_large:>3} {small:>3}q/{large:>3}q (budget {query_budget:>2}) "
+                f"{elapsed * 1000:>7.1f}ms {'; '.join(issues) or 'ok'}"
+            )
+            if issues:
+                problems.append(name)
+
+        report = "\n".join(rows)
+        if os.environ.get('QUERY_BUDGET_REPORT'):
+            with open(os.environ['QUERY_BUDGET_REPORT'], 'w') as handle:
+                handle.write(report + "\n")
+        self.assertEqual(problems, [], f"Endpoints over budget:\n{report}")
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from pypdf import PdfReader
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, Student, Subject, Exam, Grade, GeneratedReport
+from student.services import report_cards, report_jobs
+from student.services.report_cards import build_report_cards, student_report_card
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@patch.object(report_jobs, 'REPORT_RUN_IN_THREAD', False)
+class ReportCardTest(APITestCase):
+    """Report cards from Grade rows, ranked class-wide"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='card_report_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='SCHOOL', institution_name='Hill School')
+        maths = Subject.objects.create(created_by=self.owner, name='Mathematics', code='RC-MATH')
+        science = Subject.objects.create(created_by=self.owner, name='Science', code='RC-SCI')
+        exams = [
+            Exam.objects.create(
+                created_by=self.owner, name='Final', exam_type='FINAL', subject=subject, grade_class='8',
+                total_marks=100, passing_marks=35, exam_date=date(2026, 3, 10)
+            )
+            for subject in (maths, science)
+        ]
+        # Overall: 90%, 70%, 70%, 20%; the last student has no marks
+        marks = [(95, 85), (70, 70), (60, 80), (10, 30)]
+        self.students = []
+        for i in range(5):
+            student = Student.objects.create(
+                created_by=self.owner, name=f'Pupil {i}', age=13, gender='M',
+                dob=date(2012, 1, 1), grade=8, relation='Father', roll_number=f'RC-{i}'
+            )
+            self.students.append(student)
+            for exam, score in zip(exams, marks[i] if i < len(marks) else ()):
+                Grade.objects.create(created_by=self.owner, student=student, exam=exam, marks_obtained=score)
+        self.client.force_authenticate(user=self.owner)
+
+    def test_class_totals_ranks_and_percentiles(self):
+        with self.assertNumQueries(2):
+            cards = build_report_cards(self.owner, grade=8)
+        top, second, third, last, unmarked = (cards[s.pk] for s in self.students)
+
+        self.assertEqual((top['obtained'], top['max'], top['percentage']), (180, 200, 90.0))
+        self.assertEqual([line.subject for line in top['exams']], ['Mathematics', 'Science'])
+        self.assertEqual([(c['rank'], c['percentile']) for c in (top, second, third, last)],
+                         [(1, 100.0), (2, 75.0), (2, 75.0), (4, 25.0)])
+        self.assertEqual((last['passed'], last['failed']), (0, 2))
+        self.assertEqual((unmarked['rank'], unmarked['exams'], top['cohort_size']), (None, [], 4))
+
+    def test_single_report_card_uses_real_marks(self):
+        response = self.client.get(reverse('generate-report-card', args=[self.students[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        text = PdfReader(BytesIO(response.content)).pages[0].extract_text()
+        self.assertIn('HILL SCHOOL', text)
+        self.assertIn('Mathematics', text)
+        self.assertIn('Class Rank: 1 of 4', text)
+
+    def test_class_zip_and_merged_background_pdf(self):
+        url = reverse('generate-report-cards')
+        response = self.client.get(url, {'grade': 8})
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 5)
+        self.assertIn('Progress_Report_Pupil 3.pdf', archive.namelist())
+
+        queued = self.client.post(url, {'grade': 8}, format='json')
+        self.assertEqual(queued.status_code, 202)
+        self.assertEqual(self.client.post(url, {'grade': 8}, format='json').data['report_id'], queued.data['report_id'])
+
+        self.assertTrue(report_jobs.process_report(queued.data['report_id']))
+        report = GeneratedReport.objects.get(pk=queued.data['report_id'])
+        self.assertEqual((report.status, report.params), ('READY', {'grade': 8}))
+        reader = PdfReader(report.file.open('rb'))
+        self.assertGreaterEqual(len(reader.pages), 5)
+        self.assertIn('Pupil 4', reader.pages[-1].extract_text())
+
+        # Finished: the next request renders current marks again
+        self.assertNotEqual(self.client.post(url, {'grade': 8}, format='json').data['report_id'], report.pk)
+        self.assertEqual(self.client.get(url, {'grade': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'grade': 9}).status_code, 404)
+
+    def test_single_card_loads_only_its_grade(self):
+        kid = Student.objects.create(
+            created_by=self.owner, name='Nursery', age=4, gender='F',
+            dob=date(2022, 1, 1), grade=0, relation='Mother', roll_number='RC-N'
+        )
+        with patch.object(report_cards, 'compute_report_cards', wraps=report_cards.compute_report_cards) as compute:
+            self.assertIsNone(student_report_card(kid)['rank'])
+        self.assertEqual(compute.call_args.args[0], [kid])
+
+    def test_class_cards_need_an_institution(self):
+        orphan = User.objects.create_user(username='card_report_orphan', password='password123')
+        UserProfile.objects.create(user=orphan, role='TEACHER')
+        self.client.force_authenticate(user=orphan)
+        with patch('student.views.get_owner_user', return_value=None):
+            response = self.client.get(reverse('generate-report-cards'), {'grade': 8})
+        self.assertEqual((response.status_code, response.data), (403, {"error": "Permission denied"}))
+
+    def test_student_without_owner_is_ranked_alone(self):
+        orphan = self.students[0]
+        Student.objects.filter(pk=orphan.pk).update(created_by=None)
+        orphan.refresh_from_db()
+        card = student_report_card(orphan)
+        self.assertEqual((card['obtained'], card['rank'], card['cohort_size']), (180, 1, 1))
+
+        names = [name for name, _ in report_cards.iter_report_card_files([orphan, self.students[1]])]
+        self.assertEqual(names, ['Progress_Report_Pupil 0.pdf', 'Progress_Report_Pupil 1.pdf'])
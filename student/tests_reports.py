@@ -0,0 +1,84 @@
+from io import StringIO
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, GeneratedReport
+from student.services import report_jobs
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@patch.object(report_jobs, 'REPORT_RUN_IN_THREAD', False)
+class ReportQueueTest(APITestCase):
+    """Queued, de-duplicated, stored report PDFs"""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='report_owner', password='password123', email='o@example.com')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='SCHOOL')
+        self.client.force_authenticate(user=self.owner)
+
+    def _queue(self, **data):
+        return self.client.post('/api/reports/', {'type': 'GENERAL', 'period': '2026-09', **data}, format='json')
+
+    def test_queue_render_and_download(self):
+        response = self._queue()
+        self.assertEqual(response.status_code, 202)
+        report_id = response.data['report_id']
+
+        pending = self.client.get(f'/api/reports/download/{report_id}/')
+        self.assertEqual(pending.status_code, 409)
+        self.assertIn('Retry-After', pending)
+
+        call_command('process_report_jobs', stdout=StringIO())
+        report = GeneratedReport.objects.get(pk=report_id)
+        self.assertEqual(report.status, 'READY')
+
+        download = self.client.get(f'/api/reports/download/{report_id}/')
+        self.assertEqual(download.status_code, 200)
+        body = b''.join(download.streaming_content)
+        self.assertTrue(body.startswith(b'%PDF'))
+        self.assertEqual(download['ETag'], f'"{report.etag}"')
+
+        not_modified = self.client.get(f'/api/reports/download/{report_id}/', HTTP_IF_NONE_MATCH=download['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        partial = self.client.get(f'/api/reports/download/{report_id}/', HTTP_RANGE='bytes=0-9')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.content, body[:10])
+        self.assertEqual(partial['Content-Range'], f'bytes 0-9/{len(body)}')
+
+    def test_identical_requests_are_deduplicated(self):
+        first = self._queue()
+        second = self._queue()
+        self.assertEqual(first.data['report_id'], second.data['report_id'])
+
+        report_jobs.process_report(first.data['report_id'])
+        with patch.object(report_jobs, 'render_report_pdf') as render:
+            third = self._queue()
+            render.assert_not_called()
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.data['report_id'], first.data['report_id'])
+
+        other_period = self._queue(period='2026-08')
+        self.assertNotEqual(other_period.data['report_id'], first.data['report_id'])
+        self.assertEqual(GeneratedReport.objects.filter(created_by=self.owner).count(), 2)
+
+    def test_report_is_claimed_once(self):
+        report_id = self._queue().data['report_id']
+        self.assertTrue(report_jobs.process_report(report_id))
+        self.assertFalse(report_jobs.process_report(report_id))
+
+    def test_invalid_period(self):
+        self.assertEqual(self._queue(period='Sept').status_code, 400)
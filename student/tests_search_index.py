@@ -0,0 +1,78 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, Student, Course, Batch, SearchEntry
+from student.services.search_index import search, KIND_STUDENT
+
+
+class GlobalSearchIndexTest(APITestCase):
+    """Indexed, tenant-scoped global search"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='search_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='INSTITUTE')
+        self.student = self.make_student(self.owner, 'Aarav Sharma', 'GS-1')
+        self.course = Course.objects.create(
+            created_by=self.owner, name='Physics Olympiad', code='PHY-1', description='-', duration_weeks=12, fee=900
+        )
+        self.batch = Batch.objects.create(
+            created_by=self.owner, course=self.course, name='Morning Batch', start_date=date.today()
+        )
+
+    @staticmethod
+    def make_student(owner, name, roll_number):
+        return Student.objects.create(
+            created_by=owner, name=name, age=15, gender='M',
+            dob=date(2010, 1, 1), grade=10, relation='Father', roll_number=roll_number
+        )
+
+    def test_signals_keep_entries_current(self):
+        self.assertEqual(SearchEntry.objects.filter(created_by=self.owner).count(), 3)
+
+        self.student.name = 'Vihaan Sharma'
+        self.student.save()
+        self.assertEqual([r['title'] for r in search(self.owner, 'vihaan')], ['Vihaan Sharma'])
+        self.assertEqual(search(self.owner, 'aarav'), [])  # Old terms are gone from the index too
+
+        self.course.name = 'Chemistry Olympiad'
+        self.course.save()
+        self.assertEqual(search(self.owner, 'morning')[0]['subtitle'], 'Course: Chemistry Olympiad')
+
+        self.student.delete()
+        self.assertFalse(SearchEntry.objects.filter(kind=KIND_STUDENT).exists())
+
+    def test_prefix_words_and_roll_number(self):
+        self.assertEqual(search(self.owner, 'sharma aar')[0]['url'], f"#students/{self.student.pk}")
+        self.assertEqual(search(self.owner, 'gs-1')[0]['title'], 'Aarav Sharma')
+        self.assertEqual(search(self.owner, 'phy')[0]['type'], 'Course')
+
+    def test_view_is_one_query_and_tenant_scoped(self):
+        other = User.objects.create_user(username='search_other', password='password123')
+        UserProfile.objects.create(user=other, role='CLIENT', institution_type='INSTITUTE')
+        self.make_student(other, 'Aarav Other', 'GS-2')
+
+        self.client.force_authenticate(user=self.owner)
+        self.client.get(reverse('global-search'), {'q': 'aa'})  # Warm the tenant context
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('global-search'), {'q': 'aarav'})
+        self.assertEqual([r['title'] for r in response.data], ['Aarav Sharma'])
+        self.assertEqual(self.client.get(reverse('global-search'), {'q': 'a'}).data, [])
+
+    def test_school_plan_skips_courses(self):
+        UserProfile.objects.filter(user=self.owner).update(institution_type='SCHOOL')
+        self.owner.refresh_from_db()
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(reverse('global-search'), {'q': 'olympiad'})
+        self.assertEqual([r['type'] for r in response.data], ['Batch'])  # Batches match on their course name
+
+    def test_rebuild_command(self):
+        SearchEntry.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', owner=self.owner.pk, stdout=out)
+        self.assertIn('Indexed 3', out.getvalue())
+        self.assertEqual(len(search(self.owner, 'morning')), 1)
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from student.models import Attendence, Exam, Grade, Student
+from student.services import student_context
+from student.services.student_context import get_student_context
+
+
+class StudentContextSnapshotTest(TestCase):
+    """Cached RAG profile for the AI chat"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='ctx_owner', password='password123')
+        self.login = User.objects.create_user(username='ctx_student', password='password123')
+        self.student = Student.objects.create(
+            name='Asha', age=15, gender='F', dob=date(2010, 1, 1), grade=10,
+            relation='Self', user=self.login, created_by=self.owner,
+        )
+
+    def _exam(self, name, owner, days=5):
+        return Exam.objects.create(
+            name=name, exam_type='UNIT', grade_class='Class 10', total_marks=100,
+            passing_marks=35, exam_date=date.today() + timedelta(days=days), created_by=owner,
+        )
+
+    def test_cache_hit_needs_no_queries(self):
+        first = get_student_context(self.login)
+        self.assertIn('Student Profile: Asha (Grade 10)', first)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_student_context(self.login), first)
+
+    def test_writes_invalidate_snapshot(self):
+        self.assertIn('Attendance Record: No data yet.', get_student_context(self.login))
+        Attendence.objects.create(student=self.student, date=date.today(), is_present=True)
+        self.assertIn('100.0% (1/1 days present)', get_student_context(self.login))
+
+        exam = self._exam('Algebra Test', self.owner)
+        self.assertIn('- Algebra Test:', get_student_context(self.login))
+        Grade.objects.create(student=self.student, exam=exam, marks_obtained=80)
+        self.assertIn('Algebra Test (General): 80', get_student_context(self.login))
+
+    def test_other_tenant_exams_excluded(self):
+        other = User.objects.create_user(username='ctx_other', password='password123')
+        self._exam('Foreign Exam', other)
+        self.assertNotIn('Foreign Exam', get_student_context(self.login))
+
+    def test_non_student_gets_role_line(self):
+        self.assertEqual(get_student_context(self.owner), 'User Role: User')
+
+    def test_per_process_cache_keeps_snapshots_briefly(self):
+        with patch.object(student_context, 'cache') as fake:
+            fake.get.return_value = None
+            get_student_context(self.login)
+            self.assertEqual(fake.set.call_args.args[2], student_context.CONTEXT_LOCAL_TTL)
+
+            with patch.object(student_context, 'cache_is_shared', return_value=True):
+                get_student_context(self.login)
+            self.assertEqual(fake.set.call_args.args[2], student_context.CONTEXT_CACHE_TTL)
+
+    def test_refresh_command_needs_a_shared_cache(self):
+        out = StringIO()
+        with self.assertNumQueries(0):
+            call_command('refresh_student_contexts', stdout=out)
+        self.assertIn('Skipped', out.getvalue())
+
+        with patch.object(student_context, 'cache_is_shared', return_value=True):
+            call_command('refresh_student_contexts', stdout=out)
+        self.assertIn('Refreshed 1 student context(s).', out.getvalue())
+        self.assertIn('Student Profile: Asha', cache.get(student_context._context_key(self.login.pk)))
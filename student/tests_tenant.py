@@ -0,0 +1,67 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from student.models import UserProfile, Employee
+from student.tenant import get_tenant_context, clear_tenant_context
+from student.views import get_owner_user
+
+
+class TenantContextTest(TestCase):
+    """Owner / profile resolution is cached per user instance"""
+
+    def setUp(self):
+        self.client_user = User.objects.create_user(username='owner_tc', password='password123')
+        UserProfile.objects.create(user=self.client_user, role='CLIENT', institution_type='SCHOOL')
+
+        self.teacher = User.objects.create_user(username='teacher_tc', password='password123')
+        UserProfile.objects.create(user=self.teacher, role='TEACHER', institution_type='SCHOOL')
+        Employee.objects.create(
+            user=self.teacher,
+            created_by=self.client_user,
+            joining_date=date.today(),
+            basic_salary=1000,
+            contract_type='PERMANENT'
+        )
+
+        self.parent = User.objects.create_user(username='parent_tc', password='password123')
+        UserProfile.objects.create(user=self.parent, role='PARENT')
+
+    def _fresh(self, user):
+        return User.objects.get(pk=user.pk)
+
+    def test_client_owns_data(self):
+        context = get_tenant_context(self._fresh(self.client_user))
+        self.assertEqual(context.owner, self.client_user)
+        self.assertEqual(context.role, 'CLIENT')
+        self.assertEqual(context.plan, 'SCHOOL')
+        self.assertTrue(context.is_owner)
+
+    def test_teacher_resolves_to_employer(self):
+        teacher = self._fresh(self.teacher)
+        self.assertEqual(get_owner_user(teacher), self.client_user)
+        self.assertFalse(get_tenant_context(teacher).is_owner)
+
+    def test_parent_owns_own_data(self):
+        self.assertEqual(get_owner_user(self._fresh(self.parent)), self.parent)
+
+    def test_user_without_profile(self):
+        user = User.objects.create_user(username='bare_tc', password='password123')
+        context = get_tenant_context(user)
+        self.assertIsNone(context.profile)
+        self.assertEqual(context.owner, user)
+
+    def test_resolved_once_per_user_instance(self):
+        teacher = self._fresh(self.teacher)
+        with self.assertNumQueries(1):
+            get_owner_user(teacher)
+            get_owner_user(teacher)
+            get_tenant_context(teacher).plan
+
+    def test_clear_context(self):
+        teacher = self._fresh(self.teacher)
+        get_owner_user(teacher)
+        clear_tenant_context(teacher)
+        with self.assertNumQueries(1):
+            get_owner_user(teacher)
@@ -0,0 +1,65 @@
+import zipfile
+from datetime import date
+from io import BytesIO
+
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from pypdf import PdfReader
+from rest_framework.test import APITestCase
+
+from student.models import UserProfile, Student
+from student.services.zip_stream import stream_zip, pdf_entries
+
+
+class ZipStreamTest(APITestCase):
+    """Bulk PDF downloads streamed as a ZIP"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='zip_owner', password='password123')
+        UserProfile.objects.create(user=self.owner, role='CLIENT', institution_type='SCHOOL', institution_name='Zip School')
+        for i in range(3):
+            Student.objects.create(
+                created_by=self.owner, name=f'Zip {i}', age=12, gender='F',
+                dob=date(2013, 1, 1), grade=6, relation='Mother', roll_number=f'ZIP-{i}'
+            )
+
+    def test_entries_leave_before_the_next_render(self):
+        rendered = []
+
+        def entries():
+            for i in range(3):
+                rendered.append(i)
+                yield f'file_{i}.txt', b'x' * 1000
+
+        chunks = stream_zip(entries())
+        first = next(chunks)
+        self.assertEqual(rendered, [0])
+        self.assertIn(b'file_0.txt', first)
+
+        archive = zipfile.ZipFile(BytesIO(first + b''.join(chunks)))
+        self.assertEqual(archive.namelist(), ['file_0.txt', 'file_1.txt', 'file_2.txt'])
+        self.assertIsNone(archive.testzip())
+
+    def test_duplicate_names_and_failed_renders(self):
+        def render(name):
+            if name == 'bad':
+                raise ValueError(name)
+            return BytesIO(name.encode())
+
+        with self.assertLogs('student.services.zip_stream', 'ERROR'):
+            entries = list(pdf_entries(['a', 'bad', 'a'], render, lambda name: f'{name}.pdf'))
+        archive = zipfile.ZipFile(BytesIO(b''.join(stream_zip(entries))))
+        self.assertEqual(archive.namelist(), ['a.pdf', 'a (2).pdf'])
+
+    def test_admin_bulk_id_cards_stream(self):
+        admin = site._registry[Student]
+        request = RequestFactory().post('/admin/student/student/')
+        request.user = self.owner
+        response = admin.download_id_card(request, Student.objects.all())
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(sorted(archive.namelist()), [f'ID_ZIP-{i}.pdf' for i in range(3)])
+        self.assertEqual(len(PdfReader(BytesIO(archive.read('ID_ZIP-1.pdf'))).pages), 1)
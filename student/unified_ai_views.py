@@ -7,6 +7,13 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from ai.manager import get_ai_manager, AIServiceManager
+from ai.router import get_provider_router
+from ai.transport import get_transport
+from ai.response_cache import get_response_cache
+from ai.prompts import get_prompt_registry
+from asgiref.sync import sync_to_async
+from .async_api import AsyncAPIView, api_response
+from .tenant import ai_cache_namespace
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,6 +44,20 @@ class AIProvidersListView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class AIProviderHealthView(APIView):
+    """Circuit-breaker state, error rate and p95 latency per AI provider"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({
+            "success": True,
+            **get_provider_router().health(),
+            "transport": get_transport().snapshot(),
+            "response_cache": get_response_cache().snapshot(),
+            "prompts": get_prompt_registry().stats()
+        })
+
+
 from rest_framework.permissions import AllowAny
 
 class UnifiedAITutorView(APIView):
@@ -83,7 +104,8 @@ class UnifiedAITutorView(APIView):
                 subject=subject,
                 context=context,
                 media_data=files,
-                history=history
+                history=history,
+                cache_namespace=ai_cache_namespace(request.user)
             )
             
             return Response({
@@ -104,6 +126,55 @@ class UnifiedAITutorView(APIView):
             }, status=status.HTTP_200_OK)
 
 
+class AsyncUnifiedAITutorView(AsyncAPIView):
+    """UnifiedAITutorView for ASGI mode: the provider call is awaited on the event loop"""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    async def post(self, request):
+        try:
+            question = request.data.get('question')
+            subject = request.data.get('subject', 'General')
+            context = request.data.get('context', 'User is asking for advanced professional assistance.')
+            provider = request.data.get('provider')
+            model = request.data.get('model')
+
+            if not question:
+                return api_response({
+                    "error": "Question is required"
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Manager construction may build a provider client (network): off the loop
+            ai = await sync_to_async(get_ai_manager)(provider=provider, model=model)
+            namespace = await sync_to_async(ai_cache_namespace)(request.user)
+
+            answer = await ai.aask_tutor(
+                question=question,
+                subject=subject,
+                context=context,
+                media_data=request.data.get('files', []),
+                history=request.data.get('history', []),
+                cache_namespace=namespace
+            )
+
+            return api_response({
+                "success": True,
+                "question": question,
+                "answer": answer,
+                "provider_info": ai.get_provider_info()
+            })
+
+        except Exception as e:
+            logger.error(f"Universal AI error: {str(e)}")
+            # FAILSAFE: same 200 + notice as the sync view
+            return api_response({
+                "success": False,
+                "question": request.data.get('question', ''),
+                "answer": f"**System Notice:** Encoded signal interrupted. Retrying neural handshake... \n\n*(Technical Details: {str(e)})*",
+                "provider_info": {"provider": "Y.S.M Failsafe Protocol"}
+            }, status=status.HTTP_200_OK)
+
+
 class UnifiedQuizGeneratorView(APIView):
     """Unified quiz generation - supports all providers"""
     permission_classes = [AllowAny]
@@ -134,7 +205,7 @@ class UnifiedQuizGeneratorView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             ai = get_ai_manager(provider=provider, model=model)
-            quiz = ai.generate_quiz(topic, num_questions, difficulty)
+            quiz = ai.generate_quiz(topic, num_questions, difficulty, cache_namespace=ai_cache_namespace(request.user))
             
             return Response({
                 "success": True,
@@ -207,7 +278,7 @@ class UnifiedConceptExplainerView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             ai = get_ai_manager(provider=provider, model=model)
-            explanation = ai.explain_concept(concept, grade_level)
+            explanation = ai.explain_concept(concept, grade_level, cache_namespace=ai_cache_namespace(request.user))
             
             return Response({
                 "success": True,
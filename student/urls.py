@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     StudentListCreateView,
     StudentDetailsView,
     StudentTodayView,
     AttendenceCreateView,
+    AttendenceBulkMarkView,
+    AttendanceAnalyticsView,
     AttendenceDetailsView,
     ProfileView,
     StudentDashboardView,
@@ -34,8 +37,9 @@ from .views import (
     CourseListCreateView, CourseDetailView, BatchListCreateView, EnrollmentListCreateView, InvoiceDownloadView,
     LiveClassListCreateView, DepartmentListCreateView,
     ClientAuditLogListView, DashboardStatsView,
-    GenerateIDCardView, GenerateAdmitCardView, GenerateReportCardView,
-    GlobalSearchView, HolidayListCreateView, RoutineListCreateView, BulkImportView
+    GenerateIDCardView, GenerateIDCardBatchView, GenerateAdmitCardView, GenerateReportCardView, ClassReportCardsView,
+    GlobalSearchView, HolidayListCreateView, RoutineListCreateView, BulkImportView,
+    ImportJobStatusView
 )
 from .report_views import ReportListView, ReportDownloadView
 from .subscription_views import ClientSubscriptionView, SubscriptionRenewalView, RenewalSubmissionView, ManualPaymentSubmitView
@@ -44,13 +48,13 @@ from .student_portal_views import (
     StudentDownloadReportCardView, 
     StudentDownloadAdmitCardView
 )
-from .attendance_geo_views import GeoFencedAttendanceView
+from .attendance_geo_views import GeoFencedAttendanceView, CampusFenceListCreateView, CampusFenceDetailView
 from .team_views import TeamManagementView
 from .eazypay_views import InitEazypayPaymentView, EazypayCallbackView
 from .manual_payment_views import ManualPaymentSubmitView
 
 from .admin_dashboard_views import (
-    AdminPaymentApprovalView, PendingPaymentsListView, PublicSubscriptionSubmitView,
+    AdminPaymentApprovalView, AsyncAdminPaymentApprovalView, PendingPaymentsListView, PublicSubscriptionSubmitView,
     SuperAdminClientActionView, SuperAdminDashboardView
 )
 from .super_admin_views import SuperAdminAdvancedDashboardView, AuditLogView, AdminApprovalActionView
@@ -70,7 +74,7 @@ from .chatgpt_views import (
 )
 from .approval_views import StudentApprovalView
 from .unified_ai_views import (
-    AIProvidersListView, UnifiedAITutorView, UnifiedQuizGeneratorView,
+    AIProvidersListView, AIProviderHealthView, UnifiedAITutorView, AsyncUnifiedAITutorView, UnifiedQuizGeneratorView,
     UnifiedContentSummarizerView, UnifiedConceptExplainerView,
     UnifiedContentTranslatorView
 )
@@ -80,11 +84,14 @@ from .ai_logout_view import AILogoutView
 
 # REAL CHAT API IMPORTS
 from .chat_api import (
-    ChatSendMessageView, ChatHistoryView, ChatLoadConversationView,
+    ChatSendMessageView, AsyncChatSendMessageView, ChatStreamMessageView, ChatHistoryView, ChatLoadConversationView,
     ChatSearchView, NotificationListView as ChatNotificationListView,
     ChatDeleteView
 )
 
+# ASGI mode: outbound-IO-bound endpoints await provider calls on the event loop
+ASYNC = settings.ASGI_MODE
+
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -105,9 +112,13 @@ urlpatterns = [
     path("my-admit-card/", StudentDownloadAdmitCardView.as_view(), name="my-admit-card"),
     
     path("attendence/mark-geo/", GeoFencedAttendanceView.as_view(), name="mark-geo-attendance"),
+    path("attendence/campuses/", CampusFenceListCreateView.as_view(), name="campus-fences"),
+    path("attendence/campuses/<int:pk>/", CampusFenceDetailView.as_view(), name="campus-fence-detail"),
 
     #ATTENDENCE 
     path("attendence/", AttendenceCreateView.as_view(), name="attendance-create-list"),
+    path("attendence/bulk/", AttendenceBulkMarkView.as_view(), name="attendance-bulk-mark"),
+    path("attendence/analytics/", AttendanceAnalyticsView.as_view(), name="attendance-analytics"),
     path("attendence/<int:id>/", AttendenceDetailsView.as_view(), name="attendence-details"),
     #AUTH (JWT)
     path("auth/login/", TokenObtainPairView.as_view(), name="jwt-login"),
@@ -200,7 +211,7 @@ urlpatterns = [
     
     # ADMIN PAYMENT VERIFICATION
     path('admin/payments/pending/', PendingPaymentsListView.as_view(), name='admin-pending-payments'),
-    path('admin/payments/approve/', AdminPaymentApprovalView.as_view(), name='admin-approve-payment'),
+    path('admin/payments/approve/', (AsyncAdminPaymentApprovalView if ASYNC else AdminPaymentApprovalView).as_view(), name='admin-approve-payment'),
     
     # SUPER ADMIN DASHBOARD
     path('admin/subscriptions/overview/', SuperAdminDashboardView.as_view(), name='superadmin-overview'),
@@ -257,6 +268,7 @@ urlpatterns = [
     path('calendar/holidays/', HolidayListCreateView.as_view(), name='calendar-holidays'),
     path('academic/routine/', RoutineListCreateView.as_view(), name='academic-routine'),
     path('management/bulk-import/', BulkImportView.as_view(), name='bulk-import'),
+    path('management/bulk-import/<int:job_id>/', ImportJobStatusView.as_view(), name='bulk-import-status'),
     path('reports/', ReportListView.as_view(), name='reports-list'),
     path('reports/download/<int:pk>/', ReportDownloadView.as_view(), name='reports-download'),
 
@@ -269,9 +281,10 @@ urlpatterns = [
     # ==================== UNIFIED MULTI-MODEL AI ENDPOINTS ====================
     # List all available AI providers
     path('ai/providers/', AIProvidersListView.as_view(), name='ai-providers-list'),
+    path('ai/providers/health/', AIProviderHealthView.as_view(), name='ai-providers-health'),
     
     # Unified endpoints with provider selection (ChatGPT, Gemini, Claude)
-    path('ai/unified/tutor/', UnifiedAITutorView.as_view(), name='ai-unified-tutor'),
+    path('ai/unified/tutor/', (AsyncUnifiedAITutorView if ASYNC else UnifiedAITutorView).as_view(), name='ai-unified-tutor'),
     path('ai/unified/quiz/', UnifiedQuizGeneratorView.as_view(), name='ai-unified-quiz'),
     path('ai/unified/summarize/', UnifiedContentSummarizerView.as_view(), name='ai-unified-summarize'),
     path('ai/unified/explain/', UnifiedConceptExplainerView.as_view(), name='ai-unified-explain'),
@@ -279,7 +292,10 @@ urlpatterns = [
     
     # ==================== REAL CHAT API (NEW) ====================
     # Send message to AI and save to database
-    path('api/chat/send/', ChatSendMessageView.as_view(), name='chat-send-message'),
+    path('api/chat/send/', (AsyncChatSendMessageView if ASYNC else ChatSendMessageView).as_view(), name='chat-send-message'),
+    
+    # Same, answer streamed as Server-Sent Events
+    path('api/chat/stream/', ChatStreamMessageView.as_view(), name='chat-stream-message'),
     
     # Get all conversations
     path('api/chat/history/', ChatHistoryView.as_view(), name='chat-history'),
@@ -303,8 +319,10 @@ urlpatterns = [
 
 urlpatterns += [
     path('generate/id-card/<int:student_id>/', GenerateIDCardView.as_view(), name='generate-id-card'),
+    path('generate/id-cards/', GenerateIDCardBatchView.as_view(), name='generate-id-cards'),
     path('generate/admit-card/<int:student_id>/', GenerateAdmitCardView.as_view(), name='generate-admit-card'),
     path('generate/report-card/<int:student_id>/', GenerateReportCardView.as_view(), name='generate-report-card'),
+    path('generate/report-cards/', ClassReportCardsView.as_view(), name='generate-report-cards'),
 ]
 
 # Temporarily appended to fix check
@@ -1,6 +1,6 @@
 from django.views.generic import TemplateView
 from django.http import HttpResponse
-from django.db.models import Q
+from django.db.models import Q, Count
 from django.utils import timezone
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
@@ -23,6 +23,11 @@ from .models import (
 
 from .Serializer import *
 from .permissions import *
+from .tenant import get_tenant_context
+from .services import search_index
+from .services.attendance import RosterError, get_roster, mark_roll_call
+from .services.attendance_rollup import load_months, attendance_summary, attendance_streaks, class_heatmap
+from .pagination import LeanListMixin, list_response
 
 
 # COMMON HELPERS (SAAS ISOLATION)
@@ -31,24 +36,14 @@ def get_owner_user(user):
     """
     Get the owner user for data filtering (multi-tenancy isolation)
     Returns the user who 'owns' the data being accessed
+
+    Resolved once per request through the tenant context (see student/tenant.py)
+    - Super admin: sees only their own created data
+    - CLIENT / ADMIN: they are the owner of their data
+    - Teacher/Staff: their employer (Employee.created_by)
+    - Parent/Student: their own data
     """
-    # Super admin: return special marker to filter their own data separately
-    if user.is_superuser:
-        return user  # Super admin sees only their own created data
-    
-    # CLIENT or ADMIN role: they are the owner of their data
-    if hasattr(user, 'profile') and user.profile.role in ['CLIENT', 'ADMIN']:
-        return user
-    
-    # Teacher/Staff: find their client/owner
-    if hasattr(user, 'employee_profile'):
-        return user.employee_profile.created_by
-    
-    # Parent/Student: should see data from their associated client
-    if hasattr(user, 'profile') and user.profile.role in ['PARENT', 'STUDENT']:
-        return getattr(user.profile, 'created_by', user)
-    
-    return user
+    return get_tenant_context(user).owner
 
 
 def filter_by_owner(qs, user):
@@ -95,7 +90,7 @@ class StudentListCreateView(APIView):
                 Q(gender__icontains=search)
             )
 
-        return Response(StudentSerializer(students, many=True).data)
+        return list_response(request, students, StudentListSerializer)
 
 # ... [Skipping unchanged lines] ...
 
@@ -347,22 +342,22 @@ class StudentTodayView(APIView):
         today = timezone.now().date()
         students = filter_by_owner(Student.objects.all(), request.user)
 
-        attendance = Attendence.objects.filter(student__in=students, date=today)
+        attendance = (
+            Attendence.objects
+            .filter(student__in=students, date=today)
+            .select_related('student__parent')
+        )
 
-        present = attendance.filter(is_present=True)
-        absent = attendance.filter(is_present=False)
+        present = [a.student for a in attendance if a.is_present]
+        absent = [a.student for a in attendance if not a.is_present]
 
         return Response({
             "date": str(today),
             "total_students": students.count(),
-            "present_count": present.count(),
-            "absent_count": absent.count(),
-            "present_students": StudentSerializer(
-                [a.student for a in present], many=True
-            ).data,
-            "absent_students": StudentSerializer(
-                [a.student for a in absent], many=True
-            ).data
+            "present_count": len(present),
+            "absent_count": len(absent),
+            "present_students": StudentSerializer(present, many=True).data,
+            "absent_students": StudentSerializer(absent, many=True).data
         })
 
 
@@ -390,6 +385,98 @@ class AttendenceCreateView(APIView):
         return Response(serializer.errors, status=400)
 
 
+class AttendenceBulkMarkView(APIView):
+    """
+    Mark a whole class in one request.
+    {"date": "YYYY-MM-DD", "batch_id" | "grade": ..., "present": [ids], "absent": [ids]}
+    Students not listed keep their current mark.
+    """
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+
+    def post(self, request):
+        data = request.data
+        batch_id = data.get('batch_id')
+        grade = data.get('grade')
+        if not batch_id and not grade:
+            return Response({"error": "batch_id or grade is required"}, status=400)
+
+        try:
+            day = date.fromisoformat(str(data.get('date') or date.today()))
+        except ValueError:
+            return Response({"error": "date must be YYYY-MM-DD"}, status=400)
+        if day > date.today():
+            return Response({"error": "Cannot mark attendance for a future date"}, status=400)
+
+        present, absent = data.get('present', []), data.get('absent', [])
+        if not isinstance(present, list) or not isinstance(absent, list):
+            return Response({"error": "present and absent must be lists of student ids"}, status=400)
+        try:
+            present = [int(i) for i in present]
+            absent = [int(i) for i in absent]
+        except (TypeError, ValueError):
+            return Response({"error": "present and absent must be lists of student ids"}, status=400)
+        if not present and not absent:
+            return Response({"error": "No students to mark"}, status=400)
+
+        owner = get_owner_user(request.user)
+        if not owner:
+            return Response({"error": "Permission denied"}, status=403)
+
+        try:
+            result = mark_roll_call(owner, day, present, absent, batch_id=batch_id, grade=grade)
+        except RosterError as e:
+            return Response({"error": str(e), "student_ids": e.student_ids}, status=403)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response(result, status=200)
+
+
+class AttendanceAnalyticsView(APIView):
+    """
+    Attendance of a class over a date range, from the monthly bitmaps.
+    ?batch_id= | ?grade= (default: all students), ?start=&end= (YYYY-MM-DD,
+    default: the last 30 days). Returns per-student percentage and streaks
+    plus a per-day class heatmap.
+    """
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    MAX_RANGE_DAYS = 366
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            end = date.fromisoformat(params['end']) if params.get('end') else date.today()
+            start = date.fromisoformat(params['start']) if params.get('start') else end - timedelta(days=29)
+        except ValueError:
+            return Response({"error": "start and end must be YYYY-MM-DD"}, status=400)
+        if start > end or (end - start).days >= self.MAX_RANGE_DAYS:
+            return Response({"error": f"Range must be 1 to {self.MAX_RANGE_DAYS} days"}, status=400)
+
+        owner = get_owner_user(request.user)
+        if not owner:
+            return Response({"error": "Permission denied"}, status=403)
+        students = list(
+            get_roster(owner, params.get('batch_id'), params.get('grade'))
+            .order_by('roll_number', 'id').values('id', 'name', 'roll_number')
+        )
+        ids = [student['id'] for student in students]
+
+        months = load_months(ids, start, end)
+        summary = attendance_summary(ids, start, end, months)
+        streaks = attendance_streaks(ids, start, end, months)
+        return Response({
+            "start": start,
+            "end": end,
+            "students": [
+                {**student, **summary[student['id']],
+                 "current_streak": streaks[student['id']]['current'],
+                 "longest_streak": streaks[student['id']]['longest']}
+                for student in students
+            ],
+            "heatmap": class_heatmap(ids, start, end, months),
+        })
+
+
 class AttendenceDetailsView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
 
@@ -434,18 +521,25 @@ class PaymentListCreateView(APIView):
         elif request.user.profile.role == 'STUDENT':
             qs = qs.filter(student__user=request.user)
         else:
-            qs = filter_by_owner(qs, request.user)
+            # Payment has no created_by: fees belong to the student's owner,
+            # subscription payments to the paying client
+            owner = get_owner_user(request.user)
+            qs = qs.filter(Q(student__created_by=owner) | Q(user=owner)) if owner else qs.none()
 
-        return Response(PaymentSerializer(qs, many=True).data)
+        return list_response(request, qs, PaymentListSerializer)
 
 
 class PaymentDetailsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, id):
-        qs = Payment.objects.filter(id=id)
-        qs = filter_by_owner(qs, request.user)
-        payment = qs.first()
+        owner = get_owner_user(request.user)
+        payment = (
+            Payment.objects
+            .filter(Q(student__created_by=owner) | Q(user=owner), id=id)
+            .select_related('student')
+            .first()
+        ) if owner else None
 
         if not payment:
             return Response({"error": "Payment not found"}, status=404)
@@ -465,7 +559,7 @@ class NotificationListView(APIView):
             Q(recipient_type=role) |
             Q(recipient_type='ALL')
         )
-        return Response(NotificationSerializer(qs, many=True).data)
+        return list_response(request, qs, NotificationListSerializer)
 
 
 class NotificationMarkReadView(APIView):
@@ -548,9 +642,10 @@ class SubscriptionRenewalView(APIView):
          return Response({"message": "Renewal initiated"})
 
 # --- LIBRARY ---
-class LibraryBookListCreateView(generics.ListCreateAPIView):
+class LibraryBookListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = LibraryBook.objects.all()
     serializer_class = LibraryBookSerializer
+    list_serializer_class = LibraryBookListSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
@@ -568,9 +663,10 @@ class LibraryBookDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return filter_by_owner(self.queryset, self.request.user)
 
-class BookIssueListCreateView(generics.ListCreateAPIView):
+class BookIssueListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = BookIssue.objects.all()
     serializer_class = BookIssueSerializer
+    list_serializer_class = BookIssueListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -580,9 +676,10 @@ class BookIssueListCreateView(generics.ListCreateAPIView):
         serializer.save(created_by=get_owner_user(self.request.user))
 
 # --- HOSTEL ---
-class HostelListCreateView(generics.ListCreateAPIView):
+class HostelListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Hostel.objects.all()
     serializer_class = HostelSerializer
+    list_serializer_class = HostelListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -591,9 +688,10 @@ class HostelListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(created_by=get_owner_user(self.request.user))
 
-class RoomListCreateView(generics.ListCreateAPIView):
+class RoomListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
+    list_serializer_class = RoomListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -602,9 +700,10 @@ class RoomListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(created_by=get_owner_user(self.request.user))
 
-class HostelAllocationListCreateView(generics.ListCreateAPIView):
+class HostelAllocationListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = HostelAllocation.objects.all()
     serializer_class = HostelAllocationSerializer
+    list_serializer_class = HostelAllocationListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -614,9 +713,10 @@ class HostelAllocationListCreateView(generics.ListCreateAPIView):
         serializer.save(created_by=get_owner_user(self.request.user))
 
 # --- TRANSPORT ---
-class VehicleListCreateView(generics.ListCreateAPIView):
+class VehicleListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
+    list_serializer_class = VehicleListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -625,9 +725,10 @@ class VehicleListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(created_by=get_owner_user(self.request.user))
 
-class RouteListCreateView(generics.ListCreateAPIView):
+class RouteListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Route.objects.all()
     serializer_class = RouteSerializer
+    list_serializer_class = RouteListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -636,9 +737,10 @@ class RouteListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         serializer.save(created_by=get_owner_user(self.request.user))
 
-class TransportAllocationListCreateView(generics.ListCreateAPIView):
+class TransportAllocationListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = TransportAllocation.objects.select_related('student', 'route', 'vehicle').all()
     serializer_class = TransportAllocationSerializer
+    list_serializer_class = TransportAllocationListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -648,9 +750,10 @@ class TransportAllocationListCreateView(generics.ListCreateAPIView):
         serializer.save(created_by=get_owner_user(self.request.user))
 
 # --- HR ---
-class EmployeeListCreateView(generics.ListCreateAPIView):
+class EmployeeListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Employee.objects.select_related('user', 'user__profile', 'department', 'designation').all()
     serializer_class = EmployeeSerializer
+    list_serializer_class = EmployeeListSerializer
     permission_classes = [IsAuthenticated, permissions.IsAdminUser]
 
     def get_queryset(self):
@@ -660,9 +763,10 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
         owner = get_owner_user(self.request.user)
         serializer.save(created_by=owner)
 
-class LeaveRequestListCreateView(generics.ListCreateAPIView):
+class LeaveRequestListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = LeaveRequest.objects.select_related('employee', 'employee__user', 'approved_by').all()
     serializer_class = LeaveRequestSerializer
+    list_serializer_class = LeaveRequestListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -673,7 +777,7 @@ class LeaveRequestListCreateView(generics.ListCreateAPIView):
 
 # --- ACADEMIC / EXAMS ---
 class ExamListCreateView(generics.ListCreateAPIView):
-    queryset = Exam.objects.select_related('course').prefetch_related('students').all()
+    queryset = Exam.objects.select_related('subject', 'batch').all()
     serializer_class = ExamSerializer
     permission_classes = [IsAuthenticated]
 
@@ -695,9 +799,10 @@ class EventListCreateView(generics.ListCreateAPIView):
         serializer.save(created_by=get_owner_user(self.request.user))
 
 # --- COACHING ---
-class CourseListCreateView(generics.ListCreateAPIView):
+class CourseListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Course.objects.select_related('department').prefetch_related('batches').all()
     serializer_class = CourseSerializer
+    list_serializer_class = CourseListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -707,27 +812,29 @@ class CourseListCreateView(generics.ListCreateAPIView):
         serializer.save(created_by=get_owner_user(self.request.user))
 
 class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Course.objects.select_related('department').prefetch_related('batches').all()
+    queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return filter_by_owner(self.queryset, self.request.user)
 
-class BatchListCreateView(generics.ListCreateAPIView):
+class BatchListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Batch.objects.select_related('course').prefetch_related('enrollments', 'enrollments__student').all()
     serializer_class = BatchSerializer
+    list_serializer_class = BatchListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return filter_by_owner(self.queryset, self.request.user)
+        return filter_by_owner(self.queryset.annotate(enrolled_count=Count('enrollments')), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=get_owner_user(self.request.user))
 
-class EnrollmentListCreateView(generics.ListCreateAPIView):
+class EnrollmentListCreateView(LeanListMixin, generics.ListCreateAPIView):
     queryset = Enrollment.objects.select_related('student', 'student__user', 'batch', 'batch__course').all()
     serializer_class = EnrollmentSerializer
+    list_serializer_class = EnrollmentListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -737,7 +844,7 @@ class EnrollmentListCreateView(generics.ListCreateAPIView):
         serializer.save(created_by=get_owner_user(self.request.user))
 
 class LiveClassListCreateView(generics.ListCreateAPIView):
-    queryset = LiveClass.objects.select_related('course', 'teacher', 'teacher__user').all()
+    queryset = LiveClass.objects.all()
     serializer_class = LiveClassSerializer
     permission_classes = [IsAuthenticated]
 
@@ -942,48 +1049,21 @@ class DashboardStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        owner = get_owner_user(user)
-        
-        # Get Plan
-        plan = 'SCHOOL' # Default
-        if hasattr(user, 'profile'):
-            plan = user.profile.institution_type
-            
-        stats = {
-            'plan': plan,
-            'students_count': Student.objects.filter(created_by=owner).count(),
-            'recent_payments': Payment.objects.filter(user=owner).order_by('-created_at')[:5].values('amount', 'status', 'created_at'),
-        }
-        
-        # --- PLAN SPECIFIC DATA ---
-        
-        # 1. COACHING PLAN Focus
-        if plan in ['COACHING', 'INSTITUTE']:
-            stats['courses_count'] = Course.objects.filter(created_by=owner).count()
-            stats['batches_count'] = Batch.objects.filter(created_by=owner).count()
-            
-        # 2. SCHOOL/INSTITUTE Focus
-        if plan in ['SCHOOL', 'INSTITUTE']:
-            stats['teachers_count'] = 0 # Placeholder if teacher model exists
-            stats['exams_count'] = Exam.objects.filter(created_by=owner).count()
-            
-            # Attendance Stats (Today)
-            today = timezone.now().date()
-            present_count = Attendence.objects.filter(student__created_by=owner, date=today, is_present=True).count()
-            total_students = stats['students_count']
-            stats['attendance_percentage'] = int((present_count / total_students * 100)) if total_students > 0 else 0
-            
-        # 3. EXTRA MODULES (Institute Only)
-        if plan == 'INSTITUTE':
-            stats['hostel_occupancy'] = 0 # Placeholder
-            stats['transport_routes'] = 0 # Placeholder
-            
-        return Response(stats)
+        from .services.dashboard_stats import get_dashboard_stats
+
+        tenant = get_tenant_context(request.user)
+        plan = tenant.plan or 'SCHOOL' # Default
+
+        # Served from a per-owner versioned snapshot, refreshed on writes
+        return Response(get_dashboard_stats(tenant.owner, plan))
 
 # PREMIUM REPORT GENERATION (Advance Level)
-from .report_utils import generate_admit_card_pdf, generate_report_card_pdf
-from .id_card_utils import generate_id_card_pdf
+from .report_utils import generate_admit_card_pdf
+from .report_card_utils import load_branding, render_report_cards
+from .services.report_cards import student_report_card, iter_class_report_card_files
+from .services.report_jobs import REPORT_CARDS, request_report
+from .id_card_utils import generate_id_card_pdf, generate_id_cards_pdf, iter_id_card_files
+from .services.zip_stream import streaming_zip_response
 
 class GenerateAdmitCardView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
@@ -1006,32 +1086,95 @@ class GenerateAdmitCardView(APIView):
             return Response({"error": "Student not found"}, status=404)
 
 class GenerateReportCardView(APIView):
+    """
+    Report card of one student from their Grade rows, ranked against their
+    grade. ?academic_year=2024-25 (default: every exam)
+    """
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
     required_feature = 'exams'
 
     def get(self, request, student_id):
         try:
-            student = Student.objects.get(id=student_id)
+            student = Student.objects.select_related('parent', 'created_by__profile').get(id=student_id)
             # Ensure owner isolation
             if student.created_by != get_owner_user(request.user):
                 return Response({"error": "Permission Denied"}, status=403)
-            
-            # Mock Data for now (In real app, fetch from ExamResult model)
-            results = [
-                {'subject': 'Mathematics', 'total': 100, 'marks': 95},
-                {'subject': 'Physics', 'total': 100, 'marks': 88},
-                {'subject': 'Chemistry', 'total': 100, 'marks': 92},
-                {'subject': 'English', 'total': 100, 'marks': 85},
-                {'subject': 'Computer Science', 'total': 100, 'marks': 98},
-            ]
-            
-            pdf = generate_report_card_pdf(student, results)
+
+            card = student_report_card(student, request.query_params.get('academic_year') or None)
+            pdf = render_report_cards([card], load_branding(student.created_by))
             response = HttpResponse(pdf, content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="ReportCard_{student.name}.pdf"'
             return response
         except Student.DoesNotExist:
             return Response({"error": "Student not found"}, status=404)
 
+class ClassReportCardsView(APIView):
+    """
+    Report cards of a whole class (ranks and percentiles within the class).
+    ?grade=6 and/or ?batch=3 (default: every student, ranked per grade),
+    ?academic_year=2024-25 (default: every exam)
+    GET  -> ZIP with one PDF per student, streamed while it renders
+    POST -> ONE merged class PDF rendered as a background report job;
+            poll / download it at the returned url
+    """
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    required_feature = 'exams'
+
+    @staticmethod
+    def _params(data):
+        params = {}
+        for key, field in (('grade', 'grade'), ('batch', 'batch_id')):
+            value = data.get(key)
+            if value not in (None, ''):
+                try:
+                    params[field] = int(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{key} must be a number")
+        if data.get('academic_year'):
+            params['academic_year'] = str(data['academic_year'])
+        return params
+
+    def _load(self, request, data):
+        """(owner, params) or an error Response"""
+        try:
+            params = self._params(data)
+        except ValueError as e:
+            return None, Response({"error": str(e)}, status=400)
+        owner = get_owner_user(request.user)
+        if not owner:
+            return None, Response({"error": "Permission denied"}, status=403)
+        if not get_roster(owner, params.get('batch_id'), params.get('grade')).exists():
+            return None, Response({"error": "No students found"}, status=404)
+        return (owner, params), None
+
+    def get(self, request):
+        loaded, error = self._load(request, request.query_params)
+        if error:
+            return error
+        owner, params = loaded
+        return streaming_zip_response(iter_class_report_card_files(owner, **params), 'Report_Cards.zip')
+
+    def post(self, request):
+        loaded, error = self._load(request, request.data)
+        if error:
+            return error
+        owner, params = loaded
+
+        label = f"Batch {params['batch_id']}" if 'batch_id' in params else (
+            f"Class {params['grade']}" if 'grade' in params else "All Classes"
+        )
+        if 'academic_year' in params:
+            label += f" ({params['academic_year']})"
+        report, created = request_report(
+            request.user, owner, REPORT_CARDS, params=params, name=f"Report Cards - {label}"
+        )
+        return Response({
+            "message": "Report cards queued" if created else "Report cards are already being generated",
+            "report_id": report.id,
+            "status": report.status,
+            "url": f"/api/reports/download/{report.id}/"
+        }, status=202)
+
 class GenerateIDCardView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
     required_feature = 'id_cards'
@@ -1050,6 +1193,43 @@ class GenerateIDCardView(APIView):
         except Student.DoesNotExist:
             return Response({"error": "Student not found"}, status=404)
 
+class GenerateIDCardBatchView(APIView):
+    """
+    Print ID cards for many students in one request.
+    ?ids=1,2,3 and/or ?grade=6 (default: all students of the owner)
+    ?output=pdf (one multi-page PDF, default) | zip (one PDF per student)
+    """
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    required_feature = 'id_cards'
+
+    def get(self, request):
+        owner = get_owner_user(request.user)
+        students = Student.objects.filter(created_by=owner).select_related('parent', 'created_by__profile').order_by('grade', 'roll_number', 'id')
+
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                students = students.filter(id__in=[int(i) for i in ids.split(',') if i.strip()])
+            except ValueError:
+                return Response({"error": "ids must be a comma separated list of numbers"}, status=400)
+        grade = request.query_params.get('grade')
+        if grade:
+            try:
+                students = students.filter(grade=int(grade))
+            except ValueError:
+                return Response({"error": "grade must be a number"}, status=400)
+
+        students = list(students)
+        if not students:
+            return Response({"error": "No students found"}, status=404)
+
+        if request.query_params.get('output', 'pdf').lower() == 'zip':
+            response = streaming_zip_response(iter_id_card_files(students), 'Student_ID_Cards.zip')
+        else:
+            response = HttpResponse(generate_id_cards_pdf(students), content_type='application/pdf')
+            response['Content-Disposition'] = 'attachment; filename="Student_ID_Cards.pdf"'
+        return response
+
 
 
 # PWA SERVICE WORKER VIEW - PREMIUM AUTO-UPDATE VERSION
@@ -1249,6 +1429,7 @@ def google_verification(request):
 # =========================
 
 class GlobalSearchView(APIView):
+    """Type-ahead search over the tenant's Students, Courses and Batches (one indexed query)"""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -1256,53 +1437,13 @@ class GlobalSearchView(APIView):
         if not query or len(query) < 2:
             return Response([])
 
-        user = request.user
-        results = []
+        tenant = get_tenant_context(request.user)
+        kinds = [search_index.KIND_STUDENT, search_index.KIND_BATCH]
+        # Courses only for Coaching/Institute
+        if tenant.plan is not None and tenant.plan != 'SCHOOL':
+            kinds.append(search_index.KIND_COURSE)
 
-        # 1. Search Students
-        students = Student.objects.select_related('parent').filter(
-            Q(name__icontains=query) | 
-            Q(roll_number__icontains=query) |
-            Q(parent__username__icontains=query)
-        )
-        # Apply Isolation
-        students = filter_by_owner(students, user)[:5]
-        
-        for s in students:
-            results.append({
-                'type': 'Student',
-                'title': s.name,
-                'subtitle': f"Roll: {s.roll_number} | Class: {s.grade}",
-                'url': f"#students/{s.id}",
-                'icon': '👤'
-            })
-
-        # 2. Search Courses/Batches (Coaching/Institute)
-        if hasattr(user, 'profile') and user.profile.institution_type != 'SCHOOL':
-            courses = Course.objects.filter(name__icontains=query)
-            courses = filter_by_owner(courses, user)[:3]
-            for c in courses:
-                results.append({
-                    'type': 'Course',
-                    'title': c.name,
-                    'subtitle': f"Fee: ₹{c.fee}",
-                    'url': f"#courses/{c.id}",
-                    'icon': '📚'
-                })
-
-        # 3. Search Batches
-        batches = Batch.objects.select_related('course').filter(name__icontains=query)
-        batches = filter_by_owner(batches, user)[:3]
-        for b in batches:
-             results.append({
-                'type': 'Batch',
-                'title': b.name,
-                'subtitle': f"Course: {b.course.name if b.course else 'N/A'}",
-                'url': f"#batches",
-                'icon': '👥'
-            })
-        
-        return Response(results)
+        return Response(search_index.search(tenant.owner, query, kinds))
 
 # =========================
 # HOLIDAY CALENDAR API
@@ -1316,7 +1457,7 @@ class HolidayListCreateView(generics.ListCreateAPIView):
     def get(self, request):
         user = request.user
         # Strict Isolation
-        holidays = Holiday.objects.filter(owner=user.profile.get_owner() if hasattr(user, 'profile') else user)
+        holidays = Holiday.objects.filter(owner=get_owner_user(user))
         # Also include owner's own holidays (if user is owner)
         holidays |= Holiday.objects.filter(owner=user)
         
@@ -1359,7 +1500,7 @@ class RoutineListCreateView(generics.ListCreateAPIView):
 
     def get(self, request):
         user = request.user
-        routines = ClassRoutine.objects.filter(owner=user.profile.get_owner() if hasattr(user, 'profile') else user)
+        routines = ClassRoutine.objects.filter(owner=get_owner_user(user)).select_related('batch')
         
         # Filter by specific context
         batch_id = request.query_params.get('batch_id')
@@ -1408,76 +1549,74 @@ class RoutineListCreateView(generics.ListCreateAPIView):
 # =========================
 # BULK IMPORT OPERATIONS
 # =========================
-import csv
-import io
+from .models import ImportJob
+from .services import bulk_import
+
 
 class BulkImportView(APIView):
+    """
+    CSV / XLSX import for STUDENT, BOOK and STAFF records.
+    Small files are imported in the request; large files (or `background=true`)
+    are queued as an ImportJob and polled through ImportJobStatusView.
+    """
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
     def post(self, request):
-        if not request.user.profile.is_admin_or_owner():
+        tenant = get_tenant_context(request.user)
+        if not (request.user.is_superuser or (tenant.profile and tenant.profile.is_admin_or_owner())):
             return Response({"error": "Permission Denied"}, status=403)
 
         file_obj = request.FILES.get('file')
-        import_type = request.data.get('type')
-        
+        import_type = (request.data.get('type') or '').upper()
+
         if not file_obj:
             return Response({"error": "No file uploaded"}, status=400)
+        if import_type not in bulk_import.IMPORTERS:
+            return Response({"error": "Invalid Import Type"}, status=400)
 
-        # Basic CSV Parsing
-        try:
-            decoded_file = file_obj.read().decode('utf-8')
-            io_string = io.StringIO(decoded_file)
-            reader = csv.DictReader(io_string)
-            
-            count = 0
-            errors = []
-            
-            for row in reader:
-                try:
-                    self._process_row(row, import_type, request.user)
-                    count += 1
-                except Exception as e:
-                    errors.append(f"Row {count+1}: {str(e)}")
-            
+        background = str(request.data.get('background', '')).lower() in ('1', 'true', 'yes')
+        if background or file_obj.size > bulk_import.IMPORT_SYNC_MAX_BYTES:
+            job = bulk_import.create_import_job(import_type, tenant.owner, request.user, file_obj)
             return Response({
-                "message": f"Successfully imported {count} records.",
-                "errors": errors
-            })
-            
-        except Exception as e:
-            return Response({"error": f"Import failed: {str(e)}"}, status=500)
+                "message": "Import queued",
+                "job_id": job.id,
+                "status": job.status,
+            }, status=202)
 
-    def _process_row(self, row, type, user):
-        # Helper to route to specific logic
-        from .models import Student, LibraryBook, Employee
-        
-        if type == 'STUDENT':
-            Student.objects.create(
-                user=user, # Link to owner
-                name=row.get('name'),
-                phone=row.get('phone', ''),
-                email=row.get('email', ''),
-                address=row.get('address', '')
-                # Add more fields as per CSV headers
-            )
-        elif type == 'BOOK':
-             LibraryBook.objects.create(
-                created_by=user,
-                title=row.get('title'),
-                author=row.get('author'),
-                isbn=row.get('isbn', '0000000000'),
-                total_copies=int(row.get('copies', 1)),
-                price=0
-             )
-        elif type == 'STAFF':
-            Employee.objects.create(
-                user=user, # Temporarily link user as placeholder
-                first_name=row.get('first_name'),
-                last_name=row.get('last_name'),
-                email=row.get('email'),
-                phone=row.get('phone')
-            )
-        else:
-            raise ValueError("Invalid Import Type")
+        try:
+            importer = bulk_import.get_importer(import_type, tenant.owner, request.user)
+            result = bulk_import.run_import(importer, bulk_import.iter_rows(file_obj, file_obj.name))
+        except (UnicodeDecodeError, ValueError) as e:
+            return Response({"error": f"Invalid File: {str(e)}"}, status=400)
+
+        return Response({
+            "message": f"Successfully imported {result.created} records.",
+            **result.as_dict(),
+        })
+
+
+class ImportJobStatusView(APIView):
+    """Progress of a background import (owner-scoped)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        owner = get_owner_user(request.user)
+        job = ImportJob.objects.filter(pk=job_id, created_by=owner).first()
+        if not job:
+            return Response({"error": "Import job not found"}, status=404)
+
+        return Response({
+            "job_id": job.id,
+            "type": job.import_type,
+            "status": job.status,
+            "file_name": job.file_name,
+            "processed_rows": job.processed_rows,
+            "created_count": job.created_count,
+            "error_count": job.error_count,
+            "errors": job.errors,
+            "message": job.message,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        })